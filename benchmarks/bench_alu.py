@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from mipyfive.alu import *
+from mipyfive.compare import *
+
+# The ALU (one adder/subtractor, one shifter and a one-hot result mux) and CompareUnit - synthesised size and longest
+# path, alone and in the core
+
+def unitStats(unit, outputs):
+    '''Synthesis results (yosysStats) of a combinational unit, from its inputs to "outputs"'''
+    return yosysStats(rtlil.convert(unit, ports=[unit.in1, unit.in2] + outputs))
+
+if __name__ == "__main__":
+    alu, compare = ALU(32), CompareUnit(32)
+    printStats("Synthesis (yosys, generic gates - see yosysStats)", [
+        ("ALU",         unitStats(alu, [alu.aluOp, alu.out, alu.isEqual, alu.isLess, alu.isLessU])),
+        ("CompareUnit", unitStats(compare, [compare.cmpType, compare.isTrue])),
+        ("RV32I",       coreStats())
+    ])
@@ -0,0 +1,90 @@
+import os
+import sys
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.axi import *
+from examples.common.axiram import *
+
+# Bus bandwidth in words per cycle - the read data channel's theoretical maximum is one beat (word) per cycle
+
+def fetchBandwidth(depth, latency, words=256):
+    '''Sequential fetches through an AxiLiteFetchMaster ("depth" reads in flight) - returns words per cycle'''
+    m = Module()
+    m.submodules.master = master = AxiLiteFetchMaster(depth=depth)
+    m.submodules.mem = mem = AxiRAM(depth=words, latency=latency, maxOutstanding=depth, lite=True)
+    m.d.comb += master.bus.connect(mem.bus)
+
+    results = {}
+    sim = Simulator(m)
+    def process():
+        cycles = 0
+        for addr in range(0, 4 * (words + 1), 4):
+            yield master.addr.eq(addr)
+            yield Settle()
+            while not (yield master.ready):
+                yield Tick()
+                yield Settle()
+                cycles += 1
+            yield Tick()
+            cycles += 1
+        results["bandwidth"] = words / cycles
+
+    sim.add_clock(1e-6)
+    sim.add_sync_process(process)
+    sim.run()
+    return results["bandwidth"]
+
+def refillBandwidth(burstLength, latency, lines=16):
+    '''Back-to-back line reads through an AxiRefillMaster ("burstLength" word INCR bursts) - returns words per
+    cycle'''
+    m = Module()
+    m.submodules.master = master = AxiRefillMaster(burstLength=burstLength)
+    m.submodules.mem = mem = AxiRAM(depth=lines * burstLength, latency=latency)
+    m.d.comb += master.bus.connect(mem.bus)
+
+    results = {}
+    sim = Simulator(m)
+    def process():
+        cycles = 0
+        yield master.req.eq(1)
+        for line in range(lines):
+            yield master.addr.eq(4 * burstLength * line)
+            words = 0
+            while words < burstLength:
+                yield Settle()
+                words += (yield master.valid)
+                yield Tick()
+                cycles += 1
+        results["bandwidth"] = lines * burstLength / cycles
+
+    sim.add_clock(1e-6)
+    sim.add_sync_process(process)
+    sim.run()
+    return results["bandwidth"]
+
+def printBandwidth(title, rows):
+    '''Print a list of (config-name, achieved, bound) tuples - "bound" is the configuration's own maximum'''
+    print(f"\n{title}")
+    print(f"{'Config':<28}{'Words/cycle':>13}{'% of peak':>11}{'Bound':>8}")
+    for name, achieved, bound in rows:
+        print(f"{name:<28}{achieved:>13.3f}{100 * achieved:>10.1f}%{bound:>8.3f}")
+
+if __name__ == "__main__":
+    # NOTE: The bridge registers every request, so a read's round trip through the fetch master is "latency + 2"
+    #       cycles - the fetch stream needs that many reads in flight to reach the peak
+    rows = []
+    for latency in [1, 2, 4, 8]:
+        for depth in sorted({1, 2, latency + 1, latency + 2}):
+            rows.append((f"latency {latency}, {depth} in flight", fetchBandwidth(depth, latency),
+                min(1, depth / (latency + 2))))
+    printBandwidth("AXI4-Lite sequential fetch (single word reads)", rows)
+
+    # NOTE: The caches refill a line at a time, so every burst pays the read latency once
+    rows = []
+    for latency in [1, 4, 8]:
+        for burstLength in [1, 4, 8, 16]:
+            rows.append((f"latency {latency}, {burstLength} beat bursts", refillBandwidth(burstLength, latency),
+                burstLength / (burstLength + latency)))
+    printBandwidth("AXI4 cache refill (INCR bursts)", rows)
@@ -0,0 +1,109 @@
+import os
+import sys
+import zlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# CRC-32 (reflected, poly 0xedb88320) of 32 bytes at 0x0 - a nibble at a time through a 16 word table (0x100), the
+# result is stored to 0x200
+# NOTE: "index" turns the table index (x5) into the entry's address (x13 is the table base)
+def crcProgram(index):
+    nibble = f'''
+    andi   x5, x10, 15
+    {index}
+    lw     x5, x5, 0
+    srli   x10, x10, 4
+    xor    x10, x10, x5
+'''
+    body = "    lbu    x5, x20, 0\n    xor    x10, x10, x5\n" + 2 * nibble
+    loopLength = len(asm2Bin(body)) + 2
+    return asm2Bin(f'''
+    addi   x20, x0, 0
+    addi   x21, x0, 32
+    addi   x10, x0, -1
+    addi   x13, x0, 256
+{body}
+    addi   x20, x20, 1
+    addi   x21, x21, -1
+    bne    x21, {-4 * loopLength}, x0
+    xori   x10, x10, -1
+    sw     x10, 512, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+
+# Population count of 16 words at 0x40, the total is stored to 0x200
+# NOTE: RV32I uses the SWAR bit-count (masks in x12-x14), Zbb a single cpop
+popcountSwar = '''
+    srli   x5, x10, 1
+    and    x5, x5, x12
+    sub    x10, x10, x5
+    srli   x5, x10, 2
+    and    x5, x5, x13
+    and    x10, x10, x13
+    add    x10, x10, x5
+    srli   x5, x10, 4
+    add    x10, x10, x5
+    and    x10, x10, x14
+    srli   x5, x10, 8
+    add    x10, x10, x5
+    srli   x5, x10, 16
+    add    x10, x10, x5
+    andi   x10, x10, 63
+'''
+
+def popcountProgram(count):
+    loopLength = len(asm2Bin(count)) + 4
+    return asm2Bin(f'''
+    addi   x20, x0, 64
+    addi   x21, x0, 16
+    addi   x22, x0, 0
+    lui    x12, 1431654400
+    addi   x12, x12, 1365
+    lui    x13, 858992640
+    addi   x13, x13, 819
+    lui    x14, 252645376
+    addi   x14, x14, -241
+    lw     x10, x20, 0
+{count}
+    add    x22, x22, x10
+    addi   x20, x20, 4
+    addi   x21, x21, -1
+    bne    x21, {-4 * loopLength}, x0
+    sw     x22, 512, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+
+def crcTable():
+    table = []
+    for i in range(16):
+        crc = i
+        for _ in range(4):
+            crc = (crc >> 1) ^ (0xedb88320 if crc & 1 else 0)
+        table.append(crc)
+    return table
+
+# Byte-indexed dmem image - CRC message bytes (packed into words), popcount words, the CRC table
+crcMessage  = bytes((37 * i + 11) & 0xff for i in range(32))
+popcountData= [(0x9e3779b9 * (i + 1)) & 0xffffffff for i in range(16)]
+benchData   = [0] * 512
+for i in range(8):
+    benchData[4 * i] = int.from_bytes(crcMessage[4 * i:4 * i + 4], "little")
+for i in range(16):
+    benchData[64 + 4 * i] = popcountData[i]
+    benchData[256 + 4 * i] = crcTable()[i]
+
+if __name__ == "__main__":
+    rows = [
+        ("RV32I", runBenchmark(crcProgram("slli   x5, x5, 2\n    add    x5, x5, x13"), dmemInit=benchData)),
+        ("Zba (sh2add)", runBenchmark(crcProgram("sh2add x5, x5, x13"), dmemInit=benchData, enableZb=True))
+    ]
+    printResults(f"CRC-32 (32 bytes, 16 entry table) - {zlib.crc32(crcMessage):#010x}", rows)
+
+    rows = [
+        ("RV32I (SWAR)", runBenchmark(popcountProgram(popcountSwar), dmemInit=benchData)),
+        ("Zbb (cpop)", runBenchmark(popcountProgram("    cpop   x10, x10"), dmemInit=benchData, enableZb=True))
+    ]
+    printResults(f"Population count (16 words) - {sum(bin(value).count('1') for value in popcountData)}", rows)
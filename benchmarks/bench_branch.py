@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# Nested counting loops - the inner loop branch is taken on every iteration but the last
+loopProgram = asm2Bin('''
+    addi   x1, x0, 20
+    addi   x3, x0, 0
+    addi   x2, x0, 10
+    addi   x3, x3, 1
+    addi   x2, x2, -1
+    bne    x2, -8, x0
+    addi   x1, x1, -1
+    bne    x1, -20, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+
+# Loop with several distinct branches (alternating, every-other-pair and always-taken)
+branchyProgram = asm2Bin('''
+    addi   x1, x0, 40
+    addi   x5, x0, 0
+    andi   x2, x1, 1
+    beq    x2, 8, x0
+    addi   x5, x5, 1
+    andi   x3, x1, 2
+    bne    x3, 8, x0
+    addi   x5, x5, 2
+    beq    x0, 8, x0
+    addi   x5, x5, 100
+    addi   x1, x1, -1
+    bne    x1, -36, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+
+if __name__ == "__main__":
+    configs = [
+        ("static (not-taken)",      {}),
+        ("BHT (16 entries)",        { "bhtEntries": 16 }),
+        ("BHT (64 entries)",        { "bhtEntries": 64 }),
+        ("BTB (2 entries)",         { "btbEntries": 2 }),
+        ("BTB (8 entries)",         { "btbEntries": 8 }),
+        ("BTB (8 entries, 2b tag)", { "btbEntries": 8, "btbTagBits": 2 }),
+        ("BHT (64) + BTB (8)",      { "bhtEntries": 64, "btbEntries": 8 }),
+    ]
+    for title, program in [("Loop benchmark (20 x 10 nested loop)", loopProgram),
+        ("Branchy loop benchmark (40 iterations, 4 branches)", branchyProgram)]:
+        printResults(title, [(name, runBenchmark(program, **config)) for name, config in configs])
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from benchmarks.bench_dual import suite
+from benchmarks.bench_depth import meanCpi
+
+# The example programs with branches resolved in decode and in EX (branchInEx) - CPI vs. synthesised longest path
+# NOTE: In decode, a misprediction redirects fetch from the regfile/forwarding/compare chain, in EX from the forwarded
+#       ALU operands
+modes = { "ID": {}, "EX": { "branchInEx": True } }
+
+def printBranchResults(title, rows):
+    '''Print a list of (program, {mode: results}) tuples as a table'''
+    print(f"\n{title}")
+    print(f"{'Program':<16}{'Retired':>9}" + "".join(f"{f'Cycles ({mode})':>13}{f'CPI ({mode})':>10}"
+        for mode in modes))
+    for name, results in rows:
+        print(f"{name:<16}{results['ID']['retired']:>9}" + "".join(
+            f"{results[mode]['cycles']:>13}{results[mode]['cpi']:>10.3f}" for mode in modes))
+    print(f"{'Mean (geometric)':<25}" + "".join(f"{'':>13}{meanCpi(rows, mode):>10.3f}" for mode in modes))
+
+if __name__ == "__main__":
+    predictors = { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 }
+    configs = [("static", {}), ("BHT + BTB + RAS", predictors)]
+    for title, config in configs:
+        rows = []
+        for name, program, data in suite:
+            rows.append((name, { mode: runBenchmark(program, dmemInit=data, **modeConfig, **config)
+                for mode, modeConfig in modes.items() }))
+        printBranchResults(f"Branches resolved in decode vs. EX ({title})", rows)
+
+    printStats("Synthesis (yosys, generic gates - see coreStats)", [(f"RV32I {title} ({mode})",
+        coreStats(**modeConfig, **config)) for title, config in configs for mode, modeConfig in modes.items()])
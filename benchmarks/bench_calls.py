@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# 20 calls to a tiny leaf helper, followed by an 8-deep recursive call chain (return address
+# spilled/restored on a stack at x2) - returns are "jalr x0, x1, 0"
+callProgram = asm2Bin('''
+    addi   x10, x0, 0
+    addi   x11, x0, 20
+    addi   x2, x0, 512
+    addi   x12, x0, 8
+    jal    x1, 24
+    addi   x11, x11, -1
+    bne    x11, -8, x0
+    jal    x1, 20
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+    addi   x10, x10, 3
+    jalr   x0, x1, 0
+    beq    x12, 32, x0
+    addi   x2, x2, -4
+    addi   x12, x12, -1
+    sw     x1, 0, x2
+    jal    x1, -16
+    lw     x1, x2, 0
+    addi   x2, x2, 4
+    addi   x10, x10, 1
+    jalr   x0, x1, 0
+''')
+
+if __name__ == "__main__":
+    configs = [
+        ("no RAS",              {}),
+        ("RAS (depth 2)",       { "rasDepth": 2 }),
+        ("RAS (depth 4)",       { "rasDepth": 4 }),
+        ("RAS (depth 16)",      { "rasDepth": 16 }),
+        ("BHT + RAS (16)",      { "bhtEntries": 16, "rasDepth": 16 }),
+    ]
+    rows = [(name, runBenchmark(callProgram, **config)) for name, config in configs]
+    printResults("Call/return benchmark (20 leaf calls + 8-deep recursion)", rows)
+
+    baseline = rows[0][1]["cycles"]
+    for name, results in rows[1:]:
+        print(f"{name}: {baseline - results['cycles']} cycles saved vs. no RAS")
@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from benchmarks.bench_branch import loopProgram, branchyProgram
+from benchmarks.bench_calls import callProgram
+from benchmarks.bench_hazards import arraySumProgram, arraySumData
+from benchmarks.bench_dcache import memcpyProgram, arrayData
+from benchmarks.bench_mul import loopProgram as dotProgram, softMulRoutine, dotData
+from benchmarks.bench_bitmanip import crcProgram, benchData
+from benchmarks.bench_icache import largeLoopProgram
+
+# The example programs as RV32I and (compressProgram) RV32IC - code size, cycles and instruction words fetched
+# "aligned" keeps 32-bit jump/branch targets word aligned (a misaligned one costs a bubble, see MipyfiveCore)
+# NOTE: bench_jumps is left out - its jump table holds code addresses (which compressProgram does not relocate)
+suite = [
+    ("loop",            loopProgram,                                        None),
+    ("branchy",         branchyProgram,                                     None),
+    ("call",            callProgram,                                        None),
+    ("array sum",       arraySumProgram,                                    arraySumData),
+    ("memcpy",          memcpyProgram,                                      arrayData),
+    ("dot (soft mul)",  dotProgram("jal x1, 32", softMulRoutine),           dotData),
+    ("crc-32",          crcProgram("slli   x5, x5, 2\n    add    x5, x5, x13"),  benchData)
+]
+
+def printCompressedResults(title, rows):
+    '''Print a list of (program, [(variant, results, code size)]) tuples as a table - the first variant is the
+    baseline the others are compared to'''
+    print(f"\n{title}")
+    print(f"{'Program':<16}{'Variant':<18}{'Bytes':>7}{'Saved':>8}{'Cycles':>8}{'Fetches':>9}{'Saved':>8}")
+    for name, variants in rows:
+        _, base, baseBytes = variants[0]
+        for variant, results, codeBytes in variants:
+            fetchesSaved = 100 * (1 - results['fetches'] / base['fetches'])
+            print(f"{name:<16}{variant:<18}{codeBytes:>7}{100 * (1 - codeBytes / baseBytes):>7.1f}%"
+                f"{results['cycles']:>8}{results['fetches']:>9}{fetchesSaved:>7.1f}%")
+            name = ""
+
+if __name__ == "__main__":
+    for title, config in [("static", {}), ("BHT + BTB + RAS", { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 })]:
+        rows = []
+        for name, program, data in suite:
+            variants = [("RV32I", program, {})]
+            variants += [("RV32IC", compressProgram(program), { "enableC": True })]
+            variants += [("RV32IC (aligned)", compressProgram(program, alignTargets=True), { "enableC": True })]
+            rows.append((name, [(variant, runBenchmark(binary, dmemInit=data, **config, **extra), 4 * len(binary))
+                for variant, binary, extra in variants]))
+        printCompressedResults(f"RV32I vs RV32IC ({title})", rows)
+
+    # A loop body that only fits in the I-cache once compressed
+    icacheConfig = { "size": 256, "lineSize": 16, "ways": 2 }
+    compressed = compressProgram(largeLoopProgram)
+    rows = [
+        ("RV32I", runBenchmark(largeLoopProgram, icacheConfig=icacheConfig)),
+        ("RV32IC", runBenchmark(compressed, icacheConfig=icacheConfig, enableC=True))
+    ]
+    printCacheResults(f"Large loop ({4 * len(largeLoopProgram)}B RV32I, {4 * len(compressed)}B RV32IC) - "
+        f"256B 2-way I-cache", rows, "icache")
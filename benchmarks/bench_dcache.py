@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# Copy 32 words from 0x0 to 0x80
+memcpyProgram = asm2Bin('''
+    addi   x1, x0, 0
+    addi   x2, x0, 128
+    addi   x3, x0, 32
+    lw     x4, x1, 0
+    sw     x4, 0, x2
+    addi   x1, x1, 4
+    addi   x2, x2, 4
+    addi   x3, x3, -1
+    bne    x3, -20, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+
+# Sum of a 64-word (256B) array - twice, so the second pass hits if the array fits in the cache
+arraySumProgram = asm2Bin('''
+    addi   x7, x0, 2
+    addi   x5, x0, 0
+    addi   x1, x0, 0
+    addi   x2, x0, 64
+    lw     x4, x1, 0
+    add    x5, x5, x4
+    addi   x1, x1, 4
+    addi   x2, x2, -1
+    bne    x2, -16, x0
+    addi   x7, x7, -1
+    bne    x7, -32, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+# NOTE: Data memory is indexed by byte address
+arrayData = [(addr // 4) + 1 if addr % 4 == 0 else 0 for addr in range(256)]
+
+if __name__ == "__main__":
+    dmemLatency = 4
+    configs = [
+        ("64B 2-way WB",        { "size": 64, "lineSize": 16, "ways": 2 }),
+        ("128B 2-way WB",       { "size": 128, "lineSize": 16, "ways": 2 }),
+        ("256B 2-way WB",       { "size": 256, "lineSize": 16, "ways": 2 }),
+        ("512B 2-way WB",       { "size": 512, "lineSize": 16, "ways": 2 }),
+        ("256B 2-way WT",       { "size": 256, "lineSize": 16, "ways": 2, "writeBack": False }),
+        ("256B 2-way WT (1)",   { "size": 256, "lineSize": 16, "ways": 2, "writeBack": False,
+            "writeBufferDepth": 1 }),
+        ("256B 2-way WB 32B",   { "size": 256, "lineSize": 32, "ways": 2 }),
+    ]
+    for title, program in [("memcpy (32 words)", memcpyProgram), ("Array sum (64 words, 2 passes)", arraySumProgram)]:
+        rows = [("ideal (1-cycle dmem)", runBenchmark(program, dmemInit=arrayData))]
+        rows += [(name, runBenchmark(program, dmemInit=arrayData, dcacheConfig=config, dmemLatency=dmemLatency))
+            for name, config in configs]
+        printCacheResults(f"D-cache - {title}, dmem latency {dmemLatency}", rows, "dcache")
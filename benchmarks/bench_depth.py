@@ -0,0 +1,44 @@
+import os
+import sys
+import math
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from benchmarks.bench_dual import suite
+
+# The example programs on the 3, 5 and 7-stage cores - CPI vs. synthesised size and longest path
+# NOTE: The memories' access time is not part of the longest path (the memory ports are the core's) - it is what the
+#       7-stage core takes off its critical path, and what the 3-stage one puts in front of its whole decode/execute
+depths = [3, 5, 7]
+
+def meanCpi(rows, depth):
+    '''Geometric mean CPI of a depth's results'''
+    return math.exp(sum(math.log(results[depth]["cpi"]) for name, results in rows) / len(rows))
+
+def printDepthResults(title, rows):
+    '''Print a list of (program, {depth: results}) tuples as a table'''
+    print(f"\n{title}")
+    print(f"{'Program':<16}{'Retired':>9}" + "".join(f"{f'Cycles ({depth})':>12}{f'CPI ({depth})':>9}"
+        for depth in depths))
+    for name, results in rows:
+        print(f"{name:<16}{results[5]['retired']:>9}" + "".join(
+            f"{results[depth]['cycles']:>12}{results[depth]['cpi']:>9.3f}" for depth in depths))
+    print(f"{'Mean (geometric)':<25}" + "".join(f"{'':>12}{meanCpi(rows, depth):>9.3f}" for depth in depths))
+
+if __name__ == "__main__":
+    predictors = { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 }
+    for title, config in [("static", {}), ("BHT + BTB + RAS", predictors)]:
+        rows = []
+        for name, program, data in suite:
+            rows.append((name, { depth: runBenchmark(program, dmemInit=data, pipelineDepth=depth, **config)
+                for depth in depths }))
+        printDepthResults(f"Pipeline depth ({title})", rows)
+
+    stats = { depth: coreStats(pipelineDepth=depth, **predictors) for depth in depths }
+    printStats("Synthesis (yosys, generic gates - see coreStats, BHT + BTB + RAS)",
+        [(f"RV32I {depth} stages", stats[depth]) for depth in depths])
+    # Time per instruction - mean CPI x cycle time (longest path), relative to 5 stages
+    if stats[5] is not None:
+        timePerInstr = { depth: meanCpi(rows, depth) * stats[depth]["levels"] for depth in depths }
+        print("".join(f"Time/instr. ({depth} stages): {timePerInstr[depth] / timePerInstr[5]:.2f}x\n"
+            for depth in depths), end="")
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from benchmarks.bench_compressed import suite
+from benchmarks.bench_jumps import jumpProgram
+
+# The example programs on the scalar and the dual-issue core - IPC gained vs. (estimated) area spent
+# NOTE: The second pipe only takes ALU instructions, so load/branch heavy loops gain the least
+suite = suite + [("jumps", jumpProgram, None)]
+
+def printDualResults(title, rows):
+    '''Print a list of (program, scalar results, dual-issue results) tuples as a table'''
+    print(f"\n{title}")
+    print(f"{'Program':<16}{'Retired':>9}{'Cycles':>8}{'IPC':>7}{'Cycles (dual)':>15}{'IPC (dual)':>12}{'Speedup':>9}")
+    for name, scalar, dual in rows:
+        print(f"{name:<16}{scalar['retired']:>9}{scalar['cycles']:>8}{1 / scalar['cpi']:>7.3f}{dual['cycles']:>15}"
+            f"{1 / dual['cpi']:>12.3f}{scalar['cycles'] / dual['cycles']:>8.2f}x")
+
+if __name__ == "__main__":
+    for title, config in [("static", {}), ("BHT + BTB + RAS", { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 })]:
+        rows = []
+        for name, program, data in suite:
+            rows.append((name, runBenchmark(program, dmemInit=data, **config),
+                runBenchmark(program, dmemInit=data, dualIssue=True, **config)))
+        printDualResults(f"Scalar vs dual-issue ({title})", rows)
+
+    printStats("Synthesis (yosys, generic gates - see coreStats)", [(name, coreStats(**config))
+        for name, config in [("RV32I", {}), ("RV32I dual-issue", { "dualIssue": True })]])
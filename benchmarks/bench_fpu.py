@@ -0,0 +1,199 @@
+import os
+import sys
+from fractions import Fraction
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# 16 element dot product of float samples a[i] (0x0) and coefficients b[i] (0x40), the sum is stored to 0x200
+
+# Soft-float - a[i] * b[i] (x10 * x11) and the running sum (x22) through fmul/fadd routines appended after the loop
+softDotProgram = '''
+    addi   x20, x0, 0
+    addi   x21, x0, 16
+    addi   x22, x0, 0
+    lw     x10, x20, 0
+    lw     x11, x20, 64
+    jal    x1, 40
+    addi   x11, x22, 0
+    jal    x1, 200
+    addi   x22, x10, 0
+    addi   x20, x20, 4
+    addi   x21, x21, -1
+    bne    x21, -32, x0
+    sw     x22, 512, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+'''
+
+# A minimal (RV32IM) soft-float library - normal operands (and zero addends) only, round to nearest even, no
+# special values or subnormal results (as a sensor fusion loop's data would be)
+# NOTE: fmul - x10 = x10 * x11, the 48-bit significand product from mul/mulhu
+softMulRoutine = '''
+    xor    x5, x10, x11
+    srli   x6, x10, 23
+    andi   x6, x6, 255
+    srli   x7, x11, 23
+    andi   x7, x7, 255
+    add    x6, x6, x7
+    addi   x6, x6, -127
+    lui    x7, 8388608
+    addi   x28, x7, -1
+    and    x10, x10, x28
+    or     x10, x10, x7
+    and    x11, x11, x28
+    or     x11, x11, x7
+    mul    x28, x10, x11
+    mulhu  x29, x10, x11
+    srli   x30, x29, 15
+    beq    x30, 28, x0
+    addi   x6, x6, 1
+    slli   x7, x29, 8
+    srli   x31, x28, 24
+    or     x7, x7, x31
+    slli   x28, x28, 8
+    jal    x0, 20
+    slli   x7, x29, 9
+    srli   x31, x28, 23
+    or     x7, x7, x31
+    slli   x28, x28, 9
+    andi   x30, x28, 1
+    srli   x28, x28, 1
+    or     x28, x28, x30
+    andi   x30, x7, 1
+    add    x28, x28, x30
+    lui    x31, 1073741824
+    sltu   x30, x31, x28
+    add    x7, x7, x30
+    addi   x6, x6, -1
+    slli   x6, x6, 23
+    add    x10, x6, x7
+    srli   x5, x5, 31
+    slli   x5, x5, 31
+    or     x10, x10, x5
+    jalr   x0, x1, 0
+'''
+
+# NOTE: fadd - x10 = x10 + x11, the smaller magnitude is aligned (with a sticky bit) to the larger one, 6 bits below
+#       the significands are kept for rounding
+softAddRoutine = '''
+    slli   x5, x10, 1
+    slli   x6, x11, 1
+    bgeu   x6, 20, x5
+    addi   x7, x10, 0
+    addi   x10, x11, 0
+    addi   x11, x7, 0
+    addi   x6, x5, 0
+    beq    x6, 212, x0
+    srli   x5, x10, 23
+    andi   x5, x5, 255
+    srli   x6, x11, 23
+    andi   x6, x6, 255
+    lui    x7, 8388608
+    addi   x28, x7, -1
+    and    x12, x10, x28
+    or     x12, x12, x7
+    slli   x12, x12, 6
+    and    x13, x11, x28
+    or     x13, x13, x7
+    slli   x13, x13, 6
+    sub    x6, x5, x6
+    addi   x7, x0, 31
+    bltu   x7, 12, x6
+    addi   x13, x0, 1
+    jal    x0, 20
+    srl    x28, x13, x6
+    sll    x29, x28, x6
+    sltu   x29, x29, x13
+    or     x13, x28, x29
+    xor    x7, x10, x11
+    blt    x0, 12, x7
+    add    x12, x12, x13
+    jal    x0, 12
+    sub    x12, x12, x13
+    beq    x12, 108, x0
+    srli   x7, x12, 30
+    beq    x7, 24, x0
+    andi   x7, x12, 1
+    srli   x12, x12, 1
+    or     x12, x12, x7
+    addi   x5, x5, 1
+    jal    x0, 24
+    srli   x7, x12, 29
+    bne    x7, 16, x0
+    slli   x12, x12, 1
+    addi   x5, x5, -1
+    jal    x0, -16
+    andi   x7, x12, 63
+    srli   x12, x12, 6
+    andi   x28, x12, 1
+    add    x7, x7, x28
+    addi   x28, x0, 32
+    sltu   x7, x28, x7
+    add    x12, x12, x7
+    addi   x5, x5, -1
+    slli   x5, x5, 23
+    add    x12, x12, x5
+    srli   x10, x10, 31
+    slli   x10, x10, 31
+    or     x10, x10, x12
+    jalr   x0, x1, 0
+    addi   x10, x0, 0
+    jalr   x0, x1, 0
+'''
+
+# RV32F - separately rounded fmul.s/fadd.s, or a fused fmadd.s (the running sum in f0)
+fmulFaddProgram = '''
+    addi   x20, x0, 0
+    addi   x21, x0, 16
+    fmv.w.x f0, x0
+    flw    f1, x20, 0
+    flw    f2, x20, 64
+    fmul.s f3, f1, f2
+    fadd.s f0, f0, f3
+    addi   x20, x20, 4
+    addi   x21, x21, -1
+    bne    x21, -24, x0
+    fsw    f0, 512, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+'''
+
+fmaddProgram = '''
+    addi   x20, x0, 0
+    addi   x21, x0, 16
+    fmv.w.x f0, x0
+    flw    f1, x20, 0
+    flw    f2, x20, 64
+    fmadd.s f0, f1, f2, f0
+    addi   x20, x20, 4
+    addi   x21, x21, -1
+    bne    x21, -20, x0
+    fsw    f0, 512, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+'''
+
+def loopData(a, b):
+    '''Byte-indexed dmem image of the a[]/b[] (binary32) arrays'''
+    data = [0] * 256
+    for i in range(16):
+        data[4 * i] = roundF32(a[i])
+        data[64 + 4 * i] = roundF32(b[i])
+    return data
+
+# Samples in [-8, 8), filter coefficients in [-1, 1) - none of them zero
+dotA    = [Fraction((1000 * i + 517) % 4096 - 2048, 256) for i in range(16)]
+dotB    = [Fraction((733 * i + 91) % 2048 - 1024, 1000) for i in range(16)]
+dotData = loopData(dotA, dotB)
+
+if __name__ == "__main__":
+    rv32im  = CoreISAconfigs.RV32IM.value
+    rv32imf = CoreISAconfigs.RV32IMF.value
+
+    rows = [("soft-float", runBenchmark(asm2Bin(softDotProgram + softMulRoutine + softAddRoutine),
+        dmemInit=dotData, ISA=rv32im))]
+    for name, program in [("fmul+fadd", fmulFaddProgram), ("fmadd", fmaddProgram)]:
+        rows += [(f"{name}, latency {latency}", runBenchmark(asm2Bin(program), dmemInit=dotData,
+            ISA=rv32imf, fmaLatency=latency)) for latency in [1, 3]]
+    printResults("Dot product (16 x binary32 samples/coefficients)", rows)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from benchmarks.bench_branch import loopProgram, branchyProgram
+from benchmarks.bench_calls import callProgram
+from benchmarks.bench_jumps import jumpProgram
+
+# Sum of a 32-word array, two loads per iteration ("lw x6, x1, 4" has immediate bits that match x4)
+arraySumProgram = asm2Bin('''
+    addi   x1, x0, 0
+    addi   x2, x0, 16
+    addi   x5, x0, 0
+    lw     x4, x1, 0
+    lw     x6, x1, 4
+    add    x5, x5, x4
+    add    x5, x5, x6
+    addi   x1, x1, 8
+    addi   x2, x2, -1
+    bne    x2, -24, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+''')
+# NOTE: Data memory is indexed by byte address
+arraySumData = [(addr // 4) + 1 if addr % 4 == 0 and addr < 128 else 0 for addr in range(256)]
+
+suite = [
+    ("loop",        loopProgram,        None),
+    ("branchy",     branchyProgram,     None),
+    ("call",        callProgram,        None),
+    ("jump",        jumpProgram,        None),
+    ("array sum",   arraySumProgram,    arraySumData),
+]
+
+if __name__ == "__main__":
+    configs = [
+        ("static",              {}),
+        ("BHT + BTB + RAS",     { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 }),
+    ]
+    for configName, config in configs:
+        rows = [(name, runBenchmark(program, dmemInit=data, **config)) for name, program, data in suite]
+        printResults(f"Benchmark suite ({configName})", rows)
+        print(f"Total stall cycles: {sum(results['stalls'] for _, results in rows)}")
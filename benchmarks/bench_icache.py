@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# 8 iterations of a straight-line loop body - the loop (~0.5KB) only fits in the larger caches
+bodyLength = 120
+largeLoopProgram = asm2Bin(
+    "addi   x1, x0, 8\n" +
+    "".join(f"addi   x{5 + i % 4}, x{5 + i % 4}, {i % 7}\n" for i in range(bodyLength)) +
+    "addi   x1, x1, -1\n" +
+    f"bne    x1, {-4 * (bodyLength + 1)}, x0\n" +
+    "sw     x0, 2044, x0\n" +
+    "beq    x0, 0, x0\n"
+)
+
+if __name__ == "__main__":
+    imemLatency = 4
+    ideal = ("ideal (1-cycle imem)", runBenchmark(largeLoopProgram))
+
+    # Cache size sweep (2-way LRU, 16 byte lines)
+    rows = [ideal]
+    for size in [64, 128, 256, 512, 1024]:
+        config = { "size": size, "lineSize": 16, "ways": 2, "replacement": CacheReplacement.LRU }
+        rows.append((f"{size}B 2-way", runBenchmark(largeLoopProgram, icacheConfig=config,
+            imemLatency=imemLatency)))
+    printCacheResults(f"I-cache size sweep ({bodyLength + 2} instruction loop x 8, imem latency {imemLatency})",
+        rows, "icache")
+
+    # Line size/associativity/replacement at a size the loop does not fit in
+    rows = [ideal]
+    for name, config in [
+        ("256B DM 16B lines",       { "size": 256, "lineSize": 16, "ways": 1 }),
+        ("256B 2-way 32B LRU",      { "size": 256, "lineSize": 32, "ways": 2 }),
+        ("256B 4-way 16B LRU",      { "size": 256, "lineSize": 16, "ways": 4 }),
+        ("256B 4-way 16B FIFO",     { "size": 256, "lineSize": 16, "ways": 4, "replacement": CacheReplacement.FIFO }),
+        ("256B 4-way 16B random",   { "size": 256, "lineSize": 16, "ways": 4,
+            "replacement": CacheReplacement.RANDOM })]:
+        rows.append((name, runBenchmark(largeLoopProgram, icacheConfig=config, imemLatency=imemLatency)))
+    printCacheResults("I-cache organisation (256B)", rows, "icache")
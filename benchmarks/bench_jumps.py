@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# 16 iterations of: forward JAL, indirect call (JALR through a function pointer), JAL inside the
+# callee and a return - 4 jumps + 1 loop branch per iteration
+jumpProgram = asm2Bin('''
+    addi   x11, x0, 16
+    addi   x5, x0, 48
+    addi   x20, x0, 0
+    jal    x0, 8
+    addi   x10, x0, 99
+    jalr   x1, x5, 0
+    addi   x11, x11, -1
+    bne    x11, -16, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+    addi   x0, x0, 0
+    addi   x0, x0, 0
+    addi   x10, x10, 1
+    addi   x12, x12, 2
+    jal    x0, 4
+    jalr   x0, x1, 0
+''')
+jumpCount = 16 * 4
+
+if __name__ == "__main__":
+    configs = [
+        ("static",              {}),
+        ("RAS (depth 4)",       { "rasDepth": 4 }),
+        ("BTB (8)",             { "btbEntries": 8 }),
+        ("BTB (8) + RAS (4)",   { "btbEntries": 8, "rasDepth": 4 }),
+        ("BHT + BTB + RAS",     { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 }),
+    ]
+    rows = [(name, runBenchmark(jumpProgram, **config)) for name, config in configs]
+    printResults(f"Jump benchmark ({jumpCount} JAL/JALR)", rows)
+
+    # Every non-retiring cycle is a bubble (or pipeline fill)
+    for name, results in rows:
+        print(f"{name}: {results['cycles'] - results['retired']} bubble cycles")
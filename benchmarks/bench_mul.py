@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+
+# 16 element loop over a[i] (0x0) and b[i] (0x40), accumulating "a[i] <op> b[i]" into x22 (stored to 0x200)
+# NOTE: "kernel" is either a single RV32M instruction (x10 = x10 <op> x11) or "jal x1, 32" to a soft routine
+#       appended after the loop
+def loopProgram(kernel, routine=""):
+    return asm2Bin(f'''
+    addi   x20, x0, 0
+    addi   x21, x0, 16
+    addi   x22, x0, 0
+    lw     x10, x20, 0
+    lw     x11, x20, 64
+    {kernel}
+    add    x22, x22, x10
+    addi   x20, x20, 4
+    addi   x21, x21, -1
+    bne    x21, -24, x0
+    sw     x22, 512, x0
+    sw     x0, 2044, x0
+    beq    x0, 0, x0
+    {routine}
+''')
+
+# libgcc's RV32I __mulsi3 - shift-add, one iteration per bit of the multiplier (x11)
+softMulRoutine = '''
+    addi   x12, x10, 0
+    addi   x10, x0, 0
+    andi   x13, x11, 1
+    beq    x13, 8, x0
+    add    x10, x10, x12
+    srli   x11, x11, 1
+    slli   x12, x12, 1
+    bne    x11, -20, x0
+    jalr   x0, x1, 0
+'''
+
+# libgcc's RV32I __udivsi3 - the divisor is shifted up to the dividend first, then shift-subtract
+softDivRoutine = '''
+    addi   x12, x11, 0
+    addi   x11, x10, 0
+    addi   x10, x0, -1
+    beq    x12, 56, x0
+    addi   x13, x0, 1
+    bgeu   x11, 20, x12
+    bge    x12, 16, x0
+    slli   x12, x12, 1
+    slli   x13, x13, 1
+    bltu   x11, -12, x12
+    addi   x10, x0, 0
+    bltu   x12, 12, x11
+    sub    x11, x11, x12
+    or     x10, x10, x13
+    srli   x13, x13, 1
+    srli   x12, x12, 1
+    bne    x13, -20, x0
+    jalr   x0, x1, 0
+'''
+
+def loopData(a, b):
+    '''Byte-indexed dmem image of the a[]/b[] word arrays'''
+    data = [0] * 256
+    for i in range(16):
+        data[4 * i] = a[i]
+        data[64 + 4 * i] = b[i]
+    return data
+
+# Dot product of Q-format samples/coefficients, and divisions by small and by large quotients
+dotData     = loopData([(1000 * i + 517) % 4096 for i in range(16)], [(733 * i + 91) % 2048 for i in range(16)])
+smallDivData= loopData([(1000 * i + 517) % 4096 for i in range(16)], [i % 7 + 3 for i in range(16)])
+largeDivData= loopData([0x7fff0000 - 0x10000 * i for i in range(16)], [i % 7 + 3 for i in range(16)])
+
+if __name__ == "__main__":
+    rv32im = CoreISAconfigs.RV32IM.value
+
+    rows = [("soft (__mulsi3)", runBenchmark(loopProgram("jal x1, 32", softMulRoutine), dmemInit=dotData))]
+    rows += [(f"mul, latency {latency}", runBenchmark(loopProgram("mul x10, x10, x11"), dmemInit=dotData,
+        ISA=rv32im, mulLatency=latency)) for latency in [0, 1, 2, 4]]
+    printResults("Dot product (16 x 12-bit samples/11-bit coefficients)", rows)
+
+    for title, data in [("small quotients", smallDivData), ("large quotients", largeDivData)]:
+        rows = [
+            ("soft (__udivsi3)", runBenchmark(loopProgram("jal x1, 32", softDivRoutine), dmemInit=data)),
+            ("divu", runBenchmark(loopProgram("divu x10, x10, x11"), dmemInit=data, ISA=rv32im))
+        ]
+        printResults(f"Division (16 divisions, {title})", rows)
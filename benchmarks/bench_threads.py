@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.utils import *
+from benchmarks.bench_dual import suite
+
+# Many independent tasks: the example programs on the scalar core (one copy), and on the barrel core with a copy per
+# thread - per-thread and aggregate IPC, and the speedup over running the copies one after another on the scalar core
+# NOTE: All copies share the data memory (they store the same values)
+def printThreadResults(title, rows):
+    '''Print a list of (program, scalar results, [(threads, barrel results)]) tuples as a table'''
+    print(f"\n{title}")
+    print(f"{'Program':<16}{'Threads':>8}{'Cycles':>8}{'IPC':>7}{'IPC/thread':>14}{'Speedup':>9}")
+    for name, scalar, variants in rows:
+        print(f"{name:<16}{1:>8}{scalar['cycles']:>8}{1 / scalar['cpi']:>7.3f}{1 / scalar['cpi']:>14.3f}"
+            f"{1.0:>8.2f}x")
+        for threads, results in variants:
+            threadIpc = [retired / cycles for retired, cycles in zip(results["threadRetired"], results["threadCycles"])]
+            print(f"{'':<16}{threads:>8}{results['cycles']:>8}{1 / results['cpi']:>7.3f}"
+                f"{min(threadIpc):>8.3f}-{max(threadIpc):.3f}{threads * scalar['cycles'] / results['cycles']:>8.2f}x")
+
+if __name__ == "__main__":
+    rows = []
+    for name, program, data in suite:
+        scalar = runBenchmark(program, dmemInit=data, bhtEntries=16, btbEntries=8, rasDepth=4)
+        rows.append((name, scalar, [(threads, runBenchmark(program, dmemInit=data, threads=threads))
+            for threads in [3, 4, 6]]))
+    printThreadResults("Scalar (BHT + BTB + RAS) vs barrel", rows)
+
+    configs = [("RV32I (BHT + BTB + RAS)", { "bhtEntries": 16, "btbEntries": 8, "rasDepth": 4 }), ("RV32I", {}),
+        ("RV32I 3 threads", { "threads": 3 }), ("RV32I 4 threads", { "threads": 4 })]
+    printStats("Synthesis (yosys, generic gates - see coreStats)",
+        [(name, coreStats(**config)) for name, config in configs])
@@ -0,0 +1,223 @@
+import os
+import re
+import sys
+import json
+import tempfile
+import subprocess
+from nmigen import *
+from nmigen._toolchain import has_tool, require_tool
+from nmigen.back.pysim import *
+from nmigen.back import rtlil
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from tests.utils import *
+from mipyfive.core import *
+from mipyfive.types import *
+from mipyfive.icache import *
+from mipyfive.dcache import *
+from examples.common.ram import *
+from examples.common.slowram import *
+
+# Benchmark programs signal completion by storing to this address (i.e. "sw x0, 2044, x0")
+haltAddr = 0x7fc
+
+def runBenchmark(program, maxCycles=20000, dmemInit=None, icacheConfig=None, imemLatency=4, dcacheConfig=None,
+    dmemLatency=4, ISA=CoreISAconfigs.RV32I.value, **coreConfig):
+    '''Run an RV32I(M)(F)(C) program (binary list) on a core + imem/dmem SoC until it stores to haltAddr\n
+    Returns a dict of {"cycles", "retired", "cpi", "stalls", "fetches"} (retired counts instructions reaching MEM,
+    stalls counts cycles decode was held by the hazard unit, fetches counts instruction words read - accepted
+    fetch addresses other than the previous one, i.e. held or re-fetched words are not counted)\n
+    With an icacheConfig/dcacheConfig (InstructionCache/DataCache args), instructions/data go through a
+    cache backed by a slow (imemLatency/dmemLatency) memory - "icacheHits"/"icacheMisses" and
+    "dcacheHits"/"dcacheMisses" are then added to the results\n
+    A dual-issue core (dualIssue=True) fetches 64-bit pairs from its own instruction memory (there is no 64-bit
+    I-cache) - retired then counts the instructions of both pipes\n
+    A barrel core (threads > 1) runs the program on every thread, until all of them have stored to haltAddr -
+    "threadCycles"/"threadRetired" (per-thread lists, up to and incl. its halt) are then added to the results, cycles
+    and retired being the totals (stalls only counts hazard stalls, i.e. is 0 - as with pipelineDepth=3)
+    '''
+    m = Module()
+    m.submodules.core = core = MipyfiveCore(dataWidth=32, regCount=32, pcStart=0, ISA=ISA, **coreConfig)
+    if coreConfig.get("dualIssue", False):
+        m.submodules.imem = imem = RAM(width=64, depth=512, init=packWords(program))
+        m.d.comb += [
+            # imem connections
+            imem.writeEnable.eq(0),
+            imem.writeData.eq(0),
+            imem.readAddr.eq(core.PCout[3:]),
+            imem.writeAddr.eq(0),
+            core.instruction.eq(imem.readData)
+        ]
+    elif icacheConfig is None:
+        m.submodules.imem = imem = RAM(width=32, depth=1024, init=program, wordAligned=True)
+        m.d.comb += [
+            # imem connections
+            imem.writeEnable.eq(0),
+            imem.writeData.eq(0),
+            imem.readAddr.eq(core.PCout),
+            imem.writeAddr.eq(0),
+            core.instruction.eq(imem.readData)
+        ]
+    else:
+        m.submodules.icache = icache = InstructionCache(**icacheConfig)
+        m.submodules.imem = imem = SlowRAM(width=32, depth=1024, latency=imemLatency, init=program)
+        m.d.comb += [
+            # icache connections
+            icache.addr.eq(core.PCout),
+            imem.req.eq(icache.refillReq),
+            imem.addr.eq(icache.refillAddr),
+            icache.refillData.eq(imem.readData),
+            icache.refillValid.eq(imem.valid),
+            core.instruction.eq(icache.data),
+            core.instructionReady.eq(icache.ready)
+        ]
+    # NOTE: The (byte-indexed) dmemInit is given as words to the word-addressed data memory
+    if dcacheConfig is None:
+        m.submodules.dmem = dmem = RAM(width=32, depth=256, init=None if dmemInit is None else dmemInit[::4],
+            wordAligned=True)
+        m.d.comb += [
+            # dmem connections
+            dmem.writeEnable.eq(core.DataWE),
+            dmem.writeData.eq(core.DataOut),
+            dmem.byteEnable.eq(core.DataByteEn),
+            dmem.readAddr.eq(core.DataAddr),
+            dmem.writeAddr.eq(core.DataAddr),
+            core.DataIn.eq(dmem.readData)
+        ]
+    else:
+        m.submodules.dcache = dcache = DataCache(**dcacheConfig)
+        m.submodules.dmem = dmem = SlowRAM(width=32, depth=256, latency=dmemLatency,
+            init=None if dmemInit is None else dmemInit[::4])
+        m.d.comb += [
+            # dcache connections
+            dcache.addr.eq(core.DataAddr),
+            dcache.readEnable.eq(core.DataRE),
+            dcache.writeEnable.eq(core.DataWE),
+            dcache.writeData.eq(core.DataOut),
+            dcache.byteEn.eq(core.DataByteEn),
+            dmem.req.eq(dcache.memReq),
+            dmem.addr.eq(dcache.memAddr),
+            dmem.writeEnable.eq(dcache.memWriteEnable),
+            dmem.writeData.eq(dcache.memWriteData),
+            dmem.byteEnable.eq(dcache.memByteEn),
+            dcache.memReadData.eq(dmem.readData),
+            dcache.memValid.eq(dmem.valid),
+            core.DataIn.eq(dcache.readData),
+            core.DataReady.eq(dcache.ready)
+        ]
+
+    results = { "cycles": maxCycles, "retired": 0, "cpi": None, "stalls": 0, "fetches": 0 }
+    if core.threads > 1:
+        results["threadCycles"] = [None] * core.threads
+        results["threadRetired"] = [0] * core.threads
+    sim = Simulator(m)
+    def process():
+        lastFetch = None
+        for cycle in range(maxCycles):
+            if (yield core.instructionReady) and (yield core.PCout) != lastFetch:
+                results["fetches"] += 1
+                lastFetch = (yield core.PCout)
+            # NOTE: Nothing moves while the core is frozen (cache miss)
+            #       A halted thread keeps running (a loop after the halting store) - it no longer retires
+            if (yield core.instructionReady) and (yield core.DataReady):
+                if core.threads > 1:
+                    thread = (yield core.EX_MEM_thread)
+                    if results["threadCycles"][thread] is None:
+                        results["threadRetired"][thread] += (yield core.EX_MEM_valid)
+                        results["retired"] += (yield core.EX_MEM_valid)
+                else:
+                    results["retired"] += (yield core.EX_MEM_valid)
+                if core.interlocked:
+                    results["stalls"] += (yield core.hazard.IF_stall) & (yield core.IF_ID_valid)
+                if core.dualIssue:
+                    results["retired"] += (yield core.EX_MEM1_valid)
+            if (yield core.DataWE) and (yield core.DataAddr) == haltAddr:
+                if core.threads > 1:
+                    thread = (yield core.EX_MEM_thread)
+                    if results["threadCycles"][thread] is None:
+                        results["threadCycles"][thread] = cycle + 1
+                    if None not in results["threadCycles"]:
+                        results["cycles"] = cycle + 1
+                        break
+                else:
+                    results["cycles"] = cycle + 1
+                    break
+            yield Tick()
+        if results["retired"] > 0:
+            results["cpi"] = results["cycles"] / results["retired"]
+        if icacheConfig is not None:
+            results["icacheHits"] = (yield icache.hits)
+            results["icacheMisses"] = (yield icache.misses)
+        if dcacheConfig is not None:
+            results["dcacheHits"] = (yield dcache.hits)
+            results["dcacheMisses"] = (yield dcache.misses)
+
+    sim.add_clock(1e-6)
+    sim.add_sync_process(process)
+    sim.run()
+    return results
+
+def coreRtlil(ISA=CoreISAconfigs.RV32I.value, **coreConfig):
+    '''The (unoptimised) RTLIL of a core configuration, with its instruction/data memory interface as ports'''
+    core = MipyfiveCore(dataWidth=32, regCount=32, pcStart=0, ISA=ISA, **coreConfig)
+    return rtlil.convert(core, ports=[core.instruction, core.instructionReady, core.DataIn, core.DataReady,
+        core.PCout, core.DataAddr, core.DataOut, core.DataByteEn, core.DataWE, core.DataRE])
+
+def yosysStats(text):
+    '''Synthesise a design (its RTLIL) to generic gates with yosys - "synth -flatten", then "stat" and "ltp -noff"\n
+    Returns a dict of {"cells", "flops", "levels"} - cells counts all gates (incl. flip-flops, and RAMs mapped to
+    them), flops the flip-flops, levels the longest path in gates between flip-flops/ports - or None when yosys is not
+    installed (see nMigen's YOSYS environment variable)\n
+    NOTE: Technology-independent (no timing/area library) - only meaningful relative to another design
+    '''
+    if not has_tool("yosys"):
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "design.il"), "w") as file:
+            file.write(text)
+        subprocess.run([require_tool("yosys"), "-q", "design.il", "-p",
+            "synth -flatten -top top; tee -q -o stat.json stat -json; tee -q -o ltp.txt ltp -noff"],
+            cwd=directory, check=True)
+        with open(os.path.join(directory, "stat.json")) as file:
+            cellTypes = json.load(file)["design"]["num_cells_by_type"]
+        with open(os.path.join(directory, "ltp.txt")) as file:
+            levels = int(re.search(r"length=(\d+)", file.read()).group(1))
+    return {
+        "cells": sum(count for type, count in cellTypes.items() if type != "$scopeinfo"),
+        "flops": sum(count for type, count in cellTypes.items() if "DFF" in type),
+        "levels": levels
+    }
+
+def coreStats(ISA=CoreISAconfigs.RV32I.value, **coreConfig):
+    '''Synthesis results of a core configuration (see yosysStats) - None when yosys is not installed'''
+    return yosysStats(coreRtlil(ISA, **coreConfig))
+
+def printStats(title, rows):
+    '''Print a list of (config-name, yosysStats results) tuples as a table - or why there is none'''
+    print(f"\n{title}")
+    if any(stats is None for name, stats in rows):
+        print("yosys not found (see nMigen's YOSYS environment variable) - skipping the synthesis report")
+        return
+    print(f"{'Config':<32}{'Cells':>10}{'Flip-flops':>12}{'Levels':>8}")
+    for name, stats in rows:
+        print(f"{name:<32}{stats['cells']:>10}{stats['flops']:>12}{stats['levels']:>8}")
+
+def printResults(title, rows):
+    '''Print a list of (config-name, results-dict) tuples as a table'''
+    print(f"\n{title}")
+    print(f"{'Config':<24}{'Cycles':>10}{'Retired':>10}{'CPI':>8}{'Stalls':>8}")
+    for name, results in rows:
+        cpi = "n/a" if results["cpi"] is None else f"{results['cpi']:.3f}"
+        print(f"{name:<24}{results['cycles']:>10}{results['retired']:>10}{cpi:>8}{results['stalls']:>8}")
+
+def printCacheResults(title, rows, cache):
+    '''Print a list of (config-name, results-dict) tuples as a table incl. the "icache"/"dcache" miss rate'''
+    print(f"\n{title}")
+    print(f"{'Config':<24}{'Cycles':>10}{'Retired':>10}{'CPI':>8}{'Misses':>8}{'Miss rate':>11}")
+    for name, results in rows:
+        misses, missRate = "n/a", "n/a"
+        if f"{cache}Misses" in results:
+            misses = results[f"{cache}Misses"]
+            missRate = f"{100 * misses / (results[f'{cache}Hits'] + misses):.1f}%"
+        print(f"{name:<24}{results['cycles']:>10}{results['retired']:>10}{results['cpi']:>8.3f}{misses:>8}"
+            f"{missRate:>11}")
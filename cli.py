@@ -14,9 +14,33 @@ if __name__ == "__main__":
     parser.add_argument("--pcStart", dest="pcStart", default="0",
         help="PC start/reset value (Prefix value with '0x' for hex).")
     parser.add_argument("--buildCore", action="store_true", help="Build and output the main core")
-    # TODO: Uncomment when extensions are available
-    #parser.add_argument("--enableM", action="store_true", help="Enable the Multiply/Divide Extension")
-    #parser.add_argument("--enableF", action="store_true", help="Enable the Single-Precision Floating Point Extension")
+    parser.add_argument("--bhtEntries", dest="bhtEntries", type=int, default=0,
+        help="Branch History Table entries (power of 2) - 0 uses static not-taken prediction.")
+    parser.add_argument("--btbEntries", dest="btbEntries", type=int, default=0,
+        help="Branch Target Buffer entries (power of 2) - 0 disables the BTB.")
+    parser.add_argument("--btbTagBits", dest="btbTagBits", type=int, default=8,
+        help="Branch Target Buffer (partial) tag width.")
+    parser.add_argument("--rasDepth", dest="rasDepth", type=int, default=0,
+        help="Return Address Stack depth (power of 2) - 0 disables the RAS.")
+    parser.add_argument("--enableM", action="store_true", help="Enable the Multiply/Divide Extension")
+    parser.add_argument("--mulLatency", dest="mulLatency", type=int, default=2,
+        help="Multiplier pipeline stages (RV32M) - 0 uses a single-cycle combinational multiplier.")
+    parser.add_argument("--enableF", action="store_true", help="Enable the Single-Precision Floating Point Extension")
+    parser.add_argument("--fmaLatency", dest="fmaLatency", type=int, default=3,
+        help="Fused multiply-add unit pipeline stages (RV32F) - at least 1.")
+    parser.add_argument("--enableZb", action="store_true", help="Enable the Zba/Zbb Bit-Manipulation Extensions")
+    parser.add_argument("--enableC", action="store_true", help="Enable the Compressed Instruction Extension")
+    parser.add_argument("--dualIssue", action="store_true", help="Issue up to two instructions per cycle (64-bit fetch)")
+    parser.add_argument("--threads", dest="threads", type=int, default=1,
+        help="Barrel processor hardware threads (1 for a single thread, else at least 3).")
+    parser.add_argument("--pipelineDepth", dest="pipelineDepth", type=int, default=5, choices=[3, 5, 7],
+        help="Pipeline stages (3 for less area, 7 for a shorter critical path - both RV32I/M(Zb) only).")
+    parser.add_argument("--branchInEx", action="store_true",
+        help="Resolve branches in EX instead of decode (a shorter critical path, 2-cycle mispredictions - 5 stages "
+            "only, without dualIssue or threads)")
+    parser.add_argument("--bramRegfile", action="store_true",
+        help="Build the Regfile from synchronous-read (block) RAMs, read at the IF2/ID boundary (7 stages, so "
+            "RV32I/M(Zb), only)")
     args, unknown = parser.parse_known_args()
 
     if len(unknown) is not 0:
@@ -24,11 +48,15 @@ if __name__ == "__main__":
         parser.print_help()
 
     isaString = "RV32I"
+    if args.enableM:
+        isaString += "M"
+    if args.enableF:
+        isaString += "F"
     isas = {
         "RV32I"     : CoreISAconfigs.RV32I.value,
-        "RV32IF"    : CoreISAconfigs.RV32IM.value,
-        "RV32IM"    : CoreISAconfigs.RV32IF.value,
-        "RV32IFM"   : CoreISAconfigs.RV32IMF.value
+        "RV32IF"    : CoreISAconfigs.RV32IF.value,
+        "RV32IM"    : CoreISAconfigs.RV32IM.value,
+        "RV32IMF"   : CoreISAconfigs.RV32IMF.value
     }
     isaConfig = isas[isaString]
 
@@ -64,6 +92,11 @@ if __name__ == "__main__":
     # Generate core RTL
     if args.buildCore:
         print(f"[mipyfive - Info]: Generating RTL to --> {rtlFile}")
-        m = MipyfiveCore(dataWidth=32, regCount=32, pcStart=pcStart, ISA=isaConfig)
-        main(m, ports=[m.instruction, m.DataIn, m.PCout, m.DataAddr, m.DataOut])
+        m = MipyfiveCore(dataWidth=32, regCount=32, pcStart=pcStart, ISA=isaConfig, bhtEntries=args.bhtEntries,
+            btbEntries=args.btbEntries, btbTagBits=args.btbTagBits, rasDepth=args.rasDepth, mulLatency=args.mulLatency,
+            fmaLatency=args.fmaLatency, enableZb=args.enableZb, enableC=args.enableC,
+            dualIssue=args.dualIssue, threads=args.threads, pipelineDepth=args.pipelineDepth,
+            branchInEx=args.branchInEx, bramRegfile=args.bramRegfile)
+        main(m, ports=[m.instruction, m.instructionReady, m.DataIn, m.DataReady, m.PCout, m.DataAddr, m.DataOut,
+            m.DataByteEn, m.DataWE, m.DataRE])
         print("[mipyfive - Info]: Done.")
@@ -0,0 +1,135 @@
+from nmigen import *
+from nmigen.hdl.rec import *
+from mipyfive.utils import *
+from mipyfive.axi import *
+
+# An AXI4 (or AXI4-Lite, with "lite") RAM - the first read beat is returned "latency" cycles after the read address
+# is accepted, then one beat per cycle, and write beats are performed (and responded to, after the last one)
+# "writeLatency" (default: "latency") cycles after they are accepted
+# NOTE: Up to "maxOutstanding" reads and writes are accepted ahead of their responses (INCR bursts only)
+#       The write address and first data beat are accepted together
+#       A read is performed when it is queued ("latency" cycles after its address is accepted - the first beat's
+#       data is kept in its queue entry, later beats of a burst are read as they are returned), a write is only
+#       visible once it is performed - with a "writeLatency" above "latency", reads issued after a write
+#       overtake it (as AXI allows)
+class AxiRAM(Elaboratable):
+    def __init__(self, depth, latency=1, writeLatency=None, maxOutstanding=4, lite=False, init=None):
+        self.latency        = latency
+        self.writeLatency   = latency if writeLatency is None else writeLatency
+        self.maxOutstanding = maxOutstanding
+        self.lite           = lite
+        self.bus            = Record(axiLiteLayout if lite else axiLayout)
+        self.memory         = Memory(width=32, depth=depth, init=init)
+        self.wordBits       = ceilLog2(depth)
+
+        # Statistics
+        self.readBeats      = Signal(32)
+        self.writeBeats     = Signal(32)
+
+    def delay(self, m, latency, valid, fields, name):
+        # "latency - 1" register stages (a latency of 1 responds the cycle after acceptance)
+        for i in range(latency - 1):
+            stage = [Signal.like(valid, name=f"{name}Valid{i}")] + [Signal.like(f, name=f"{name}{j}_{i}")
+                for j, f in enumerate(fields)]
+            m.d.sync += [s.eq(f) for s, f in zip(stage, [valid] + fields)]
+            valid, fields = stage[0], stage[1:]
+        return valid, fields
+
+    def elaborate(self, platform):
+        m = Module()
+
+        arLen   = C(0, 8) if self.lite else self.bus.arlen
+        wLast   = C(1) if self.lite else self.bus.wlast
+
+        # Read - accepted addresses are delayed, then queued for the read data channel
+        readsOut    = Signal(range(self.maxOutstanding + 1))
+        queueAddr   = Array(Signal(self.wordBits, name=f"queueAddr{i}") for i in range(self.maxOutstanding))
+        queueLen    = Array(Signal(8, name=f"queueLen{i}") for i in range(self.maxOutstanding))
+        queueData   = Array(Signal(32, name=f"queueData{i}") for i in range(self.maxOutstanding))
+        head        = Signal(range(self.maxOutstanding))
+        tail        = Signal(range(self.maxOutstanding))
+        queued      = Signal(range(self.maxOutstanding + 1))
+        beat        = Signal(8)
+        arAccept    = Signal()
+        rBeat       = Signal()
+        rDone       = Signal()
+
+        m.d.comb += [
+            self.bus.arready.eq(readsOut != self.maxOutstanding),
+            arAccept.eq(self.bus.arvalid & self.bus.arready),
+            self.bus.rvalid.eq(queued != 0),
+            self.bus.rdata.eq(Mux(beat == 0, queueData[head], self.memory[(queueAddr[head] + beat)[:self.wordBits]])),
+            self.bus.rresp.eq(0),
+            rBeat.eq(self.bus.rvalid & self.bus.rready),
+            rDone.eq(rBeat & (beat == queueLen[head]))
+        ]
+        if not self.lite:
+            m.d.comb += self.bus.rlast.eq(beat == queueLen[head])
+
+        pushValid, (pushAddr, pushLen) = self.delay(m, self.latency, arAccept,
+            [self.bus.araddr[2:2+self.wordBits], arLen], "ar")
+        with m.If(pushValid):
+            m.d.sync += [
+                queueAddr[tail].eq(pushAddr),
+                queueLen[tail].eq(pushLen),
+                queueData[tail].eq(self.memory[pushAddr]),
+                tail.eq(wrapPtr(tail, self.maxOutstanding))
+            ]
+        with m.If(rDone):
+            m.d.sync += [
+                head.eq(wrapPtr(head, self.maxOutstanding)),
+                beat.eq(0)
+            ]
+        with m.Elif(rBeat):
+            m.d.sync += beat.eq(beat + 1)
+        with m.If(rBeat):
+            m.d.sync += self.readBeats.eq(self.readBeats + 1)
+        m.d.sync += [
+            queued.eq(queued + pushValid - rDone),
+            readsOut.eq(readsOut + arAccept - rDone)
+        ]
+
+        # Write - accepted beats are delayed, then performed (and responded to, after the last beat)
+        writesOut   = Signal(range(self.maxOutstanding + 1))
+        responses   = Signal(range(self.maxOutstanding + 1))
+        active      = Signal()
+        writeAddr   = Signal(self.wordBits)
+        awAccept    = Signal()
+        wBeat       = Signal()
+        addr        = Mux(active, writeAddr, self.bus.awaddr[2:2+self.wordBits])
+
+        m.d.comb += [
+            self.bus.awready.eq(~active & (writesOut != self.maxOutstanding)),
+            self.bus.wready.eq(active | self.bus.awvalid & self.bus.awready),
+            awAccept.eq(self.bus.awvalid & self.bus.awready),
+            wBeat.eq(self.bus.wvalid & self.bus.wready),
+            self.bus.bvalid.eq(responses != 0),
+            self.bus.bresp.eq(0)
+        ]
+
+        with m.If(wBeat):
+            m.d.sync += [
+                writeAddr.eq(addr + 1),
+                active.eq(~wLast)
+            ]
+        with m.Elif(awAccept):
+            m.d.sync += [
+                writeAddr.eq(addr),
+                active.eq(1)
+            ]
+
+        performValid, (performAddr, performData, performStrb, performLast) = self.delay(m, self.writeLatency,
+            wBeat, [addr, self.bus.wdata, self.bus.wstrb, wLast], "w")
+        respValid   = performValid & performLast
+        word        = self.memory[performAddr]
+        with m.If(performValid):
+            m.d.sync += [
+                word.eq(Cat(Mux(performStrb[i], performData[8*i:8*i+8], word[8*i:8*i+8]) for i in range(4))),
+                self.writeBeats.eq(self.writeBeats + 1)
+            ]
+        m.d.sync += [
+            responses.eq(responses + respValid - (self.bus.bvalid & self.bus.bready)),
+            writesOut.eq(writesOut + awAccept - (self.bus.bvalid & self.bus.bready))
+        ]
+
+        return m
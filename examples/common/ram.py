@@ -2,11 +2,14 @@ from nmigen import *
 from mipyfive.utils import *
 
 # A generic single-port synchronous RAM
+# NOTE: With "wordAligned", the read/write addresses are byte addresses of (width-bit) words
+#       Writes only update the byte lanes set in "byteEnable" (all of them by default)
 class RAM(Elaboratable):
     def __init__(self, width, depth, init=None, wordAligned=False):
-        addrBits            = ceilLog2(depth)
+        addrBits            = ceilLog2(depth) + (2 if wordAligned else 0)
         self.wordAligned    = wordAligned
         self.writeEnable    = Signal()
+        self.byteEnable     = Signal(width // 8, reset=(1 << (width // 8)) - 1)
         self.readData       = Signal(width)
         self.writeData      = Signal(width)
         self.readAddr       = Signal(addrBits)
@@ -16,12 +19,13 @@ class RAM(Elaboratable):
     def elaborate(self, platform):
         m = Module()
 
+        writeWord   = self.memory[self.writeAddr[2:] if self.wordAligned else self.writeAddr]
+        readWord    = self.memory[self.readAddr[2:] if self.wordAligned else self.readAddr]
+
         with m.If(self.writeEnable):
-            m.d.sync += self.memory[self.writeAddr].eq(self.writeData)
+            m.d.sync += writeWord.eq(Cat(Mux(self.byteEnable[i], self.writeData[8*i:8*i+8], writeWord[8*i:8*i+8])
+                for i in range(len(self.byteEnable))))
 
-        if self.wordAligned:
-            m.d.sync += self.readData.eq(self.memory[self.readAddr[2:]])
-        else:
-            m.d.sync += self.readData.eq(self.memory[self.readAddr])
+        m.d.sync += self.readData.eq(readWord)
 
         return m
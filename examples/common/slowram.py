@@ -0,0 +1,54 @@
+from nmigen import *
+from mipyfive.utils import *
+
+# A word-addressed RAM with a fixed access latency (i.e. a model of slow external memory)
+# NOTE: "addr" is a byte address - a request is held (req=1) until "valid" pulses, which happens
+#       "latency" cycles after it was accepted (writes complete the same way, updating the "byteEnable" lanes)
+class SlowRAM(Elaboratable):
+    def __init__(self, width, depth, latency, init=None):
+        self.latency        = latency
+        self.req            = Signal()
+        self.addr           = Signal(32)
+        self.writeEnable    = Signal()
+        self.writeData      = Signal(width)
+        self.byteEnable     = Signal(width // 8, reset=(1 << (width // 8)) - 1)
+        self.readData       = Signal(width)
+        self.valid          = Signal()
+        self.memory         = Memory(width=width, depth=depth, init=init)
+        self.wordBits       = ceilLog2(depth)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        busy    = Signal()
+        count   = Signal(range(self.latency + 1))
+        addr    = Signal(self.wordBits)
+        write   = Signal()
+        data    = Signal.like(self.writeData)
+        byteEn  = Signal.like(self.byteEnable)
+        word    = self.memory[addr]
+
+        m.d.comb += [
+            self.valid.eq(busy & (count == 0)),
+            self.readData.eq(word)
+        ]
+
+        with m.If(~busy & self.req):
+            m.d.sync += [
+                busy.eq(1),
+                count.eq(self.latency - 1),
+                addr.eq(self.addr[2:2+self.wordBits]),
+                write.eq(self.writeEnable),
+                data.eq(self.writeData),
+                byteEn.eq(self.byteEnable)
+            ]
+        with m.Elif(busy):
+            with m.If(count == 0):
+                m.d.sync += busy.eq(0)
+                with m.If(write):
+                    m.d.sync += word.eq(Cat(Mux(byteEn[i], data[8*i:8*i+8], word[8*i:8*i+8])
+                        for i in range(len(byteEn))))
+            with m.Else():
+                m.d.sync += count.eq(count - 1)
+
+        return m
@@ -0,0 +1,50 @@
+from nmigen import *
+from mipyfive.utils import *
+
+# A word-addressed synchronous RAM with pseudo-random wait states (i.e. a model of a slow/shared memory port)
+# NOTE: "addr" is a byte address - a request (req=1) is accepted on a clock edge where "ready" is high, its
+#       read data is valid the next cycle "ready" is high (0 to "maxWait" wait states later, per an LFSR)
+#       Writes are performed when accepted (updating the "byteEnable" lanes)
+class WaitStateRAM(Elaboratable):
+    def __init__(self, width, depth, maxWait, seed=0xace1, init=None):
+        self.maxWait        = maxWait
+        self.seed           = seed
+        self.req            = Signal()
+        self.addr           = Signal(32)
+        self.writeEnable    = Signal()
+        self.writeData      = Signal(width)
+        self.byteEnable     = Signal(width // 8, reset=(1 << (width // 8)) - 1)
+        self.readData       = Signal(width)
+        self.ready          = Signal()
+        self.memory         = Memory(width=width, depth=depth, init=init)
+        self.wordBits       = ceilLog2(depth)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        waits   = Signal(range(self.maxWait + 1))
+        # 16-bit Galois LFSR (x^16 + x^14 + x^13 + x^11 + 1)
+        lfsr    = Signal(16, reset=self.seed)
+        roll    = Signal(range(self.maxWait + 1))
+        # (lfsr mod maxWait+1) - the low bits are always below 2*(maxWait+1)
+        low     = lfsr[:ceilLog2(self.maxWait + 1)]
+        word    = self.memory[self.addr[2:2+self.wordBits]]
+
+        m.d.comb += [
+            self.ready.eq(waits == 0),
+            roll.eq(Mux(low > self.maxWait, low - (self.maxWait + 1), low))
+        ]
+        m.d.sync += lfsr.eq(Mux(lfsr[0], (lfsr >> 1) ^ 0xb400, lfsr >> 1))
+
+        with m.If(self.ready & self.req):
+            m.d.sync += [
+                waits.eq(roll),
+                self.readData.eq(word)
+            ]
+            with m.If(self.writeEnable):
+                m.d.sync += word.eq(Cat(Mux(self.byteEnable[i], self.writeData[8*i:8*i+8], word[8*i:8*i+8])
+                    for i in range(len(self.byteEnable))))
+        with m.Elif(~self.ready):
+            m.d.sync += waits.eq(waits - 1)
+
+        return m
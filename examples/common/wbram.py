@@ -0,0 +1,57 @@
+from nmigen import *
+from nmigen.hdl.rec import *
+from mipyfive.utils import *
+from mipyfive.wishbone import *
+
+# A Wishbone B4 pipelined-mode RAM - accepts one access per cycle and acknowledges it "latency" cycles later
+# NOTE: With "randomStall", "stall" is asserted on (roughly) a quarter of the cycles (per an LFSR)
+#       Writes (per byte lane) are performed when accepted
+class WishboneRAM(Elaboratable):
+    def __init__(self, depth, latency=1, randomStall=False, seed=0xace1, init=None):
+        self.latency        = latency
+        self.randomStall    = randomStall
+        self.seed           = seed
+        self.bus            = Record(wishboneLayout)
+        self.memory         = Memory(width=32, depth=depth, init=init)
+        self.wordBits       = ceilLog2(depth)
+
+        # Statistics
+        self.accesses       = Signal(32)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        accept  = Signal()
+        word    = self.memory[self.bus.adr[:self.wordBits]]
+        acks    = Signal(self.latency)
+        data    = Array(Signal(32, name=f"data{i}") for i in range(self.latency))
+
+        if self.randomStall:
+            # 16-bit Galois LFSR (x^16 + x^14 + x^13 + x^11 + 1)
+            lfsr = Signal(16, reset=self.seed)
+            m.d.sync += lfsr.eq(Mux(lfsr[0], (lfsr >> 1) ^ 0xb400, lfsr >> 1))
+            m.d.comb += self.bus.stall.eq(lfsr[1:3] == 0)
+        else:
+            m.d.comb += self.bus.stall.eq(0)
+
+        m.d.comb += [
+            accept.eq(self.bus.cyc & self.bus.stb & ~self.bus.stall),
+            self.bus.ack.eq(acks[-1]),
+            self.bus.dat_r.eq(data[self.latency - 1])
+        ]
+
+        # Response pipeline
+        m.d.sync += [
+            acks.eq(Cat(accept, acks[:-1])),
+            data[0].eq(word)
+        ]
+        for i in range(1, self.latency):
+            m.d.sync += data[i].eq(data[i - 1])
+
+        with m.If(accept):
+            m.d.sync += self.accesses.eq(self.accesses + 1)
+            with m.If(self.bus.we):
+                m.d.sync += word.eq(Cat(Mux(self.bus.sel[i], self.bus.dat_w[8*i:8*i+8], word[8*i:8*i+8])
+                    for i in range(4)))
+
+        return m
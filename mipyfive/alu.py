@@ -1,40 +1,149 @@
 from nmigen import *
 from .types import *
 from .utils import *
+from .divider import leadingZeros
 
+def popCount(value):
+    ''' Number of set bits of an nMigen value (an adder tree) '''
+    counts = [value[i] for i in range(len(value))]
+    while len(counts) > 1:
+        pairs = [counts[i] + counts[i + 1] for i in range(0, len(counts) - 1, 2)]
+        counts = pairs + counts[len(pairs) * 2:]
+    return counts[0]
+
+def orTree(values):
+    ''' OR of a list of nMigen values (a balanced tree) '''
+    while len(values) > 1:
+        pairs = [values[i] | values[i + 1] for i in range(0, len(values) - 1, 2)]
+        values = pairs + values[len(pairs) * 2:]
+    return values[0]
+
+# NOTE: The Zba/Zbb operations are only decoded with "enableZb" (see Controller) - unary ones (CLZ, CTZ, CPOP,
+#       REV8, ORCB, SEXTB/H, ZEXTH) only use in1, shifts and rotates use in2's low bits as the shift amount
+#       Each functional unit is built once and the result is picked by a one-hot (AND-OR) mux:
+#       - One adder/subtractor (ADD, SUB, SHxADD with in1 pre-shifted) - its carry/sign also give SLT(U), MIN/MAX
+#       - One right shifter - left shifts/rotates shift the bit-reversed in1 (and reverse the result back), SRA
+#         shifts sign bits in, rotates in1 itself
+#       - One logic unit - ANDN/ORN/XNOR invert in2
+#       The comparison flags (isEqual, isLess, isLessU - in1 vs. in2) are outputs too, for the branch compare with
+#       branches resolved in EX (see compareTrue) - isLess/isLessU are only valid for a subtraction (e.g. SUB)
 class ALU(Elaboratable):
     def __init__(self, width):
+        self.width  = width
         self.aluOp  = Signal(ceilLog2(len(AluOp)))
         self.in1    = Signal(width)
         self.in2    = Signal(width)
 
         self.out    = Signal(width)
+        self.isEqual= Signal()
+        self.isLess = Signal()
+        self.isLessU= Signal()
 
     def elaborate(self, platform):
         m = Module()
 
-        with m.If(self.aluOp == AluOp.ADD):
-            m.d.comb += self.out.eq(self.in1 + self.in2)
-        with m.Elif(self.aluOp == AluOp.SUB):
-            m.d.comb += self.out.eq(self.in1 + ~(self.in2) + 1)
-        with m.Elif(self.aluOp == AluOp.AND):
-            m.d.comb += self.out.eq(self.in1 & self.in2)
-        with m.Elif(self.aluOp == AluOp.OR):
-            m.d.comb += self.out.eq(self.in1 | self.in2)
-        with m.Elif(self.aluOp == AluOp.XOR):
-            m.d.comb += self.out.eq(self.in1 ^ self.in2)
-        with m.Elif(self.aluOp == AluOp.SLL):
-            m.d.comb += self.out.eq(self.in1 << self.in2[:ceilLog2(self.in2.width)])
-        with m.Elif(self.aluOp == AluOp.SRL):
-            m.d.comb += self.out.eq(self.in1 >> self.in2)
-        with m.Elif(self.aluOp == AluOp.SRA):
-            m.d.comb += self.out.eq(self.in1.as_signed() >> self.in2)
-        with m.Elif(self.aluOp == AluOp.SLT):
-            m.d.comb += self.out.eq(self.in1.as_signed() < self.in2.as_signed())
-        with m.Elif(self.aluOp == AluOp.SLTU):
-            m.d.comb += self.out.eq(self.in1 < self.in2)
-        # Default: Unknown AluOp should just resort to ADD
-        with m.Else():
-            m.d.comb += self.out.eq(self.in1 + self.in2)
+        # --- Decode ---
+        # NOTE: Anything that isn't one of the other operations (incl. unknown AluOps) is the adder's result
+        isOp        = lambda *ops: self.aluOp.matches(*[op.value for op in ops])
+        subtract    = Signal()
+        unsigned    = Signal()
+        invertB     = Signal()
+        isXnor      = Signal()
+        shiftLeft   = Signal()
+        rotate      = Signal()
+        signFill    = Signal()
+        isCtz       = Signal()
+        isMax       = Signal()
+        groups      = [
+            isOp(AluOp.SLT, AluOp.SLTU),
+            isOp(AluOp.AND, AluOp.ANDN),
+            isOp(AluOp.OR, AluOp.ORN),
+            isOp(AluOp.XOR, AluOp.XNOR),
+            isOp(AluOp.SLL, AluOp.SRL, AluOp.SRA, AluOp.ROL, AluOp.ROR),
+            isOp(AluOp.CLZ, AluOp.CTZ),
+            isOp(AluOp.CPOP),
+            isOp(AluOp.MIN, AluOp.MINU, AluOp.MAX, AluOp.MAXU),
+            isOp(AluOp.REV8),
+            isOp(AluOp.ORCB),
+            isOp(AluOp.SEXTB),
+            isOp(AluOp.SEXTH),
+            isOp(AluOp.ZEXTH)
+        ]
+        selects     = Signal(len(groups))
+        selectAdd   = Signal()
+        m.d.comb += [
+            subtract.eq(isOp(AluOp.SUB, AluOp.SLT, AluOp.SLTU, AluOp.MIN, AluOp.MINU, AluOp.MAX, AluOp.MAXU)),
+            unsigned.eq(isOp(AluOp.SLTU, AluOp.MINU, AluOp.MAXU)),
+            invertB.eq(isOp(AluOp.ANDN, AluOp.ORN)),
+            isXnor.eq(isOp(AluOp.XNOR)),
+            shiftLeft.eq(isOp(AluOp.SLL, AluOp.ROL)),
+            rotate.eq(isOp(AluOp.ROL, AluOp.ROR)),
+            signFill.eq(isOp(AluOp.SRA) & self.in1[-1]),
+            isCtz.eq(isOp(AluOp.CTZ)),
+            isMax.eq(isOp(AluOp.MAX, AluOp.MAXU)),
+            selects.eq(Cat(*groups)),
+            selectAdd.eq(selects == 0)
+        ]
+
+        # --- Adder/subtractor ---
+        # NOTE: The carry in (subtract) goes in below both operands' LSB, for a single adder
+        addA        = Signal(self.width)
+        addB        = Signal(self.width)
+        adder       = Signal(self.width + 2)
+        less        = Signal()
+        m.d.comb += [
+            addA.eq(Mux(isOp(AluOp.SH1ADD), self.in1 << 1, Mux(isOp(AluOp.SH2ADD), self.in1 << 2,
+                Mux(isOp(AluOp.SH3ADD), self.in1 << 3, self.in1)))),
+            addB.eq(self.in2 ^ Repl(subtract, self.width)),
+            adder.eq(Cat(subtract, addA) + Cat(subtract, addB)),
+            # No carry out of in1 - in2 is a borrow - a signed one too, unless the signs differ
+            self.isLessU.eq(~adder[-1]),
+            self.isLess.eq(Mux(self.in1[-1] ^ self.in2[-1], self.in1[-1], adder[-2])),
+            less.eq(Mux(unsigned, self.isLessU, self.isLess))
+        ]
+
+        # --- Logic unit ---
+        difference  = Signal(self.width)
+        logicB      = Signal(self.width)
+        m.d.comb += [
+            difference.eq(self.in1 ^ self.in2),
+            self.isEqual.eq(difference == 0),
+            logicB.eq(self.in2 ^ Repl(invertB, self.width))
+        ]
+
+        # --- Shifter ---
+        shiftIn     = Signal(self.width)
+        shiftOut    = Signal(self.width)
+        m.d.comb += [
+            shiftIn.eq(Mux(shiftLeft, self.in1[::-1], self.in1)),
+            shiftOut.eq(Cat(shiftIn, Mux(rotate, shiftIn, Repl(signFill, self.width))) >>
+                self.in2[:ceilLog2(self.width)])
+        ]
+
+        # --- Counts ---
+        countIn     = Signal(self.width)
+        m.d.comb += countIn.eq(Mux(isCtz, self.in1[::-1], self.in1))
+
+        # --- Result mux ---
+        # NOTE: One result per decoded group (in the same order), the adder's last
+        orcb = [Signal(name=f"orcb{i // 8}") for i in range(0, self.width, 8)]
+        m.d.comb += [orcb[i // 8].eq(self.in1[i:i+8] != 0) for i in range(0, self.width, 8)]
+        results = [
+            less,
+            self.in1 & logicB,
+            self.in1 | logicB,
+            difference ^ Repl(isXnor, self.width),
+            Mux(shiftLeft, shiftOut[::-1], shiftOut),
+            leadingZeros(countIn),
+            popCount(self.in1),
+            Mux(less ^ isMax, self.in1, self.in2),
+            Cat(*[self.in1[i:i+8] for i in reversed(range(0, self.width, 8))]),
+            Cat(*[Repl(bit, 8) for bit in orcb]),
+            Cat(self.in1[:8], Repl(self.in1[7], self.width - 8)),
+            Cat(self.in1[:16], Repl(self.in1[15], self.width - 16)),
+            self.in1[:16]
+        ]
+        m.d.comb += self.out.eq(orTree([Repl(selects[i], self.width) & result for i, result in enumerate(results)] +
+            [Repl(selectAdd, self.width) & adder[1:-1]]))
 
         return m
@@ -0,0 +1,254 @@
+from nmigen import *
+from nmigen.hdl.rec import *
+from .utils import *
+from .wishbone import *
+
+# AXI4-Lite bus (32-bit address/data)
+# NOTE: Directions are from the master's side - connect with "master.bus.connect(slave.bus)"
+axiLiteLayout = [
+    # Write address channel
+    ("awaddr",  32, DIR_FANOUT),
+    ("awprot",  3,  DIR_FANOUT),
+    ("awvalid", 1,  DIR_FANOUT),
+    ("awready", 1,  DIR_FANIN),
+    # Write data channel
+    ("wdata",   32, DIR_FANOUT),
+    ("wstrb",   4,  DIR_FANOUT),
+    ("wvalid",  1,  DIR_FANOUT),
+    ("wready",  1,  DIR_FANIN),
+    # Write response channel
+    ("bresp",   2,  DIR_FANIN),
+    ("bvalid",  1,  DIR_FANIN),
+    ("bready",  1,  DIR_FANOUT),
+    # Read address channel
+    ("araddr",  32, DIR_FANOUT),
+    ("arprot",  3,  DIR_FANOUT),
+    ("arvalid", 1,  DIR_FANOUT),
+    ("arready", 1,  DIR_FANIN),
+    # Read data channel
+    ("rdata",   32, DIR_FANIN),
+    ("rresp",   2,  DIR_FANIN),
+    ("rvalid",  1,  DIR_FANIN),
+    ("rready",  1,  DIR_FANOUT)
+]
+
+# AXI4 bus - AXI4-Lite plus bursts (single ID, so every transaction of a direction completes in order)
+axiLayout = axiLiteLayout + [
+    ("awlen",   8,  DIR_FANOUT),
+    ("awsize",  3,  DIR_FANOUT),
+    ("awburst", 2,  DIR_FANOUT),
+    ("wlast",   1,  DIR_FANOUT),
+    ("arlen",   8,  DIR_FANOUT),
+    ("arsize",  3,  DIR_FANOUT),
+    ("arburst", 2,  DIR_FANOUT),
+    ("rlast",   1,  DIR_FANIN)
+]
+
+class AxiBurst:
+    FIXED   = 0b00
+    INCR    = 0b01
+    WRAP    = 0b10
+
+# Wishbone B4 pipelined slave to AXI4-Lite master bridge - up to "depth" transactions in flight
+# NOTE: Requests are registered onto the AR (reads) or AW+W (writes) channels, so a valid is never retracted
+#       AXI does not order reads against writes - a read is held (arvalid low) until every earlier write has been
+#       responded to, and the bridge records the direction of every transaction and only takes the R/B response
+#       matching the oldest one, so the Wishbone side is acknowledged in order
+#       "stall" does not depend on the request (the core's ready signals are derived from it)
+class WishboneAxiLiteBridge(Elaboratable):
+    def __init__(self, depth=4):
+        self.depth  = depth
+        self.wb     = Record(wishboneLayout)
+        self.bus    = Record(axiLiteLayout)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        order       = Array(Signal(name=f"order{i}") for i in range(self.depth))
+        head        = Signal(range(self.depth))
+        tail        = Signal(range(self.depth))
+        outstanding = Signal(range(self.depth + 1))
+        writesOut   = Signal(range(self.depth + 1))
+        readPending = Signal()
+        accept      = Signal()
+        ack         = Signal()
+
+        # Response channels - only the oldest transaction's direction is taken
+        m.d.comb += [
+            self.bus.rready.eq((outstanding != 0) & ~order[head]),
+            self.bus.bready.eq((outstanding != 0) & order[head]),
+            ack.eq(self.bus.rvalid & self.bus.rready | self.bus.bvalid & self.bus.bready),
+            self.wb.ack.eq(ack),
+            self.wb.dat_r.eq(self.bus.rdata)
+        ]
+
+        # Request channels
+        m.d.comb += [
+            self.bus.arvalid.eq(readPending & (writesOut == 0)),
+            self.wb.stall.eq((outstanding == self.depth) | readPending & ~(self.bus.arvalid & self.bus.arready) |
+                self.bus.awvalid & ~self.bus.awready | self.bus.wvalid & ~self.bus.wready),
+            accept.eq(self.wb.cyc & self.wb.stb & ~self.wb.stall),
+            self.bus.awprot.eq(0),
+            self.bus.arprot.eq(0)
+        ]
+        with m.If(self.bus.arvalid & self.bus.arready):
+            m.d.sync += readPending.eq(0)
+        with m.If(self.bus.awready):
+            m.d.sync += self.bus.awvalid.eq(0)
+        with m.If(self.bus.wready):
+            m.d.sync += self.bus.wvalid.eq(0)
+        with m.If(accept):
+            m.d.sync += [
+                order[tail].eq(self.wb.we),
+                tail.eq(wrapPtr(tail, self.depth))
+            ]
+            with m.If(self.wb.we):
+                m.d.sync += [
+                    self.bus.awvalid.eq(1),
+                    self.bus.awaddr.eq(Cat(C(0, 2), self.wb.adr)),
+                    self.bus.wvalid.eq(1),
+                    self.bus.wdata.eq(self.wb.dat_w),
+                    self.bus.wstrb.eq(self.wb.sel)
+                ]
+            with m.Else():
+                m.d.sync += [
+                    readPending.eq(1),
+                    self.bus.araddr.eq(Cat(C(0, 2), self.wb.adr))
+                ]
+        with m.If(ack):
+            m.d.sync += head.eq(wrapPtr(head, self.depth))
+        m.d.sync += [
+            outstanding.eq(outstanding + accept - ack),
+            writesOut.eq(writesOut + (accept & self.wb.we) - (self.bus.bvalid & self.bus.bready))
+        ]
+
+        return m
+
+# AXI4-Lite instruction fetch master - WishboneFetchMaster (sequential prefetch, "depth" reads in flight) over
+# a WishboneAxiLiteBridge
+# NOTE: Core side follows the core's fetch port protocol (see MipyfiveCore)
+class AxiLiteFetchMaster(Elaboratable):
+    def __init__(self, depth=4):
+        self.master = WishboneFetchMaster(depth=depth)
+        self.bridge = WishboneAxiLiteBridge(depth=depth)
+
+        # Core port
+        self.addr   = self.master.addr
+        self.data   = self.master.data
+        self.ready  = self.master.ready
+
+        self.bus    = self.bridge.bus
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.master = self.master
+        m.submodules.bridge = self.bridge
+        m.d.comb += self.master.bus.connect(self.bridge.wb)
+        return m
+
+# AXI4-Lite data master (uncached/peripheral accesses) - WishboneDataMaster (posted stores, byte strobes from
+# "byteEn") over a WishboneAxiLiteBridge
+# NOTE: Core side follows the core's data port protocol (see MipyfiveCore)
+class AxiLiteDataMaster(Elaboratable):
+    def __init__(self, depth=4):
+        self.master         = WishboneDataMaster(depth=depth)
+        self.bridge         = WishboneAxiLiteBridge(depth=depth)
+
+        # Core port
+        self.addr           = self.master.addr
+        self.readEnable     = self.master.readEnable
+        self.writeEnable    = self.master.writeEnable
+        self.writeData      = self.master.writeData
+        self.byteEn         = self.master.byteEn
+        self.readData       = self.master.readData
+        self.ready          = self.master.ready
+
+        self.bus            = self.bridge.bus
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.master = self.master
+        m.submodules.bridge = self.bridge
+        m.d.comb += self.master.bus.connect(self.bridge.wb)
+        return m
+
+# AXI4 cache refill master - a read of a line-aligned address is one INCR burst of "burstLength" words,
+# returned (in order) as the beats arrive - writes (write buffer drains, "byteEn" lanes) are single beats,
+# posted with up to "depth" responses outstanding
+# NOTE: Memory side follows the caches' memory port (i.e. SlowRAM) - a read is held (req=1) until "valid",
+#       which pulses once per word (so "arvalid" is held until accepted too)
+#       AXI does not order reads against writes - a read waits until every posted write has been responded to
+class AxiRefillMaster(Elaboratable):
+    def __init__(self, burstLength, depth=4):
+        self.burstLength    = burstLength
+        self.depth          = depth
+
+        # Memory port
+        self.req            = Signal()
+        self.addr           = Signal(32)
+        self.writeEnable    = Signal()
+        self.writeData      = Signal(32)
+        self.byteEn         = Signal(4, reset=0b1111)
+        self.readData       = Signal(32)
+        self.valid          = Signal()
+
+        self.bus            = Record(axiLayout)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        reading     = Signal()
+        writesOut   = Signal(range(self.depth + 1))
+        awDone      = Signal()
+        wDone       = Signal()
+        written     = Signal()
+
+        lineAligned = self.addr[2:2+ceilLog2(self.burstLength)] == 0 if self.burstLength > 1 else C(1)
+        startRead   = ~reading & self.req & ~self.writeEnable & (writesOut == 0)
+        startWrite  = ~reading & self.req & self.writeEnable & (writesOut != self.depth)
+        beat        = self.bus.rvalid & self.bus.rready
+
+        m.d.comb += [
+            # Read channels
+            self.bus.arvalid.eq(startRead),
+            self.bus.araddr.eq(self.addr),
+            self.bus.arlen.eq(Mux(lineAligned, self.burstLength - 1, 0)),
+            self.bus.arsize.eq(0b010),
+            self.bus.arburst.eq(AxiBurst.INCR),
+            self.bus.arprot.eq(0),
+            self.bus.rready.eq(reading),
+            self.readData.eq(self.bus.rdata),
+            # Write channels - the address and data handshakes may complete in different cycles
+            self.bus.awvalid.eq(startWrite & ~awDone),
+            self.bus.awaddr.eq(self.addr),
+            self.bus.awlen.eq(0),
+            self.bus.awsize.eq(0b010),
+            self.bus.awburst.eq(AxiBurst.INCR),
+            self.bus.awprot.eq(0),
+            self.bus.wvalid.eq(startWrite & ~wDone),
+            self.bus.wdata.eq(self.writeData),
+            self.bus.wstrb.eq(self.byteEn),
+            self.bus.wlast.eq(1),
+            self.bus.bready.eq(1),
+            written.eq(startWrite & (awDone | self.bus.awready) & (wDone | self.bus.wready)),
+            self.valid.eq(beat | written)
+        ]
+
+        with m.If(self.bus.arvalid & self.bus.arready):
+            m.d.sync += reading.eq(1)
+        with m.Elif(beat & self.bus.rlast):
+            m.d.sync += reading.eq(0)
+
+        with m.If(written):
+            m.d.sync += [
+                awDone.eq(0),
+                wDone.eq(0)
+            ]
+        with m.Else():
+            with m.If(self.bus.awvalid & self.bus.awready):
+                m.d.sync += awDone.eq(1)
+            with m.If(self.bus.wvalid & self.bus.wready):
+                m.d.sync += wDone.eq(1)
+        m.d.sync += writesOut.eq(writesOut + written - self.bus.bvalid)
+
+        return m
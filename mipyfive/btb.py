@@ -0,0 +1,48 @@
+from nmigen import *
+from .utils import *
+
+# Direct-mapped Branch Target Buffer (BTB)
+# NOTE: Indexed by the word-aligned PC (halfword-aligned with a "pcLsb" of 1, i.e. RV32C) - "entries" should be a
+#       power of 2
+#       Tags are partial (tagBits wide), so aliasing is possible - hits are verified in decode
+class BranchTargetBuffer(Elaboratable):
+    def __init__(self, entries, tagBits, pcLsb=2):
+        self.indexBits      = ceilLog2(entries)
+        self.tagBits        = tagBits
+        self.pcLsb          = pcLsb
+        self.fetchPc        = Signal(32)
+        self.updatePc       = Signal(32)
+        self.updateTarget   = Signal(32)
+        self.updateEnable   = Signal()
+        self.invalidate     = Signal()
+
+        self.hit            = Signal()
+        self.target         = Signal(32)
+        # Entry layout: (valid | tag | target)
+        self.entries        = Memory(width=1+tagBits+32, depth=entries)
+
+    def pcIndex(self, pc):
+        return pc[self.pcLsb:self.pcLsb+self.indexBits]
+
+    def pcTag(self, pc):
+        return pc[self.pcLsb+self.indexBits:self.pcLsb+self.indexBits+self.tagBits]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        entry = self.entries[self.pcIndex(self.fetchPc)]
+
+        # Lookup
+        m.d.comb += [
+            self.hit.eq(entry[0] & (entry[1:1+self.tagBits] == self.pcTag(self.fetchPc))),
+            self.target.eq(entry[1+self.tagBits:])
+        ]
+
+        # Fill/Invalidate
+        with m.If(self.updateEnable):
+            m.d.sync += self.entries[self.pcIndex(self.updatePc)].eq(
+                Cat(C(1), self.pcTag(self.updatePc), self.updateTarget))
+        with m.Elif(self.invalidate):
+            m.d.sync += self.entries[self.pcIndex(self.updatePc)].eq(0)
+
+        return m
@@ -3,6 +3,15 @@ from nmigen import *
 from .utils import *
 from .types import *
 
+def compareTrue(cmpType, isEqual, isLess, isLessU):
+    ''' Branch condition from the comparison flags of in1 - in2 (see CompareTypes)\n
+    NOTE: cmpType[1]/[2] select a less-than compare, [0] the unsigned one (or NOT_EQUAL), [2] inverts it
+    '''
+    isLessType = cmpType[1] | cmpType[2]
+    return Mux(isLessType, Mux(cmpType[0], isLessU, isLess), isEqual) ^ Mux(isLessType, cmpType[2], cmpType[0])
+
+# NOTE: A single (unsigned) comparator gives both less-thans - the signed one is the same unless the operands' signs
+#       differ (then in1 is less if it is the negative one)
 class CompareUnit(Elaboratable):
     def __init__(self, width):
         self.in1        = Signal(width)
@@ -14,18 +23,12 @@ class CompareUnit(Elaboratable):
     def elaborate(self, platform):
         m = Module()
 
-        with m.Switch(self.cmpType):
-            with m.Case(CompareTypes.EQUAL):
-                m.d.comb += self.isTrue.eq(self.in1 == self.in2)
-            with m.Case(CompareTypes.NOT_EQUAL):
-                m.d.comb += self.isTrue.eq(self.in1 != self.in2)
-            with m.Case(CompareTypes.LESS_THAN):
-                m.d.comb += self.isTrue.eq(self.in1.as_signed() < self.in2.as_signed())
-            with m.Case(CompareTypes.LESS_THAN_U):
-                m.d.comb += self.isTrue.eq(self.in1 < self.in2)
-            with m.Case(CompareTypes.GREATER_EQUAL):
-                m.d.comb += self.isTrue.eq(self.in1.as_signed() >= self.in2.as_signed())
-            with m.Case(CompareTypes.GREATER_EQUAL_U):
-                m.d.comb += self.isTrue.eq(self.in1 >= self.in2)
+        isLess      = Signal()
+        isLessU     = Signal()
+        m.d.comb += [
+            isLessU.eq(self.in1 < self.in2),
+            isLess.eq(Mux(self.in1[-1] ^ self.in2[-1], self.in1[-1], isLessU)),
+            self.isTrue.eq(compareTrue(self.cmpType, self.in1 == self.in2, isLess, isLessU))
+        ]
 
         return m
@@ -4,8 +4,13 @@ from .utils import *
 
 # TODO: Look into a ROM-based microcoded controller unit
 #       (Compare with this hard-wired combinational circuit)
+# NOTE: RV32M instructions are only decoded with "enableM", RV32F ones with "enableF" and Zba/Zbb ones with
+#       "enableZb" (otherwise they are unknown instructions)
 class Controller(Elaboratable):
-    def __init__(self):
+    def __init__(self, enableM=False, enableF=False, enableZb=False):
+        self.enableM        = enableM
+        self.enableF        = enableF
+        self.enableZb       = enableZb
         self.instruction    = Signal(32)
         self.aluOp          = Signal(ceilLog2(len(AluOp)))
         self.cmpType        = Signal(ceilLog2(len(CompareTypes)))
@@ -16,14 +21,28 @@ class Controller(Elaboratable):
         self.memRead        = Signal()
         self.mem2Reg        = Signal()
         self.aluAsrc        = Signal(2)
-        self.aluBsrc        = Signal()
+        self.aluBsrc        = Signal(2)
         self.branch         = Signal()
+        self.jal            = Signal()
+        self.jalr           = Signal()
+        # Source register usage - rs1/rs2 fields of other formats hold immediate bits
+        self.usesRs1        = Signal()
+        self.usesRs2        = Signal()
+        # RV32F - FP operation/unit, FP register file write, FP source registers (rs3 is R4-type only), FSW
+        self.fpuOp          = Signal(ceilLog2(len(FpuOp)))
+        self.fpUnit         = Signal(ceilLog2(len(FpUnit)))
+        self.fpRegWrite     = Signal()
+        self.usesFrs1       = Signal()
+        self.usesFrs2       = Signal()
+        self.usesFrs3       = Signal()
+        self.fpStore        = Signal()
 
     def elaborate(self, platform):
         m = Module()
         opcode = self.instruction[0:7]
         funct3 = self.instruction[12:15]
         funct7 = self.instruction[25:32]
+        rs2    = self.instruction[20:25]
 
         # Get instruction type via opcode
         with m.Switch(opcode):
@@ -39,7 +58,9 @@ class Controller(Elaboratable):
                     self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
                     self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
                     self.aluBsrc.eq(AluBSrcCtrl.FROM_RS2.value),
-                    self.branch.eq(0)
+                    self.branch.eq(0),
+                    self.usesRs1.eq(1),
+                    self.usesRs2.eq(1)
                 ]
                 with m.Switch(Cat(opcode, funct3, funct7)):
                     with m.Case(Rv32iInstructions.ADD.value):
@@ -62,6 +83,35 @@ class Controller(Elaboratable):
                         m.d.comb += self.aluOp.eq(AluOp.SLT.value)
                     with m.Case(Rv32iInstructions.SLTU.value):
                         m.d.comb += self.aluOp.eq(AluOp.SLTU.value)
+                    if self.enableM:
+                        with m.Case(Rv32mInstructions.MUL.value):
+                            m.d.comb += self.aluOp.eq(AluOp.MUL.value)
+                        with m.Case(Rv32mInstructions.MULH.value):
+                            m.d.comb += self.aluOp.eq(AluOp.MULH.value)
+                        with m.Case(Rv32mInstructions.MULHSU.value):
+                            m.d.comb += self.aluOp.eq(AluOp.MULHSU.value)
+                        with m.Case(Rv32mInstructions.MULHU.value):
+                            m.d.comb += self.aluOp.eq(AluOp.MULHU.value)
+                        with m.Case(Rv32mInstructions.DIV.value):
+                            m.d.comb += self.aluOp.eq(AluOp.DIV.value)
+                        with m.Case(Rv32mInstructions.DIVU.value):
+                            m.d.comb += self.aluOp.eq(AluOp.DIVU.value)
+                        with m.Case(Rv32mInstructions.REM.value):
+                            m.d.comb += self.aluOp.eq(AluOp.REM.value)
+                        with m.Case(Rv32mInstructions.REMU.value):
+                            m.d.comb += self.aluOp.eq(AluOp.REMU.value)
+                    if self.enableZb:
+                        for instr, aluOp in [
+                            (Rv32bInstructions.SH1ADD, AluOp.SH1ADD), (Rv32bInstructions.SH2ADD, AluOp.SH2ADD),
+                            (Rv32bInstructions.SH3ADD, AluOp.SH3ADD), (Rv32bInstructions.ANDN, AluOp.ANDN),
+                            (Rv32bInstructions.ORN, AluOp.ORN), (Rv32bInstructions.XNOR, AluOp.XNOR),
+                            (Rv32bInstructions.MIN, AluOp.MIN), (Rv32bInstructions.MINU, AluOp.MINU),
+                            (Rv32bInstructions.MAX, AluOp.MAX), (Rv32bInstructions.MAXU, AluOp.MAXU),
+                            (Rv32bInstructions.ROL, AluOp.ROL), (Rv32bInstructions.ROR, AluOp.ROR),
+                            (Rv32bInstructions.ZEXT_H, AluOp.ZEXTH)
+                        ]:
+                            with m.Case(instr.value):
+                                m.d.comb += self.aluOp.eq(aluOp.value)
                     with m.Default():
                         pass # TODO: Handle invalid instruction here later...
 
@@ -72,7 +122,8 @@ class Controller(Elaboratable):
                     self.regWrite.eq(1),
                     self.memWrite.eq(0),
                     self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
-                    self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value)
+                    self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value),
+                    self.usesRs1.eq(1)
                 ]
                 with m.If(opcode == Rv32iTypes.I_Load.value):
                     m.d.comb += [
@@ -99,7 +150,17 @@ class Controller(Elaboratable):
                         self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
                     ]
                     with m.Switch(Cat(opcode, funct3, Repl(C(0), len(funct7)))):
-                        with m.Case(Rv32iInstructions.JALR.value, Rv32iInstructions.ADDI.value):
+                        with m.Case(Rv32iInstructions.JALR.value):
+                            # Link (PC + 4) is computed by the ALU, target is resolved in decode
+                            m.d.comb += [
+                                self.jalr.eq(1),
+                                self.aluOp.eq(AluOp.ADD.value),
+                                self.cmpType.eq(CompareTypes.EQUAL.value),
+                                self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
+                                self.aluAsrc.eq(AluASrcCtrl.FROM_PC.value),
+                                self.aluBsrc.eq(AluBSrcCtrl.FROM_FOUR.value)
+                            ]
+                        with m.Case(Rv32iInstructions.ADDI.value):
                             m.d.comb += [
                                 self.aluOp.eq(AluOp.ADD.value),
                                 self.cmpType.eq(CompareTypes.EQUAL.value),
@@ -156,6 +217,22 @@ class Controller(Elaboratable):
                                         self.cmpType.eq(CompareTypes.EQUAL.value),
                                         self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value)
                                     ]
+                                # Zba/Zbb - RORI (a shift amount like SRAI's), the unary ones by their funct12
+                                # NOTE: These override the shift's aluOp above
+                                if self.enableZb:
+                                    with m.Switch(Cat(opcode, funct3, funct7)):
+                                        with m.Case(Rv32bInstructions.RORI.value):
+                                            m.d.comb += self.aluOp.eq(AluOp.ROR.value)
+                                    with m.Switch(Cat(opcode, funct3, self.instruction[20:32])):
+                                        for instr, aluOp in [
+                                            (Rv32bInstructions.CLZ, AluOp.CLZ), (Rv32bInstructions.CTZ, AluOp.CTZ),
+                                            (Rv32bInstructions.CPOP, AluOp.CPOP),
+                                            (Rv32bInstructions.SEXT_B, AluOp.SEXTB),
+                                            (Rv32bInstructions.SEXT_H, AluOp.SEXTH),
+                                            (Rv32bInstructions.ORC_B, AluOp.ORCB), (Rv32bInstructions.REV8, AluOp.REV8)
+                                        ]:
+                                            with m.Case(instr.value):
+                                                m.d.comb += self.aluOp.eq(aluOp.value)
                         with m.Default():
                             pass # TODO: Handle invalid instruction here later...
 
@@ -188,7 +265,9 @@ class Controller(Elaboratable):
                     self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
                     self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
                     self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
-                    self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value)
+                    self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value),
+                    self.usesRs1.eq(1),
+                    self.usesRs2.eq(1)
                 ]
                 with m.Switch(Cat(opcode, funct3)):
                     with m.Case(Rv32iInstructions.SB.value):
@@ -205,12 +284,14 @@ class Controller(Elaboratable):
                     self.regWrite.eq(0),
                     self.memWrite.eq(0),
                     self.memRead.eq(0),
-                    self.aluOp.eq(AluOp.ADD.value),
+                    self.aluOp.eq(AluOp.SUB.value), # rs1 - rs2 - the compare flags (branches resolved in EX)
                     self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
                     self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
                     self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
                     self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
-                    self.aluBsrc.eq(AluBSrcCtrl.FROM_RS2.value)
+                    self.aluBsrc.eq(AluBSrcCtrl.FROM_RS2.value),
+                    self.usesRs1.eq(1),
+                    self.usesRs2.eq(1)
                 ]
                 with m.Switch(Cat(opcode, funct3)):
                     with m.Case(Rv32iInstructions.BEQ.value):
@@ -251,9 +332,11 @@ class Controller(Elaboratable):
                         pass # TODO: Handle invalid instruction here later...
 
             # -- J-Type --
+            # Link (PC + 4) is computed by the ALU, target is resolved in decode
             with m.Case(Rv32iTypes.J):
                 m.d.comb += [
                     self.branch.eq(0),
+                    self.jal.eq(1),
                     self.regWrite.eq(1),
                     self.memWrite.eq(0),
                     self.memRead.eq(0),
@@ -262,10 +345,137 @@ class Controller(Elaboratable):
                     self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
                     self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
                     self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
-                    self.aluAsrc.eq(AluASrcCtrl.FROM_ZERO.value),
-                    self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value)
+                    self.aluAsrc.eq(AluASrcCtrl.FROM_PC.value),
+                    self.aluBsrc.eq(AluBSrcCtrl.FROM_FOUR.value)
                 ]
 
+            if self.enableF:
+                # --- RV32F loads/stores (executed as LW/SW, to/from the FP register file) ---
+                with m.Case(Rv32fTypes.F_Load.value):
+                    m.d.comb += [
+                        self.fpRegWrite.eq(1),
+                        self.memRead.eq(1),
+                        self.aluOp.eq(AluOp.ADD.value),
+                        self.cmpType.eq(CompareTypes.EQUAL.value),
+                        self.mem2Reg.eq(Mem2RegCtrl.FROM_MEM.value),
+                        self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LW.value),
+                        self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
+                        self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
+                        self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value),
+                        self.usesRs1.eq(1)
+                    ]
+                with m.Case(Rv32fTypes.F_Store.value):
+                    m.d.comb += [
+                        self.memWrite.eq(1),
+                        self.fpStore.eq(1),
+                        self.aluOp.eq(AluOp.ADD.value),
+                        self.cmpType.eq(CompareTypes.EQUAL.value),
+                        self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
+                        self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
+                        self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SW.value),
+                        self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
+                        self.aluBsrc.eq(AluBSrcCtrl.FROM_IMM.value),
+                        self.usesRs1.eq(1),
+                        self.usesFrs2.eq(1)
+                    ]
+
+                # --- RV32F R-Type (OP-FP) ---
+                # NOTE: Integer operands (FMV.W.X, FCVT.S.W(U)) are read as rs1 and reach EX as the ALU's A input
+                with m.Case(Rv32fTypes.F_Op.value):
+                    m.d.comb += [
+                        self.aluOp.eq(AluOp.ADD.value),
+                        self.cmpType.eq(CompareTypes.EQUAL.value),
+                        self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
+                        self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
+                        self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
+                        self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
+                        self.aluBsrc.eq(AluBSrcCtrl.FROM_RS2.value)
+                    ]
+                    with m.Switch(funct7):
+                        with m.Case(Rv32fInstructions.FADD.value >> 10):
+                            m.d.comb += [self.fpuOp.eq(FpuOp.FADD.value), self.fpUnit.eq(FpUnit.FMA.value),
+                                self.fpRegWrite.eq(1), self.usesFrs1.eq(1), self.usesFrs2.eq(1)]
+                        with m.Case(Rv32fInstructions.FSUB.value >> 10):
+                            m.d.comb += [self.fpuOp.eq(FpuOp.FSUB.value), self.fpUnit.eq(FpUnit.FMA.value),
+                                self.fpRegWrite.eq(1), self.usesFrs1.eq(1), self.usesFrs2.eq(1)]
+                        with m.Case(Rv32fInstructions.FMUL.value >> 10):
+                            m.d.comb += [self.fpuOp.eq(FpuOp.FMUL.value), self.fpUnit.eq(FpUnit.FMA.value),
+                                self.fpRegWrite.eq(1), self.usesFrs1.eq(1), self.usesFrs2.eq(1)]
+                        with m.Case(Rv32fInstructions.FDIV.value >> 10):
+                            m.d.comb += [self.fpuOp.eq(FpuOp.FDIV.value), self.fpUnit.eq(FpUnit.DIVSQRT.value),
+                                self.fpRegWrite.eq(1), self.usesFrs1.eq(1), self.usesFrs2.eq(1)]
+                        with m.Case(Rv32fInstructions.FSQRT.value >> 10):
+                            m.d.comb += [self.fpuOp.eq(FpuOp.FSQRT.value), self.fpUnit.eq(FpUnit.DIVSQRT.value),
+                                self.fpRegWrite.eq(1), self.usesFrs1.eq(1)]
+                        with m.Case(Rv32fInstructions.FSGNJ.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.fpRegWrite.eq(1),
+                                self.usesFrs1.eq(1), self.usesFrs2.eq(1)]
+                            with m.Switch(funct3):
+                                with m.Case(0b000):
+                                    m.d.comb += self.fpuOp.eq(FpuOp.FSGNJ.value)
+                                with m.Case(0b001):
+                                    m.d.comb += self.fpuOp.eq(FpuOp.FSGNJN.value)
+                                with m.Default():
+                                    m.d.comb += self.fpuOp.eq(FpuOp.FSGNJX.value)
+                        with m.Case(Rv32fInstructions.FMIN.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.fpRegWrite.eq(1),
+                                self.usesFrs1.eq(1), self.usesFrs2.eq(1),
+                                self.fpuOp.eq(Mux(funct3[0], FpuOp.FMAX.value, FpuOp.FMIN.value))]
+                        with m.Case(Rv32fInstructions.FEQ.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.regWrite.eq(1),
+                                self.usesFrs1.eq(1), self.usesFrs2.eq(1)]
+                            with m.Switch(funct3):
+                                with m.Case(0b010):
+                                    m.d.comb += self.fpuOp.eq(FpuOp.FEQ.value)
+                                with m.Case(0b001):
+                                    m.d.comb += self.fpuOp.eq(FpuOp.FLT.value)
+                                with m.Default():
+                                    m.d.comb += self.fpuOp.eq(FpuOp.FLE.value)
+                        with m.Case(Rv32fInstructions.FCVT_W.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.regWrite.eq(1),
+                                self.usesFrs1.eq(1),
+                                self.fpuOp.eq(Mux(rs2[0], FpuOp.FCVT_WU_S.value, FpuOp.FCVT_W_S.value))]
+                        with m.Case(Rv32fInstructions.FMV_X_W.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.regWrite.eq(1),
+                                self.usesFrs1.eq(1),
+                                self.fpuOp.eq(Mux(funct3[0], FpuOp.FCLASS.value, FpuOp.FMV_X_W.value))]
+                        with m.Case(Rv32fInstructions.FCVT_S.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.fpRegWrite.eq(1),
+                                self.usesRs1.eq(1),
+                                self.fpuOp.eq(Mux(rs2[0], FpuOp.FCVT_S_WU.value, FpuOp.FCVT_S_W.value))]
+                        with m.Case(Rv32fInstructions.FMV_W_X.value >> 10):
+                            m.d.comb += [self.fpUnit.eq(FpUnit.MISC.value), self.fpRegWrite.eq(1),
+                                self.usesRs1.eq(1), self.fpuOp.eq(FpuOp.FMV_W_X.value)]
+                        with m.Default():
+                            pass # TODO: Handle invalid instruction here later...
+
+                # --- RV32F R4-Type (fused multiply-adds) ---
+                with m.Case(Rv32fTypes.F_Madd.value, Rv32fTypes.F_Msub.value, Rv32fTypes.F_Nmsub.value,
+                    Rv32fTypes.F_Nmadd.value):
+                    m.d.comb += [
+                        self.aluOp.eq(AluOp.ADD.value),
+                        self.cmpType.eq(CompareTypes.EQUAL.value),
+                        self.mem2Reg.eq(Mem2RegCtrl.FROM_ALU.value),
+                        self.lsuLoadCtrl.eq(LSULoadCtrl.LSU_LB.value),
+                        self.lsuStoreCtrl.eq(LSUStoreCtrl.LSU_SB.value),
+                        self.aluAsrc.eq(AluASrcCtrl.FROM_RS1.value),
+                        self.aluBsrc.eq(AluBSrcCtrl.FROM_RS2.value),
+                        self.fpUnit.eq(FpUnit.FMA.value),
+                        self.fpRegWrite.eq(1),
+                        self.usesFrs1.eq(1),
+                        self.usesFrs2.eq(1),
+                        self.usesFrs3.eq(1)
+                    ]
+                    with m.Switch(opcode):
+                        with m.Case(Rv32fInstructions.FMADD.value):
+                            m.d.comb += self.fpuOp.eq(FpuOp.FMADD.value)
+                        with m.Case(Rv32fInstructions.FMSUB.value):
+                            m.d.comb += self.fpuOp.eq(FpuOp.FMSUB.value)
+                        with m.Case(Rv32fInstructions.FNMSUB.value):
+                            m.d.comb += self.fpuOp.eq(FpuOp.FNMSUB.value)
+                        with m.Default():
+                            m.d.comb += self.fpuOp.eq(FpuOp.FNMADD.value)
+
             # -- Unknown instruction --
             with m.Default():
                 pass # TODO: Handle invalid instruction here later...
@@ -9,37 +9,231 @@ from .compare import *
 from .forward import *
 from .pipereg import *
 from .regfile import *
+from .btb import *
+from .ras import *
+from .predictor import *
 from .controller import *
+from .multiplier import *
+from .divider import *
+from .fpregfile import *
+from .fpfma import *
+from .fpdivsqrt import *
+from .fpmisc import *
+from .expander import *
 
 class MipyfiveCore(Elaboratable):
     # TODO: Starting boot addr, extensions, etc. can be configured here
-    def __init__(self, dataWidth, regCount, pcStart, ISA):
+    # NOTE: bhtEntries=0 disables dynamic branch prediction (static assume not-taken)
+    #       btbEntries=0 disables the Branch Target Buffer (targets are then only known in decode)
+    #       rasDepth=0 disables the Return Address Stack (returns are then resolved in decode)
+    #       Memory ports: a request (PCout - always, DataAddr with DataRE/DataWE) is accepted on a clock edge
+    #       where its ready input is high, its response (instruction/DataIn) is valid in the next cycle where
+    #       the ready input is high (i.e. a synchronous RAM just ties ready high)
+    #       DataByteEn has a bit per byte lane written by a store (DataOut is already shifted into its lane(s)),
+    #       loads read the whole word (the LSU picks the lane)
+    #       RV32M (ISA of RV32IM/RV32IMF) - multiplies take "mulLatency" extra cycles in EX (0 for a single-cycle
+    #       combinational multiplier), divides 2 to 34 cycles (depending on the operands) - see Multiplier/Divider
+    #       RV32F (ISA of RV32IF/RV32IMF) - FLW/FSW and single-cycle operations (FpMisc) go down the pipeline, FMA
+    #       operations issue to a pipelined unit ("fmaLatency" cycles, at least 1) and FDIV/FSQRT to an iterative
+    #       one (28 cycles, one at a time) as they leave EX, and write the FP register file when they complete -
+    #       the hazard unit's scoreboard holds dependent instructions in decode until then
+    #       There is no fcsr - the dynamic rounding mode is RNE and exception flags are not kept
+    #       enableZb adds the Zba/Zbb bit-manipulation instructions (single-cycle, in the ALU) to any ISA
+    #       enableC adds RV32C - PCout is then always word aligned and instructions may start at any halfword, a
+    #       compressed one is expanded (see Expander) in decode, where the next fetch address (pc + 2 or 4) is
+    #       computed - the upper half of the last fetched word is kept, so an instruction straddling two words only
+    #       costs a bubble when it is a jump/branch target (its upper half is fetched after it has been decoded)
+    #       dualIssue adds a second (ALU-only) pipe - "instruction" is then a 64-bit port returning the 8-byte aligned
+    #       pair of words at PCout, and decode issues the instruction at pc along with the next one when they pair:
+    #       the second is an integer register-register/immediate ALU operation (incl. LUI/AUIPC, no multiply/divide),
+    #       does not use or write the first one's destination, and the first is not a jump/branch (or a
+    #       multiply/divide or FDIV/FSQRT - which hold EX) - like RV32C, the next fetch address (pc + 4 or 8) is
+    #       computed in decode, with the upper word of the last fetched pair kept for an unpaired (or misaligned)
+    #       instruction - dualIssue is not available with enableC
+    #       threads (> 1) makes a barrel processor - fetch takes "threads" hardware threads in turn (one instruction
+    #       each), all starting at pcStart with their index in x10/a0 (see RegFile, which has a bank per thread)
+    #       A thread's next instruction is only decoded once its previous one has written back, so there are no
+    #       hazards nor forwarding (the hazard/forwarding units are left out), and its next pc is resolved in decode
+    #       before its next turn (nothing is predicted) - this takes at least 3 threads, and RV32F, enableC,
+    #       dualIssue and branch prediction (BHT/BTB/RAS) are not available with it
+    #       pipelineDepth is 5 (IF ID EX MEM WB), 3 or 7 - RV32F, enableC, dualIssue and threads are only available
+    #       with 5 stages:
+    #       3 - IF, ID/EX/MEM (decode, execute and the data request - ID_EX/EX_MEM are transparent) and WB (load
+    #       data returns) - an instruction's operands were all written back (or are being written through), so
+    #       there are no hazards nor forwarding (the hazard/forwarding units are left out) - a longer critical path
+    #       (instruction/load data to the next data request) for less flops and no stalls
+    #       7 - IF1 (request), IF2 (instruction returns - IF1_IF2), ID (from the registered instruction - IF_ID),
+    #       EX, MEM1 (request - EX_MEM), MEM2 (load data returns, the LSU - MEM_WB) and WB (MEM2_WB) - a redirect
+    #       from decode costs a bubble (a misprediction 2), a load-use 2 stalls, as neither memory's output goes
+    #       further than a register in its cycle
+    #       branchInEx resolves branches and jumps in EX (from the forwarded ALU operands) instead of decode, which
+    #       then only predicts them - taking the regfile/forwarding/compare chain off decode's fetch redirect, for
+    #       a misprediction costing 2 bubbles instead of 1 (a correctly predicted one still costs none) - only with
+    #       5 stages, and not with dualIssue or threads - branches then compare with the ALU's subtractor (its flags,
+    #       see compareTrue) instead of a CompareUnit
+    #       bramRegfile builds the Regfile from two replicated RAMs with a synchronous read (see RegFile), which FPGA
+    #       block RAMs can implement - they are read at the IF2/ID boundary, from the source register fields of the
+    #       instruction entering IF_ID (or of the one held in it) - only with 7 stages (the instruction is only
+    #       known in decode with 3 or 5), i.e. RV32I/M only
+    def __init__(self, dataWidth, regCount, pcStart, ISA, bhtEntries=0, btbEntries=0, btbTagBits=8,
+        rasDepth=0, mulLatency=2, fmaLatency=3, enableZb=False, enableC=False, dualIssue=False, threads=1,
+        pipelineDepth=5, branchInEx=False, bramRegfile=False):
+        if enableC and dualIssue:
+            raise ValueError("dualIssue is not available with enableC")
+        if branchInEx and (pipelineDepth != 5 or dualIssue or threads > 1):
+            raise ValueError("branchInEx is only available with 5 stages, without dualIssue or threads")
+        if bramRegfile and pipelineDepth != 7:
+            raise ValueError("bramRegfile is only available with 7 stages (RV32I/M)")
+        if pipelineDepth not in [3, 5, 7]:
+            raise ValueError("pipelineDepth must be 3, 5 or 7")
+        if pipelineDepth != 5 and (ISA in [CoreISAconfigs.RV32IF.value, CoreISAconfigs.RV32IMF.value] or enableC or
+            dualIssue or threads > 1):
+            raise ValueError("pipelineDepth 3/7 is not available with RV32F, enableC, dualIssue or threads")
+        if threads == 2:
+            raise ValueError("threads must be 1 or at least 3 (a thread's instructions are never forwarded)")
+        if threads > 1 and (ISA in [CoreISAconfigs.RV32IF.value, CoreISAconfigs.RV32IMF.value] or enableC or
+            dualIssue or bhtEntries > 0 or btbEntries > 0 or rasDepth > 0):
+            raise ValueError("threads is not available with RV32F, enableC, dualIssue or branch prediction")
         self.dataWidth      = dataWidth
         self.pcStart        = pcStart
-        self.ISA            = ISA # TODO: Use later when extensions are added/supported
-        self.instruction    = Signal(32)
+        self.ISA            = ISA
+        self.enableM        = ISA in [CoreISAconfigs.RV32IM.value, CoreISAconfigs.RV32IMF.value]
+        self.enableF        = ISA in [CoreISAconfigs.RV32IF.value, CoreISAconfigs.RV32IMF.value]
+        self.enableZb       = enableZb
+        self.enableC        = enableC
+        self.dualIssue      = dualIssue
+        self.threads        = threads
+        self.pipelineDepth  = pipelineDepth
+        self.branchInEx     = branchInEx
+        self.bramRegfile    = bramRegfile
+        # No hazards (nor forwarding) with threads or 3 stages - see above
+        self.interlocked    = threads == 1 and pipelineDepth > 3
+        self.bhtEntries     = bhtEntries
+        self.btbEntries     = btbEntries
+        self.rasDepth       = rasDepth
+        self.instruction    = Signal(64 if dualIssue else 32)
+        self.instructionReady = Signal(reset=1)
         self.DataIn         = Signal(dataWidth)
+        self.DataReady      = Signal(reset=1)
 
         self.PCout          = Signal(32)
         self.DataAddr       = Signal(32)
         self.DataOut        = Signal(dataWidth)
+        self.DataByteEn     = Signal(dataWidth // 8)
         self.DataWE         = Signal()
+        self.DataRE         = Signal()
 
         # --- Core Submodules ---
         self.alu        = ALU(dataWidth)
         self.lsu        = LSU(dataWidth)
         self.immgen     = ImmGen() # TODO: Allow for arbitrary width?
-        self.hazard     = HazardUnit(regCount)
-        self.compare    = CompareUnit(dataWidth)
-        self.forward    = ForwardingUnit(regCount)
-        self.regfile    = RegFile(dataWidth, regCount)
-        self.control    = Controller()
+        if not self.branchInEx:
+            self.compare    = CompareUnit(dataWidth)
+        self.regfile    = RegFile(dataWidth, regCount, dualIssue=dualIssue, threads=threads, syncRead=bramRegfile)
+        if self.interlocked:
+            self.hazard     = HazardUnit(regCount, enableF=self.enableF, dualIssue=dualIssue,
+                pipelineDepth=pipelineDepth)
+            self.forward    = ForwardingUnit(regCount, dualIssue=dualIssue, pipelineDepth=pipelineDepth)
+        self.control    = Controller(enableM=self.enableM, enableF=self.enableF, enableZb=self.enableZb)
+        if self.dualIssue:
+            self.alu1       = ALU(dataWidth)
+            self.immgen1    = ImmGen()
+            self.control1   = Controller(enableM=self.enableM, enableZb=self.enableZb)
+        if self.enableM:
+            self.multiplier = Multiplier(dataWidth, mulLatency)
+            self.divider    = Divider(dataWidth)
+        if self.enableF:
+            self.fpregfile  = FpRegFile(regCount)
+            self.fpMisc     = FpMisc()
+            self.fpFma      = FpFma(fmaLatency, tagWidth=self.regfile.addrBits)
+            self.fpDivSqrt  = FpDivSqrt(tagWidth=self.regfile.addrBits)
+        if self.enableC:
+            self.expander   = Expander()
+        if self.bhtEntries > 0:
+            self.predictor = BranchPredictor(self.bhtEntries, pcLsb=1 if enableC else 2)
+        if self.btbEntries > 0:
+            self.btb = BranchTargetBuffer(self.btbEntries, btbTagBits, pcLsb=1 if enableC else 2)
+        if self.rasDepth > 0:
+            self.ras = ReturnAddressStack(self.rasDepth)
 
         # Create pipeline registers
-        self.IF_ID = PipeReg(pc=self.dataWidth)
-        self.IF_ID_pc = self.IF_ID.doutSlice("pc")
+        # NOTE: RV32F adds its control fields and FP operands (read in decode) to ID_EX, and the FP register file
+        #       write (of FLW and single-cycle operation results) to EX_MEM/MEM_WB
+        #       RV32C adds whether the word after the instruction's was fetched (its upper half is in the next one)
+        #       to IF_ID, and whether it was compressed (its link address is pc + 2) to ID_EX
+        #       Dual-issue adds whether the pair after the instruction's was fetched (the instruction is the buffered
+        #       upper word) to IF_ID, and the second pipe's ID_EX1/EX_MEM1/MEM_WB1 (ALU operations only)
+        #       Threads add the instruction's thread (for its Regfile bank) to all of them
+        #       With 3 stages, ID_EX and EX_MEM are transparent (no registers), with 7 stages IF1_IF2 goes before IF_ID
+        #       (which gets the instruction), and MEM2_WB after MEM_WB (which is then MEM1 -> MEM2)
+        #       Branch resolution in EX adds the instruction's control flow and decode's prediction of it to ID_EX
+        #       Each one's "dataFields" have no reset - they only matter along with the stage's control bits (e.g.
+        #       rdAddr/thread with regWrite), which a flush clears
+        fpFields = dict(
+            fpuOp=ceilLog2(len(FpuOp)),
+            fpUnit=ceilLog2(len(FpUnit)),
+            fpRegWrite=1,
+            fpStore=1,
+            frs1=32,
+            frs2=32,
+            frs3=32,
+            rm=3
+        ) if self.enableF else {}
+        threadFields = dict(thread=ceilLog2(threads)) if self.threads > 1 else {}
+        fpDataFields = ["frs1", "frs2", "frs3"] if self.enableF else []
+        threadDataFields = ["thread"] if self.threads > 1 else []
+        branchFields = dict(
+            branch=1,
+            jump=1,
+            jalr=1,
+            cmpType=ceilLog2(len(CompareTypes)),
+            bhtCounter=2,
+            btbTaken=1,
+            predictReturn=1,
+            predicted=1,
+            predTarget=self.dataWidth
+        ) if self.branchInEx else {}
+        branchDataFields = ["predTarget"] if self.branchInEx else []
+        if self.pipelineDepth > 5:
+            self.IF1_IF2 = PipeReg(
+                valid=1,
+                bhtCounter=2,
+                btbTaken=1,
+                pc=self.dataWidth,
+                dataFields=["pc"]
+            )
+            self.IF1_IF2_valid      = self.IF1_IF2.doutSlice("valid")
+            self.IF1_IF2_bhtCounter = self.IF1_IF2.doutSlice("bhtCounter")
+            self.IF1_IF2_btbTaken   = self.IF1_IF2.doutSlice("btbTaken")
+            self.IF1_IF2_pc         = self.IF1_IF2.doutSlice("pc")
+
+        self.IF_ID = PipeReg(
+            valid=1,
+            bhtCounter=2,
+            btbTaken=1,
+            pc=self.dataWidth,
+            **(dict(nextWord=1) if self.enableC else {}),
+            **(dict(nextBlock=1) if self.dualIssue else {}),
+            **(dict(instruction=32) if self.pipelineDepth > 5 else {}),
+            **threadFields,
+            dataFields=["pc", *(["instruction"] if self.pipelineDepth > 5 else []), *threadDataFields]
+        )
+        self.IF_ID_valid        = self.IF_ID.doutSlice("valid")
+        self.IF_ID_bhtCounter   = self.IF_ID.doutSlice("bhtCounter")
+        self.IF_ID_btbTaken     = self.IF_ID.doutSlice("btbTaken")
+        self.IF_ID_pc           = self.IF_ID.doutSlice("pc")
+        if self.enableC:
+            self.IF_ID_nextWord = self.IF_ID.doutSlice("nextWord")
+        if self.dualIssue:
+            self.IF_ID_nextBlock = self.IF_ID.doutSlice("nextBlock")
+        if self.pipelineDepth > 5:
+            self.IF_ID_instruction = self.IF_ID.doutSlice("instruction")
+        if self.threads > 1:
+            self.IF_ID_thread   = self.IF_ID.doutSlice("thread")
 
         self.ID_EX = PipeReg(
+            transparent=self.pipelineDepth == 3,
+            valid=1,
             aluOp=ceilLog2(len(AluOp)),
             lsuLoadCtrl=ceilLog2(len(LSULoadCtrl)),
             lsuStoreCtrl=ceilLog2(len(LSUStoreCtrl)),
@@ -48,15 +242,22 @@ class MipyfiveCore(Elaboratable):
             memRead=1,
             mem2Reg=1,
             aluAsrc=2,
-            aluBsrc=1,
+            aluBsrc=2,
             rs1=self.dataWidth,
             rs2=self.dataWidth,
             rs1Addr=self.regfile.addrBits,
             rs2Addr=self.regfile.addrBits,
             rdAddr=self.regfile.addrBits,
             imm=self.dataWidth,
-            pc=self.dataWidth
+            pc=self.dataWidth,
+            **fpFields,
+            **(dict(compressed=1) if self.enableC else {}),
+            **branchFields,
+            **threadFields,
+            dataFields=["rs1", "rs2", "rs1Addr", "rs2Addr", "rdAddr", "imm", "pc", *fpDataFields, *branchDataFields,
+                *threadDataFields]
         )
+        self.ID_EX_valid          = self.ID_EX.doutSlice("valid")
         self.ID_EX_aluOp          = self.ID_EX.doutSlice("aluOp")
         self.ID_EX_lsuLoadCtrl    = self.ID_EX.doutSlice("lsuLoadCtrl")
         self.ID_EX_lsuStoreCtrl   = self.ID_EX.doutSlice("lsuStoreCtrl")
@@ -73,126 +274,624 @@ class MipyfiveCore(Elaboratable):
         self.ID_EX_rdAddr         = self.ID_EX.doutSlice("rdAddr")
         self.ID_EX_imm            = self.ID_EX.doutSlice("imm")
         self.ID_EX_pc             = self.ID_EX.doutSlice("pc")
+        if self.enableF:
+            self.ID_EX_fpuOp      = self.ID_EX.doutSlice("fpuOp")
+            self.ID_EX_fpUnit     = self.ID_EX.doutSlice("fpUnit")
+            self.ID_EX_fpRegWrite = self.ID_EX.doutSlice("fpRegWrite")
+            self.ID_EX_fpStore    = self.ID_EX.doutSlice("fpStore")
+            self.ID_EX_frs1       = self.ID_EX.doutSlice("frs1")
+            self.ID_EX_frs2       = self.ID_EX.doutSlice("frs2")
+            self.ID_EX_frs3       = self.ID_EX.doutSlice("frs3")
+            self.ID_EX_rm         = self.ID_EX.doutSlice("rm")
+        if self.enableC:
+            self.ID_EX_compressed = self.ID_EX.doutSlice("compressed")
+        if self.branchInEx:
+            self.ID_EX_branch     = self.ID_EX.doutSlice("branch")
+            self.ID_EX_jump       = self.ID_EX.doutSlice("jump")
+            self.ID_EX_jalr       = self.ID_EX.doutSlice("jalr")
+            self.ID_EX_cmpType    = self.ID_EX.doutSlice("cmpType")
+            self.ID_EX_bhtCounter = self.ID_EX.doutSlice("bhtCounter")
+            self.ID_EX_btbTaken   = self.ID_EX.doutSlice("btbTaken")
+            self.ID_EX_predictReturn = self.ID_EX.doutSlice("predictReturn")
+            self.ID_EX_predicted  = self.ID_EX.doutSlice("predicted")
+            self.ID_EX_predTarget = self.ID_EX.doutSlice("predTarget")
+        if self.threads > 1:
+            self.ID_EX_thread     = self.ID_EX.doutSlice("thread")
 
         self.EX_MEM = PipeReg(
+            transparent=self.pipelineDepth == 3,
+            valid=1,
             lsuLoadCtrl=ceilLog2(len(LSULoadCtrl)),
             lsuStoreCtrl=ceilLog2(len(LSUStoreCtrl)),
             regWrite=1,
             mem2Reg=1,
             memWrite=1,
+            memRead=1,
             aluOut=self.dataWidth,
             writeData=self.dataWidth,
-            rdAddr=self.regfile.addrBits
+            rdAddr=self.regfile.addrBits,
+            **(dict(fpRegWrite=1) if self.enableF else {}),
+            **threadFields,
+            dataFields=["aluOut", "writeData", "rdAddr", *threadDataFields]
         )
+        self.EX_MEM_valid          = self.EX_MEM.doutSlice("valid")
         self.EX_MEM_lsuLoadCtrl    = self.EX_MEM.doutSlice("lsuLoadCtrl")
         self.EX_MEM_lsuStoreCtrl   = self.EX_MEM.doutSlice("lsuStoreCtrl")
         self.EX_MEM_regWrite       = self.EX_MEM.doutSlice("regWrite")
         self.EX_MEM_mem2Reg        = self.EX_MEM.doutSlice("mem2Reg")
         self.EX_MEM_memWrite       = self.EX_MEM.doutSlice("memWrite")
+        self.EX_MEM_memRead        = self.EX_MEM.doutSlice("memRead")
         self.EX_MEM_aluOut         = self.EX_MEM.doutSlice("aluOut")
         self.EX_MEM_writeData      = self.EX_MEM.doutSlice("writeData")
         self.EX_MEM_rdAddr         = self.EX_MEM.doutSlice("rdAddr")
+        if self.enableF:
+            self.EX_MEM_fpRegWrite = self.EX_MEM.doutSlice("fpRegWrite")
+        if self.threads > 1:
+            self.EX_MEM_thread     = self.EX_MEM.doutSlice("thread")
 
         self.MEM_WB = PipeReg(
+            valid=1,
             lsuLoadCtrl=ceilLog2(len(LSULoadCtrl)),
             regWrite=1,
             mem2Reg=1,
             aluOut=self.dataWidth,
-            rdAddr=self.regfile.addrBits
+            rdAddr=self.regfile.addrBits,
+            **(dict(fpRegWrite=1) if self.enableF else {}),
+            **threadFields,
+            dataFields=["aluOut", "rdAddr", *threadDataFields]
         )
+        self.MEM_WB_valid       = self.MEM_WB.doutSlice("valid")
         self.MEM_WB_lsuLoadCtrl = self.MEM_WB.doutSlice("lsuLoadCtrl")
         self.MEM_WB_regWrite    = self.MEM_WB.doutSlice("regWrite")
         self.MEM_WB_mem2Reg     = self.MEM_WB.doutSlice("mem2Reg")
         self.MEM_WB_aluOut      = self.MEM_WB.doutSlice("aluOut")
         self.MEM_WB_rdAddr      = self.MEM_WB.doutSlice("rdAddr")
+        if self.enableF:
+            self.MEM_WB_fpRegWrite = self.MEM_WB.doutSlice("fpRegWrite")
+        if self.threads > 1:
+            self.MEM_WB_thread     = self.MEM_WB.doutSlice("thread")
+
+        if self.pipelineDepth > 5:
+            self.MEM2_WB = PipeReg(
+                valid=1,
+                regWrite=1,
+                rdAddr=self.regfile.addrBits,
+                data=self.dataWidth,
+                dataFields=["rdAddr", "data"]
+            )
+            self.MEM2_WB_valid      = self.MEM2_WB.doutSlice("valid")
+            self.MEM2_WB_regWrite   = self.MEM2_WB.doutSlice("regWrite")
+            self.MEM2_WB_rdAddr     = self.MEM2_WB.doutSlice("rdAddr")
+            self.MEM2_WB_data       = self.MEM2_WB.doutSlice("data")
+
+        if self.dualIssue:
+            self.ID_EX1 = PipeReg(
+                valid=1,
+                aluOp=ceilLog2(len(AluOp)),
+                regWrite=1,
+                aluAsrc=2,
+                aluBsrc=2,
+                rs1=self.dataWidth,
+                rs2=self.dataWidth,
+                rs1Addr=self.regfile.addrBits,
+                rs2Addr=self.regfile.addrBits,
+                rdAddr=self.regfile.addrBits,
+                imm=self.dataWidth,
+                pc=self.dataWidth,
+                dataFields=["rs1", "rs2", "rs1Addr", "rs2Addr", "rdAddr", "imm", "pc"]
+            )
+            self.ID_EX1_valid       = self.ID_EX1.doutSlice("valid")
+            self.ID_EX1_aluOp       = self.ID_EX1.doutSlice("aluOp")
+            self.ID_EX1_regWrite    = self.ID_EX1.doutSlice("regWrite")
+            self.ID_EX1_aluAsrc     = self.ID_EX1.doutSlice("aluAsrc")
+            self.ID_EX1_aluBsrc     = self.ID_EX1.doutSlice("aluBsrc")
+            self.ID_EX1_rs1         = self.ID_EX1.doutSlice("rs1")
+            self.ID_EX1_rs2         = self.ID_EX1.doutSlice("rs2")
+            self.ID_EX1_rs1Addr     = self.ID_EX1.doutSlice("rs1Addr")
+            self.ID_EX1_rs2Addr     = self.ID_EX1.doutSlice("rs2Addr")
+            self.ID_EX1_rdAddr      = self.ID_EX1.doutSlice("rdAddr")
+            self.ID_EX1_imm         = self.ID_EX1.doutSlice("imm")
+            self.ID_EX1_pc          = self.ID_EX1.doutSlice("pc")
+
+            self.EX_MEM1 = PipeReg(
+                valid=1,
+                regWrite=1,
+                aluOut=self.dataWidth,
+                rdAddr=self.regfile.addrBits,
+                dataFields=["aluOut", "rdAddr"]
+            )
+            self.EX_MEM1_valid      = self.EX_MEM1.doutSlice("valid")
+            self.EX_MEM1_regWrite   = self.EX_MEM1.doutSlice("regWrite")
+            self.EX_MEM1_aluOut     = self.EX_MEM1.doutSlice("aluOut")
+            self.EX_MEM1_rdAddr     = self.EX_MEM1.doutSlice("rdAddr")
+
+            self.MEM_WB1 = PipeReg(
+                valid=1,
+                regWrite=1,
+                aluOut=self.dataWidth,
+                rdAddr=self.regfile.addrBits,
+                dataFields=["aluOut", "rdAddr"]
+            )
+            self.MEM_WB1_valid      = self.MEM_WB1.doutSlice("valid")
+            self.MEM_WB1_regWrite   = self.MEM_WB1.doutSlice("regWrite")
+            self.MEM_WB1_aluOut     = self.MEM_WB1.doutSlice("aluOut")
+            self.MEM_WB1_rdAddr     = self.MEM_WB1.doutSlice("rdAddr")
 
     def elaborate(self, platform):
         m = Module()
 
         PC          = Signal(32, reset=self.pcStart)
+        fetchPc     = Signal(32)
+        fetchAddr   = Signal(32)
+        instruction = Signal(32)
+        decodeValid = Signal()
+        instrLength = Signal(3)
+        issueLength = Signal(4)
+        bhtCounter  = Signal(2)
+        btbTaken    = Signal()
+        btbTarget   = Signal(32)
+        pcRelTarget = Signal(32)
+        jalrTarget  = Signal(32)
+        rasTop      = Signal(32)
+        predTarget  = Signal(32)
+        takenTarget = Signal(32)
         mem2RegWire = Signal(self.dataWidth)
         aluAin      = Signal(self.dataWidth)
         fwdAluAin   = Signal(self.dataWidth)
         aluBin      = Signal(self.dataWidth)
         fwdAluBin   = Signal(self.dataWidth)
+        loadHold    = Signal(self.dataWidth)
+        loadHeld    = Signal()
+        exOut       = Signal(self.dataWidth)
+        mulDivStall = Signal()
+        fpStall     = Signal()
+        exStall     = Signal()
+        exData      = Signal(self.dataWidth)
 
         # Instantiate Submodules
         m.submodules.alu        = self.alu
         m.submodules.lsu        = self.lsu
         m.submodules.immgen     = self.immgen
-        m.submodules.hazard     = self.hazard
-        m.submodules.compare    = self.compare
-        m.submodules.forward    = self.forward
+        if not self.branchInEx:
+            m.submodules.compare    = self.compare
         m.submodules.regfile    = self.regfile
+        if self.interlocked:
+            m.submodules.hazard     = self.hazard
+            m.submodules.forward    = self.forward
         m.submodules.control    = self.control
+        if self.bhtEntries > 0:
+            m.submodules.predictor = self.predictor
+        if self.btbEntries > 0:
+            m.submodules.btb = self.btb
+        if self.rasDepth > 0:
+            m.submodules.ras = self.ras
+        if self.enableM:
+            m.submodules.multiplier = self.multiplier
+            m.submodules.divider    = self.divider
+        if self.enableF:
+            m.submodules.fpregfile  = self.fpregfile
+            m.submodules.fpMisc     = self.fpMisc
+            m.submodules.fpFma      = self.fpFma
+            m.submodules.fpDivSqrt  = self.fpDivSqrt
+        if self.enableC:
+            m.submodules.expander   = self.expander
+        if self.dualIssue:
+            m.submodules.alu1       = self.alu1
+            m.submodules.immgen1    = self.immgen1
+            m.submodules.control1   = self.control1
+        if self.pipelineDepth > 5:
+            m.submodules.IF1_IF2    = self.IF1_IF2
         m.submodules.IF_ID      = self.IF_ID
         m.submodules.ID_EX      = self.ID_EX
         m.submodules.EX_MEM     = self.EX_MEM
         m.submodules.MEM_WB     = self.MEM_WB
+        if self.pipelineDepth > 5:
+            m.submodules.MEM2_WB    = self.MEM2_WB
+        if self.dualIssue:
+            m.submodules.ID_EX1     = self.ID_EX1
+            m.submodules.EX_MEM1    = self.EX_MEM1
+            m.submodules.MEM_WB1    = self.MEM_WB1
+
+        rs1Addr = instruction[15:20]
+        rs2Addr = instruction[20:25]
+        rdAddr  = instruction[7:12]
+        # Unused source fields (immediate bits, etc.) are seen as x0 - which never hazards/forwards
+        rs1Used = Mux(self.control.usesRs1, rs1Addr, 0)
+        rs2Used = Mux(self.control.usesRs2, rs2Addr, 0)
 
         # Internal logic
-        takeBranch = self.control.branch & self.compare.isTrue
+        # NOTE: A squashed (invalid) IF_ID slot is decoded as a bubble
+        #       The whole pipeline freezes while either memory port is not ready (cache miss, wait states) -
+        #       nothing is updated, so the same requests are presented again once they are
+        #       Fetch/decode also hold on a hazard stall (a bubble is inserted into ID_EX instead)
+        #       Fetch/decode/execute hold while a multiply/divide is in EX, or an FDIV/FSQRT waits there for the
+        #       divide/square root unit (bubbles are inserted into EX_MEM)
+        #       With RV32C, a valid IF_ID slot holding only the lower half of an instruction is decoded as a bubble
+        #       With threads, nothing stalls decode (there are no hazards) and nothing is mispredicted
+        #       With 3 stages, nothing stalls decode either (but EX holds it - there is no ID_EX register)
+        #       With branchInEx, branches/JALR never wait in decode for their operands (they are forwarded in EX)
+        freeze          = ~self.instructionReady | ~self.DataReady
+        stall           = self.hazard.IF_stall & decodeValid if self.interlocked else C(0)
+        flush           = self.hazard.ID_EX_flush if self.interlocked else C(0)
+        hold            = stall | freeze | exStall
+        isBranch        = self.control.branch & decodeValid
+        isJal           = self.control.jal & decodeValid
+        isJalr          = self.control.jalr & decodeValid
+        predictTaken    = isBranch & self.IF_ID_bhtCounter[1]
+
+        # RAS push/pop hints - x1/x5 are the link registers (see RISC-V spec JALR hint table)
+        rdLink          = (rdAddr == 1) | (rdAddr == 5)
+        rs1Link         = (rs1Addr == 1) | (rs1Addr == 5)
+        rasPush         = (isJal | isJalr) & rdLink
+        rasPop          = isJalr & rs1Link & ~(rdLink & (rdAddr == rs1Addr))
+        predictReturn   = rasPop if self.rasDepth > 0 else C(0)
+
+        # Fetch already redirected this instruction's successor (BTB hit) - verify direction and target
+        # Otherwise, decode redirects fetch itself on a predicted-taken branch, a predicted return or
+        # a JAL (pre-decoded from the returned instruction word - zero bubbles as its target is PC-relative)
+        btbRedirected   = decodeValid & self.IF_ID_btbTaken
+        decodeRedirect  = ~btbRedirected & (predictTaken | isJal | predictReturn)
+        predictedTaken  = btbRedirected | decodeRedirect
+
+        # Resolve the instruction in decode - or with branchInEx, the one in EX against decode's prediction of it
+        # (kept in ID_EX) as it moves on, the instruction in decode is then squashed on a misprediction as well
+        if self.branchInEx:
+            resolveEn           = ~freeze & ~exStall
+            resolvePc           = self.ID_EX_pc
+            resolveLength       = Mux(self.ID_EX_compressed, 2, 4) if self.enableC else C(4)
+            resolveBranch       = self.ID_EX_branch
+            resolveJump         = self.ID_EX_jump
+            resolveCounter      = self.ID_EX_bhtCounter
+            resolveBtbTaken     = self.ID_EX_btbTaken
+            resolveReturn       = self.ID_EX_predictReturn
+            resolvePredicted    = self.ID_EX_predicted
+            # NOTE: A JALR's target is checked without its adder's carry chain - (rs1 + imm)[1:] is the predicted
+            #       target iff each bit's sum matches it with the carry the bit below produces when that one does
+            pcRelTargetEx       = Signal(32)
+            jalrCarry           = Cat(fwdAluAin[0] & self.ID_EX_imm[0], (fwdAluAin & self.ID_EX_imm |
+                (fwdAluAin ^ self.ID_EX_imm) & ~self.ID_EX_predTarget)[1:31])
+            targetMiss          = Mux(self.ID_EX_jalr,
+                (fwdAluAin ^ self.ID_EX_imm ^ self.ID_EX_predTarget)[1:32] != jalrCarry,
+                pcRelTargetEx != self.ID_EX_predTarget)
+        else:
+            resolveEn           = ~hold
+            resolvePc           = self.IF_ID_pc
+            resolveLength       = issueLength
+            resolveBranch       = isBranch
+            resolveJump         = isJal | isJalr
+            resolveCounter      = self.IF_ID_bhtCounter
+            resolveBtbTaken     = btbRedirected
+            resolveReturn       = predictReturn
+            resolvePredicted    = predictedTaken
+            targetMiss          = predTarget != takenTarget
+        branchTrue      = compareTrue(self.ID_EX_cmpType, self.alu.isEqual, self.alu.isLess, self.alu.isLessU) \
+            if self.branchInEx else self.compare.isTrue
+        takeBranch      = resolveBranch & branchTrue
+        taken           = takeBranch | resolveJump
+        mispredict      = resolveEn & ((taken != resolvePredicted) | (taken & targetMiss)) \
+            if self.threads == 1 else C(0)
+        squashDecode    = mispredict if self.branchInEx else C(0)
+
+        m.d.comb += pcRelTarget.eq(self.IF_ID_pc + self.immgen.imm)
+        if self.branchInEx:
+            m.d.comb += [
+                pcRelTargetEx.eq(self.ID_EX_pc + self.ID_EX_imm),
+                takenTarget.eq(Mux(self.ID_EX_jalr, jalrTarget, pcRelTargetEx))
+            ]
+        else:
+            m.d.comb += takenTarget.eq(Mux(isJalr, jalrTarget, pcRelTarget))
+        # NOTE: With 7 stages, the successor fetched after a BTB hit is in IF2 (one more redirected from decode is
+        #       squashed there)
+        with m.If(btbRedirected):
+            m.d.comb += predTarget.eq(self.IF1_IF2_pc if self.pipelineDepth > 5 else PC)
+        with m.Elif(predictReturn):
+            m.d.comb += predTarget.eq(rasTop)
+        with m.Else():
+            m.d.comb += predTarget.eq(pcRelTarget)
 
         # Hazard and Forwarding setup/logic
-        m.d.comb += [
-            # Hazard
-            self.hazard.ID_EX_memRead.eq(self.ID_EX_memRead),
-            self.hazard.Branch.eq(self.control.branch),
-            self.hazard.EX_MEM_memToReg.eq(self.EX_MEM_mem2Reg),
-            self.hazard.ID_EX_regWrite.eq(self.ID_EX_regWrite),
-            self.hazard.ID_EX_rd.eq(self.ID_EX_rdAddr),
-            self.hazard.EX_MEM_rd.eq(self.EX_MEM_rdAddr),
-            self.hazard.IF_ID_rs1.eq(self.instruction[15:20]),
-            self.hazard.IF_ID_rs2.eq(self.instruction[20:25]),
-            # Forward
-            self.forward.IF_ID_rs1.eq(self.instruction[15:20]),
-            self.forward.ID_EX_rs1.eq(self.ID_EX_rs1Addr),
-            self.forward.IF_ID_rs2.eq(self.instruction[20:25]),
-            self.forward.ID_EX_rs2.eq(self.ID_EX_rs2Addr),
-            self.forward.EX_MEM_rd.eq(self.EX_MEM_rdAddr),
-            self.forward.MEM_WB_rd.eq(self.MEM_WB_rdAddr),
-            self.forward.EX_MEM_reg_write.eq(self.EX_MEM_regWrite),
-            self.forward.MEM_WB_reg_write.eq(self.MEM_WB_regWrite)
-        ]
+        if self.interlocked:
+            m.d.comb += [
+                # Hazard
+                self.hazard.ID_EX_memRead.eq(self.ID_EX_memRead),
+                self.hazard.Branch.eq(isBranch | isJalr if not self.branchInEx else C(0)),
+                self.hazard.EX_MEM_memToReg.eq(self.EX_MEM_memRead),
+                self.hazard.ID_EX_regWrite.eq(self.ID_EX_regWrite),
+                self.hazard.ID_EX_rd.eq(self.ID_EX_rdAddr),
+                self.hazard.EX_MEM_rd.eq(self.EX_MEM_rdAddr),
+                self.hazard.IF_ID_rs1.eq(rs1Used),
+                self.hazard.IF_ID_rs2.eq(rs2Used),
+                # Forward
+                self.forward.IF_ID_rs1.eq(rs1Used),
+                self.forward.ID_EX_rs1.eq(self.ID_EX_rs1Addr),
+                self.forward.IF_ID_rs2.eq(rs2Used),
+                self.forward.ID_EX_rs2.eq(self.ID_EX_rs2Addr),
+                self.forward.EX_MEM_rd.eq(self.EX_MEM_rdAddr),
+                self.forward.MEM_WB_rd.eq(self.MEM_WB_rdAddr),
+                self.forward.EX_MEM_reg_write.eq(self.EX_MEM_regWrite),
+                self.forward.MEM_WB_reg_write.eq(self.MEM_WB_regWrite),
+                self.forward.MEM_WB_mem_read.eq(self.MEM_WB_mem2Reg == Mem2RegCtrl.FROM_MEM.value)
+            ]
+        if self.interlocked and self.pipelineDepth > 5:
+            m.d.comb += [
+                # Hazard
+                self.hazard.MEM_WB_memToReg.eq(self.MEM_WB_mem2Reg == Mem2RegCtrl.FROM_MEM.value),
+                self.hazard.MEM_WB_rd.eq(self.MEM_WB_rdAddr),
+                # Forward
+                self.forward.MEM2_WB_rd.eq(self.MEM2_WB_rdAddr),
+                self.forward.MEM2_WB_reg_write.eq(self.MEM2_WB_regWrite)
+            ]
+
+        # Dual-issue pairing - the instruction after the one at pc (IF_ID1, the second issue slot) goes down the
+        # second pipe in the same cycle if it is an ALU operation independent of the first one
+        # NOTE: A second slot instruction using a load still in EX is not paired (it issues next, on its own - the
+        #       hazard unit's load-use stall if it still has to wait then)
+        if self.dualIssue:
+            instruction1    = Signal(32)
+            slot1Valid      = Signal()
+            pairIssue       = Signal()
+            rs1Addr1        = instruction1[15:20]
+            rs2Addr1        = instruction1[20:25]
+            rdAddr1         = instruction1[7:12]
+            rs1Used1        = Mux(self.control1.usesRs1, rs1Addr1, 0)
+            rs2Used1        = Mux(self.control1.usesRs2, rs2Addr1, 0)
+            opcode1         = instruction1[0:7]
+            isMulDiv        = lambda aluOp: (aluOp >= AluOp.MUL.value) & (aluOp <= AluOp.REMU.value) \
+                if self.enableM else C(0)
+            aluOnly1        = ((opcode1 == Rv32iTypes.R.value) | (opcode1 == Rv32iTypes.I_Arith.value) |
+                (opcode1 == Rv32iTypes.U_Load.value) | (opcode1 == Rv32iTypes.U_Add.value)) & \
+                ~isMulDiv(self.control1.aluOp)
+            holdsEx         = isMulDiv(self.control.aluOp) | \
+                (self.control.fpUnit == FpUnit.DIVSQRT.value if self.enableF else C(0))
+            writesRd        = self.control.regWrite & (rdAddr != 0)
+            dependent       = writesRd & ((rdAddr == rs1Used1) | (rdAddr == rs2Used1) |
+                self.control1.regWrite & (rdAddr == rdAddr1))
+            m.d.comb += [
+                pairIssue.eq(decodeValid & slot1Valid & aluOnly1 & ~(self.control.branch | self.control.jal |
+                    self.control.jalr) & ~holdsEx & ~dependent & ~self.hazard.pairStall),
+                issueLength.eq(Mux(pairIssue, 8, 4)),
+                # Hazard
+                self.hazard.ID_EX1_regWrite.eq(self.ID_EX1_regWrite),
+                self.hazard.ID_EX1_rd.eq(self.ID_EX1_rdAddr),
+                self.hazard.IF_ID1_rs1.eq(rs1Used1),
+                self.hazard.IF_ID1_rs2.eq(rs2Used1),
+                # Forward
+                self.forward.ID_EX1_rs1.eq(self.ID_EX1_rs1Addr),
+                self.forward.ID_EX1_rs2.eq(self.ID_EX1_rs2Addr),
+                self.forward.EX_MEM1_rd.eq(self.EX_MEM1_rdAddr),
+                self.forward.MEM_WB1_rd.eq(self.MEM_WB1_rdAddr),
+                self.forward.EX_MEM1_reg_write.eq(self.EX_MEM1_regWrite),
+                self.forward.MEM_WB1_reg_write.eq(self.MEM_WB1_regWrite)
+            ]
+        else:
+            m.d.comb += issueLength.eq(instrLength)
 
         # -------------
         # --- Fetch ---
         # -------------
+        # Re-fetch the held instruction on a stall/freeze, redirect on a prediction made in decode
+        # NOTE: With RV32C (or dual-issue), the sequential fetch address is only known in decode (pc + the decoded
+        #       instruction's length, or the number of instructions issued) - PC is used after a redirect or a squash
+        #       (e.g. a BTB hit, a misprediction)
+        #       With threads, fetch takes them in turn - each one's pc is updated by decode (before its next turn)
+        #       With 7 stages, the held fetch is the one in IF2 (decode has its instruction registered in IF_ID)
+        if self.threads > 1:
+            threadPc    = Array(Signal(32, reset=self.pcStart, name=f"threadPc{i}") for i in range(self.threads))
+            fetchThread = Signal(ceilLog2(self.threads))
+            with m.If(hold & self.IF_ID_valid):
+                m.d.comb += fetchPc.eq(self.IF_ID_pc)
+            with m.Else():
+                m.d.comb += fetchPc.eq(threadPc[fetchThread])
+        else:
+            heldValid, heldPc = (self.IF1_IF2_valid, self.IF1_IF2_pc) if self.pipelineDepth > 5 else \
+                (self.IF_ID_valid, self.IF_ID_pc)
+            with m.If(hold & heldValid):
+                m.d.comb += fetchPc.eq(heldPc)
+            with m.Elif(decodeRedirect):
+                m.d.comb += fetchPc.eq(predTarget)
+            if self.enableC or self.dualIssue:
+                with m.Elif(self.IF_ID_valid & ~btbRedirected):
+                    m.d.comb += fetchPc.eq(self.IF_ID_pc + Mux(decodeValid, issueLength, 0))
+            with m.Else():
+                m.d.comb += fetchPc.eq(PC)
+
+        # RV32C fetch realignment - an instruction in the upper half of the word in decode gets its lower half from
+        # "halfBuf" (that word's upper half), so the next word is fetched for its upper half (if it has one)
+        # NOTE: Fetching a compressed instruction's word again is left to the memory (or fetch master) to serve
+        if self.enableC:
+            halfBuf     = Signal(16)
+            nextWord    = Signal()
+            decodeWord  = Signal(30)
+            lowHalf     = Signal(16)
+            highHalf    = Signal(16)
+            compressed  = Signal()
+            straddle    = Signal()
+            m.d.comb += [
+                decodeWord.eq(self.IF_ID_pc[2:] + self.IF_ID_nextWord),
+                nextWord.eq(Mux(hold & self.IF_ID_valid, self.IF_ID_nextWord,
+                    self.IF_ID_valid & fetchPc[1] & (fetchPc[2:] == decodeWord))),
+                fetchAddr.eq(Cat(C(0, 2), fetchPc[2:] + nextWord)),
+                # Decode - the instruction at IF_ID_pc (the upper half of a straddling one is missing without
+                # "nextWord", it is then fetched again along with the next word)
+                lowHalf.eq(Mux(self.IF_ID_nextWord, halfBuf,
+                    Mux(self.IF_ID_pc[1], self.instruction[16:32], self.instruction[0:16]))),
+                highHalf.eq(Mux(self.IF_ID_nextWord, self.instruction[0:16], self.instruction[16:32])),
+                compressed.eq(lowHalf[0:2] != 0b11),
+                straddle.eq(self.IF_ID_pc[1] & ~self.IF_ID_nextWord & ~compressed),
+                self.expander.instruction.eq(lowHalf),
+                instruction.eq(Mux(compressed, self.expander.out, Cat(lowHalf, highHalf))),
+                decodeValid.eq(self.IF_ID_valid & ~straddle),
+                instrLength.eq(Mux(compressed, 2, 4))
+            ]
+            with m.If(~hold):
+                m.d.sync += halfBuf.eq(self.instruction[16:32])
+        # Dual-issue fetch realignment - the same, a word at a time: an instruction in the upper word of the pair in
+        # decode (e.g. the second one, when not paired) gets "wordBuf" (that pair's upper word) as its own, so the
+        # next pair is fetched for its successor - only a jump/branch to an upper word has no second slot
+        elif self.dualIssue:
+            wordBuf     = Signal(32)
+            nextBlock   = Signal()
+            decodeBlock = Signal(29)
+            m.d.comb += [
+                decodeBlock.eq(self.IF_ID_pc[3:] + self.IF_ID_nextBlock),
+                nextBlock.eq(Mux(hold & self.IF_ID_valid, self.IF_ID_nextBlock,
+                    self.IF_ID_valid & fetchPc[2] & (fetchPc[3:] == decodeBlock))),
+                fetchAddr.eq(Cat(C(0, 3), fetchPc[3:] + nextBlock)),
+                instruction.eq(Mux(self.IF_ID_nextBlock, wordBuf,
+                    Mux(self.IF_ID_pc[2], self.instruction[32:64], self.instruction[0:32]))),
+                instruction1.eq(Mux(self.IF_ID_nextBlock, self.instruction[0:32], self.instruction[32:64])),
+                slot1Valid.eq(self.IF_ID_nextBlock | ~self.IF_ID_pc[2]),
+                decodeValid.eq(self.IF_ID_valid),
+                instrLength.eq(4)
+            ]
+            with m.If(~hold):
+                m.d.sync += wordBuf.eq(self.instruction[32:64])
+        else:
+            m.d.comb += [
+                fetchAddr.eq(fetchPc),
+                instruction.eq(self.IF_ID_instruction if self.pipelineDepth > 5 else self.instruction),
+                decodeValid.eq(self.IF_ID_valid),
+                instrLength.eq(4)
+            ]
+
+        if self.bhtEntries > 0:
+            m.d.comb += [
+                self.predictor.fetchPc.eq(fetchPc),
+                self.predictor.updatePc.eq(resolvePc),
+                self.predictor.updateEnable.eq(resolveBranch & resolveEn),
+                self.predictor.updateCounter.eq(resolveCounter),
+                self.predictor.updateTaken.eq(takeBranch),
+                bhtCounter.eq(self.predictor.counter)
+            ]
+        else:
+            m.d.comb += bhtCounter.eq(BhtState.WEAK_NOT_TAKEN.value)
+
+        # BTB hits redirect the next fetch (direction from the BHT when present)
+        # NOTE: Without a BHT, the BTB acts as the predictor (not-taken branches are evicted)
+        #       Taken branches and jumps fill the BTB - except for returns when the RAS predicts them
+        if self.btbEntries > 0:
+            m.d.comb += [
+                self.btb.fetchPc.eq(fetchPc),
+                self.btb.updatePc.eq(resolvePc),
+                self.btb.updateTarget.eq(takenTarget),
+                self.btb.updateEnable.eq(taken & ~resolveReturn & resolveEn),
+                self.btb.invalidate.eq(resolveBtbTaken & ~taken & resolveEn &
+                    (~resolveBranch if self.bhtEntries > 0 else C(1))),
+                btbTaken.eq(self.btb.hit & (bhtCounter[1] if self.bhtEntries > 0 else C(1))),
+                btbTarget.eq(self.btb.target)
+            ]
+        else:
+            m.d.comb += [
+                btbTaken.eq(0),
+                btbTarget.eq(0)
+            ]
+
+        # RAS is updated in decode, where control flow is already resolved (never speculative)
+        # NOTE: With branchInEx, only the instruction in EX is not resolved yet - decode's update is dropped when it
+        #       mispredicts
+        if self.rasDepth > 0:
+            m.d.comb += [
+                self.ras.push.eq(rasPush & ~hold & ~squashDecode),
+                self.ras.pop.eq(rasPop & ~hold & ~squashDecode),
+                self.ras.pushAddr.eq(self.IF_ID_pc + instrLength),
+                rasTop.eq(self.ras.top)
+            ]
+        else:
+            m.d.comb += rasTop.eq(0)
+
+        # With 7 stages, a redirect from decode also squashes the sequential fetch already in IF2
+        if self.pipelineDepth > 5:
+            m.d.comb += [
+                # Pipereg
+                self.IF1_IF2.rst.eq(mispredict),
+                self.IF1_IF2.en.eq(~hold),
+                self.IF1_IF2.din.eq(
+                    Cat(
+                        C(1),
+                        bhtCounter,
+                        btbTaken,
+                        fetchPc
+                    )
+                )
+            ]
+            fetched = [self.IF1_IF2_valid, self.IF1_IF2_bhtCounter, self.IF1_IF2_btbTaken, self.IF1_IF2_pc]
+        else:
+            fetched = [C(1), bhtCounter, btbTaken, fetchPc]
         m.d.comb += [
             # Pipereg
-            self.IF_ID.rst.eq(takeBranch),
-            self.IF_ID.en.eq(~self.hazard.IF_ID_stall),
-            self.IF_ID.din.eq(PC),
+            self.IF_ID.rst.eq(mispredict | decodeRedirect & ~hold if self.pipelineDepth > 5 else mispredict),
+            self.IF_ID.en.eq(~hold),
+            self.IF_ID.din.eq(
+                Cat(
+                    *fetched,
+                    *([nextWord] if self.enableC else []),
+                    *([nextBlock] if self.dualIssue else []),
+                    *([self.instruction] if self.pipelineDepth > 5 else []),
+                    *([fetchThread] if self.threads > 1 else [])
+                )
+            ),
             # PCout
-            self.PCout.eq(PC)
+            self.PCout.eq(fetchAddr)
         ]
-        with m.If(takeBranch):
-            m.d.sync += PC.eq(self.IF_ID_pc + (self.immgen.imm << 1))
-        with m.Elif(self.hazard.IF_stall):
-            m.d.sync += PC.eq(PC)
-        with m.Else():
-            m.d.sync += PC.eq(PC + 4)
+        # Mispredictions are corrected from decode (the wrong-path fetch is squashed in IF_ID)
+        # NOTE: With branchInEx, from EX (the instruction in decode is squashed too - see ID_EX)
+        # NOTE: With threads, decode sets its thread's next pc instead (there is no wrong path)
+        if self.threads > 1:
+            with m.If(~hold):
+                m.d.sync += fetchThread.eq(Mux(fetchThread == self.threads - 1, 0, fetchThread + 1))
+                with m.If(decodeValid):
+                    m.d.sync += threadPc[self.IF_ID_thread].eq(Mux(taken, takenTarget, self.IF_ID_pc + 4))
+        else:
+            with m.If(mispredict & taken):
+                m.d.sync += PC.eq(takenTarget)
+            with m.Elif(mispredict):
+                m.d.sync += PC.eq(resolvePc + resolveLength)
+            with m.Elif(hold):
+                m.d.sync += PC.eq(PC)
+            with m.Elif(btbTaken):
+                m.d.sync += PC.eq(btbTarget)
+            with m.Else():
+                m.d.sync += PC.eq(fetchPc + 4)
 
         # --------------
         # --- Decode ---
         # --------------
-        rs1Data = Mux(self.forward.fwdRegfileAout, self.EX_MEM_aluOut, self.regfile.rs1Data)
-        rs2Data = Mux(self.forward.fwdRegfileBout, self.EX_MEM_aluOut, self.regfile.rs2Data)
-
-        rs1Addr = self.instruction[15:20]
-        rs2Addr = self.instruction[20:25]
-        rdAddr  = self.instruction[7:12]
+        # NOTE: MEM/WB results (incl. load data) come through the Regfile write-through bypass
+        #       The second slot's operands need no forwarding here - EX forwards all results they could miss
+        #       With threads, a thread's previous instruction has always written back
+        #       With 3 stages, the previous instruction is in WB (written through), with 7 stages MEM2/WB results are
+        #       written through instead and MEM/WB ALU results are forwarded
+        if not self.interlocked:
+            rs1Data = self.regfile.rs1Data
+            rs2Data = self.regfile.rs2Data
+        elif self.dualIssue:
+            rs1Data = Mux(self.forward.fwdRegfileAout == RegfileOutForwardCtrl.EX_MEM1.value, self.EX_MEM1_aluOut,
+                Mux(self.forward.fwdRegfileAout[0], self.EX_MEM_aluOut, self.regfile.rs1Data))
+            rs2Data = Mux(self.forward.fwdRegfileBout == RegfileOutForwardCtrl.EX_MEM1.value, self.EX_MEM1_aluOut,
+                Mux(self.forward.fwdRegfileBout[0], self.EX_MEM_aluOut, self.regfile.rs2Data))
+        elif self.pipelineDepth > 5:
+            rs1Data = Mux(self.forward.fwdRegfileAout == RegfileOutForwardCtrl.MEM_WB.value, self.MEM_WB_aluOut,
+                Mux(self.forward.fwdRegfileAout[0], self.EX_MEM_aluOut, self.regfile.rs1Data))
+            rs2Data = Mux(self.forward.fwdRegfileBout == RegfileOutForwardCtrl.MEM_WB.value, self.MEM_WB_aluOut,
+                Mux(self.forward.fwdRegfileBout[0], self.EX_MEM_aluOut, self.regfile.rs2Data))
+        else:
+            rs1Data = Mux(self.forward.fwdRegfileAout, self.EX_MEM_aluOut, self.regfile.rs1Data)
+            rs2Data = Mux(self.forward.fwdRegfileBout, self.EX_MEM_aluOut, self.regfile.rs2Data)
 
+        # NOTE: Writes to x0 are dropped here (i.e. "jalr x0, ..." returns)
+        #       A transparent ID_EX (3 stages) just passes a squashed slot on as a bubble - EX holds decode itself
         m.d.comb += [
             # Pipereg
-            self.ID_EX.rst.eq(self.hazard.ID_EX_flush),
-            self.ID_EX.en.eq(1),
+            self.ID_EX.rst.eq((flush | ~decodeValid | squashDecode) & ~freeze & ~exStall if self.pipelineDepth > 3
+                else ~decodeValid),
+            self.ID_EX.en.eq(~freeze & ~exStall),
             self.ID_EX.din.eq(
                 Cat(
+                    decodeValid,
                     self.control.aluOp,
                     self.control.lsuLoadCtrl,
                     self.control.lsuStoreCtrl,
-                    self.control.regWrite,
+                    self.control.regWrite & (rdAddr != 0),
                     self.control.memWrite,
                     self.control.memRead,
                     self.control.mem2Reg,
@@ -200,69 +899,278 @@ class MipyfiveCore(Elaboratable):
                     self.control.aluBsrc,
                     rs1Data,
                     rs2Data,
-                    rs1Addr,
-                    rs2Addr,
+                    rs1Used,
+                    rs2Used,
                     rdAddr,
                     self.immgen.imm,
-                    self.IF_ID_pc
+                    self.IF_ID_pc,
+                    *([
+                        self.control.fpuOp,
+                        self.control.fpUnit,
+                        self.control.fpRegWrite,
+                        self.control.fpStore,
+                        self.fpregfile.rs1Data,
+                        self.fpregfile.rs2Data,
+                        self.fpregfile.rs3Data,
+                        # NOTE: No fcsr - the dynamic rounding mode is RNE
+                        Mux(instruction[12:15] == FpRoundingMode.DYN.value, FpRoundingMode.RNE.value,
+                            instruction[12:15])
+                    ] if self.enableF else []),
+                    *([compressed] if self.enableC else []),
+                    *([
+                        isBranch,
+                        isJal | isJalr,
+                        isJalr,
+                        self.control.cmpType,
+                        self.IF_ID_bhtCounter,
+                        btbRedirected,
+                        predictReturn,
+                        predictedTaken,
+                        predTarget
+                    ] if self.branchInEx else []),
+                    *([self.IF_ID_thread] if self.threads > 1 else [])
                 )
             ),
             # Immgen
-            self.immgen.instruction.eq(self.instruction),
-            # Compare
-            self.compare.in1.eq(rs1Data),
-            self.compare.in2.eq(Mux(self.control.aluBsrc, self.immgen.imm, rs2Data)),
-            self.compare.cmpType.eq(self.control.cmpType),
+            self.immgen.instruction.eq(instruction),
             # Control
-            self.control.instruction.eq(self.instruction),
+            self.control.instruction.eq(instruction),
             # Regfile
-            self.regfile.rs1Addr.eq(self.instruction[15:20]),
-            self.regfile.rs2Addr.eq(self.instruction[20:25]),
-            self.regfile.writeData.eq(self.lsu.lDataOut),
-            self.regfile.writeEnable.eq(self.MEM_WB_regWrite),
-            self.regfile.writeAddr.eq(self.MEM_WB_rdAddr)
+            self.regfile.rs1Addr.eq(instruction[15:20]),
+            self.regfile.rs2Addr.eq(instruction[20:25]),
+            self.regfile.writeData.eq(self.MEM2_WB_data if self.pipelineDepth > 5 else mem2RegWire),
+            self.regfile.writeEnable.eq(self.MEM2_WB_regWrite if self.pipelineDepth > 5 else self.MEM_WB_regWrite),
+            self.regfile.writeAddr.eq(self.MEM2_WB_rdAddr if self.pipelineDepth > 5 else self.MEM_WB_rdAddr)
         ]
+        # Compare/JALR target (see EX with branchInEx)
+        if not self.branchInEx:
+            m.d.comb += [
+                jalrTarget.eq(Cat(C(0), (rs1Data + self.immgen.imm)[1:32])),
+                self.compare.in1.eq(rs1Data),
+                self.compare.in2.eq(Mux(self.control.aluBsrc == AluBSrcCtrl.FROM_IMM.value, self.immgen.imm,
+                    rs2Data)),
+                self.compare.cmpType.eq(self.control.cmpType)
+            ]
+        # Synchronous Regfile reads - addressed by the instruction IF_ID gets (or keeps, while held)
+        if self.bramRegfile:
+            nextInstruction = Mux(self.IF_ID.en, self.instruction, self.IF_ID_instruction)
+            m.d.comb += [
+                self.regfile.rs1AddrNext.eq(nextInstruction[15:20]),
+                self.regfile.rs2AddrNext.eq(nextInstruction[20:25])
+            ]
+        if self.threads > 1:
+            m.d.comb += [
+                self.regfile.readThread.eq(self.IF_ID_thread),
+                self.regfile.writeThread.eq(self.MEM_WB_thread)
+            ]
+        # Second issue slot - a bubble goes down the second pipe when it is not paired
+        if self.dualIssue:
+            m.d.comb += [
+                # Pipereg
+                self.ID_EX1.rst.eq((self.hazard.ID_EX_flush | ~pairIssue) & ~freeze & ~exStall),
+                self.ID_EX1.en.eq(~freeze & ~exStall),
+                self.ID_EX1.din.eq(
+                    Cat(
+                        pairIssue,
+                        self.control1.aluOp,
+                        self.control1.regWrite & (rdAddr1 != 0),
+                        self.control1.aluAsrc,
+                        self.control1.aluBsrc,
+                        self.regfile.rs3Data,
+                        self.regfile.rs4Data,
+                        rs1Used1,
+                        rs2Used1,
+                        rdAddr1,
+                        self.immgen1.imm,
+                        self.IF_ID_pc + 4
+                    )
+                ),
+                # Immgen/Control
+                self.immgen1.instruction.eq(instruction1),
+                self.control1.instruction.eq(instruction1),
+                # Regfile
+                self.regfile.rs3Addr.eq(rs1Addr1),
+                self.regfile.rs4Addr.eq(rs2Addr1),
+                self.regfile.writeData2.eq(self.MEM_WB1_aluOut),
+                self.regfile.writeEnable2.eq(self.MEM_WB1_regWrite),
+                self.regfile.writeAddr2.eq(self.MEM_WB1_rdAddr)
+            ]
+        # FP register file and scoreboard - decode issues when it moves on to EX (it is never squashed after that)
+        if self.enableF:
+            m.d.comb += [
+                self.fpregfile.rs1Addr.eq(instruction[15:20]),
+                self.fpregfile.rs2Addr.eq(instruction[20:25]),
+                self.fpregfile.rs3Addr.eq(instruction[27:32]),
+                self.fpregfile.writeData.eq(mem2RegWire),
+                self.fpregfile.writeEnable.eq(self.MEM_WB_fpRegWrite),
+                self.fpregfile.writeAddr.eq(self.MEM_WB_rdAddr),
+                self.hazard.IF_ID_frs1.eq(instruction[15:20]),
+                self.hazard.IF_ID_frs2.eq(instruction[20:25]),
+                self.hazard.IF_ID_frs3.eq(instruction[27:32]),
+                self.hazard.IF_ID_frd.eq(rdAddr),
+                self.hazard.IF_ID_usesFrs1.eq(self.control.usesFrs1),
+                self.hazard.IF_ID_usesFrs2.eq(self.control.usesFrs2),
+                self.hazard.IF_ID_usesFrs3.eq(self.control.usesFrs3),
+                self.hazard.IF_ID_fpRegWrite.eq(self.control.fpRegWrite),
+                self.hazard.fpIssue.eq(decodeValid & ~hold & ~squashDecode),
+                self.hazard.fpWriteEnable.eq(self.MEM_WB_fpRegWrite),
+                self.hazard.fpWriteAddr.eq(self.MEM_WB_rdAddr),
+                self.hazard.fpUnitWriteEnable.eq(self.fpregfile.unitWriteEnable),
+                self.hazard.fpUnitWriteAddr.eq(self.fpregfile.unitWriteAddr)
+            ]
 
         # ---------------
         # --- Execute ---
         # ---------------
         m.d.comb += [
             # Pipereg
-            self.EX_MEM.rst.eq(0),
-            self.EX_MEM.en.eq(1),
+            self.EX_MEM.rst.eq(exStall & ~freeze if self.pipelineDepth > 3 else exStall),
+            self.EX_MEM.en.eq(~freeze),
             self.EX_MEM.din.eq(
                 Cat(
+                    self.ID_EX_valid,
                     self.ID_EX_lsuLoadCtrl,
                     self.ID_EX_lsuStoreCtrl,
                     self.ID_EX_regWrite,
                     self.ID_EX_mem2Reg,
                     self.ID_EX_memWrite,
-                    self.alu.out,
-                    fwdAluBin,
-                    self.ID_EX_rdAddr
+                    self.ID_EX_memRead,
+                    exOut,
+                    Mux(self.ID_EX_fpStore, self.ID_EX_frs2, fwdAluBin) if self.enableF else fwdAluBin,
+                    self.ID_EX_rdAddr,
+                    # FMA/divide/square root results are written by their units instead
+                    *([self.ID_EX_fpRegWrite & ~self.ID_EX_fpUnit[1]] if self.enableF else []),
+                    *([self.ID_EX_thread] if self.threads > 1 else [])
                 )
             ),
             # ALU
             self.alu.in1.eq(aluAin),
             self.alu.in2.eq(aluBin),
             self.alu.aluOp.eq(self.ID_EX_aluOp),
+            exStall.eq(mulDivStall | fpStall)
         ]
-        # Fwd ALU A
-        with m.Switch(self.forward.fwdAluA):
-            with m.Case(AluForwardCtrl.NO_FWD):
-                m.d.comb += fwdAluAin.eq(self.ID_EX_rs1)
-            with m.Case(AluForwardCtrl.MEM_WB):
-                m.d.comb += fwdAluAin.eq(self.MEM_WB_aluOut)
-            with m.Case(AluForwardCtrl.EX_MEM):
-                m.d.comb += fwdAluAin.eq(self.EX_MEM_aluOut)
-        # Fwd ALU B
-        with m.Switch(self.forward.fwdAluB):
-            with m.Case(AluForwardCtrl.NO_FWD):
-                m.d.comb += fwdAluBin.eq(self.ID_EX_rs2)
-            with m.Case(AluForwardCtrl.MEM_WB):
-                m.d.comb += fwdAluBin.eq(self.MEM_WB_aluOut)
-            with m.Case(AluForwardCtrl.EX_MEM):
-                m.d.comb += fwdAluBin.eq(self.EX_MEM_aluOut)
+        # RV32F - single-cycle operations produce the EX result, FMA and divide/square root operations are issued
+        # as they leave EX (with their destination as the tag), the divide/square root unit takes one at a time
+        # NOTE: Both units write through a single FP register file port - an FMA result goes first, a finished
+        #       divide/square root is held until the port is free
+        if self.enableF:
+            isFpMisc    = self.ID_EX_valid & (self.ID_EX_fpUnit == FpUnit.MISC.value)
+            isFma       = self.ID_EX_valid & (self.ID_EX_fpUnit == FpUnit.FMA.value)
+            isDivSqrt   = self.ID_EX_valid & (self.ID_EX_fpUnit == FpUnit.DIVSQRT.value)
+            divSqrtAck  = self.fpDivSqrt.valid & ~self.fpFma.valid
+            m.d.comb += [
+                self.fpMisc.fpuOp.eq(self.ID_EX_fpuOp),
+                self.fpMisc.rm.eq(self.ID_EX_rm),
+                self.fpMisc.in1.eq(self.ID_EX_frs1),
+                self.fpMisc.in2.eq(self.ID_EX_frs2),
+                self.fpMisc.intIn.eq(aluAin),
+                exData.eq(Mux(isFpMisc, self.fpMisc.out, self.alu.out)),
+                fpStall.eq(isDivSqrt & (self.fpDivSqrt.busy | self.fpDivSqrt.valid & ~divSqrtAck)),
+                self.fpFma.start.eq(isFma & ~freeze & ~exStall),
+                self.fpFma.fpuOp.eq(self.ID_EX_fpuOp),
+                self.fpFma.rm.eq(self.ID_EX_rm),
+                self.fpFma.in1.eq(self.ID_EX_frs1),
+                self.fpFma.in2.eq(self.ID_EX_frs2),
+                self.fpFma.in3.eq(self.ID_EX_frs3),
+                self.fpFma.tag.eq(self.ID_EX_rdAddr),
+                self.fpDivSqrt.start.eq(isDivSqrt & ~freeze & ~exStall),
+                self.fpDivSqrt.fpuOp.eq(self.ID_EX_fpuOp),
+                self.fpDivSqrt.rm.eq(self.ID_EX_rm),
+                self.fpDivSqrt.in1.eq(self.ID_EX_frs1),
+                self.fpDivSqrt.in2.eq(self.ID_EX_frs2),
+                self.fpDivSqrt.tag.eq(self.ID_EX_rdAddr),
+                self.fpDivSqrt.ack.eq(divSqrtAck),
+                self.fpregfile.unitWriteEnable.eq(self.fpFma.valid | self.fpDivSqrt.valid),
+                self.fpregfile.unitWriteAddr.eq(Mux(self.fpFma.valid, self.fpFma.tagOut, self.fpDivSqrt.tagOut)),
+                self.fpregfile.unitWriteData.eq(Mux(self.fpFma.valid, self.fpFma.out, self.fpDivSqrt.out))
+            ]
+        else:
+            m.d.comb += [
+                fpStall.eq(0),
+                exData.eq(self.alu.out)
+            ]
+        # Multiply/Divide - operands are taken in the first EX cycle (forwarded values move on afterwards), the
+        # result is kept once ready in case the pipeline is frozen
+        if self.enableM:
+            isMul           = self.ID_EX_valid & (self.ID_EX_aluOp >= AluOp.MUL.value) & \
+                (self.ID_EX_aluOp <= AluOp.MULHU.value)
+            isDiv           = self.ID_EX_valid & (self.ID_EX_aluOp >= AluOp.DIV.value) & \
+                (self.ID_EX_aluOp <= AluOp.REMU.value)
+            mulDivStarted   = Signal()
+            mulDivDone      = Signal()
+            mulDivHeld      = Signal(self.dataWidth)
+            mulDivReady     = mulDivDone | isMul & self.multiplier.valid | isDiv & self.divider.done
+            mulDivOut       = Mux(mulDivDone, mulDivHeld, Mux(isMul, self.multiplier.out, self.divider.out))
+
+            m.d.comb += [
+                self.multiplier.start.eq(isMul & ~mulDivStarted),
+                self.multiplier.aluOp.eq(self.ID_EX_aluOp),
+                self.multiplier.in1.eq(aluAin),
+                self.multiplier.in2.eq(aluBin),
+                self.divider.start.eq(isDiv & ~mulDivStarted),
+                self.divider.aluOp.eq(self.ID_EX_aluOp),
+                self.divider.in1.eq(aluAin),
+                self.divider.in2.eq(aluBin),
+                mulDivStall.eq((isMul | isDiv) & ~mulDivReady),
+                exOut.eq(Mux(isMul | isDiv, mulDivOut, exData))
+            ]
+            with m.If(~freeze & ~mulDivStall):
+                m.d.sync += [
+                    mulDivStarted.eq(0),
+                    mulDivDone.eq(0)
+                ]
+            with m.Else():
+                m.d.sync += mulDivStarted.eq(isMul | isDiv)
+                with m.If(mulDivReady & ~mulDivDone):
+                    m.d.sync += [
+                        mulDivDone.eq(1),
+                        mulDivHeld.eq(mulDivOut)
+                    ]
+        else:
+            m.d.comb += [
+                mulDivStall.eq(0),
+                exOut.eq(exData)
+            ]
+        # Fwd ALU A/B (of both pipes with dual-issue)
+        # NOTE: With threads (or 3 stages), there is nothing to forward
+        #       With 7 stages, load data is only forwarded from MEM2/WB (see HazardUnit)
+        if not self.interlocked:
+            fwdInputs = []
+            m.d.comb += [
+                fwdAluAin.eq(self.ID_EX_rs1),
+                fwdAluBin.eq(self.ID_EX_rs2)
+            ]
+        else:
+            fwdInputs = [
+                (self.forward.fwdAluA, fwdAluAin, self.ID_EX_rs1),
+                (self.forward.fwdAluB, fwdAluBin, self.ID_EX_rs2)
+            ]
+        if self.dualIssue:
+            fwdAluAin1  = Signal(self.dataWidth)
+            fwdAluBin1  = Signal(self.dataWidth)
+            fwdInputs  += [
+                (self.forward.fwdAluA1, fwdAluAin1, self.ID_EX1_rs1),
+                (self.forward.fwdAluB1, fwdAluBin1, self.ID_EX1_rs2)
+            ]
+        for fwd, fwdIn, rsData in fwdInputs:
+            with m.Switch(fwd):
+                with m.Case(AluForwardCtrl.NO_FWD):
+                    m.d.comb += fwdIn.eq(rsData)
+                with m.Case(AluForwardCtrl.MEM_WB):
+                    m.d.comb += fwdIn.eq(self.MEM_WB_aluOut)
+                with m.Case(AluForwardCtrl.EX_MEM):
+                    m.d.comb += fwdIn.eq(self.EX_MEM_aluOut)
+                if self.pipelineDepth > 5:
+                    with m.Case(AluForwardCtrl.MEM2_WB):
+                        m.d.comb += fwdIn.eq(self.MEM2_WB_data)
+                else:
+                    with m.Case(AluForwardCtrl.MEM_WB_LOAD):
+                        m.d.comb += fwdIn.eq(self.lsu.lDataOut)
+                if self.dualIssue:
+                    with m.Case(AluForwardCtrl.EX_MEM1):
+                        m.d.comb += fwdIn.eq(self.EX_MEM1_aluOut)
+                    with m.Case(AluForwardCtrl.MEM_WB1):
+                        m.d.comb += fwdIn.eq(self.MEM_WB1_aluOut)
         # ALU A Src
         with m.Switch(self.ID_EX_aluAsrc):
             with m.Case(AluASrcCtrl.FROM_RS1):
@@ -272,7 +1180,63 @@ class MipyfiveCore(Elaboratable):
             with m.Case(AluASrcCtrl.FROM_PC):
                 m.d.comb += aluAin.eq(self.ID_EX_pc)
         # ALU B Src
-        m.d.comb += aluBin.eq(Mux(self.ID_EX_aluBsrc, self.ID_EX_imm, fwdAluBin))
+        with m.Switch(self.ID_EX_aluBsrc):
+            with m.Case(AluBSrcCtrl.FROM_RS2):
+                m.d.comb += aluBin.eq(fwdAluBin)
+            with m.Case(AluBSrcCtrl.FROM_IMM):
+                m.d.comb += aluBin.eq(self.ID_EX_imm)
+            with m.Case(AluBSrcCtrl.FROM_FOUR):
+                m.d.comb += aluBin.eq(Mux(self.ID_EX_compressed, 2, 4) if self.enableC else 4)
+        # JALR target with branchInEx - from the forwarded operands (branches subtract rs2 from rs1 in the ALU)
+        if self.branchInEx:
+            m.d.comb += jalrTarget.eq(Cat(C(0), (fwdAluAin + self.ID_EX_imm)[1:32]))
+
+        # Second pipe - a single-cycle ALU operation, moving along with the first pipe
+        # NOTE: Nothing that holds EX is paired, i.e. EX_MEM1 only gets a bubble when the first pipe's EX
+        #       holds a lone instruction
+        if self.dualIssue:
+            aluAin1 = Signal(self.dataWidth)
+            aluBin1 = Signal(self.dataWidth)
+            with m.Switch(self.ID_EX1_aluAsrc):
+                with m.Case(AluASrcCtrl.FROM_RS1):
+                    m.d.comb += aluAin1.eq(fwdAluAin1)
+                with m.Case(AluASrcCtrl.FROM_ZERO):
+                    m.d.comb += aluAin1.eq(0)
+                with m.Case(AluASrcCtrl.FROM_PC):
+                    m.d.comb += aluAin1.eq(self.ID_EX1_pc)
+            with m.Switch(self.ID_EX1_aluBsrc):
+                with m.Case(AluBSrcCtrl.FROM_RS2):
+                    m.d.comb += aluBin1.eq(fwdAluBin1)
+                with m.Case(AluBSrcCtrl.FROM_IMM):
+                    m.d.comb += aluBin1.eq(self.ID_EX1_imm)
+            m.d.comb += [
+                # Pipereg
+                self.EX_MEM1.rst.eq(exStall & ~freeze),
+                self.EX_MEM1.en.eq(~freeze),
+                self.EX_MEM1.din.eq(
+                    Cat(
+                        self.ID_EX1_valid,
+                        self.ID_EX1_regWrite,
+                        self.alu1.out,
+                        self.ID_EX1_rdAddr
+                    )
+                ),
+                # ALU
+                self.alu1.in1.eq(aluAin1),
+                self.alu1.in2.eq(aluBin1),
+                self.alu1.aluOp.eq(self.ID_EX1_aluOp),
+                # Pipereg (MEM - nothing to do but move on)
+                self.MEM_WB1.rst.eq(0),
+                self.MEM_WB1.en.eq(~freeze),
+                self.MEM_WB1.din.eq(
+                    Cat(
+                        self.EX_MEM1_valid,
+                        self.EX_MEM1_regWrite,
+                        self.EX_MEM1_aluOut,
+                        self.EX_MEM1_rdAddr
+                    )
+                )
+            ]
 
         # --------------
         # --- Memory ---
@@ -280,35 +1244,67 @@ class MipyfiveCore(Elaboratable):
         m.d.comb += [
             # Pipereg
             self.MEM_WB.rst.eq(0),
-            self.MEM_WB.en.eq(1),
+            self.MEM_WB.en.eq(~freeze),
             self.MEM_WB.din.eq(
                 Cat(
+                    self.EX_MEM_valid,
                     self.EX_MEM_lsuLoadCtrl,
                     self.EX_MEM_regWrite,
                     self.EX_MEM_mem2Reg,
                     self.EX_MEM_aluOut,
-                    self.EX_MEM_rdAddr
+                    self.EX_MEM_rdAddr,
+                    *([self.EX_MEM_fpRegWrite] if self.enableF else []),
+                    *([self.EX_MEM_thread] if self.threads > 1 else [])
                 )
             ),
             # LSU
-            self.lsu.lDataIn.eq(mem2RegWire),
+            self.lsu.lDataIn.eq(Mux(loadHeld, loadHold, self.DataIn)),
             self.lsu.lCtrlIn.eq(self.MEM_WB_lsuLoadCtrl),
+            self.lsu.lAddrIn.eq(self.MEM_WB_aluOut[0:2]),
             self.lsu.sDataIn.eq(self.EX_MEM_writeData),
             self.lsu.sCtrlIn.eq(self.EX_MEM_lsuStoreCtrl),
+            self.lsu.sAddrIn.eq(self.EX_MEM_aluOut[0:2]),
             # DataAddr
             self.DataAddr.eq(self.EX_MEM_aluOut),
-            # DataOut
+            # DataOut/DataByteEn
             self.DataOut.eq(self.lsu.sDataOut),
-            # DataWE
-            self.DataWE.eq(self.EX_MEM_memWrite)
+            self.DataByteEn.eq(self.lsu.sByteEnOut),
+            # DataWE/DataRE
+            self.DataWE.eq(self.EX_MEM_memWrite & ~freeze),
+            self.DataRE.eq(self.EX_MEM_memRead & ~freeze)
         ]
+        # Load data returns the cycle after its address (or once DataReady is back) - while frozen, the data
+        # port already addresses the next access (held in EX/MEM), so the returned word is kept until the
+        # freeze ends
+        with m.If(freeze & self.DataReady & ~loadHeld):
+            m.d.sync += [
+                loadHold.eq(self.DataIn),
+                loadHeld.eq(1)
+            ]
+        with m.Elif(~freeze):
+            m.d.sync += loadHeld.eq(0)
 
         # -----------------
         # --- Writeback ---
         # -----------------
         m.d.comb += [
             # Mem2Reg
-            mem2RegWire.eq(Mux(self.MEM_WB_mem2Reg, self.MEM_WB_aluOut, self.DataIn))
+            mem2RegWire.eq(Mux(self.MEM_WB_mem2Reg, self.MEM_WB_aluOut, self.lsu.lDataOut))
         ]
+        # With 7 stages, the result is only written back from MEM2/WB (MEM_WB is MEM1 -> MEM2)
+        if self.pipelineDepth > 5:
+            m.d.comb += [
+                # Pipereg
+                self.MEM2_WB.rst.eq(0),
+                self.MEM2_WB.en.eq(~freeze),
+                self.MEM2_WB.din.eq(
+                    Cat(
+                        self.MEM_WB_valid,
+                        self.MEM_WB_regWrite,
+                        self.MEM_WB_rdAddr,
+                        mem2RegWire
+                    )
+                )
+            ]
 
         return m
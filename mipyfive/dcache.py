@@ -0,0 +1,293 @@
+from functools import reduce
+from nmigen import *
+from .utils import *
+from .types import *
+
+# Set-associative data cache between the core's data port and a slower memory
+# NOTE: "size" and "lineSize" are in bytes - they (and "ways") should be powers of 2
+#       A request (read/write) is accepted when "ready" - it is looked up the following cycle (i.e. like a
+#       synchronous RAM), where "ready" stays low until a miss has been served
+#       Write-back: write-allocate, dirty lines are evicted through the write buffer
+#       Write-through: no write-allocate, every store goes through the write buffer (cached lines are updated)
+#       Refills wait for buffered writes to the same line to drain
+#       Stores only update the "byteEn" lanes (buffered writes carry their byte enables to "memByteEn")
+class DataCache(Elaboratable):
+    def __init__(self, size, lineSize, ways, replacement=CacheReplacement.LRU, writeBack=True,
+        writeBufferDepth=4):
+        self.ways           = ways
+        self.replacement    = replacement
+        self.writeBack      = writeBack
+        self.bufferDepth    = writeBufferDepth
+        self.sets           = size // (lineSize * ways)
+        self.wordsPerLine   = lineSize // 4
+        self.wordBits       = ceilLog2(self.wordsPerLine) if self.wordsPerLine > 1 else 0
+        self.indexBits      = ceilLog2(self.sets) if self.sets > 1 else 0
+        self.wayBits        = ceilLog2(ways)
+        self.tagBits        = 32 - 2 - self.wordBits - self.indexBits
+
+        # Core port
+        self.addr           = Signal(32)
+        self.readEnable     = Signal()
+        self.writeEnable    = Signal()
+        self.writeData      = Signal(32)
+        self.byteEn         = Signal(4, reset=0b1111)
+        self.readData       = Signal(32)
+        self.ready          = Signal()
+
+        # Memory port
+        self.memReq         = Signal()
+        self.memAddr        = Signal(32)
+        self.memWriteEnable = Signal()
+        self.memWriteData   = Signal(32)
+        self.memByteEn      = Signal(4)
+        self.memReadData    = Signal(32)
+        self.memValid       = Signal()
+
+        # Statistics
+        self.hits           = Signal(32)
+        self.misses         = Signal(32)
+
+        # Per-way storage - tag entry layout: (valid | dirty | tag)
+        self.tags           = [Memory(width=2+self.tagBits, depth=self.sets) for _ in range(ways)]
+        self.lines          = [Memory(width=32, depth=self.sets*self.wordsPerLine) for _ in range(ways)]
+        # Per-set replacement state (LRU: one age per way, MRU way is 0 - FIFO: next way to replace)
+        if replacement == CacheReplacement.LRU:
+            self.ages       = Memory(width=ways*self.wayBits, depth=self.sets,
+                init=[sum(way << (way*self.wayBits) for way in range(ways))] * self.sets)
+        elif replacement == CacheReplacement.FIFO:
+            self.fifo       = Memory(width=self.wayBits, depth=self.sets)
+
+    def addrWord(self, addr):
+        return addr[2:2+self.wordBits]
+
+    def addrIndex(self, addr):
+        return addr[2+self.wordBits:2+self.wordBits+self.indexBits]
+
+    def addrTag(self, addr):
+        return addr[2+self.wordBits+self.indexBits:]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        reqAddr     = Signal(32)
+        reqRead     = Signal()
+        reqWrite    = Signal()
+        reqData     = Signal(32)
+        reqByteEn   = Signal(4)
+        refilled    = Signal()
+        victim      = Signal(self.wayBits)
+        refillWay   = Signal(self.wayBits)
+        refillWord  = Signal(max(self.wordBits, 1))
+        hitWays     = Signal(self.ways)
+        hitWay      = Signal(self.wayBits)
+        victimEntry = Signal(2+self.tagBits)
+        victimDirty = Signal()
+
+        index   = self.addrIndex(reqAddr)
+        tag     = self.addrTag(reqAddr)
+        # NOTE: Cat() of empty slices is fine for direct-mapped/single-word-line configs
+        wordIdx = Cat(self.addrWord(reqAddr), index)
+        hit     = hitWays.any()
+
+        # Lookup
+        for way in range(self.ways):
+            entry = self.tags[way][index]
+            m.d.comb += hitWays[way].eq(entry[0] & (entry[2:] == tag))
+            with m.If(hitWays[way]):
+                m.d.comb += hitWay.eq(way)
+            with m.If(refillWay == way):
+                m.d.comb += victimEntry.eq(entry)
+            with m.If(victim == way):
+                m.d.comb += victimDirty.eq(entry[0] & entry[1])
+        m.d.comb += self.readData.eq(reduce(lambda a, b: a | b,
+            [Mux(hitWays[way], self.lines[way][wordIdx], 0) for way in range(self.ways)]))
+
+        # Victim selection - an invalid way first, otherwise per the replacement policy
+        # LRU update - the accessed way becomes MRU (age 0), younger ways age by one
+        lruUpdate = []
+        if self.ways > 1:
+            invalidWays = Cat(~self.tags[way][index][0] for way in range(self.ways))
+            if self.replacement == CacheReplacement.LRU:
+                ages    = self.ages[index]
+                age     = lambda way: ages[way*self.wayBits:(way+1)*self.wayBits]
+                hitAge  = Signal(self.wayBits)
+                for way in range(self.ways):
+                    with m.If(age(way) == self.ways - 1):
+                        m.d.comb += victim.eq(way)
+                    with m.If(hitWay == way):
+                        m.d.comb += hitAge.eq(age(way))
+                lruUpdate = [self.ages[index].eq(Cat(
+                    Mux(hitWay == way, 0, Mux(age(way) < hitAge, age(way) + 1, age(way)))[:self.wayBits]
+                        for way in range(self.ways)))]
+            elif self.replacement == CacheReplacement.FIFO:
+                m.d.comb += victim.eq(self.fifo[index])
+            else:
+                # Free-running counter as the (pseudo-)random source
+                counter = Signal(self.wayBits)
+                m.d.sync += counter.eq(counter + 1)
+                m.d.comb += victim.eq(counter)
+            for way in reversed(range(self.ways)):
+                with m.If(invalidWays[way]):
+                    m.d.comb += victim.eq(way)
+
+        # --- Write buffer ---
+        # Entries are drained (in order) whenever the memory port is not used by a refill
+        bufAddr     = Array(Signal(32, name=f"bufAddr{i}") for i in range(self.bufferDepth))
+        bufData     = Array(Signal(32, name=f"bufData{i}") for i in range(self.bufferDepth))
+        bufByteEn   = Array(Signal(4, name=f"bufByteEn{i}") for i in range(self.bufferDepth))
+        bufValid    = Array(Signal(name=f"bufValid{i}") for i in range(self.bufferDepth))
+        head        = Signal(range(self.bufferDepth))
+        tail        = Signal(range(self.bufferDepth))
+        push        = Signal()
+        pushAddr    = Signal(32)
+        pushData    = Signal(32)
+        pushByteEn  = Signal(4)
+        pop         = Signal()
+        draining    = Signal()
+        drainReq    = Signal()
+        bufferFull  = bufValid[tail]
+        bufferEmpty = ~bufValid[head]
+        # Buffered writes to the requested line (the refill has to wait for them)
+        lineBits    = 2 + self.wordBits
+        bufferHit   = reduce(lambda a, b: a | b,
+            [bufValid[i] & (bufAddr[i][lineBits:] == reqAddr[lineBits:]) for i in range(self.bufferDepth)])
+
+        wrap = lambda ptr: Mux(ptr == self.bufferDepth - 1, 0, ptr + 1)
+        with m.If(push):
+            m.d.sync += [
+                bufAddr[tail].eq(pushAddr),
+                bufData[tail].eq(pushData),
+                bufByteEn[tail].eq(pushByteEn),
+                bufValid[tail].eq(1),
+                tail.eq(wrap(tail))
+            ]
+        with m.If(pop):
+            m.d.sync += [
+                bufValid[head].eq(0),
+                head.eq(wrap(head))
+            ]
+
+        # Memory port - a started request is held until "memValid" (the drain or refill owns the port until then)
+        m.d.comb += [
+            pop.eq(draining & self.memValid),
+            self.memReq.eq(drainReq | draining),
+            self.memAddr.eq(bufAddr[head]),
+            self.memWriteEnable.eq(1),
+            self.memWriteData.eq(bufData[head]),
+            self.memByteEn.eq(bufByteEn[head])
+        ]
+        with m.If(drainReq):
+            m.d.sync += draining.eq(1)
+        with m.Elif(pop):
+            m.d.sync += draining.eq(0)
+
+        # Write-through stores always go through the write buffer (and wait for space in it)
+        bufferedWrite = C(0) if self.writeBack else reqWrite
+
+        with m.FSM():
+            with m.State("LOOKUP"):
+                m.d.comb += drainReq.eq(~bufferEmpty & ~draining)
+                with m.If(~(reqRead | reqWrite) | hit & ~(bufferedWrite & bufferFull)):
+                    m.d.comb += self.ready.eq(1)
+                    m.d.sync += [
+                        reqAddr.eq(self.addr),
+                        reqRead.eq(self.readEnable),
+                        reqWrite.eq(self.writeEnable),
+                        reqData.eq(self.writeData),
+                        reqByteEn.eq(self.byteEn),
+                        refilled.eq(0)
+                    ]
+                    with m.If(reqRead | reqWrite):
+                        m.d.sync += lruUpdate
+                        with m.If(~refilled):
+                            m.d.sync += self.hits.eq(self.hits + 1)
+                    # Write hit - update the line (write-back: mark it dirty, write-through: buffer the write)
+                    with m.If(reqWrite):
+                        for way in range(self.ways):
+                            with m.If(hitWays[way]):
+                                line = self.lines[way][wordIdx]
+                                m.d.sync += line.eq(Cat(Mux(reqByteEn[i], reqData[8*i:8*i+8], line[8*i:8*i+8])
+                                    for i in range(4)))
+                                if self.writeBack:
+                                    m.d.sync += self.tags[way][index].eq(Cat(C(1), C(1), tag))
+                        if not self.writeBack:
+                            m.d.comb += [
+                                push.eq(1),
+                                pushAddr.eq(reqAddr),
+                                pushData.eq(reqData),
+                                pushByteEn.eq(reqByteEn)
+                            ]
+                with m.Elif(bufferedWrite):
+                    # Write-through miss - not allocated, only buffered
+                    with m.If(~bufferFull):
+                        m.d.comb += [
+                            self.ready.eq(1),
+                            push.eq(1),
+                            pushAddr.eq(reqAddr),
+                            pushData.eq(reqData),
+                            pushByteEn.eq(reqByteEn)
+                        ]
+                        m.d.sync += [
+                            self.misses.eq(self.misses + 1),
+                            reqAddr.eq(self.addr),
+                            reqRead.eq(self.readEnable),
+                            reqWrite.eq(self.writeEnable),
+                            reqData.eq(self.writeData),
+                            reqByteEn.eq(self.byteEn),
+                            refilled.eq(0)
+                        ]
+                with m.Elif(~hit):
+                    m.d.sync += [
+                        self.misses.eq(self.misses + 1),
+                        refillWay.eq(victim),
+                        refillWord.eq(0)
+                    ]
+                    # Dirty victim - its words are pushed to the write buffer (clean victims are just replaced)
+                    m.next = "REFILL"
+                    if self.writeBack:
+                        with m.If(victimDirty):
+                            m.next = "EVICT"
+
+            if self.writeBack:
+                with m.State("EVICT"):
+                    m.d.comb += drainReq.eq(~bufferEmpty & ~draining)
+                    with m.If(~bufferFull):
+                        m.d.comb += [
+                            push.eq(1),
+                            pushAddr.eq(Cat(C(0, 2), refillWord[:self.wordBits], index, victimEntry[2:])),
+                            pushByteEn.eq(0b1111),
+                            pushData.eq(reduce(lambda a, b: a | b,
+                                [Mux(refillWay == way, self.lines[way][Cat(refillWord[:self.wordBits], index)], 0)
+                                    for way in range(self.ways)]))
+                        ]
+                        m.d.sync += refillWord.eq(refillWord + 1)
+                        with m.If(refillWord == self.wordsPerLine - 1):
+                            m.d.sync += refillWord.eq(0)
+                            m.next = "REFILL"
+
+            with m.State("REFILL"):
+                # Buffered writes to this line drain first - the port is then owned by the refill
+                m.d.comb += drainReq.eq(bufferHit & ~draining)
+                with m.If(~bufferHit & ~draining):
+                    m.d.comb += [
+                        self.memReq.eq(1),
+                        self.memAddr.eq(Cat(C(0, 2), refillWord[:self.wordBits], index, tag)),
+                        self.memWriteEnable.eq(0)
+                    ]
+                    with m.If(self.memValid):
+                        m.d.sync += refillWord.eq(refillWord + 1)
+                        for way in range(self.ways):
+                            with m.If(refillWay == way):
+                                m.d.sync += self.lines[way][Cat(refillWord[:self.wordBits], index)].eq(
+                                    self.memReadData)
+                        # Last word - the line becomes valid (and the retried lookup hits)
+                        with m.If(refillWord == self.wordsPerLine - 1):
+                            for way in range(self.ways):
+                                with m.If(refillWay == way):
+                                    m.d.sync += self.tags[way][index].eq(Cat(C(1), C(0), tag))
+                            if self.replacement == CacheReplacement.FIFO:
+                                m.d.sync += self.fifo[index].eq(refillWay + 1)
+                            m.d.sync += refilled.eq(1)
+                            m.next = "LOOKUP"
+
+        return m
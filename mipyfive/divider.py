@@ -0,0 +1,106 @@
+from nmigen import *
+from .types import *
+from .utils import *
+
+def leadingZeros(value):
+    ''' Leading zero count of an nMigen value (a mux level per halving)\n\n NOTE: A zero value gives len(value) '''
+    width = len(value)
+    if width == 1:
+        return value == 0
+    # Pad to a power of two with ones below the LSB - they never count, except when the value is zero
+    padded = 1 << ceilLog2(width)
+    value = Cat(Repl(1, padded - width), value) if padded > width else value
+    # The count of a block of 2^k bits is its all-zero flag above k low bits - the low bits are the upper half's
+    # (if it has a one) or the lower half's, plus half the block
+    def lowBits(start, size):
+        half = size // 2
+        highZero, lowZero = value[start + half:start + size] == 0, value[start:start + half] == 0
+        if size == 2:
+            return highZero & ~lowZero
+        return Mux(highZero, Cat(lowBits(start, half), ~lowZero), Cat(lowBits(start + half, half), C(0)))
+    return Cat(lowBits(0, padded), value == 0)[:ceilLog2(width + 1)]
+
+# Iterative RV32M divider (DIV/DIVU/REM/REMU) - restoring, one quotient bit per cycle
+# NOTE: "start" loads the operands (the divider is "busy" from the next cycle), "done" is high for one cycle
+#       with the result on "out" once the last quotient bit has been computed
+#       Early termination - only the quotient's significant bits are iterated over (from the operands' leading
+#       zero counts), so a small dividend or a large divisor takes a few cycles instead of "width"
+#       Division by zero (quotient of all ones, remainder = dividend) and signed overflow (-2^31 / -1) give the
+#       results the RISC-V spec requires
+class Divider(Elaboratable):
+    def __init__(self, width):
+        self.width      = width
+        self.aluOp      = Signal(ceilLog2(len(AluOp)))
+        self.start      = Signal()
+        self.in1        = Signal(width) # Dividend
+        self.in2        = Signal(width) # Divisor
+
+        self.busy       = Signal()
+        self.done       = Signal()
+        self.out        = Signal(width)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        isSigned    = (self.aluOp == AluOp.DIV.value) | (self.aluOp == AluOp.REM.value)
+        neg1        = isSigned & self.in1[-1]
+        neg2        = isSigned & self.in2[-1]
+        abs1        = Mux(neg1, -self.in1, self.in1)[:self.width]
+        abs2        = Mux(neg2, -self.in2, self.in2)[:self.width]
+        lz1         = leadingZeros(abs1)
+        lz2         = leadingZeros(abs2)
+        steps       = Mux(lz2 >= lz1, lz2 - lz1 + 1, 0)[:ceilLog2(self.width + 1)]
+
+        count       = Signal(range(self.width + 1))
+        remainder   = Signal(self.width)
+        quotient    = Signal(self.width) # Remaining dividend bits shifted out at the top, quotient bits in
+        divisor     = Signal(self.width)
+        negQuotient = Signal()
+        negRemainder= Signal()
+        isRem       = Signal()
+        trial       = Cat(quotient[-1], remainder)
+
+        m.d.comb += [
+            self.done.eq(self.busy & (count == 0)),
+            self.out.eq(Mux(isRem, Mux(negRemainder, -remainder, remainder), Mux(negQuotient, -quotient, quotient)))
+        ]
+
+        with m.If(self.start):
+            m.d.sync += [
+                self.busy.eq(1),
+                divisor.eq(abs2),
+                isRem.eq((self.aluOp == AluOp.REM.value) | (self.aluOp == AluOp.REMU.value))
+            ]
+            with m.If(self.in2 == 0):
+                m.d.sync += [
+                    count.eq(0),
+                    remainder.eq(self.in1),
+                    quotient.eq(Repl(C(1), self.width)),
+                    negQuotient.eq(0),
+                    negRemainder.eq(0)
+                ]
+            with m.Else():
+                # The dividend bits above the quotient's are the initial partial remainder
+                m.d.sync += [
+                    count.eq(steps),
+                    remainder.eq(abs1 >> steps),
+                    quotient.eq(abs1 << (self.width - steps)[:ceilLog2(self.width + 1)]),
+                    negQuotient.eq(neg1 ^ neg2),
+                    negRemainder.eq(neg1)
+                ]
+        with m.Elif(self.done):
+            m.d.sync += self.busy.eq(0)
+        with m.Elif(self.busy):
+            m.d.sync += count.eq(count - 1)
+            with m.If(trial >= divisor):
+                m.d.sync += [
+                    remainder.eq(trial - divisor),
+                    quotient.eq(Cat(C(1), quotient[:-1]))
+                ]
+            with m.Else():
+                m.d.sync += [
+                    remainder.eq(trial),
+                    quotient.eq(Cat(C(0), quotient[:-1]))
+                ]
+
+        return m
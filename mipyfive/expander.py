@@ -0,0 +1,144 @@
+from nmigen import *
+from .types import *
+
+# 32-bit instruction encoders (immediates are given at their full width - 12, 13 or 21 bits, 20 for U-type)
+def rType(funct7, rs2, rs1, funct3, rd, opcode=Rv32iTypes.R.value):
+    return Cat(C(opcode, 7), rd, C(funct3, 3), rs1, rs2, C(funct7, 7))
+
+def iType(imm, rs1, funct3, rd, opcode):
+    return Cat(C(opcode, 7), rd, C(funct3, 3), rs1, imm)
+
+def sType(imm, rs2, rs1, funct3, opcode=Rv32iTypes.S.value):
+    return Cat(C(opcode, 7), imm[0:5], C(funct3, 3), rs1, rs2, imm[5:12])
+
+def bType(imm, rs2, rs1, funct3):
+    return Cat(C(Rv32iTypes.B.value, 7), imm[11], imm[1:5], C(funct3, 3), rs1, rs2, imm[5:11], imm[12])
+
+def jType(imm, rd):
+    return Cat(C(Rv32iTypes.J.value, 7), rd, imm[12:20], imm[11], imm[1:11], imm[20])
+
+def uType(imm, rd, opcode):
+    return Cat(C(opcode, 7), rd, imm)
+
+# RV32C expander - a 16-bit (compressed) instruction to the 32-bit instruction it stands for, so the rest of
+# decode (Controller/ImmGen/register addresses) only ever sees 32-bit encodings
+# NOTE: C.FLW/C.FSW(SP) expand to FLW/FSW (only decoded with RV32F), RV64/RV128/D-only encodings (C.FLD, ...),
+#       reserved and illegal ones (incl. the all-zero halfword) expand to 0 - an unknown (no-op) instruction
+class Expander(Elaboratable):
+    def __init__(self):
+        self.instruction    = Signal(16)
+
+        self.out            = Signal(32)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        i           = self.instruction
+        rd          = i[7:12]
+        rs2         = i[2:7]
+        rdP         = Cat(i[7:10], C(0b01, 2)) # rd'/rs1' (x8-x15)
+        rs2P        = Cat(i[2:5], C(0b01, 2))  # rd'/rs2' (x8-x15)
+        x0, x1, x2  = C(0, 5), C(1, 5), C(2, 5)
+
+        immCI       = Cat(i[2:7], Repl(i[12], 7))
+        uimmCL      = Cat(C(0, 2), i[6], i[10:13], i[5], C(0, 5))
+        uimmCIW     = Cat(C(0, 2), i[6], i[5], i[11:13], i[7:11], C(0, 2))
+        imm16sp     = Cat(C(0, 4), i[6], i[2], i[5], i[3:5], Repl(i[12], 3))
+        immLui      = Cat(i[2:7], Repl(i[12], 15))
+        uimmLwsp    = Cat(C(0, 2), i[4:7], i[12], i[2:4], C(0, 4))
+        uimmSwsp    = Cat(C(0, 2), i[9:13], i[7:9], C(0, 4))
+        immCJ       = Cat(C(0), i[3:6], i[11], i[2], i[7], i[6], i[9:11], i[8], Repl(i[12], 10))
+        immCB       = Cat(C(0), i[3:5], i[10:12], i[2], i[5:7], Repl(i[12], 5))
+        shamt       = Cat(i[2:7], C(0, 7))
+
+        # Quadrant (op) and funct3
+        with m.Switch(Cat(i[0:2], i[13:16])):
+            # --- Quadrant 0 ---
+            with m.Case(0b000_00):
+                # C.ADDI4SPN (a zero immediate is illegal)
+                with m.If(i[5:13] != 0):
+                    m.d.comb += self.out.eq(iType(uimmCIW, x2, 0b000, rs2P, Rv32iTypes.I_Arith.value))
+            with m.Case(0b010_00):
+                m.d.comb += self.out.eq(iType(uimmCL, rdP, 0b010, rs2P, Rv32iTypes.I_Load.value))
+            with m.Case(0b011_00):
+                m.d.comb += self.out.eq(iType(uimmCL, rdP, 0b010, rs2P, Rv32fTypes.F_Load.value))
+            with m.Case(0b110_00):
+                m.d.comb += self.out.eq(sType(uimmCL, rs2P, rdP, 0b010))
+            with m.Case(0b111_00):
+                m.d.comb += self.out.eq(sType(uimmCL, rs2P, rdP, 0b010, Rv32fTypes.F_Store.value))
+
+            # --- Quadrant 1 ---
+            with m.Case(0b000_01):
+                # C.ADDI (C.NOP)
+                m.d.comb += self.out.eq(iType(immCI, rd, 0b000, rd, Rv32iTypes.I_Arith.value))
+            with m.Case(0b001_01):
+                m.d.comb += self.out.eq(jType(immCJ, x1))
+            with m.Case(0b010_01):
+                # C.LI
+                m.d.comb += self.out.eq(iType(immCI, x0, 0b000, rd, Rv32iTypes.I_Arith.value))
+            with m.Case(0b011_01):
+                # C.ADDI16SP / C.LUI (zero immediates are reserved)
+                with m.If(Cat(i[2:7], i[12]) != 0):
+                    with m.If(rd == 2):
+                        m.d.comb += self.out.eq(iType(imm16sp, x2, 0b000, x2, Rv32iTypes.I_Arith.value))
+                    with m.Else():
+                        m.d.comb += self.out.eq(uType(immLui, rd, Rv32iTypes.U_Load.value))
+            with m.Case(0b100_01):
+                with m.Switch(i[10:12]):
+                    with m.Case(0b00):
+                        m.d.comb += self.out.eq(iType(shamt, rdP, 0b101, rdP, Rv32iTypes.I_Arith.value))
+                    with m.Case(0b01):
+                        m.d.comb += self.out.eq(iType(shamt | (0b0100000 << 5), rdP, 0b101, rdP,
+                            Rv32iTypes.I_Arith.value))
+                    with m.Case(0b10):
+                        m.d.comb += self.out.eq(iType(immCI, rdP, 0b111, rdP, Rv32iTypes.I_Arith.value))
+                    with m.Case(0b11):
+                        # C.SUB/C.XOR/C.OR/C.AND (i[12] set is RV64's C.SUBW/C.ADDW)
+                        with m.If(~i[12]):
+                            with m.Switch(i[5:7]):
+                                with m.Case(0b00):
+                                    m.d.comb += self.out.eq(rType(0b0100000, rs2P, rdP, 0b000, rdP))
+                                with m.Case(0b01):
+                                    m.d.comb += self.out.eq(rType(0b0000000, rs2P, rdP, 0b100, rdP))
+                                with m.Case(0b10):
+                                    m.d.comb += self.out.eq(rType(0b0000000, rs2P, rdP, 0b110, rdP))
+                                with m.Case(0b11):
+                                    m.d.comb += self.out.eq(rType(0b0000000, rs2P, rdP, 0b111, rdP))
+            with m.Case(0b101_01):
+                m.d.comb += self.out.eq(jType(immCJ, x0))
+            with m.Case(0b110_01):
+                m.d.comb += self.out.eq(bType(immCB, x0, rdP, 0b000))
+            with m.Case(0b111_01):
+                m.d.comb += self.out.eq(bType(immCB, x0, rdP, 0b001))
+
+            # --- Quadrant 2 ---
+            with m.Case(0b000_10):
+                m.d.comb += self.out.eq(iType(shamt, rd, 0b001, rd, Rv32iTypes.I_Arith.value))
+            with m.Case(0b010_10):
+                # C.LWSP (rd = x0 is reserved)
+                with m.If(rd != 0):
+                    m.d.comb += self.out.eq(iType(uimmLwsp, x2, 0b010, rd, Rv32iTypes.I_Load.value))
+            with m.Case(0b011_10):
+                m.d.comb += self.out.eq(iType(uimmLwsp, x2, 0b010, rd, Rv32fTypes.F_Load.value))
+            with m.Case(0b100_10):
+                with m.If(~i[12]):
+                    # C.JR (rs1 = x0 is reserved) / C.MV
+                    with m.If(rs2 == 0):
+                        with m.If(rd != 0):
+                            m.d.comb += self.out.eq(iType(C(0, 12), rd, 0b000, x0, Rv32iTypes.I_Jump.value))
+                    with m.Else():
+                        m.d.comb += self.out.eq(rType(0b0000000, rs2, x0, 0b000, rd))
+                with m.Else():
+                    # C.EBREAK / C.JALR / C.ADD
+                    with m.If((rs2 == 0) & (rd == 0)):
+                        m.d.comb += self.out.eq(iType(C(1, 12), x0, 0b000, x0, Rv32iTypes.I_Sys.value))
+                    with m.Elif(rs2 == 0):
+                        m.d.comb += self.out.eq(iType(C(0, 12), rd, 0b000, x1, Rv32iTypes.I_Jump.value))
+                    with m.Else():
+                        m.d.comb += self.out.eq(rType(0b0000000, rs2, rd, 0b000, rd))
+            with m.Case(0b110_10):
+                m.d.comb += self.out.eq(sType(uimmSwsp, rs2, x2, 0b010))
+            with m.Case(0b111_10):
+                m.d.comb += self.out.eq(sType(uimmSwsp, rs2, x2, 0b010, Rv32fTypes.F_Store.value))
+
+        return m
@@ -2,9 +2,17 @@ from nmigen import *
 from .utils import *
 from .types import *
 
+# NOTE: With "dualIssue", the second pipe's EX/MEM and MEM/WB results (ALU only - loads only go down the first pipe)
+#       are forwarded too, to both pipes' ALU inputs (fwdAluA1/fwdAluB1 for the second one) and to decode
+#       Both pipes never write the same register from the same stage (such instructions are not paired), so the
+#       results of a stage are checked in either order
+#       With "pipelineDepth" 7 (two memory stages), decode also gets MEM/WB ALU results, and EX gets MEM2/WB results
+#       (incl. load data) - a load in MEM/WB is never forwarded (the hazard unit stalls its uses until MEM2/WB)
 class ForwardingUnit(Elaboratable):
-    def __init__(self, regCount):
+    def __init__(self, regCount, dualIssue=False, pipelineDepth=5):
         addrBits                = ceilLog2(regCount)
+        self.dualIssue          = dualIssue
+        self.pipelineDepth      = pipelineDepth
         self.IF_ID_rs1          = Signal(addrBits)
         self.ID_EX_rs1          = Signal(addrBits)
         self.IF_ID_rs2          = Signal(addrBits)
@@ -13,47 +21,77 @@ class ForwardingUnit(Elaboratable):
         self.MEM_WB_rd          = Signal(addrBits)
         self.EX_MEM_reg_write   = Signal()
         self.MEM_WB_reg_write   = Signal()
+        self.MEM_WB_mem_read    = Signal()
+        if self.pipelineDepth > 5:
+            self.MEM2_WB_rd         = Signal(addrBits)
+            self.MEM2_WB_reg_write  = Signal()
+        if self.dualIssue:
+            self.ID_EX1_rs1         = Signal(addrBits)
+            self.ID_EX1_rs2         = Signal(addrBits)
+            self.EX_MEM1_rd         = Signal(addrBits)
+            self.MEM_WB1_rd         = Signal(addrBits)
+            self.EX_MEM1_reg_write  = Signal()
+            self.MEM_WB1_reg_write  = Signal()
 
-        self.fwdAluA            = Signal(2)
-        self.fwdAluB            = Signal(2)
-        self.fwdRegfileAout     = Signal()
-        self.fwdRegfileBout     = Signal()
+        wide                    = dualIssue or pipelineDepth > 5
+        self.fwdAluA            = Signal(3 if wide else 2)
+        self.fwdAluB            = Signal(3 if wide else 2)
+        self.fwdRegfileAout     = Signal(2 if wide else 1)
+        self.fwdRegfileBout     = Signal(2 if wide else 1)
+        if self.dualIssue:
+            self.fwdAluA1           = Signal(3)
+            self.fwdAluB1           = Signal(3)
 
     def elaborate(self, platform):
         m = Module()
 
-        # --- Forwarding for Control Hazards ---
-        # Forward conditions for output A of Regfile
-        with m.If((self.IF_ID_rs1 != 0) & (self.IF_ID_rs1 == self.EX_MEM_rd) & (self.EX_MEM_reg_write)):
-            m.d.comb += self.fwdRegfileAout.eq(RegfileOutForwardCtrl.EX_MEM.value)
-        with m.Else():
-            m.d.comb += self.fwdRegfileAout.eq(RegfileOutForwardCtrl.NO_FWD.value)
+        if self.dualIssue:
+            EX_MEM1_write = self.EX_MEM1_reg_write & (self.EX_MEM1_rd != 0)
+            MEM_WB1_write = self.MEM_WB1_reg_write & (self.MEM_WB1_rd != 0)
 
-        # Forward conditions for output B of Regfile
-        with m.If((self.IF_ID_rs2 != 0) & (self.IF_ID_rs2 == self.EX_MEM_rd) & (self.EX_MEM_reg_write)):
-            m.d.comb += self.fwdRegfileBout.eq(RegfileOutForwardCtrl.EX_MEM.value)
-        with m.Else():
-            m.d.comb += self.fwdRegfileBout.eq(RegfileOutForwardCtrl.NO_FWD.value)
+        # --- Forwarding for Control Hazards ---
+        # Decode (branch comparator, JALR target and ID/EX operands) sees every value already computed
+        # NOTE: MEM/WB results (incl. load data) need no path here - the Regfile writes them through
+        #       (MEM2/WB results with two memory stages)
+        for rs, fwd in [(self.IF_ID_rs1, self.fwdRegfileAout), (self.IF_ID_rs2, self.fwdRegfileBout)]:
+            with m.If((rs != 0) & (rs == self.EX_MEM_rd) & (self.EX_MEM_reg_write)):
+                m.d.comb += fwd.eq(RegfileOutForwardCtrl.EX_MEM.value)
+            if self.dualIssue:
+                with m.Elif(EX_MEM1_write & (self.EX_MEM1_rd == rs)):
+                    m.d.comb += fwd.eq(RegfileOutForwardCtrl.EX_MEM1.value)
+            if self.pipelineDepth > 5:
+                with m.Elif((rs != 0) & (rs == self.MEM_WB_rd) & self.MEM_WB_reg_write & ~self.MEM_WB_mem_read):
+                    m.d.comb += fwd.eq(RegfileOutForwardCtrl.MEM_WB.value)
+            with m.Else():
+                m.d.comb += fwd.eq(RegfileOutForwardCtrl.NO_FWD.value)
 
         # --- Forwarding for Data Hazards ---
-        # Forward conditions for input A of ALU
-        with m.If((self.EX_MEM_reg_write) & (self.EX_MEM_rd != 0) & (self.EX_MEM_rd == self.ID_EX_rs1)):
-            m.d.comb += self.fwdAluA.eq(AluForwardCtrl.EX_MEM)
-        with m.Elif((self.MEM_WB_reg_write) & (self.MEM_WB_rd != 0) &
-            ~((self.EX_MEM_reg_write) & (self.EX_MEM_rd != 0) & (self.EX_MEM_rd == self.ID_EX_rs1)) &
-                (self.MEM_WB_rd == self.ID_EX_rs1)):
-                    m.d.comb += self.fwdAluA.eq(AluForwardCtrl.MEM_WB)
-        with m.Else():
-            m.d.comb += self.fwdAluA.eq(AluForwardCtrl.NO_FWD)
-
-        # Forward conditions for input B of ALU
-        with m.If((self.EX_MEM_reg_write) & (self.EX_MEM_rd != 0) & (self.EX_MEM_rd == self.ID_EX_rs2)):
-            m.d.comb += self.fwdAluB.eq(AluForwardCtrl.EX_MEM)
-        with m.Elif((self.MEM_WB_reg_write) & (self.MEM_WB_rd != 0) &
-            ~((self.EX_MEM_reg_write) & (self.EX_MEM_rd != 0) & (self.EX_MEM_rd == self.ID_EX_rs2)) &
-                (self.MEM_WB_rd == self.ID_EX_rs2)):
-                    m.d.comb += self.fwdAluB.eq(AluForwardCtrl.MEM_WB)
-        with m.Else():
-            m.d.comb += self.fwdAluB.eq(AluForwardCtrl.NO_FWD)
+        # Forward conditions for the ALU inputs - the most recent (EX/MEM) result first
+        aluInputs = [(self.ID_EX_rs1, self.fwdAluA), (self.ID_EX_rs2, self.fwdAluB)]
+        if self.dualIssue:
+            aluInputs += [(self.ID_EX1_rs1, self.fwdAluA1), (self.ID_EX1_rs2, self.fwdAluB1)]
+        for rs, fwd in aluInputs:
+            with m.If((self.EX_MEM_reg_write) & (self.EX_MEM_rd != 0) & (self.EX_MEM_rd == rs)):
+                m.d.comb += fwd.eq(AluForwardCtrl.EX_MEM)
+            if self.dualIssue:
+                with m.Elif(EX_MEM1_write & (self.EX_MEM1_rd == rs)):
+                    m.d.comb += fwd.eq(AluForwardCtrl.EX_MEM1)
+            if self.pipelineDepth > 5:
+                with m.Elif((self.MEM_WB_reg_write) & (self.MEM_WB_rd != 0) & (self.MEM_WB_rd == rs) &
+                    ~self.MEM_WB_mem_read):
+                    m.d.comb += fwd.eq(AluForwardCtrl.MEM_WB)
+                with m.Elif((self.MEM2_WB_reg_write) & (self.MEM2_WB_rd != 0) & (self.MEM2_WB_rd == rs)):
+                    m.d.comb += fwd.eq(AluForwardCtrl.MEM2_WB)
+            else:
+                with m.Elif((self.MEM_WB_reg_write) & (self.MEM_WB_rd != 0) & (self.MEM_WB_rd == rs)):
+                    with m.If(self.MEM_WB_mem_read):
+                        m.d.comb += fwd.eq(AluForwardCtrl.MEM_WB_LOAD)
+                    with m.Else():
+                        m.d.comb += fwd.eq(AluForwardCtrl.MEM_WB)
+            if self.dualIssue:
+                with m.Elif(MEM_WB1_write & (self.MEM_WB1_rd == rs)):
+                    m.d.comb += fwd.eq(AluForwardCtrl.MEM_WB1)
+            with m.Else():
+                m.d.comb += fwd.eq(AluForwardCtrl.NO_FWD)
 
         return m
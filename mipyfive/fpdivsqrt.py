@@ -0,0 +1,166 @@
+from nmigen import *
+from .types import *
+from .utils import *
+from .divider import leadingZeros
+from .fpround import *
+
+# Iterative single-precision FDIV/FSQRT - one quotient (or root) bit per cycle
+# NOTE: "start" loads the operands (the unit is "busy" from the next cycle), the result is "valid" (with its "tag",
+#       i.e. the destination register) once the last bit has been computed, and stays valid until "ack"
+#       Subnormal inputs are normalized up front, so every operation takes 27 iterations (24 result bits, guard and
+#       round bits, the remainder is the sticky bit) - special values (NaN, infinity, zero) finish after 1 cycle
+#       NaN results are always the canonical NaN - exception flags are not provided (there is no fcsr)
+class FpDivSqrt(Elaboratable):
+    def __init__(self, tagWidth=5):
+        self.start      = Signal()
+        self.fpuOp      = Signal(ceilLog2(len(FpuOp)))
+        self.rm         = Signal(3)
+        self.in1        = Signal(32)
+        self.in2        = Signal(32)
+        self.tag        = Signal(tagWidth)
+        self.ack        = Signal()
+
+        self.busy       = Signal()
+        self.valid      = Signal()
+        self.out        = Signal(32)
+        self.tagOut     = Signal(tagWidth)
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.round = rounder = FpRound(mantWidth=27)
+
+        iterations  = 27
+        isSqrt      = self.fpuOp == FpuOp.FSQRT.value
+        signA, expA, sigA, zeroA, infA, nanA = fpUnpack(self.in1)
+        signB, expB, sigB, zeroB, infB, nanB = fpUnpack(self.in2)
+
+        # Normalized operands - "exp" is the (biased) exponent of bit 23
+        lzA         = Signal(range(25))
+        lzB         = Signal(range(25))
+        normA       = Signal(24)
+        normB       = Signal(24)
+        expNA       = Signal(signed(12))
+        expNB       = Signal(signed(12))
+        expA0       = Signal(signed(12))
+        expB0       = Signal(signed(12))
+        # Square root - an even exponent for the radicand (shifted left by 28 or 29 bits), halved for the root
+        oddExp      = Signal()
+        rootExp     = Signal(signed(12))
+        m.d.comb += [
+            lzA.eq(leadingZeros(sigA)),
+            lzB.eq(leadingZeros(sigB)),
+            normA.eq(sigA << lzA),
+            normB.eq(sigB << lzB),
+            expA0.eq(expA),
+            expB0.eq(expB),
+            expNA.eq(expA0 - lzA),
+            expNB.eq(expB0 - lzB),
+            oddExp.eq((expNA - FP_BIAS)[0]),
+            rootExp.eq(expNA - FP_BIAS - FP_FRAC_BITS - Mux(oddExp, 28, 29))
+        ]
+
+        special     = Signal(32)
+        isSpecial   = Signal()
+        with m.If(isSqrt):
+            with m.If(nanA | signA & ~zeroA):
+                m.d.comb += [isSpecial.eq(1), special.eq(FP_QNAN)]
+            with m.Elif(zeroA | infA):
+                m.d.comb += [isSpecial.eq(1), special.eq(self.in1)]
+        with m.Else():
+            with m.If(nanA | nanB | zeroA & zeroB | infA & infB):
+                m.d.comb += [isSpecial.eq(1), special.eq(FP_QNAN)]
+            with m.Elif(infA | zeroB):
+                m.d.comb += [isSpecial.eq(1), special.eq(Cat(C(FP_INF, 31), signA ^ signB))]
+            with m.Elif(zeroA | infB):
+                m.d.comb += [isSpecial.eq(1), special.eq(Cat(C(0, 31), signA ^ signB))]
+
+        count       = Signal(range(iterations + 1))
+        sqrtOp      = Signal()
+        specialOut  = Signal(32)
+        useSpecial  = Signal()
+        sign        = Signal()
+        exp         = Signal(signed(12))
+        rm          = Signal(3)
+        divisor     = Signal(24)
+        radicand    = Signal(54) # Remaining radicand bits, shifted out at the top two at a time
+        remainder   = Signal(29)
+        result      = Signal(iterations)
+        divTrial    = Signal(29)
+        sqrtRem     = Signal(29)
+        sqrtTrial   = Signal(29)
+
+        m.d.comb += [
+            divTrial.eq(remainder - divisor),
+            sqrtRem.eq(Cat(radicand[-2:], remainder)),
+            sqrtTrial.eq(Cat(C(1, 2), result)),
+            rounder.sign.eq(sign),
+            rounder.exp.eq(exp),
+            rounder.mant.eq(result),
+            rounder.sticky.eq(remainder != 0),
+            rounder.rm.eq(rm),
+            self.out.eq(Mux(useSpecial, specialOut, rounder.out))
+        ]
+
+        with m.If(self.start):
+            m.d.sync += [
+                sqrtOp.eq(isSqrt),
+                specialOut.eq(special),
+                useSpecial.eq(isSpecial),
+                rm.eq(self.rm),
+                self.tagOut.eq(self.tag),
+                result.eq(0),
+                count.eq(Mux(isSpecial, 0, iterations)),
+                self.busy.eq(~isSpecial),
+                self.valid.eq(isSpecial)
+            ]
+            with m.If(isSqrt):
+                # Root bit 26 (the last iteration's root is floor(sqrt(radicand)), up to 27 bits)
+                m.d.sync += [
+                    sign.eq(0),
+                    exp.eq(FP_BIAS + iterations - 1 + Cat(rootExp[1:], rootExp[-1])),
+                    radicand.eq(Mux(oddExp, normA << 28, normA << 29)),
+                    remainder.eq(0)
+                ]
+            with m.Else():
+                # Quotient bit 26 has the exponent of the operands' ratio (normA / normB is in [0.5, 2))
+                m.d.sync += [
+                    sign.eq(signA ^ signB),
+                    exp.eq(expNA - expNB + FP_BIAS),
+                    divisor.eq(normB),
+                    remainder.eq(normA)
+                ]
+        with m.Elif(self.busy):
+            m.d.sync += count.eq(count - 1)
+            with m.If(count == 1):
+                m.d.sync += [
+                    self.busy.eq(0),
+                    self.valid.eq(1)
+                ]
+            with m.If(sqrtOp):
+                m.d.sync += radicand.eq(radicand << 2)
+                with m.If(sqrtRem >= sqrtTrial):
+                    m.d.sync += [
+                        remainder.eq(sqrtRem - sqrtTrial),
+                        result.eq(Cat(C(1), result[:-1]))
+                    ]
+                with m.Else():
+                    m.d.sync += [
+                        remainder.eq(sqrtRem),
+                        result.eq(Cat(C(0), result[:-1]))
+                    ]
+            with m.Else():
+                # NOTE: The partial remainder is doubled after each step - except the last (it is only sticky)
+                with m.If(remainder >= divisor):
+                    m.d.sync += [
+                        remainder.eq(Mux(count == 1, divTrial, divTrial << 1)),
+                        result.eq(Cat(C(1), result[:-1]))
+                    ]
+                with m.Else():
+                    m.d.sync += [
+                        remainder.eq(Mux(count == 1, remainder, remainder << 1)),
+                        result.eq(Cat(C(0), result[:-1]))
+                    ]
+        with m.Elif(self.ack):
+            m.d.sync += self.valid.eq(0)
+
+        return m
@@ -0,0 +1,141 @@
+from nmigen import *
+from .types import *
+from .utils import *
+from .divider import leadingZeros
+from .fpround import *
+
+# Pipelined single-precision fused multiply-add - FMADD/FMSUB/FNMSUB/FNMADD, and FADD/FSUB (in1 * 1.0 +/- in2) and
+# FMUL (in1 * in2, no addend) - a new operation may start every cycle, its result is "valid" (with its "tag", i.e.
+# the destination register) "latency" cycles later
+# NOTE: The product is exact (48 bits) and added to the addend in a 52-bit window (carry, 48 bits, 3 guard bits),
+#       where the operand with the smaller exponent is shifted right and its shifted out bits are "jammed" into the
+#       window's lowest bit - so a single rounding (see FpRound) gives the correctly rounded result
+#       As with the Multiplier, the result is computed up front and passed through "latency" register stages
+#       NaN results are always the canonical NaN - exception flags are not provided (there is no fcsr)
+class FpFma(Elaboratable):
+    def __init__(self, latency=3, tagWidth=5):
+        self.latency    = latency
+        self.start      = Signal()
+        self.fpuOp      = Signal(ceilLog2(len(FpuOp)))
+        self.rm         = Signal(3)
+        self.in1        = Signal(32)
+        self.in2        = Signal(32)
+        self.in3        = Signal(32)
+        self.tag        = Signal(tagWidth)
+
+        self.valid      = Signal()
+        self.out        = Signal(32)
+        self.tagOut     = Signal(tagWidth)
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.round = rounder = FpRound(mantWidth=52)
+
+        isAdd       = self.fpuOp.matches(FpuOp.FADD.value, FpuOp.FSUB.value)
+        isMul       = self.fpuOp == FpuOp.FMUL.value
+        negProduct  = self.fpuOp.matches(FpuOp.FNMSUB.value, FpuOp.FNMADD.value)
+        negAddend   = self.fpuOp.matches(FpuOp.FSUB.value, FpuOp.FMSUB.value, FpuOp.FNMADD.value)
+        b           = Mux(isAdd, C(0x3f800000, 32), self.in2)
+        c           = Mux(isAdd, self.in2, Mux(isMul, C(0, 32), self.in3))
+
+        signA, expA, sigA, zeroA, infA, nanA = fpUnpack(self.in1)
+        signB, expB, sigB, zeroB, infB, nanB = fpUnpack(b)
+        signC, expC, sigC, zeroC, infC, nanC = fpUnpack(c)
+        signP       = signA ^ signB ^ negProduct
+        signS       = signC ^ negAddend
+        zeroP       = zeroA | zeroB
+        infP        = infA | infB
+
+        # Both operands normalized to 48 bits - "exp" is the (biased) exponent of bit 47
+        expAB       = Signal(signed(12))
+        expC0       = Signal(signed(12))
+        product     = Signal(48)
+        lzP         = Signal(range(49))
+        expP        = Signal(signed(12))
+        addend      = Signal(48)
+        lzC         = Signal(range(49))
+        expS        = Signal(signed(12))
+        m.d.comb += [
+            product.eq(sigA * sigB),
+            lzP.eq(leadingZeros(product)),
+            # NOTE: Exponent arithmetic is signed (an unsigned difference would wrap)
+            expAB.eq(expA + expB),
+            expC0.eq(expC),
+            expP.eq(expAB - (FP_BIAS - 1) - lzP),
+            addend.eq(Cat(C(0, 24), sigC) << lzC),
+            lzC.eq(leadingZeros(sigC)),
+            expS.eq(expC0 - lzC)
+        ]
+
+        # Larger exponent first (a zero addend never is), the other is aligned to it
+        swap        = Signal()
+        big         = Signal(48)
+        bigSign     = Signal()
+        bigExp      = Signal(signed(12))
+        small       = Signal(48)
+        smallSign   = Signal()
+        dist        = Signal(range(53))
+        aligned     = Signal(103)
+        window      = Signal(signed(53))
+        magnitude   = Signal(52)
+        diff        = Signal(signed(13))
+        m.d.comb += [
+            swap.eq(~zeroC & (expS > expP)),
+            big.eq(Mux(swap, addend, product << lzP)),
+            bigSign.eq(Mux(swap, signS, signP)),
+            bigExp.eq(Mux(swap, expS, expP)),
+            small.eq(Mux(swap, product << lzP, addend)),
+            smallSign.eq(Mux(swap, signP, signS)),
+            diff.eq(bigExp - Mux(swap, expP, expS)),
+            dist.eq(Mux(diff > 52, 52, diff)),
+            # Bits shifted out of the window (below aligned[52]) are jammed into its lowest bit
+            aligned.eq(Cat(C(0, 52), C(0, 3), small) >> dist),
+            window.eq(Mux(bigSign != smallSign,
+                Cat(C(0, 3), big) - Cat(aligned[52] | (aligned[:52] != 0), aligned[53:]),
+                Cat(C(0, 3), big) + Cat(aligned[52] | (aligned[:52] != 0), aligned[53:]))),
+            magnitude.eq(Mux(window < 0, -window, window)),
+            # The window's top (carry) bit is one above the larger operand's bit 47
+            rounder.sign.eq(bigSign ^ (window < 0)),
+            rounder.exp.eq(bigExp + 1),
+            rounder.mant.eq(magnitude),
+            rounder.sticky.eq(0),
+            rounder.rm.eq(self.rm)
+        ]
+
+        # Special values, and exact zeros (the sign of a zero sum depends on the rounding mode)
+        result = Signal(32)
+        with m.If(nanA | nanB | nanC | infP & zeroP | infP & infC & (signP != signS)):
+            m.d.comb += result.eq(FP_QNAN)
+        with m.Elif(infP):
+            m.d.comb += result.eq(Cat(C(FP_INF, 31), signP))
+        with m.Elif(infC):
+            m.d.comb += result.eq(Cat(C(FP_INF, 31), signS))
+        with m.Elif(zeroP & (isMul | zeroC)):
+            m.d.comb += result.eq(Cat(C(0, 31), Mux(isMul | (signP == signS), signP,
+                self.rm == FpRoundingMode.RDN.value)))
+        with m.Elif(zeroP):
+            m.d.comb += result.eq(Cat(c[:31], signS))
+        with m.Elif(magnitude == 0):
+            m.d.comb += result.eq(Cat(C(0, 31), self.rm == FpRoundingMode.RDN.value))
+        with m.Else():
+            m.d.comb += result.eq(rounder.out)
+
+        valid, out, tag = self.start, result, self.tag
+        for i in range(self.latency):
+            stageValid  = Signal(name=f"stageValid{i}")
+            stageOut    = Signal(32, name=f"stageOut{i}")
+            stageTag    = Signal.like(self.tag, name=f"stageTag{i}")
+            m.d.sync += [
+                stageValid.eq(valid),
+                stageOut.eq(out),
+                stageTag.eq(tag)
+            ]
+            valid, out, tag = stageValid, stageOut, stageTag
+
+        m.d.comb += [
+            self.valid.eq(valid),
+            self.out.eq(out),
+            self.tagOut.eq(tag)
+        ]
+
+        return m
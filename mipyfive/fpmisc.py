@@ -0,0 +1,123 @@
+from nmigen import *
+from .types import *
+from .utils import *
+from .fpround import *
+
+# Single-cycle (combinational) RV32F operations - sign injection, min/max, comparisons, classification, conversions
+# and moves between the integer and floating point register files
+# NOTE: "in1"/"in2" are floating point operands, "intIn" the integer one (FCVT.S.W(U), FMV.W.X) - the result
+#       goes to an integer register (comparisons, FCLASS, FCVT.W(U).S, FMV.X.W) or a floating point one (the rest)
+#       Out of range conversions saturate, NaN operands of min/max are ignored (both NaN gives the canonical NaN)
+class FpMisc(Elaboratable):
+    def __init__(self):
+        self.fpuOp      = Signal(ceilLog2(len(FpuOp)))
+        self.rm         = Signal(3)
+        self.in1        = Signal(32)
+        self.in2        = Signal(32)
+        self.intIn      = Signal(32)
+
+        self.out        = Signal(32)
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.round = rounder = FpRound(mantWidth=32)
+
+        signA, expA, sigA, zeroA, infA, nanA = fpUnpack(self.in1)
+        signB, expB, sigB, zeroB, infB, nanB = fpUnpack(self.in2)
+
+        # Ordering - sign/magnitude, so -0 orders below +0 (as min/max require), comparisons treat them as equal
+        less        = Signal()
+        equal       = Signal()
+        bothZero    = zeroA & zeroB
+        m.d.comb += [
+            less.eq(Mux(signA != signB, signA,
+                Mux(signA, self.in1[:31] > self.in2[:31], self.in1[:31] < self.in2[:31]))),
+            equal.eq((self.in1 == self.in2) | bothZero)
+        ]
+
+        # FCVT.S.W(U) - the integer's magnitude (bit 31 is worth 2^31) rounded to single precision
+        intSigned   = self.fpuOp == FpuOp.FCVT_S_W.value
+        intNeg      = intSigned & self.intIn[31]
+        m.d.comb += [
+            rounder.sign.eq(intNeg),
+            rounder.exp.eq(FP_BIAS + 31),
+            rounder.mant.eq(Mux(intNeg, -self.intIn, self.intIn)),
+            rounder.sticky.eq(0),
+            rounder.rm.eq(self.rm)
+        ]
+
+        # FCVT.W(U).S - the value in 32.32 fixed point (bit 32 is worth 1), rounded to an integer
+        fixed       = Signal(64)
+        shiftLeft   = Signal(range(41))
+        shiftRight  = Signal(range(27))
+        lost        = Signal()
+        guard       = Signal()
+        sticky      = Signal()
+        magnitude   = Signal(33)
+        overflow    = Signal()
+        m.d.comb += [
+            overflow.eq(expA > FP_BIAS + 31),
+            shiftLeft.eq(Mux(expA > FP_BIAS - 9, expA - (FP_BIAS - 9), 0)),
+            shiftRight.eq(Mux(expA < FP_BIAS - 9, Mux(expA < FP_BIAS - 35, 26, (FP_BIAS - 9) - expA), 0)),
+            fixed.eq(Mux(shiftRight != 0, sigA >> shiftRight, sigA << shiftLeft)),
+            lost.eq(((sigA >> shiftRight) << shiftRight)[:24] != sigA),
+            guard.eq(fixed[31]),
+            sticky.eq((fixed[:31] != 0) | lost),
+            magnitude.eq(fixed[32:] + fpRoundUp(self.rm, signA, fixed[32], guard, sticky))
+        ]
+        toSigned    = Signal(32)
+        toUnsigned  = Signal(32)
+        with m.If(nanA | ~signA & (overflow | (magnitude > 0x7fffffff))):
+            m.d.comb += toSigned.eq(0x7fffffff)
+        with m.Elif(signA & (overflow | (magnitude > 0x80000000))):
+            m.d.comb += toSigned.eq(0x80000000)
+        with m.Else():
+            m.d.comb += toSigned.eq(Mux(signA, -magnitude, magnitude))
+        with m.If(nanA | ~signA & (overflow | magnitude[32])):
+            m.d.comb += toUnsigned.eq(0xffffffff)
+        with m.Elif(signA):
+            m.d.comb += toUnsigned.eq(0)
+        with m.Else():
+            m.d.comb += toUnsigned.eq(magnitude)
+
+        with m.Switch(self.fpuOp):
+            with m.Case(FpuOp.FSGNJ.value):
+                m.d.comb += self.out.eq(Cat(self.in1[:31], signB))
+            with m.Case(FpuOp.FSGNJN.value):
+                m.d.comb += self.out.eq(Cat(self.in1[:31], ~signB))
+            with m.Case(FpuOp.FSGNJX.value):
+                m.d.comb += self.out.eq(Cat(self.in1[:31], signA ^ signB))
+            with m.Case(FpuOp.FMIN.value, FpuOp.FMAX.value):
+                with m.If(nanA & nanB):
+                    m.d.comb += self.out.eq(FP_QNAN)
+                with m.Elif(nanA):
+                    m.d.comb += self.out.eq(self.in2)
+                with m.Elif(nanB):
+                    m.d.comb += self.out.eq(self.in1)
+                with m.Else():
+                    m.d.comb += self.out.eq(Mux(less ^ (self.fpuOp == FpuOp.FMAX.value), self.in1, self.in2))
+            with m.Case(FpuOp.FEQ.value):
+                m.d.comb += self.out.eq(~nanA & ~nanB & equal)
+            with m.Case(FpuOp.FLT.value):
+                m.d.comb += self.out.eq(~nanA & ~nanB & less & ~bothZero)
+            with m.Case(FpuOp.FLE.value):
+                m.d.comb += self.out.eq(~nanA & ~nanB & (less | equal))
+            with m.Case(FpuOp.FCLASS.value):
+                subnormal = (self.in1[FP_FRAC_BITS:31] == 0) & ~zeroA
+                normal = ~zeroA & ~subnormal & ~infA & ~nanA
+                m.d.comb += self.out.eq(Cat(
+                    signA & infA, signA & normal, signA & subnormal, signA & zeroA,
+                    ~signA & zeroA, ~signA & subnormal, ~signA & normal, ~signA & infA,
+                    nanA & ~self.in1[FP_FRAC_BITS-1], nanA & self.in1[FP_FRAC_BITS-1]))
+            with m.Case(FpuOp.FCVT_W_S.value):
+                m.d.comb += self.out.eq(toSigned)
+            with m.Case(FpuOp.FCVT_WU_S.value):
+                m.d.comb += self.out.eq(toUnsigned)
+            with m.Case(FpuOp.FCVT_S_W.value, FpuOp.FCVT_S_WU.value):
+                m.d.comb += self.out.eq(rounder.out)
+            with m.Case(FpuOp.FMV_X_W.value):
+                m.d.comb += self.out.eq(self.in1)
+            with m.Case(FpuOp.FMV_W_X.value):
+                m.d.comb += self.out.eq(self.intIn)
+
+        return m
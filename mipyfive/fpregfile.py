@@ -0,0 +1,45 @@
+from nmigen import *
+from .utils import *
+
+# RV32F register file (f0-f31) - three read ports (FMADD & co. read rs3), and two write ports: the pipeline's
+# (writeback of FLW/FMV.W.X/... results) and the floating point units' (FMA, FDIV/FSQRT results, which complete
+# outside of the pipeline)
+# NOTE: f0 is an ordinary register - and the hazard unit's scoreboard never lets both ports write the same register
+#       in the same cycle
+class FpRegFile(Elaboratable):
+    def __init__(self, regCount=32):
+        self.addrBits           = ceilLog2(regCount)
+        self.regArray           = Memory(width=32, depth=regCount)
+        self.rs1Addr            = Signal(self.addrBits)
+        self.rs2Addr            = Signal(self.addrBits)
+        self.rs3Addr            = Signal(self.addrBits)
+        self.writeEnable        = Signal()
+        self.writeAddr          = Signal(self.addrBits)
+        self.writeData          = Signal(32)
+        self.unitWriteEnable    = Signal()
+        self.unitWriteAddr      = Signal(self.addrBits)
+        self.unitWriteData      = Signal(32)
+
+        self.rs1Data            = Signal(32)
+        self.rs2Data            = Signal(32)
+        self.rs3Data            = Signal(32)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # Write-through - a register written this cycle (by either port) reads as the new value
+        for rsAddr, rsData in [(self.rs1Addr, self.rs1Data), (self.rs2Addr, self.rs2Data),
+            (self.rs3Addr, self.rs3Data)]:
+            with m.If(self.unitWriteEnable & (rsAddr == self.unitWriteAddr)):
+                m.d.comb += rsData.eq(self.unitWriteData)
+            with m.Elif(self.writeEnable & (rsAddr == self.writeAddr)):
+                m.d.comb += rsData.eq(self.writeData)
+            with m.Else():
+                m.d.comb += rsData.eq(self.regArray[rsAddr])
+
+        with m.If(self.writeEnable):
+            m.d.sync += self.regArray[self.writeAddr].eq(self.writeData)
+        with m.If(self.unitWriteEnable):
+            m.d.sync += self.regArray[self.unitWriteAddr].eq(self.unitWriteData)
+
+        return m
@@ -0,0 +1,98 @@
+from nmigen import *
+from .types import *
+from .utils import *
+from .divider import leadingZeros
+
+# Single-precision (IEEE 754 binary32) fields/constants
+FP_EXP_BITS     = 8
+FP_FRAC_BITS    = 23
+FP_BIAS         = 127
+FP_QNAN         = 0x7fc00000 # Canonical NaN
+FP_INF          = 0x7f800000
+FP_MAX          = 0x7f7fffff # Largest finite magnitude
+
+def fpUnpack(value):
+    ''' Unpack a binary32 value --> (sign, exp, sig, isZero, isInf, isNan)\n
+    NOTE: "sig" includes the hidden bit (24 bits) and subnormals get an "exp" of 1 (so both are scaled alike)
+    '''
+    sign    = value[31]
+    expField= value[FP_FRAC_BITS:31]
+    frac    = value[0:FP_FRAC_BITS]
+    exp     = Mux(expField == 0, 1, expField)
+    sig     = Cat(frac, expField != 0)
+    isZero  = (expField == 0) & (frac == 0)
+    isInf   = (expField == 0xff) & (frac == 0)
+    isNan   = (expField == 0xff) & (frac != 0)
+    return sign, exp, sig, isZero, isInf, isNan
+
+def fpRoundUp(rm, sign, lsb, guard, sticky):
+    ''' Whether a truncated value is to be incremented, for rounding mode "rm" (anything else is RNE) '''
+    return Mux(rm == FpRoundingMode.RTZ.value, 0,
+        Mux(rm == FpRoundingMode.RDN.value, (guard | sticky) & sign,
+        Mux(rm == FpRoundingMode.RUP.value, (guard | sticky) & ~sign,
+        Mux(rm == FpRoundingMode.RMM.value, guard, guard & (sticky | lsb)))))
+
+# Normalize, round and pack a (sign, exponent, mantissa) value into a binary32 result
+# NOTE: The value is "mant" * 2^("exp" - bias - (mantWidth - 1)) - i.e. "exp" is the (biased, signed) exponent of
+#       the mantissa's top bit, "mant" does not need to be normalized and "sticky" stands for non-zero bits below it
+#       Tiny results are denormalized before rounding (so they round as subnormals), overflows give infinity or
+#       the largest finite value (depending on the rounding mode)
+#       A zero mantissa (and sticky) gives a zero of the given sign - other special values are up to the units
+class FpRound(Elaboratable):
+    def __init__(self, mantWidth, expWidth=12):
+        self.mantWidth  = mantWidth
+        self.expWidth   = expWidth
+        self.sign       = Signal()
+        self.exp        = Signal(signed(expWidth))
+        self.mant       = Signal(mantWidth)
+        self.sticky     = Signal()
+        self.rm         = Signal(3)
+
+        self.out        = Signal(32)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        width       = self.mantWidth
+        lz          = Signal(range(width + 1))
+        norm        = Signal(width)
+        exp         = Signal(signed(self.expWidth))
+        shift       = Signal(range(width + 2))
+        shifted     = Signal(width)
+        lost        = Signal()
+        sig         = Signal(FP_FRAC_BITS + 1)
+        guard       = Signal()
+        sticky      = Signal()
+        roundUp     = Signal()
+        packed      = Signal(self.expWidth + FP_FRAC_BITS + 1)
+        toInf       = Signal()
+
+        m.d.comb += [
+            lz.eq(leadingZeros(self.mant)),
+            norm.eq(self.mant << lz),
+            exp.eq(self.exp - lz),
+            # Tiny results - shift down to the subnormal exponent (1), the shifted out bits become sticky
+            shift.eq(Mux(exp < 1, Mux(exp < -width, width + 1, 1 - exp), 0)),
+            shifted.eq(norm >> shift),
+            lost.eq((shifted << shift)[:width] != norm),
+            sig.eq(shifted[width-FP_FRAC_BITS-1:]),
+            guard.eq(shifted[width-FP_FRAC_BITS-2]),
+            sticky.eq((shifted[:width-FP_FRAC_BITS-2] != 0) | lost | self.sticky),
+            roundUp.eq(fpRoundUp(self.rm, self.sign, sig[0], guard, sticky))
+        ]
+
+        # The hidden bit adds one to the exponent field - so a subnormal (no hidden bit) keeps a field of 0, and a
+        # rounding carry out of the significand just increments the exponent
+        m.d.comb += [
+            packed.eq((Mux(exp < 1, 0, exp - 1)[:self.expWidth] << FP_FRAC_BITS) + sig + roundUp),
+            toInf.eq(~((self.rm == FpRoundingMode.RTZ.value) | (self.rm == FpRoundingMode.RUP.value) & self.sign |
+                (self.rm == FpRoundingMode.RDN.value) & ~self.sign))
+        ]
+        with m.If((self.mant == 0) & ~self.sticky):
+            m.d.comb += self.out.eq(Cat(C(0, 31), self.sign))
+        with m.Elif(packed >= FP_INF):
+            m.d.comb += self.out.eq(Cat(Mux(toInf, FP_INF, FP_MAX)[:31], self.sign))
+        with m.Else():
+            m.d.comb += self.out.eq(Cat(packed[:31], self.sign))
+
+        return m
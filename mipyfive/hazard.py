@@ -1,9 +1,21 @@
 from nmigen import *
 from .utils import *
 
+# NOTE: With "enableF", FP registers are scoreboarded - a register is pending from the decode of an instruction
+#       writing it until it is written (by writeback, or by the FMA/divide-sqrt units, which complete out of order)
+#       Decode waits on pending sources (and a pending destination - so results are written in order), there is
+#       no forwarding between FP instructions
+#       With "dualIssue", the second pipe's ALU result in EX holds a branch in decode as well, and "pairStall" tells
+#       decode the second issue slot's instruction (IF_ID1) uses a load still in EX - it is not issued (paired) then
+#       With "pipelineDepth" 7, memory access takes two stages (EX/MEM -> MEM/WB -> MEM2/WB) and load data is only
+#       forwarded from MEM2/WB - see below
 class HazardUnit(Elaboratable):
-    def __init__(self, regCount):
+    def __init__(self, regCount, enableF=False, dualIssue=False, pipelineDepth=5):
         addrBits                = ceilLog2(regCount)
+        self.regCount           = regCount
+        self.enableF            = enableF
+        self.dualIssue          = dualIssue
+        self.pipelineDepth      = pipelineDepth
         self.ID_EX_memRead      = Signal()
         self.Branch             = Signal()
         self.EX_MEM_memToReg    = Signal()
@@ -13,6 +25,32 @@ class HazardUnit(Elaboratable):
         self.IF_ID_rs1          = Signal(addrBits)
         self.IF_ID_rs2          = Signal(addrBits)
 
+        if self.pipelineDepth > 5:
+            self.MEM_WB_memToReg    = Signal()
+            self.MEM_WB_rd          = Signal(addrBits)
+
+        if self.dualIssue:
+            self.ID_EX1_regWrite    = Signal()
+            self.ID_EX1_rd          = Signal(addrBits)
+            self.IF_ID1_rs1         = Signal(addrBits)
+            self.IF_ID1_rs2         = Signal(addrBits)
+            self.pairStall          = Signal()
+
+        if self.enableF:
+            self.IF_ID_frs1         = Signal(addrBits)
+            self.IF_ID_frs2         = Signal(addrBits)
+            self.IF_ID_frs3         = Signal(addrBits)
+            self.IF_ID_frd          = Signal(addrBits)
+            self.IF_ID_usesFrs1     = Signal()
+            self.IF_ID_usesFrs2     = Signal()
+            self.IF_ID_usesFrs3     = Signal()
+            self.IF_ID_fpRegWrite   = Signal()
+            self.fpIssue            = Signal() # The instruction in decode moves on to EX
+            self.fpWriteEnable      = Signal()
+            self.fpWriteAddr        = Signal(addrBits)
+            self.fpUnitWriteEnable  = Signal()
+            self.fpUnitWriteAddr    = Signal(addrBits)
+
         self.IF_stall           = Signal()
         self.IF_ID_stall        = Signal()
         self.ID_EX_flush        = Signal()
@@ -20,15 +58,63 @@ class HazardUnit(Elaboratable):
     def elaborate(self, platform):
         m = Module()
 
-        branchStall = (self.Branch & self.ID_EX_regWrite &
-            ((self.ID_EX_rd == self.IF_ID_rs1) | (self.ID_EX_rd == self.IF_ID_rs2)) |
-                self.Branch & self.EX_MEM_memToReg &
-                    ((self.EX_MEM_rd == self.IF_ID_rs1) | (self.EX_MEM_rd == self.IF_ID_rs2)))
-
-        loadStall = (self.ID_EX_memRead &
+        # NOTE: x0 never hazards - unused source operands are also presented as x0
+        ID_EX_match     = ((self.ID_EX_rd != 0) &
             ((self.ID_EX_rd == self.IF_ID_rs1) | (self.ID_EX_rd == self.IF_ID_rs2)))
+        EX_MEM_match    = ((self.EX_MEM_rd != 0) &
+            ((self.EX_MEM_rd == self.IF_ID_rs1) | (self.EX_MEM_rd == self.IF_ID_rs2)))
+
+        # Load data is valid (post-LSU) once the load reaches MEM/WB, from where it is forwarded to both
+        # EX and decode - so a load-use costs 1 stall, a load-branch 2 (1 if another instruction sits between)
+        # Branches (and JALR) are resolved in decode, where EX/MEM and MEM/WB are fully forwarded - so they
+        # only wait for values not computed yet (ALU result still in EX, load still in EX/MEM)
+        # NOTE: There is no MEM/WB case - the Regfile writes WB results through to decode in the same cycle
+        branchStall = (self.Branch & self.ID_EX_regWrite & ID_EX_match |
+            self.Branch & self.EX_MEM_memToReg & EX_MEM_match)
+
+        loadStall = self.ID_EX_memRead & self.ID_EX_regWrite & ID_EX_match
+
+        # With two memory stages, load data is only forwarded once the load reaches MEM2/WB (the LSU output is not
+        # forwarded from MEM/WB) - a load-use costs 2 stalls, and a branch also waits for a load in MEM/WB
+        # NOTE: ALU results in MEM/WB are forwarded to decode, the Regfile writes MEM2/WB results through
+        if self.pipelineDepth > 5:
+            MEM_WB_match    = ((self.MEM_WB_rd != 0) &
+                ((self.MEM_WB_rd == self.IF_ID_rs1) | (self.MEM_WB_rd == self.IF_ID_rs2)))
+            branchStall     = branchStall | self.Branch & self.MEM_WB_memToReg & MEM_WB_match
+            loadStall       = loadStall | self.EX_MEM_memToReg & EX_MEM_match
+
+        if self.dualIssue:
+            ID_EX1_match    = ((self.ID_EX1_rd != 0) &
+                ((self.ID_EX1_rd == self.IF_ID_rs1) | (self.ID_EX1_rd == self.IF_ID_rs2)))
+            pairMatch       = ((self.ID_EX_rd != 0) &
+                ((self.ID_EX_rd == self.IF_ID1_rs1) | (self.ID_EX_rd == self.IF_ID1_rs2)))
+            branchStall     = branchStall | self.Branch & self.ID_EX1_regWrite & ID_EX1_match
+            m.d.comb += self.pairStall.eq(self.ID_EX_memRead & self.ID_EX_regWrite & pairMatch)
+
+        fpStall = C(0)
+        if self.enableF:
+            pending = Array(Signal(name=f"pending{i}") for i in range(self.regCount))
+            # A register written this cycle is read through (write-through FP register file)
+            # NOTE: Each lookup goes through its own signal (operations on Array proxies would expand per element)
+            def busy(addr, name):
+                pendingBit = Signal(name=f"{name}Pending")
+                m.d.comb += pendingBit.eq(pending[addr])
+                return pendingBit & ~(self.fpWriteEnable & (self.fpWriteAddr == addr)) & \
+                    ~(self.fpUnitWriteEnable & (self.fpUnitWriteAddr == addr))
+            fpStall = (self.IF_ID_usesFrs1 & busy(self.IF_ID_frs1, "frs1") |
+                self.IF_ID_usesFrs2 & busy(self.IF_ID_frs2, "frs2") |
+                self.IF_ID_usesFrs3 & busy(self.IF_ID_frs3, "frs3") |
+                self.IF_ID_fpRegWrite & busy(self.IF_ID_frd, "frd"))
+
+            # NOTE: An issue and a write of the same register in the same cycle leave it pending (issue is last)
+            with m.If(self.fpWriteEnable):
+                m.d.sync += pending[self.fpWriteAddr].eq(0)
+            with m.If(self.fpUnitWriteEnable):
+                m.d.sync += pending[self.fpUnitWriteAddr].eq(0)
+            with m.If(self.fpIssue & self.IF_ID_fpRegWrite):
+                m.d.sync += pending[self.IF_ID_frd].eq(1)
 
-        with m.If(branchStall | loadStall):
+        with m.If(branchStall | loadStall | fpStall):
                 m.d.comb += [
                     self.IF_stall.eq(1),
                     self.IF_ID_stall.eq(1),
@@ -0,0 +1,151 @@
+from functools import reduce
+from nmigen import *
+from .utils import *
+from .types import *
+
+# Set-associative (read-only) instruction cache between the core's fetch port and a slower memory
+# NOTE: "size" and "lineSize" are in bytes - they (and "ways") should be powers of 2
+#       The fetch address is looked up the cycle after it is presented (i.e. like a synchronous RAM)
+#       On a miss, "ready" is held low while the line is refilled (one word per request) via the refill port
+class InstructionCache(Elaboratable):
+    def __init__(self, size, lineSize, ways, replacement=CacheReplacement.LRU):
+        self.ways           = ways
+        self.replacement    = replacement
+        self.sets           = size // (lineSize * ways)
+        self.wordsPerLine   = lineSize // 4
+        self.wordBits       = ceilLog2(self.wordsPerLine) if self.wordsPerLine > 1 else 0
+        self.indexBits      = ceilLog2(self.sets) if self.sets > 1 else 0
+        self.wayBits        = ceilLog2(ways)
+        self.tagBits        = 32 - 2 - self.wordBits - self.indexBits
+
+        # Fetch port
+        self.addr           = Signal(32)
+        self.data           = Signal(32)
+        self.ready          = Signal()
+
+        # Refill port
+        self.refillReq      = Signal()
+        self.refillAddr     = Signal(32)
+        self.refillData     = Signal(32)
+        self.refillValid    = Signal()
+
+        # Statistics
+        self.hits           = Signal(32)
+        self.misses         = Signal(32)
+
+        # Per-way storage - tag entry layout: (valid | tag)
+        self.tags           = [Memory(width=1+self.tagBits, depth=self.sets) for _ in range(ways)]
+        self.lines          = [Memory(width=32, depth=self.sets*self.wordsPerLine) for _ in range(ways)]
+        # Per-set replacement state (LRU: one age per way, MRU way is 0 - FIFO: next way to replace)
+        if replacement == CacheReplacement.LRU:
+            self.ages       = Memory(width=ways*self.wayBits, depth=self.sets,
+                init=[sum(way << (way*self.wayBits) for way in range(ways))] * self.sets)
+        elif replacement == CacheReplacement.FIFO:
+            self.fifo       = Memory(width=self.wayBits, depth=self.sets)
+
+    def addrWord(self, addr):
+        return addr[2:2+self.wordBits]
+
+    def addrIndex(self, addr):
+        return addr[2+self.wordBits:2+self.wordBits+self.indexBits]
+
+    def addrTag(self, addr):
+        return addr[2+self.wordBits+self.indexBits:]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        reqAddr     = Signal(32)
+        reqValid    = Signal()
+        refilled    = Signal()
+        victim      = Signal(self.wayBits)
+        refillWay   = Signal(self.wayBits)
+        refillWord  = Signal(max(self.wordBits, 1))
+        hitWays     = Signal(self.ways)
+        hitWay      = Signal(self.wayBits)
+
+        index   = self.addrIndex(reqAddr)
+        tag     = self.addrTag(reqAddr)
+        # NOTE: Cat() of empty slices is fine for direct-mapped/single-word-line configs
+        wordIdx = Cat(self.addrWord(reqAddr), index)
+        hit     = hitWays.any()
+
+        # Lookup
+        for way in range(self.ways):
+            entry = self.tags[way][index]
+            m.d.comb += hitWays[way].eq(entry[0] & (entry[1:] == tag))
+            with m.If(hitWays[way]):
+                m.d.comb += hitWay.eq(way)
+        m.d.comb += self.data.eq(reduce(lambda a, b: a | b,
+            [Mux(hitWays[way], self.lines[way][wordIdx], 0) for way in range(self.ways)]))
+
+        # Victim selection - an invalid way first, otherwise per the replacement policy
+        # LRU update - the accessed way becomes MRU (age 0), younger ways age by one
+        lruUpdate = []
+        if self.ways > 1:
+            invalidWays = Cat(~self.tags[way][index][0] for way in range(self.ways))
+            if self.replacement == CacheReplacement.LRU:
+                ages    = self.ages[index]
+                age     = lambda way: ages[way*self.wayBits:(way+1)*self.wayBits]
+                hitAge  = Signal(self.wayBits)
+                for way in range(self.ways):
+                    with m.If(age(way) == self.ways - 1):
+                        m.d.comb += victim.eq(way)
+                    with m.If(hitWay == way):
+                        m.d.comb += hitAge.eq(age(way))
+                lruUpdate = [self.ages[index].eq(Cat(
+                    Mux(hitWay == way, 0, Mux(age(way) < hitAge, age(way) + 1, age(way)))[:self.wayBits]
+                        for way in range(self.ways)))]
+            elif self.replacement == CacheReplacement.FIFO:
+                m.d.comb += victim.eq(self.fifo[index])
+            else:
+                # Free-running counter as the (pseudo-)random source
+                counter = Signal(self.wayBits)
+                m.d.sync += counter.eq(counter + 1)
+                m.d.comb += victim.eq(counter)
+            for way in reversed(range(self.ways)):
+                with m.If(invalidWays[way]):
+                    m.d.comb += victim.eq(way)
+
+        with m.FSM():
+            with m.State("LOOKUP"):
+                with m.If(~reqValid | hit):
+                    m.d.comb += self.ready.eq(1)
+                    m.d.sync += [
+                        reqAddr.eq(self.addr),
+                        reqValid.eq(1),
+                        refilled.eq(0)
+                    ]
+                    with m.If(reqValid):
+                        m.d.sync += lruUpdate
+                        with m.If(~refilled):
+                            m.d.sync += self.hits.eq(self.hits + 1)
+                with m.Else():
+                    m.d.sync += [
+                        self.misses.eq(self.misses + 1),
+                        refillWay.eq(victim),
+                        refillWord.eq(0)
+                    ]
+                    m.next = "REFILL"
+
+            with m.State("REFILL"):
+                m.d.comb += [
+                    self.refillReq.eq(1),
+                    self.refillAddr.eq(Cat(C(0, 2), refillWord[:self.wordBits], index, tag))
+                ]
+                with m.If(self.refillValid):
+                    m.d.sync += refillWord.eq(refillWord + 1)
+                    for way in range(self.ways):
+                        with m.If(refillWay == way):
+                            m.d.sync += self.lines[way][Cat(refillWord[:self.wordBits], index)].eq(self.refillData)
+                    # Last word - the line becomes valid (and the retried lookup hits)
+                    with m.If(refillWord == self.wordsPerLine - 1):
+                        for way in range(self.ways):
+                            with m.If(refillWay == way):
+                                m.d.sync += self.tags[way][index].eq(Cat(C(1), tag))
+                        if self.replacement == CacheReplacement.FIFO:
+                            m.d.sync += self.fifo[index].eq(refillWay + 1)
+                        m.d.sync += refilled.eq(1)
+                        m.next = "LOOKUP"
+
+        return m
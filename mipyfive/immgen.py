@@ -20,9 +20,10 @@ class ImmGen(Elaboratable):
                         self.instruction[12:20], Repl(self.instruction[31], 12))
 
         with m.Switch(opcode):
-            with m.Case(Rv32iTypes.I_Jump.value, Rv32iTypes.I_Load.value, Rv32iTypes.I_Arith):
+            with m.Case(Rv32iTypes.I_Jump.value, Rv32iTypes.I_Load.value, Rv32iTypes.I_Arith,
+                Rv32fTypes.F_Load.value):
                 m.d.comb += self.imm.eq(immI)
-            with m.Case(Rv32iTypes.S.value):
+            with m.Case(Rv32iTypes.S.value, Rv32fTypes.F_Store.value):
                 m.d.comb += self.imm.eq(immS)
             with m.Case(Rv32iTypes.B.value):
                 m.d.comb += self.imm.eq(immB)
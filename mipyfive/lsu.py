@@ -1,24 +1,31 @@
 from nmigen import *
 from .types import *
 
-# Load-Store Unit really only does sign/zero extensions at the moment
+# Load-Store Unit - moves load/store data between its byte lane (per the address offset) and the low bits,
+# and sign/zero extends loads
+# NOTE: "sByteEnOut" has a bit per byte lane written by the store (accesses are assumed to be naturally aligned)
 class LSU(Elaboratable):
     def __init__(self, width):
         self.lDataIn    = Signal(width)
         self.lCtrlIn    = Signal(3)
+        self.lAddrIn    = Signal(2)
         self.sDataIn    = Signal(width)
         self.sCtrlIn    = Signal(2)
+        self.sAddrIn    = Signal(2)
         self.sDataOut   = Signal(width)
+        self.sByteEnOut = Signal(width // 8)
         self.lDataOut   = Signal(width)
 
     def elaborate(self, platform):
         m = Module()
 
         # Load logic
-        lb  = Cat(self.lDataIn[0:8], Repl(self.lDataIn[7], 24))
-        lbu = Cat(self.lDataIn[0:8], Repl(0, 24))
-        lh  = Cat(self.lDataIn[0:16], Repl(self.lDataIn[15], 16))
-        lhu = Cat(self.lDataIn[0:16], Repl(0, 16))
+        lData   = Signal.like(self.lDataIn)
+        m.d.comb += lData.eq(self.lDataIn >> Cat(C(0, 3), self.lAddrIn))
+        lb  = Cat(lData[0:8], Repl(lData[7], 24))
+        lbu = Cat(lData[0:8], Repl(0, 24))
+        lh  = Cat(lData[0:16], Repl(lData[15], 16))
+        lhu = Cat(lData[0:16], Repl(0, 16))
         with m.Switch(self.lCtrlIn):
             with m.Case(LSULoadCtrl.LSU_LB.value):
                 m.d.comb += self.lDataOut.eq(lb)
@@ -29,17 +36,27 @@ class LSU(Elaboratable):
             with m.Case(LSULoadCtrl.LSU_LHU.value):
                 m.d.comb += self.lDataOut.eq(lhu)
             with m.Default():
-                m.d.comb += self.lDataOut.eq(self.lDataIn)
+                m.d.comb += self.lDataOut.eq(lData)
 
         # Store logic
-        sb = Cat(self.sDataIn[0:8], Repl(0, 24))
-        sh = Cat(self.sDataIn[0:16], Repl(0, 16))
+        shift   = Cat(C(0, 3), self.sAddrIn)
+        sb      = Cat(self.sDataIn[0:8], Repl(0, 24)) << shift
+        sh      = Cat(self.sDataIn[0:16], Repl(0, 16)) << shift
         with m.Switch(self.sCtrlIn):
             with m.Case(LSUStoreCtrl.LSU_SB.value):
-                m.d.comb += self.sDataOut.eq(sb)
+                m.d.comb += [
+                    self.sDataOut.eq(sb),
+                    self.sByteEnOut.eq(C(0b0001, 4) << self.sAddrIn)
+                ]
             with m.Case(LSUStoreCtrl.LSU_SH.value):
-                m.d.comb += self.sDataOut.eq(sh)
+                m.d.comb += [
+                    self.sDataOut.eq(sh),
+                    self.sByteEnOut.eq(C(0b0011, 4) << self.sAddrIn)
+                ]
             with m.Default():
-                m.d.comb += self.sDataOut.eq(self.sDataIn)
+                m.d.comb += [
+                    self.sDataOut.eq(self.sDataIn),
+                    self.sByteEnOut.eq(0b1111)
+                ]
 
         return m
@@ -0,0 +1,57 @@
+from nmigen import *
+from .types import *
+from .utils import *
+
+# Pipelined RV32M multiplier (MUL/MULH/MULHSU/MULHU) - a new operation may start every cycle, its result is
+# "valid" "latency" cycles later (0 is a single-cycle, purely combinational multiply)
+# NOTE: Both operands are extended to width+1 bits (signed or unsigned per operation), so a single signed
+#       multiplier covers all four operations
+#       The product is computed up front and then passed through "latency" register stages - synthesis tools
+#       retime these into the multiplier (i.e. the pipeline registers of FPGA DSP blocks)
+class Multiplier(Elaboratable):
+    def __init__(self, width, latency=2):
+        self.width      = width
+        self.latency    = latency
+        self.aluOp      = Signal(ceilLog2(len(AluOp)))
+        self.start      = Signal()
+        self.in1        = Signal(width)
+        self.in2        = Signal(width)
+
+        self.valid      = Signal()
+        self.out        = Signal(width)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        in1Signed   = (self.aluOp == AluOp.MULH.value) | (self.aluOp == AluOp.MULHSU.value)
+        in2Signed   = self.aluOp == AluOp.MULH.value
+        a           = Signal(signed(self.width + 1))
+        b           = Signal(signed(self.width + 1))
+        product     = Signal(2 * self.width)
+        upper       = Signal()
+
+        m.d.comb += [
+            a.eq(Cat(self.in1, in1Signed & self.in1[-1])),
+            b.eq(Cat(self.in2, in2Signed & self.in2[-1])),
+            product.eq(a * b),
+            upper.eq(self.aluOp != AluOp.MUL.value)
+        ]
+
+        valid = self.start
+        for i in range(self.latency):
+            stageValid      = Signal(name=f"stageValid{i}")
+            stageProduct    = Signal.like(product, name=f"stageProduct{i}")
+            stageUpper      = Signal(name=f"stageUpper{i}")
+            m.d.sync += [
+                stageValid.eq(valid),
+                stageProduct.eq(product),
+                stageUpper.eq(upper)
+            ]
+            valid, product, upper = stageValid, stageProduct, stageUpper
+
+        m.d.comb += [
+            self.valid.eq(valid),
+            self.out.eq(Mux(upper, product[self.width:], product[:self.width]))
+        ]
+
+        return m
@@ -1,35 +1,72 @@
 from nmigen import *
 
 # Adjustable-width pipeline register
+# NOTE: Fields are plain registers - "control" ones (the default) are cleared by rst (and the domain's reset), the
+#       ones named in "dataFields" have no reset and load din whenever en is set (even while rst), i.e. they are
+#       only meaningful while the stage's control bits (valid, regWrite, memWrite...) say so
+#       They are packed into two registers, "ctrl" and "data" - dout (the fields in din's order) is an expression
+#       of those, which doutSlice slices directly
+#       A "transparent" one has no register - dout is din (control fields zero while rst, en is ignored), i.e. the
+#       two stages on either side of it are merged (see MipyfiveCore's pipelineDepth)
 class PipeReg(Elaboratable):
-    def __init__(self, **inputs):
+    def __init__(self, transparent=False, dataFields=(), **inputs):
+        self.transparent = transparent
         self.width = 0
         self.inputs = {}
-        if inputs is None:
-            self.width = 1
-        else:
-            for input in inputs.items():
-                self.inputs[str(input[0])] = (self.width, self.width+input[1])
-                self.width += input[1]
+        for input in inputs.items():
+            self.inputs[str(input[0])] = (self.width, self.width+input[1])
+            self.width += input[1]
+        unknown = [name for name in dataFields if name not in self.inputs]
+        if unknown:
+            raise ValueError(f"PipeReg has no field(s) {', '.join(unknown)} (dataFields)")
+        self.dataFields = set(dataFields)
+
+        # Each field's (register, lsb) in ctrl/data
+        self.packed = {}
+        ctrlWidth, dataWidth = 0, 0
+        for name, (lo, hi) in self.inputs.items():
+            if name in self.dataFields:
+                self.packed[name] = ("data", dataWidth)
+                dataWidth += hi - lo
+            else:
+                self.packed[name] = ("ctrl", ctrlWidth)
+                ctrlWidth += hi - lo
+
         self.din    = Signal(self.width)
         self.en     = Signal()
-        self.rst    = ResetSignal()
-        self.dout   = Signal(self.width)
-        self.reg    = Memory(width=self.width, depth=1)
+        self.rst    = Signal()
+        self.ctrl   = Signal(ctrlWidth)
+        self.data   = Signal(dataWidth, reset_less=True)
+        self.dout   = Cat(*(self.doutSlice(name) for name in self.inputs))
+
+    def dinSlice(self, din):
+        return self.din[self.inputs[din][0]:self.inputs[din][1]]
 
     def doutSlice(self, din):
-        return self.dout[self.inputs[din][0]:self.inputs[din][1]]
+        reg, lsb = self.packed[din]
+        return getattr(self, reg)[lsb:lsb + self.inputs[din][1] - self.inputs[din][0]]
 
     def elaborate(self, platform):
         m = Module()
 
-        m.d.comb += self.dout.eq(self.reg[0])
-        
-        with m.If(self.rst):
-            m.d.sync += self.reg[0].eq(0)
-        with m.Elif(self.en):
-            m.d.sync += self.reg[0].eq(self.din)
-        with m.Else():
-            m.d.sync += self.reg[0].eq(self.reg[0])
+        ctrl = Cat(*(self.dinSlice(name) for name in self.inputs if name not in self.dataFields))
+        data = Cat(*(self.dinSlice(name) for name in self.inputs if name in self.dataFields))
+
+        # NOTE: pysim can't assign zero-width signals (no control or no data fields)
+        if self.transparent:
+            if len(self.ctrl) > 0:
+                m.d.comb += self.ctrl.eq(Mux(self.rst, 0, ctrl))
+            if len(self.data) > 0:
+                m.d.comb += self.data.eq(data)
+            return m
+
+        if len(self.ctrl) > 0:
+            with m.If(self.rst):
+                m.d.sync += self.ctrl.eq(0)
+            with m.Elif(self.en):
+                m.d.sync += self.ctrl.eq(ctrl)
+        if len(self.data) > 0:
+            with m.If(self.en):
+                m.d.sync += self.data.eq(data)
 
         return m
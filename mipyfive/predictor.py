@@ -0,0 +1,41 @@
+from nmigen import *
+from .utils import *
+from .types import *
+
+# Branch History Table (BHT) of 2-bit saturating counters
+# NOTE: Indexed by the word-aligned PC (halfword-aligned with a "pcLsb" of 1, i.e. RV32C) - "entries" should be a
+#       power of 2
+class BranchPredictor(Elaboratable):
+    def __init__(self, entries, pcLsb=2):
+        self.indexBits      = ceilLog2(entries)
+        self.pcLsb          = pcLsb
+        self.fetchPc        = Signal(32)
+        self.updatePc       = Signal(32)
+        self.updateEnable   = Signal()
+        self.updateCounter  = Signal(2)
+        self.updateTaken    = Signal()
+
+        self.counter        = Signal(2)
+        self.taken          = Signal()
+        self.bht            = Memory(width=2, depth=entries, init=[BhtState.WEAK_NOT_TAKEN.value] * entries)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        fetchIndex  = self.fetchPc[self.pcLsb:self.pcLsb+self.indexBits]
+        updateIndex = self.updatePc[self.pcLsb:self.pcLsb+self.indexBits]
+
+        # Lookup (counter is carried down the pipe alongside the fetched instruction)
+        m.d.comb += [
+            self.counter.eq(self.bht[fetchIndex]),
+            self.taken.eq(self.counter[1])
+        ]
+
+        # Update (saturating increment on taken, saturating decrement on not-taken)
+        with m.If(self.updateEnable):
+            with m.If(self.updateTaken & (self.updateCounter != BhtState.STRONG_TAKEN.value)):
+                m.d.sync += self.bht[updateIndex].eq(self.updateCounter + 1)
+            with m.Elif(~self.updateTaken & (self.updateCounter != BhtState.STRONG_NOT_TAKEN.value)):
+                m.d.sync += self.bht[updateIndex].eq(self.updateCounter - 1)
+
+        return m
@@ -0,0 +1,35 @@
+from nmigen import *
+from .utils import *
+
+# Return Address Stack (RAS) - circular, so overflowing it overwrites the oldest entry
+# NOTE: "depth" should be a power of 2
+class ReturnAddressStack(Elaboratable):
+    def __init__(self, depth):
+        self.ptrBits    = ceilLog2(depth)
+        self.push       = Signal()
+        self.pop        = Signal()
+        self.pushAddr   = Signal(32)
+
+        self.top        = Signal(32)
+        self.stack      = Memory(width=32, depth=depth)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # Stack pointer always points at the current top entry
+        sp = Signal(self.ptrBits)
+
+        m.d.comb += self.top.eq(self.stack[sp])
+
+        # Pop-then-push (i.e. coroutine swap) just replaces the top entry
+        with m.If(self.push & self.pop):
+            m.d.sync += self.stack[sp].eq(self.pushAddr)
+        with m.Elif(self.push):
+            m.d.sync += [
+                sp.eq(sp + 1),
+                self.stack[(sp + 1)[:self.ptrBits]].eq(self.pushAddr)
+            ]
+        with m.Elif(self.pop):
+            m.d.sync += sp.eq(sp - 1)
+
+        return m
@@ -1,31 +1,109 @@
 from nmigen import *
 from .utils import *
 
+# NOTE: With "dualIssue", there are two more read ports (rs3/rs4 - the second issue slot's sources) and a second
+#       write port ("writeEnable2"/"writeAddr2"/"writeData2" - the second pipe's writeback), which wins when both
+#       write the same register (it holds the younger instruction - the core never pairs such instructions though)
+#       With "threads" (> 1), there is a bank of regCount registers per thread - reads are from the "readThread"
+#       bank, writes to the "writeThread" one - and each bank's x10 (a0) starts out as its thread index (hart ID), so
+#       threads starting at the same pc can tell themselves apart
+#       With "syncRead", the registers are two replicated RAMs (one per read port, both written alike) with a
+#       synchronous read - e.g. FPGA block RAMs, which cannot read asynchronously - addressed by "rs1AddrNext"/
+#       "rs2AddrNext" a cycle ahead (the sources of the instruction entering decode), rs1Addr/rs2Addr must then be
+#       the previous cycle's rs1AddrNext/rs2AddrNext - a write in that cycle (not seen by the RAM read) is bypassed
+#       from a register, one in this cycle written through as usual - not with dualIssue or threads
 class RegFile(Elaboratable):
-    def __init__(self, width, regCount):
+    def __init__(self, width, regCount, dualIssue=False, threads=1, syncRead=False):
+        if syncRead and (dualIssue or threads > 1):
+            raise ValueError("syncRead is not available with dualIssue or threads")
         self.addrBits       = ceilLog2(regCount)
+        self.regCount       = regCount
+        self.dualIssue      = dualIssue
+        self.threads        = threads
+        self.syncRead       = syncRead
         self.rs1Data        = Signal(width)
         self.rs2Data        = Signal(width)
         self.writeData      = Signal(width)
         self.writeEnable    = Signal()
-        self.regArray       = Memory(width=width, depth=regCount)
+        self.regArray       = Memory(width=width, depth=regCount * threads,
+            init=[thread if reg == 10 else 0 for thread in range(threads) for reg in range(regCount)])
         self.rs1Addr        = Signal(self.addrBits)
         self.rs2Addr        = Signal(self.addrBits)
         self.writeAddr      = Signal(self.addrBits)
+        if self.dualIssue:
+            self.rs3Data        = Signal(width)
+            self.rs4Data        = Signal(width)
+            self.rs3Addr        = Signal(self.addrBits)
+            self.rs4Addr        = Signal(self.addrBits)
+            self.writeData2     = Signal(width)
+            self.writeEnable2   = Signal()
+            self.writeAddr2     = Signal(self.addrBits)
+        if self.syncRead:
+            self.regArray2      = Memory(width=width, depth=regCount, init=[0] * regCount)
+            self.rs1AddrNext    = Signal(self.addrBits)
+            self.rs2AddrNext    = Signal(self.addrBits)
+        if self.threads > 1:
+            self.readThread     = Signal(ceilLog2(threads))
+            self.writeThread    = Signal(ceilLog2(threads))
 
     def elaborate(self, platform):
         m = Module()
 
-        with m.If((self.rs1Addr == self.writeAddr) & self.writeEnable):
-            m.d.comb += self.rs1Data.eq(self.writeData)
-        with m.Elif((self.rs1Addr == self.writeAddr) & self.writeEnable):
-            m.d.comb += self.rs2Data.eq(self.writeData)
-        with m.Else():
-            m.d.comb += [
-                self.rs1Data.eq(self.regArray[self.rs1Addr]),
-                self.rs2Data.eq(self.regArray[self.rs2Addr])
-            ]
-        with m.If(self.writeEnable):
-            m.d.sync += self.regArray[self.writeAddr].eq(self.writeData)
+        # x0 is hard-wired to zero (writes to it are dropped)
+        write   = self.writeEnable & (self.writeAddr != 0)
+        write2  = self.writeEnable2 & (self.writeAddr2 != 0) if self.dualIssue else C(0)
+        ports   = [(self.rs1Addr, self.rs1Data), (self.rs2Addr, self.rs2Data)]
+        if self.dualIssue:
+            ports += [(self.rs3Addr, self.rs3Data), (self.rs4Addr, self.rs4Data)]
+
+        # Bank selection (the register index alone without threads)
+        if self.threads > 1:
+            readBank    = lambda addr: self.readThread * self.regCount + addr
+            writeBank   = lambda addr: self.writeThread * self.regCount + addr
+            sameBank    = self.readThread == self.writeThread
+        else:
+            readBank    = writeBank = lambda addr: addr
+            sameBank    = C(1)
+
+        # Synchronous reads - a RAM per read port, a write in the read's cycle comes from "bypassData" instead
+        if self.syncRead:
+            bypassData  = Signal.like(self.writeData)
+            readData    = []
+            for i, (regArray, rsAddrNext) in enumerate([(self.regArray, self.rs1AddrNext),
+                (self.regArray2, self.rs2AddrNext)]):
+                readPort    = regArray.read_port(transparent=False)
+                writePort   = regArray.write_port()
+                bypass      = Signal(name=f"bypass{i + 1}")
+                m.submodules[f"readPort{i + 1}"]    = readPort
+                m.submodules[f"writePort{i + 1}"]   = writePort
+                m.d.comb += [
+                    readPort.addr.eq(rsAddrNext),
+                    writePort.addr.eq(self.writeAddr),
+                    writePort.data.eq(self.writeData),
+                    writePort.en.eq(write)
+                ]
+                m.d.sync += bypass.eq(write & (self.writeAddr == rsAddrNext))
+                readData.append(Mux(bypass, bypassData, readPort.data))
+            m.d.sync += bypassData.eq(self.writeData)
+
+        # Write-through - a register written this cycle reads as the new value on any port
+        for i, (rsAddr, rsData) in enumerate(ports):
+            with m.If(rsAddr == 0):
+                m.d.comb += rsData.eq(0)
+            if self.dualIssue:
+                with m.Elif(write2 & (rsAddr == self.writeAddr2)):
+                    m.d.comb += rsData.eq(self.writeData2)
+            with m.Elif(write & sameBank & (rsAddr == self.writeAddr)):
+                m.d.comb += rsData.eq(self.writeData)
+            with m.Else():
+                m.d.comb += rsData.eq(readData[i] if self.syncRead else self.regArray[readBank(rsAddr)])
+
+        # Writes (through the RAMs' write ports with syncRead)
+        if not self.syncRead:
+            with m.If(write):
+                m.d.sync += self.regArray[writeBank(self.writeAddr)].eq(self.writeData)
+            if self.dualIssue:
+                with m.If(write2):
+                    m.d.sync += self.regArray[self.writeAddr2].eq(self.writeData2)
 
         return m
@@ -67,6 +67,91 @@ class Rv32iInstructions(Enum):
     #
     JAL = (0b1101111)
 
+# RISC-V RV32M Instructions
+class Rv32mInstructions(Enum):
+    # --- R-type Instruction Formats ---
+    # (funt7) | (funct3) | (opcode)
+    #
+    MUL     = (0b0000001 << 10) | (0b000 << 7) | (0b0110011)
+    MULH    = (0b0000001 << 10) | (0b001 << 7) | (0b0110011)
+    MULHSU  = (0b0000001 << 10) | (0b010 << 7) | (0b0110011)
+    MULHU   = (0b0000001 << 10) | (0b011 << 7) | (0b0110011)
+    DIV     = (0b0000001 << 10) | (0b100 << 7) | (0b0110011)
+    DIVU    = (0b0000001 << 10) | (0b101 << 7) | (0b0110011)
+    REM     = (0b0000001 << 10) | (0b110 << 7) | (0b0110011)
+    REMU    = (0b0000001 << 10) | (0b111 << 7) | (0b0110011)
+
+# RISC-V Zba/Zbb (bit-manipulation) Instructions
+# NOTE: The unary ones (CLZ, ..., REV8) are told apart by the whole immediate field (funct12)
+class Rv32bInstructions(Enum):
+    # --- R-type Instruction Formats ---
+    # (funt7) | (funct3) | (opcode)
+    #
+    SH1ADD  = (0b0010000 << 10) | (0b010 << 7) | (0b0110011)
+    SH2ADD  = (0b0010000 << 10) | (0b100 << 7) | (0b0110011)
+    SH3ADD  = (0b0010000 << 10) | (0b110 << 7) | (0b0110011)
+    ANDN    = (0b0100000 << 10) | (0b111 << 7) | (0b0110011)
+    ORN     = (0b0100000 << 10) | (0b110 << 7) | (0b0110011)
+    XNOR    = (0b0100000 << 10) | (0b100 << 7) | (0b0110011)
+    MIN     = (0b0000101 << 10) | (0b100 << 7) | (0b0110011)
+    MINU    = (0b0000101 << 10) | (0b101 << 7) | (0b0110011)
+    MAX     = (0b0000101 << 10) | (0b110 << 7) | (0b0110011)
+    MAXU    = (0b0000101 << 10) | (0b111 << 7) | (0b0110011)
+    ROL     = (0b0110000 << 10) | (0b001 << 7) | (0b0110011)
+    ROR     = (0b0110000 << 10) | (0b101 << 7) | (0b0110011)
+    ZEXT_H  = (0b0000100 << 10) | (0b100 << 7) | (0b0110011) # rs2 = x0
+
+    # --- I-type Instruction Formats ---
+    # (funct7 or funct12) | (funct3) | (opcode)
+    #
+    RORI    = (0b0110000 << 10) | (0b101 << 7) | (0b0010011)
+    CLZ     = (0b011000000000 << 10) | (0b001 << 7) | (0b0010011)
+    CTZ     = (0b011000000001 << 10) | (0b001 << 7) | (0b0010011)
+    CPOP    = (0b011000000010 << 10) | (0b001 << 7) | (0b0010011)
+    SEXT_B  = (0b011000000100 << 10) | (0b001 << 7) | (0b0010011)
+    SEXT_H  = (0b011000000101 << 10) | (0b001 << 7) | (0b0010011)
+    ORC_B   = (0b001010000111 << 10) | (0b101 << 7) | (0b0010011)
+    REV8    = (0b011010011000 << 10) | (0b101 << 7) | (0b0010011)
+
+# RISC-V RV32F Instructions
+# NOTE: The arithmetic and int-to-float convert instructions hold the rounding mode in funct3 (given as 0 here)
+class Rv32fInstructions(Enum):
+    # --- I/S-type Instruction Formats ---
+    # (funct3) | (opcode)
+    #
+    FLW = (0b010 << 7) | (0b0000111)
+    FSW = (0b010 << 7) | (0b0100111)
+
+    # --- R-type Instruction Formats ---
+    # (funt7) | (funct3) | (opcode) - the rs2 field selects the FCVT variant
+    #
+    FADD    = (0b0000000 << 10) | (0b000 << 7) | (0b1010011)
+    FSUB    = (0b0000100 << 10) | (0b000 << 7) | (0b1010011)
+    FMUL    = (0b0001000 << 10) | (0b000 << 7) | (0b1010011)
+    FDIV    = (0b0001100 << 10) | (0b000 << 7) | (0b1010011)
+    FSQRT   = (0b0101100 << 10) | (0b000 << 7) | (0b1010011)
+    FSGNJ   = (0b0010000 << 10) | (0b000 << 7) | (0b1010011)
+    FSGNJN  = (0b0010000 << 10) | (0b001 << 7) | (0b1010011)
+    FSGNJX  = (0b0010000 << 10) | (0b010 << 7) | (0b1010011)
+    FMIN    = (0b0010100 << 10) | (0b000 << 7) | (0b1010011)
+    FMAX    = (0b0010100 << 10) | (0b001 << 7) | (0b1010011)
+    FCVT_W  = (0b1100000 << 10) | (0b000 << 7) | (0b1010011) # FCVT.W.S/FCVT.WU.S
+    FMV_X_W = (0b1110000 << 10) | (0b000 << 7) | (0b1010011)
+    FCLASS  = (0b1110000 << 10) | (0b001 << 7) | (0b1010011)
+    FEQ     = (0b1010000 << 10) | (0b010 << 7) | (0b1010011)
+    FLT     = (0b1010000 << 10) | (0b001 << 7) | (0b1010011)
+    FLE     = (0b1010000 << 10) | (0b000 << 7) | (0b1010011)
+    FCVT_S  = (0b1101000 << 10) | (0b000 << 7) | (0b1010011) # FCVT.S.W/FCVT.S.WU
+    FMV_W_X = (0b1111000 << 10) | (0b000 << 7) | (0b1010011)
+
+    # --- R4-type Instruction Formats ---
+    # (opcode)
+    #
+    FMADD   = (0b1000011)
+    FMSUB   = (0b1000111)
+    FNMSUB  = (0b1001011)
+    FNMADD  = (0b1001111)
+
 # RV32I Instruction Types
 class Rv32iTypes(Enum):
     R       = 0b0110011
@@ -81,6 +166,16 @@ class Rv32iTypes(Enum):
     U_Add   = 0b0010111
     J       = 0b1101111
 
+# RV32F Instruction Types
+class Rv32fTypes(Enum):
+    F_Load  = 0b0000111
+    F_Store = 0b0100111
+    F_Op    = 0b1010011
+    F_Madd  = 0b1000011
+    F_Msub  = 0b1000111
+    F_Nmsub = 0b1001011
+    F_Nmadd = 0b1001111
+
 # CPU control signal types
 class AluOp(Enum):
     ADD     = 0b0000
@@ -93,6 +188,79 @@ class AluOp(Enum):
     SRA     = 0b0111 # Shift Right Arithmetically
     SLT     = 0b1000 # Set if Less Than
     SLTU    = 0b1001 # Set if Less Than (Unsigned)
+    # RV32M - executed by the Multiplier/Divider instead of the ALU
+    MUL     = 0b1010 # Lower 32 bits of the product
+    MULH    = 0b1011 # Upper 32 bits (signed x signed)
+    MULHSU  = 0b1100 # Upper 32 bits (signed x unsigned)
+    MULHU   = 0b1101 # Upper 32 bits (unsigned x unsigned)
+    DIV     = 0b1110
+    DIVU    = 0b1111
+    REM     = 0b10000
+    REMU    = 0b10001
+    # Zba/Zbb
+    SH1ADD  = 0b10010 # (in1 << 1) + in2
+    SH2ADD  = 0b10011
+    SH3ADD  = 0b10100
+    ANDN    = 0b10101 # in1 & ~in2
+    ORN     = 0b10110
+    XNOR    = 0b10111
+    CLZ     = 0b11000 # Count Leading Zeros (in1)
+    CTZ     = 0b11001 # Count Trailing Zeros (in1)
+    CPOP    = 0b11010 # Count set bits (in1)
+    MIN     = 0b11011
+    MINU    = 0b11100
+    MAX     = 0b11101
+    MAXU    = 0b11110
+    ROL     = 0b11111 # Rotate Left
+    ROR     = 0b100000 # Rotate Right
+    REV8    = 0b100001 # Reverse byte order
+    ORCB    = 0b100010 # Bytes to 0x00/0xff (OR-Combine)
+    SEXTB   = 0b100011 # Sign-extend the low byte
+    SEXTH   = 0b100100 # Sign-extend the low halfword
+    ZEXTH   = 0b100101 # Zero-extend the low halfword
+
+# FP operation - executed by the unit given by FpUnit
+class FpuOp(Enum):
+    FADD        = 0b00000
+    FSUB        = 0b00001
+    FMUL        = 0b00010
+    FMADD       = 0b00011
+    FMSUB       = 0b00100
+    FNMSUB      = 0b00101
+    FNMADD      = 0b00110
+    FDIV        = 0b00111
+    FSQRT       = 0b01000
+    FSGNJ       = 0b01001
+    FSGNJN      = 0b01010
+    FSGNJX      = 0b01011
+    FMIN        = 0b01100
+    FMAX        = 0b01101
+    FCVT_W_S    = 0b01110
+    FCVT_WU_S   = 0b01111
+    FCVT_S_W    = 0b10000
+    FCVT_S_WU   = 0b10001
+    FMV_X_W     = 0b10010
+    FMV_W_X     = 0b10011
+    FEQ         = 0b10100
+    FLT         = 0b10101
+    FLE         = 0b10110
+    FCLASS      = 0b10111
+
+# FP execution units
+class FpUnit(Enum):
+    NONE    = 0b00 # Not an FP operation (incl. FLW/FSW - executed as integer loads/stores)
+    MISC    = 0b01 # Single-cycle, in EX (sign injection, min/max, compares, class, moves, converts)
+    FMA     = 0b10 # Pipelined fused multiply-add (add/sub/mul/fused multiply-adds)
+    DIVSQRT = 0b11 # Iterative divide/square root
+
+# IEEE 754 rounding modes (instruction rm field)
+class FpRoundingMode(Enum):
+    RNE = 0b000 # Round to Nearest, ties to Even
+    RTZ = 0b001 # Round towards Zero
+    RDN = 0b010 # Round Down (towards -infinity)
+    RUP = 0b011 # Round Up (towards +infinity)
+    RMM = 0b100 # Round to Nearest, ties to Max Magnitude
+    DYN = 0b111 # Dynamic (fcsr.frm)
 
 # Mem2Reg mux select types
 class Mem2RegCtrl(Enum):
@@ -105,14 +273,20 @@ class AluASrcCtrl(Enum):
     FROM_PC     = 0b10
 
 class AluBSrcCtrl(Enum):
-    FROM_RS2    = 0
-    FROM_IMM    = 1
+    FROM_RS2    = 0b00
+    FROM_IMM    = 0b01
+    FROM_FOUR   = 0b10 # Link address (PC + 4) for jumps
 
 # ALU Input Data Hazard Forward Selection mux Ctrl types
+# NOTE: EX_MEM1/MEM_WB1 are the second pipe's results (dual-issue only)
 class AluForwardCtrl(Enum):
-    NO_FWD  = 0b00
-    MEM_WB  = 0b01
-    EX_MEM  = 0b10
+    NO_FWD      = 0b000
+    MEM_WB      = 0b001
+    EX_MEM      = 0b010
+    MEM_WB_LOAD = 0b011
+    EX_MEM1     = 0b100
+    MEM_WB1     = 0b101
+    MEM2_WB     = 0b110
 
 # Load-Store Unit control types
 class LSUStoreCtrl(Enum):
@@ -131,6 +305,8 @@ class LSULoadCtrl(Enum):
 class RegfileOutForwardCtrl(Enum):
     NO_FWD  = 0
     EX_MEM  = 1
+    EX_MEM1 = 2
+    MEM_WB  = 3
 
 # Compare unit types
 class CompareTypes(Enum):
@@ -141,6 +317,19 @@ class CompareTypes(Enum):
     GREATER_EQUAL   = 0b100
     GREATER_EQUAL_U = 0b101
 
+# Branch History Table 2-bit saturating counter states
+class BhtState(Enum):
+    STRONG_NOT_TAKEN    = 0b00
+    WEAK_NOT_TAKEN      = 0b01
+    WEAK_TAKEN          = 0b10
+    STRONG_TAKEN        = 0b11
+
+# Cache replacement policies
+class CacheReplacement(Enum):
+    LRU     = 0
+    FIFO    = 1
+    RANDOM  = 2
+
 # Supported ISAs
 class CoreISAconfigs(Enum):
     RV32I   = 0
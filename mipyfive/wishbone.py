@@ -0,0 +1,280 @@
+from nmigen import *
+from nmigen.hdl.rec import *
+from .utils import *
+
+# Wishbone B4 pipelined-mode bus (32-bit data, word addressed - byte lanes via "sel")
+# NOTE: Directions are from the master's side - connect with "master.bus.connect(slave.bus)"
+# NOTE: "cti"/"bte" are the registered feedback cycle type/burst type tags (incrementing bursts use
+#       cti=0b010 and end with cti=0b111, bte=0b00 is a linear burst)
+wishboneLayout = [
+    ("adr",     30, DIR_FANOUT),
+    ("dat_w",   32, DIR_FANOUT),
+    ("dat_r",   32, DIR_FANIN),
+    ("sel",     4,  DIR_FANOUT),
+    ("cyc",     1,  DIR_FANOUT),
+    ("stb",     1,  DIR_FANOUT),
+    ("we",      1,  DIR_FANOUT),
+    ("ack",     1,  DIR_FANIN),
+    ("stall",   1,  DIR_FANIN),
+    ("cti",     3,  DIR_FANOUT),
+    ("bte",     2,  DIR_FANOUT)
+]
+
+class WishboneCti:
+    CLASSIC     = 0b000
+    INCREMENT   = 0b010
+    END         = 0b111
+
+def wrapPtr(ptr, depth):
+    return Mux(ptr == depth - 1, 0, ptr + 1)
+
+# Instruction fetch master - prefetches sequentially ahead of the core (up to "depth" reads in flight)
+# NOTE: Core side follows the core's fetch port protocol (the address is accepted when "ready", the
+#       instruction is returned with the next "ready") - a fetch that does not match the prefetched stream
+#       (i.e. a taken branch) flushes it, and restarts it from the new address (in-flight reads are dropped)
+#       Re-fetching the last returned word (i.e. while the core stalls) is served without touching the stream
+class WishboneFetchMaster(Elaboratable):
+    def __init__(self, depth=4):
+        self.depth  = depth
+
+        # Core port
+        self.addr   = Signal(32)
+        self.data   = Signal(32)
+        self.ready  = Signal()
+
+        self.bus    = Record(wishboneLayout)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        reqAddr     = Signal(32)
+        reqValid    = Signal()
+        headAddr    = Signal(32)
+        nextAddr    = Signal(32)
+        entries     = Array(Signal(32, name=f"entry{i}") for i in range(self.depth))
+        filled      = Array(Signal(name=f"filled{i}") for i in range(self.depth))
+        head        = Signal(range(self.depth))
+        fill        = Signal(range(self.depth))
+        count       = Signal(range(self.depth + 1))
+        outstanding = Signal(range(self.depth + 1))
+        drop        = Signal(range(self.depth + 1))
+        lastAddr    = Signal(32)
+        lastData    = Signal(32)
+        lastValid   = Signal()
+        issue       = Signal()
+        pop         = Signal()
+
+        ack         = self.bus.ack & (drop == 0)
+        replay      = reqValid & lastValid & (lastAddr == reqAddr)
+        # The head entry arrives this cycle - bypass the bus data
+        headAvail   = (count != 0) & (filled[head] | ack & (fill == head))
+        mismatch    = reqValid & ~replay & (headAddr != reqAddr)
+
+        m.d.comb += [
+            pop.eq(reqValid & ~replay & ~mismatch & headAvail),
+            self.ready.eq(~reqValid | replay | pop),
+            self.data.eq(Mux(replay, lastData, Mux(filled[head], entries[head], self.bus.dat_r))),
+            # Bus
+            issue.eq(self.bus.stb & ~self.bus.stall),
+            self.bus.stb.eq(~mismatch & (count != self.depth) & (outstanding != self.depth)),
+            self.bus.cyc.eq(self.bus.stb | (outstanding != 0)),
+            self.bus.adr.eq(nextAddr[2:]),
+            self.bus.sel.eq(0b1111),
+            self.bus.we.eq(0),
+            self.bus.cti.eq(WishboneCti.CLASSIC),
+            self.bus.bte.eq(0)
+        ]
+
+        with m.If(self.ready):
+            m.d.sync += [
+                reqAddr.eq(self.addr),
+                reqValid.eq(1)
+            ]
+        with m.If(pop):
+            m.d.sync += [
+                lastAddr.eq(headAddr),
+                lastData.eq(self.data),
+                lastValid.eq(1)
+            ]
+
+        m.d.sync += outstanding.eq(outstanding + issue - self.bus.ack)
+        with m.If(mismatch):
+            # Flush - every read still in flight is dropped
+            m.d.sync += [
+                drop.eq(outstanding - self.bus.ack),
+                head.eq(0),
+                fill.eq(0),
+                count.eq(0),
+                headAddr.eq(reqAddr),
+                nextAddr.eq(reqAddr)
+            ]
+            for i in range(self.depth):
+                m.d.sync += filled[i].eq(0)
+        with m.Else():
+            with m.If(self.bus.ack & (drop != 0)):
+                m.d.sync += drop.eq(drop - 1)
+            with m.Elif(self.bus.ack):
+                m.d.sync += [
+                    entries[fill].eq(self.bus.dat_r),
+                    filled[fill].eq(1),
+                    fill.eq(wrapPtr(fill, self.depth))
+                ]
+            with m.If(pop):
+                m.d.sync += [
+                    filled[head].eq(0),
+                    head.eq(wrapPtr(head, self.depth)),
+                    headAddr.eq(headAddr + 4)
+                ]
+            with m.If(issue):
+                m.d.sync += nextAddr.eq(nextAddr + 4)
+            m.d.sync += count.eq(count + issue - pop)
+
+        return m
+
+# Data master - stores are posted (the core moves on once the bus accepts them, up to "depth" in flight),
+# loads wait for their acknowledge (every earlier store is acknowledged first - the bus is in-order)
+# NOTE: Core side follows the core's data port protocol (see MipyfiveCore)
+class WishboneDataMaster(Elaboratable):
+    def __init__(self, depth=4):
+        self.depth          = depth
+
+        # Core port
+        self.addr           = Signal(32)
+        self.readEnable     = Signal()
+        self.writeEnable    = Signal()
+        self.writeData      = Signal(32)
+        self.byteEn         = Signal(4, reset=0b1111)
+        self.readData       = Signal(32)
+        self.ready          = Signal()
+
+        self.bus            = Record(wishboneLayout)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        outstanding = Signal(range(self.depth + 1))
+        loadPending = Signal()
+        respValid   = Signal()
+        respData    = Signal(32)
+        issue       = Signal()
+
+        request     = self.readEnable | self.writeEnable
+        # A pending load is the last access in flight
+        loadAck     = self.bus.ack & loadPending & ~respValid & (outstanding == 1)
+        responded   = ~loadPending | respValid | loadAck
+
+        # NOTE: "ready" does not depend on the request (the core gates its requests with it)
+        m.d.comb += [
+            self.ready.eq(responded & ~self.bus.stall & (outstanding != self.depth)),
+            self.readData.eq(Mux(respValid, respData, self.bus.dat_r)),
+            # Bus
+            issue.eq(self.bus.stb & ~self.bus.stall),
+            self.bus.stb.eq(request & responded & (outstanding != self.depth)),
+            self.bus.cyc.eq(self.bus.stb | (outstanding != 0)),
+            self.bus.adr.eq(self.addr[2:]),
+            self.bus.dat_w.eq(self.writeData),
+            self.bus.sel.eq(self.byteEn),
+            self.bus.we.eq(self.writeEnable),
+            self.bus.cti.eq(WishboneCti.CLASSIC),
+            self.bus.bte.eq(0)
+        ]
+
+        m.d.sync += outstanding.eq(outstanding + issue - self.bus.ack)
+        # Load data arriving while "ready" is low (i.e. the bus stalls the next access) is kept
+        with m.If(self.ready):
+            m.d.sync += [
+                respValid.eq(0),
+                loadPending.eq(self.readEnable)
+            ]
+        with m.Elif(loadAck):
+            m.d.sync += [
+                respValid.eq(1),
+                respData.eq(self.bus.dat_r)
+            ]
+
+        return m
+
+# Cache refill master - a read of a line-aligned address ("burstLength" words) is an incrementing burst,
+# words are returned (in order) as they are acknowledged - writes (write buffer drains, "byteEn" lanes) are posted
+# NOTE: Memory side follows the caches' memory port (i.e. SlowRAM) - a read is held (req=1) until "valid",
+#       which pulses once per word, while the burst's later words are requested
+class WishboneRefillMaster(Elaboratable):
+    def __init__(self, burstLength, depth=4):
+        self.burstLength    = burstLength
+        self.depth          = depth
+
+        # Memory port
+        self.req            = Signal()
+        self.addr           = Signal(32)
+        self.writeEnable    = Signal()
+        self.writeData      = Signal(32)
+        self.byteEn         = Signal(4, reset=0b1111)
+        self.readData       = Signal(32)
+        self.valid          = Signal()
+
+        self.bus            = Record(wishboneLayout)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        toIssue     = Signal(range(self.burstLength + 1))
+        toAck       = Signal(range(self.burstLength + 1))
+        burstAddr   = Signal(32)
+        writesOut   = Signal(range(self.depth + 1))
+        issue       = Signal()
+
+        idle        = (toIssue == 0) & (toAck == 0)
+        lineAligned = self.addr[2:2+ceilLog2(self.burstLength)] == 0 if self.burstLength > 1 else C(1)
+        startRead   = idle & self.req & ~self.writeEnable
+        startWrite  = idle & self.req & self.writeEnable & (writesOut != self.depth)
+        # Posted writes were issued first, so they are acknowledged first
+        readAck     = self.bus.ack & (writesOut == 0)
+
+        m.d.comb += [
+            issue.eq(self.bus.stb & ~self.bus.stall),
+            self.bus.cyc.eq(self.bus.stb | (writesOut != 0) | (toAck != 0)),
+            self.bus.dat_w.eq(self.writeData),
+            self.bus.sel.eq(0b1111),
+            self.bus.bte.eq(0),
+            self.readData.eq(self.bus.dat_r),
+            self.valid.eq(readAck & (toAck != 0) | startWrite & issue)
+        ]
+
+        with m.If(toIssue != 0):
+            m.d.comb += [
+                self.bus.stb.eq(1),
+                self.bus.adr.eq(burstAddr[2:]),
+                self.bus.cti.eq(Mux(toIssue == 1, WishboneCti.END, WishboneCti.INCREMENT))
+            ]
+            with m.If(issue):
+                m.d.sync += [
+                    toIssue.eq(toIssue - 1),
+                    burstAddr.eq(burstAddr + 4)
+                ]
+        with m.Elif(startRead):
+            burst = lineAligned & (self.burstLength > 1)
+            m.d.comb += [
+                self.bus.stb.eq(1),
+                self.bus.adr.eq(self.addr[2:]),
+                self.bus.cti.eq(Mux(burst, WishboneCti.INCREMENT, WishboneCti.END))
+            ]
+            with m.If(issue):
+                m.d.sync += [
+                    toIssue.eq(Mux(burst, self.burstLength - 1, 0)),
+                    toAck.eq(Mux(burst, self.burstLength, 1)),
+                    burstAddr.eq(self.addr + 4)
+                ]
+        with m.Elif(startWrite):
+            m.d.comb += [
+                self.bus.stb.eq(1),
+                self.bus.we.eq(1),
+                self.bus.adr.eq(self.addr[2:]),
+                self.bus.sel.eq(self.byteEn),
+                self.bus.cti.eq(WishboneCti.END)
+            ]
+
+        with m.If(readAck & (toAck != 0)):
+            m.d.sync += toAck.eq(toAck - 1)
+        m.d.sync += writesOut.eq(writesOut + (startWrite & issue) - (self.bus.ack & (writesOut != 0)))
+
+        return m
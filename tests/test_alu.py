@@ -3,6 +3,7 @@ import sys
 import random
 import argparse
 import unittest
+import itertools
 from nmigen import *
 from nmigen.back.pysim import *
 
@@ -69,6 +70,110 @@ def test_runner(in1, in2, aluOp):
             sim.run()
     return test
 
+# RV32I reference model (32-bit operands) - shifts only use in2's low 5 bits
+def baseModel(in1, in2, aluOp):
+    signed = lambda value: value - (1 << 32) if value & (1 << 31) else value
+    model = {
+        AluOp.ADD:      lambda: in1 + in2,
+        AluOp.SUB:      lambda: in1 - in2,
+        AluOp.AND:      lambda: in1 & in2,
+        AluOp.OR:       lambda: in1 | in2,
+        AluOp.XOR:      lambda: in1 ^ in2,
+        AluOp.SLL:      lambda: in1 << (in2 & 31),
+        AluOp.SRL:      lambda: in1 >> (in2 & 31),
+        AluOp.SRA:      lambda: signed(in1) >> (in2 & 31),
+        AluOp.SLT:      lambda: int(signed(in1) < signed(in2)),
+        AluOp.SLTU:     lambda: int(in1 < in2)
+    }
+    return model[aluOp]() & 0xffffffff
+
+# Zba/Zbb reference model (32-bit operands)
+def bitmanipModel(in1, in2, aluOp):
+    signed = lambda value: value - (1 << 32) if value & (1 << 31) else value
+    rotate = lambda value, amount: ((value >> amount) | (value << (32 - amount))) & 0xffffffff
+    sext = lambda value, bits: (value & ((1 << bits) - 1)) - ((value & (1 << (bits - 1))) << 1)
+    model = {
+        AluOp.SH1ADD:   lambda: (in1 << 1) + in2,
+        AluOp.SH2ADD:   lambda: (in1 << 2) + in2,
+        AluOp.SH3ADD:   lambda: (in1 << 3) + in2,
+        AluOp.ANDN:     lambda: in1 & ~in2,
+        AluOp.ORN:      lambda: in1 | ~in2,
+        AluOp.XNOR:     lambda: ~(in1 ^ in2),
+        AluOp.CLZ:      lambda: 32 - in1.bit_length(),
+        AluOp.CTZ:      lambda: 32 if in1 == 0 else (in1 & -in1).bit_length() - 1,
+        AluOp.CPOP:     lambda: bin(in1).count("1"),
+        AluOp.MIN:      lambda: in1 if signed(in1) < signed(in2) else in2,
+        AluOp.MINU:     lambda: min(in1, in2),
+        AluOp.MAX:      lambda: in1 if signed(in1) > signed(in2) else in2,
+        AluOp.MAXU:     lambda: max(in1, in2),
+        AluOp.ROL:      lambda: rotate(in1, (32 - (in2 & 31)) & 31),
+        AluOp.ROR:      lambda: rotate(in1, in2 & 31),
+        AluOp.REV8:     lambda: int.from_bytes(in1.to_bytes(4, "little"), "big"),
+        AluOp.ORCB:     lambda: sum(0xff << i for i in range(0, 32, 8) if (in1 >> i) & 0xff),
+        AluOp.SEXTB:    lambda: sext(in1, 8),
+        AluOp.SEXTH:    lambda: sext(in1, 16),
+        AluOp.ZEXTH:    lambda: in1 & 0xffff
+    }
+    return model[aluOp]() & 0xffffffff
+
+def test_bitmanip(operands):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            for in1, in2 in operands:
+                for aluOp in [op for op in AluOp if op.value >= AluOp.SH1ADD.value]:
+                    yield self.dut.in1.eq(in1)
+                    yield self.dut.in2.eq(in2)
+                    yield self.dut.aluOp.eq(aluOp.value)
+                    yield Delay(1e-6)
+                    self.assertEqual((yield self.dut.out), bitmanipModel(in1, in2, aluOp),
+                        f"{aluOp.name} {in1:#010x}, {in2:#010x}")
+
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# The RV32I operations, and the comparison flags of a subtraction (see compareTrue)
+def test_base(operands):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            signed = lambda value: value - (1 << 32) if value & (1 << 31) else value
+            for in1, in2 in operands:
+                for aluOp in [op for op in AluOp if op.value <= AluOp.SLTU.value]:
+                    yield self.dut.in1.eq(in1)
+                    yield self.dut.in2.eq(in2)
+                    yield self.dut.aluOp.eq(aluOp.value)
+                    yield Delay(1e-6)
+                    self.assertEqual((yield self.dut.out), baseModel(in1, in2, aluOp),
+                        f"{aluOp.name} {in1:#010x}, {in2:#010x}")
+                yield self.dut.aluOp.eq(AluOp.SUB.value)
+                yield Delay(1e-6)
+                self.assertEqual((yield self.dut.isEqual), int(in1 == in2), f"isEqual {in1:#010x}, {in2:#010x}")
+                self.assertEqual((yield self.dut.isLess), int(signed(in1) < signed(in2)),
+                    f"isLess {in1:#010x}, {in2:#010x}")
+                self.assertEqual((yield self.dut.isLessU), int(in1 < in2), f"isLessU {in1:#010x}, {in2:#010x}")
+
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
 # Define unit tests
 class TestAlu(unittest.TestCase):
     def setUp(self):
@@ -88,6 +193,21 @@ class TestAlu(unittest.TestCase):
     test_alu_srl = test_runner(int1, int2, AluOp.SRL)
     test_alu_sra = test_runner(int1, int2, AluOp.SRA)
 
+    # Shift amounts of 32 and over (only the low 5 bits count), signed/unsigned compares and flags
+    edgeValues = [0, 1, 31, 32, 0x7fffffff, 0x80000000, 0x80000001, 0xffffffff]
+    test_alu_base_edge = test_base(list(itertools.product(edgeValues, repeat=2)))
+    random.seed(0x2323)
+    test_alu_base_random = test_base([(random.getrandbits(32), random.getrandbits(32)) for _ in range(50)])
+
+class TestAluBitmanip(unittest.TestCase):
+    def setUp(self):
+        self.dut = ALU(width=32)
+
+    edgeValues = [0, 1, 0x80, 0xff, 0x8000, 0x7fffffff, 0x80000000, 0xffffffff, 0x00ff0100]
+    test_alu_bitmanip_edge = test_bitmanip([(a, b) for a in edgeValues for b in [0, 1, 31, 0x80000000, 0xffffffff]])
+    random.seed(0x2b2b)
+    test_alu_bitmanip_random = test_bitmanip([(random.getrandbits(32), random.getrandbits(32)) for _ in range(50)])
+
 parser = argparse.ArgumentParser()
 parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
 args, argv = parser.parse_known_args()
@@ -0,0 +1,259 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.types import *
+from mipyfive.dcache import *
+from mipyfive.axi import *
+from examples.common.axiram import *
+
+memDepth = 64
+
+def createSoc(master, latency, writeLatency=None, maxOutstanding=4, lite=True):
+    dut = Module()
+    dut.submodules.master   = master
+    dut.submodules.mem      = mem = AxiRAM(depth=memDepth, latency=latency, writeLatency=writeLatency,
+        maxOutstanding=maxOutstanding, lite=lite,
+        init=[random.randint(0, 4294967295) for _ in range(memDepth)])
+    dut.d.comb += master.bus.connect(mem.bus)
+    return dut
+
+def createCacheSoc(latency, writeLatency=None, **dcacheConfig):
+    dut = createSoc(AxiRefillMaster(burstLength=4), latency, writeLatency, lite=False)
+    dut.submodules.dcache = dcache = DataCache(size=64, lineSize=16, ways=2, writeBufferDepth=2, **dcacheConfig)
+    master = dut.submodules.master
+    dut.d.comb += [
+        master.req.eq(dcache.memReq),
+        master.addr.eq(dcache.memAddr),
+        master.writeEnable.eq(dcache.memWriteEnable),
+        master.writeData.eq(dcache.memWriteData),
+        master.byteEn.eq(dcache.memByteEn),
+        dcache.memReadData.eq(master.readData),
+        dcache.memValid.eq(master.valid)
+    ]
+    return dut
+
+# Fetch streams - sequential runs from random starting points, with some repeated (re-fetched) words
+def fetchStream(length):
+    addrs = []
+    while len(addrs) < length:
+        start = random.randrange(0, memDepth)
+        for i in range(random.randint(1, 12)):
+            addrs += [((start + i) % memDepth) * 4] * (2 if random.random() < 0.2 else 1)
+    return addrs[:length]
+
+# (write, addr, data, byteEn) accesses with some locality
+def accessStream(length):
+    accesses = []
+    while len(accesses) < length:
+        start = random.randrange(0, memDepth)
+        for i in range(random.randint(1, 8)):
+            write = random.random() < 0.5
+            accesses.append((write, ((start + i) % memDepth) * 4, random.randint(0, 4294967295),
+                random.choice([0b1111, 0b0001, 0b0010, 0b0100, 0b1000, 0b0011, 0b1100]) if write else 0b1111))
+    return accesses[:length]
+
+# Stores each followed by loads of the same word (right after, or after another store) - the loads must see them
+def storeLoadStream(length):
+    accesses = []
+    while len(accesses) < length:
+        addr = random.randrange(0, memDepth) * 4
+        accesses.append((True, addr, random.randint(0, 4294967295), random.choice([0b1111, 0b0001, 0b1100])))
+        if random.random() < 0.3:
+            accesses.append((True, random.randrange(0, memDepth) * 4, random.randint(0, 4294967295), 0b1111))
+        accesses.append((False, addr, 0, 0b1111))
+    return accesses[:length]
+
+# Present "addr" (core port protocol) until accepted - returns the response of the previous access
+def access(port, addr, readEnable=None, writeEnable=None):
+    yield port.addr.eq(addr)
+    if readEnable is not None:
+        yield port.readEnable.eq(readEnable)
+        yield port.writeEnable.eq(writeEnable)
+    yield Settle()
+    while not (yield port.ready):
+        yield Tick()
+        yield Settle()
+    data = yield (port.data if readEnable is None else port.readData)
+    yield Tick()
+    yield Settle()
+    return data
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def runSim(self, process):
+    global createVcd
+    global outputDir
+    sim = Simulator(self.dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(process)
+    if createVcd:
+        if not os.path.exists(outputDir):
+            os.makedirs(outputDir)
+        with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+            sim.run()
+    else:
+        sim.run()
+
+def test_fetch(addrs):
+    def test(self):
+        master = self.dut.submodules.master
+        mem = self.dut.submodules.mem
+        def process():
+            pending = None
+            for addr in addrs + [0]:
+                data = yield from access(master, addr)
+                if pending is not None:
+                    self.assertEqual(data, mem.memory._init[pending // 4])
+                pending = addr
+        runSim(self, process)
+    return test
+
+def test_fetch_throughput(length, maxCycles):
+    def test(self):
+        master = self.dut.submodules.master
+        def process():
+            cycles = 0
+            for addr in [4*i for i in range(length)]:
+                yield master.addr.eq(addr)
+                yield Settle()
+                while not (yield master.ready):
+                    yield Tick()
+                    yield Settle()
+                    cycles += 1
+                yield Tick()
+                cycles += 1
+            self.assertLessEqual(cycles, maxCycles)
+        runSim(self, process)
+    return test
+
+def test_data(accesses):
+    def test(self):
+        master = self.dut.submodules.master
+        mem = self.dut.submodules.mem
+        def process():
+            model = list(mem.memory._init)
+            expected = None
+            for write, addr, data, byteEn in accesses + [(False, 4*i, 0, 0b1111) for i in range(memDepth)]:
+                yield master.writeData.eq(data)
+                yield master.byteEn.eq(byteEn)
+                readData = yield from access(master, addr, not write, write)
+                if expected is not None:
+                    self.assertEqual(readData, expected)
+                expected = None if write else model[addr // 4]
+                if write:
+                    model[addr // 4] = sum((data if byteEn & (1 << i) else model[addr // 4]) & (0xff << 8*i)
+                        for i in range(4))
+            yield master.readEnable.eq(0)
+            yield master.writeEnable.eq(0)
+        runSim(self, process)
+    return test
+
+def test_refill(accesses):
+    def test(self):
+        dcache = self.dut.submodules.dcache
+        mem = self.dut.submodules.mem
+        def process():
+            model = list(mem.memory._init)
+            expected = None
+            for write, addr, data, byteEn in accesses + [(False, 4*i, 0, 0b1111) for i in range(memDepth)]:
+                yield dcache.writeData.eq(data)
+                yield dcache.byteEn.eq(byteEn)
+                readData = yield from access(dcache, addr, not write, write)
+                if expected is not None:
+                    self.assertEqual(readData, expected)
+                expected = None if write else model[addr // 4]
+                if write:
+                    model[addr // 4] = sum((data if byteEn & (1 << i) else model[addr // 4]) & (0xff << 8*i)
+                        for i in range(4))
+        runSim(self, process)
+    return test
+
+def test_refill_burst(latency):
+    def test(self):
+        dcache = self.dut.submodules.dcache
+        def process():
+            # A whole line is refilled as one burst - a word per cycle once the first one is back
+            yield from access(dcache, 0, True, False)
+            cycles = 0
+            while not (yield dcache.ready):
+                yield Tick()
+                yield Settle()
+                cycles += 1
+            self.assertLessEqual(cycles, latency + 4 + 1)
+        runSim(self, process)
+    return test
+
+# Define unit tests
+class TestAxiLiteFetch(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(AxiLiteFetchMaster(depth=4), latency=2)
+
+    test_fetch_random = test_fetch(fetchStream(300))
+    # Sequential fetches are back-to-back once the prefetch stream is running (the bridge adds a cycle of latency)
+    test_fetch_throughput = test_fetch_throughput(length=64, maxCycles=64 + 5)
+
+class TestAxiLiteFetchShallow(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(AxiLiteFetchMaster(depth=2), latency=3, maxOutstanding=1)
+
+    test_fetch_random = test_fetch(fetchStream(300))
+
+class TestAxiLiteData(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(AxiLiteDataMaster(depth=4), latency=2)
+
+    test_data_random = test_data(accessStream(300))
+    test_data_store_load = test_data(storeLoadStream(100))
+
+class TestAxiLiteDataShallow(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(AxiLiteDataMaster(depth=2), latency=1, maxOutstanding=1)
+
+    test_data_random = test_data(accessStream(300))
+    test_data_store_load = test_data(storeLoadStream(100))
+
+# Slow writes - a read issued while a posted write is outstanding would be performed before it (as AXI allows), so
+# the bridge must hold reads until every write has been responded to
+class TestAxiLiteDataSlowWrites(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(AxiLiteDataMaster(depth=4), latency=1, writeLatency=5)
+
+    test_data_random = test_data(accessStream(300))
+    test_data_store_load = test_data(storeLoadStream(100))
+
+class TestAxiRefill(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(latency=3)
+
+    test_refill_random = test_refill(accessStream(300))
+    test_refill_burst = test_refill_burst(latency=3)
+
+class TestAxiRefillWriteThrough(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(latency=2, writeBack=False)
+
+    test_refill_random = test_refill(accessStream(300))
+
+# Slow write responses - a refill must not overtake the (write-through) stores to its line
+class TestAxiRefillSlowWrites(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(latency=1, writeLatency=6, writeBack=False)
+
+    test_refill_random = test_refill(accessStream(300))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
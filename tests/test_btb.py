@@ -0,0 +1,77 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.btb import *
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_btb(pc, target, aliasPc):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # Empty BTB should always miss
+            yield self.dut.fetchPc.eq(pc)
+            yield Tick()
+            self.assertEqual((yield self.dut.hit), 0)
+
+            # Fill
+            yield self.dut.updatePc.eq(pc)
+            yield self.dut.updateTarget.eq(target)
+            yield self.dut.updateEnable.eq(1)
+            yield Tick()
+            yield self.dut.updateEnable.eq(0)
+            yield Tick()
+            self.assertEqual((yield self.dut.hit), 1)
+            self.assertEqual((yield self.dut.target), target)
+
+            # Same index, different tag should miss
+            yield self.dut.fetchPc.eq(aliasPc)
+            yield Tick()
+            self.assertEqual((yield self.dut.hit), 0)
+
+            # Invalidate
+            yield self.dut.fetchPc.eq(pc)
+            yield self.dut.invalidate.eq(1)
+            yield Tick()
+            yield self.dut.invalidate.eq(0)
+            yield Tick()
+            self.assertEqual((yield self.dut.hit), 0)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# Define unit tests
+class TestBtb(unittest.TestCase):
+    def setUp(self):
+        self.dut = BranchTargetBuffer(entries=8, tagBits=6)
+
+    test_btb_fill = test_btb(pc=0x14, target=0x0c, aliasPc=0x14 + (8 * 4))
+
+    randPc = random.randint(0, 1023) * 4
+    test_btb_random = test_btb(pc=randPc, target=random.randint(0, 1023) * 4, aliasPc=randPc ^ (1 << 5))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
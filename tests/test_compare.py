@@ -55,6 +55,13 @@ class TestCompare(unittest.TestCase):
     test_false_ge     = test_compare(0x00000070, 0x70000000, CompareTypes.GREATER_EQUAL.value, 0)
     test_false_geu    = test_compare(0x70000000, 0x80000000, CompareTypes.GREATER_EQUAL_U.value, 0)
 
+    # Test equal operands, same-sign and opposite-sign (signed overflow of in1 - in2) cases
+    test_ge_equal       = test_compare(0xfffffffe, 0xfffffffe, CompareTypes.GREATER_EQUAL.value, 1)
+    test_geu_equal      = test_compare(0x80000000, 0x80000000, CompareTypes.GREATER_EQUAL_U.value, 1)
+    test_lt_negative    = test_compare(0xfffffffe, 0xffffffff, CompareTypes.LESS_THAN.value, 1)
+    test_false_lt_max   = test_compare(0x7fffffff, 0x80000000, CompareTypes.LESS_THAN.value, 0)
+    test_false_ltu_max  = test_compare(0xffffffff, 0x00000001, CompareTypes.LESS_THAN_U.value, 0)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
@@ -44,6 +44,27 @@ def test_controller(instruction, aluOp, cmpType, regWrite, memWrite, memRead, me
             sim.run()
     return test
 
+def test_controller_uses(instruction, usesRs1, usesRs2):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            yield self.dut.instruction.eq(instruction)
+            yield Delay(1e-6)
+
+            self.assertEqual((yield self.dut.usesRs1), usesRs1)
+            self.assertEqual((yield self.dut.usesRs2), usesRs2)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
 # Define unit tests
 class TestController(unittest.TestCase):
     def setUp(self):
@@ -62,36 +83,37 @@ class TestController(unittest.TestCase):
             AluBSrcCtrl.FROM_IMM.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
 
     # Jump instruction tests
+    # (ALU computes the link address, i.e. PC + 4)
     test_ctrl_jal = test_controller(asm2binJ("jal", "x4", str(randImm20)),
-        AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_ZERO.value,
-            AluBSrcCtrl.FROM_IMM.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
+        AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_PC.value,
+            AluBSrcCtrl.FROM_FOUR.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_jalr = test_controller(asm2binI("jalr", "x4", "x10", str(randImm12)),
-        AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
-            AluBSrcCtrl.FROM_IMM.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
+        AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_PC.value,
+            AluBSrcCtrl.FROM_FOUR.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
 
     # Branch instruction tests
     test_ctrl_beq = test_controller(asm2binB("beq", "x23", str(randImm12), "x11"),
-        AluOp.ADD.value, CompareTypes.EQUAL.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SUB.value, CompareTypes.EQUAL.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_RS2.value, 1,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_bne = test_controller(asm2binB("bne", "x12", str(randImm12), "x1"),
-        AluOp.ADD.value, CompareTypes.NOT_EQUAL.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SUB.value, CompareTypes.NOT_EQUAL.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_RS2.value, 1,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_blt = test_controller(asm2binB("blt", "x14", str(randImm12), "x21"),
-        AluOp.ADD.value, CompareTypes.LESS_THAN.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SUB.value, CompareTypes.LESS_THAN.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_RS2.value, 1,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_bge = test_controller(asm2binB("bge", "x3", str(randImm12), "x30"),
-        AluOp.ADD.value, CompareTypes.GREATER_EQUAL.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SUB.value, CompareTypes.GREATER_EQUAL.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_RS2.value, 1,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_bltu = test_controller(asm2binB("bltu", "x9", str(randImm12), "x4"),
-        AluOp.ADD.value, CompareTypes.LESS_THAN_U.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SUB.value, CompareTypes.LESS_THAN_U.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_RS2.value, 1,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_bgeu = test_controller(asm2binB("bgeu", "x0", str(randImm12), "x0"),
-        AluOp.ADD.value, CompareTypes.GREATER_EQUAL_U.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SUB.value, CompareTypes.GREATER_EQUAL_U.value, 0, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_RS2.value, 1,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
 
@@ -128,11 +150,11 @@ class TestController(unittest.TestCase):
         AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
             AluBSrcCtrl.FROM_IMM.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_slti = test_controller(asm2binI("slti", "x2", "x14", str(randImm12)),
-        AluOp.ADD.value, CompareTypes.LESS_THAN.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SLT.value, CompareTypes.LESS_THAN.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_IMM.value, 0,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_sltiu = test_controller(asm2binI("sltiu", "x1", "x29", str(randImm12)),
-        AluOp.ADD.value, CompareTypes.LESS_THAN_U.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value,
+        AluOp.SLTU.value, CompareTypes.LESS_THAN_U.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value,
             AluASrcCtrl.FROM_RS1.value, AluBSrcCtrl.FROM_IMM.value, 0,
                 LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_xori = test_controller(asm2binI("xori", "x1", "x6", str(randImm12)),
@@ -169,10 +191,10 @@ class TestController(unittest.TestCase):
         AluOp.SLL.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
             AluBSrcCtrl.FROM_RS2.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_slt = test_controller(asm2binR("slt", "x0", "x8", "x1"),
-        AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
+        AluOp.SLT.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
             AluBSrcCtrl.FROM_RS2.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_sltu = test_controller(asm2binR("sltu", "x9", "x28", "x4"),
-        AluOp.ADD.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
+        AluOp.SLTU.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
             AluBSrcCtrl.FROM_RS2.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
     test_ctrl_xor = test_controller(asm2binR("xor", "x22", "x18", "x25"),
         AluOp.XOR.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
@@ -190,6 +212,17 @@ class TestController(unittest.TestCase):
         AluOp.AND.value, CompareTypes.EQUAL.value, 1, 0, 0, Mem2RegCtrl.FROM_ALU.value, AluASrcCtrl.FROM_RS1.value,
             AluBSrcCtrl.FROM_RS2.value, 0, LSULoadCtrl.LSU_LB.value, LSUStoreCtrl.LSU_SB.value)
 
+    # Source operand usage tests (immediate bits must not look like register reads)
+    test_ctrl_uses_add = test_controller_uses(asm2binR("add", "x1", "x2", "x3"), 1, 1)
+    test_ctrl_uses_addi = test_controller_uses(asm2binI("addi", "x4", "x1", "4"), 1, 0)
+    test_ctrl_uses_lw = test_controller_uses(asm2binI("lw", "x4", "x1", "4"), 1, 0)
+    test_ctrl_uses_jalr = test_controller_uses(asm2binI("jalr", "x1", "x5", "0"), 1, 0)
+    test_ctrl_uses_sw = test_controller_uses(asm2binS("sw", "x3", "8", "x2"), 1, 1)
+    test_ctrl_uses_beq = test_controller_uses(asm2binB("beq", "x3", "8", "x2"), 1, 1)
+    test_ctrl_uses_lui = test_controller_uses(asm2binU("lui", "x6", "12345"), 0, 0)
+    test_ctrl_uses_auipc = test_controller_uses(asm2binU("auipc", "x6", "12345"), 0, 0)
+    test_ctrl_uses_jal = test_controller_uses(asm2binJ("jal", "x1", "64"), 0, 0)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
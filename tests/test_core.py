@@ -10,24 +10,45 @@ from tests.utils import *
 from mipyfive.utils import *
 from mipyfive.core import *
 from mipyfive.types import *
+from mipyfive.icache import *
+from mipyfive.dcache import *
 from examples.common.ram import *
+from examples.common.slowram import *
+from examples.common.waitram import *
+from examples.common.wbram import *
+from mipyfive.wishbone import *
+from examples.common.axiram import *
+from mipyfive.axi import *
 
 createVcd = False
 outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
-def test_core(program):
+def test_core(program, cycles=None, expectedRegs=None, expectedFpRegs=None):
     def test(self):
         global createVcd
         global outputDir
         sim = Simulator(self.dut)
         def process():
-            # NOTE/TODO: No assertions for now - add later
-            # (i.e. test(s) will always pass - currently just using this for VCD dumping)
+            # NOTE: Programs without expectedRegs are only used for VCD dumping (always pass)
+            #       With threads, every thread's Regfile bank is checked - expectedRegs may then be a function of
+            #       the thread index
             for i in range(len(program)):
                 yield self.dut.submodules.imem.memory[i].eq(program[i])
 
-            for i in range(len(program) + 5):
+            for i in range(len(program) + 5 if cycles is None else cycles):
                 yield Tick()
 
+            if expectedRegs is not None:
+                core = self.dut.submodules.core
+                for thread in range(core.threads):
+                    regs = expectedRegs(thread) if callable(expectedRegs) else expectedRegs
+                    for reg, value in regs.items():
+                        self.assertEqual((yield core.regfile.regArray[thread * 32 + reg]), value,
+                            f"thread {thread}, x{reg}")
+            if expectedFpRegs is not None:
+                for reg, value in expectedFpRegs.items():
+                    self.assertEqual(hex((yield self.dut.submodules.core.fpregfile.regArray[reg])), hex(value),
+                        f"f{reg}")
+
         sim.add_clock(1e-6)
         sim.add_sync_process(process)
         if createVcd:
@@ -39,31 +60,600 @@ def test_core(program):
             sim.run()
     return test
 
-# Define unit tests
-class TestCore(unittest.TestCase):
-    def setUp(self):
-        self.dut  = Module()
-        self.dut.submodules.core = MipyfiveCore(dataWidth=32, regCount=32, pcStart=-4, ISA=CoreISAconfigs.RV32I.value)
-        self.dut.submodules.imem = RAM(width=32, depth=128, wordAligned=True)
-        self.dut.submodules.dmem = RAM(width=32, depth=128)
+# NOTE: With an icacheConfig/dcacheConfig (InstructionCache/DataCache args), instructions/data go through a
+#       cache backed by a slow (imemLatency/dmemLatency) memory
+#       With imemMaxWait/dmemMaxWait, the imem/dmem insert 0 to maxWait (pseudo-random) wait states per access
+def createSoc(icacheConfig=None, dcacheConfig=None, imemLatency=2, dmemLatency=2, imemMaxWait=None,
+    dmemMaxWait=None, seed=0xace1, wishboneLatency=None, wishboneStall=False, axiLatency=None,
+    ISA=CoreISAconfigs.RV32I.value, **coreConfig):
+    dut = Module()
+    dut.submodules.core = MipyfiveCore(dataWidth=32, regCount=32, pcStart=-4, ISA=ISA, **coreConfig)
 
-        self.dut.d.comb += [
+    if wishboneLatency is not None:
+        dut.submodules.fetch = WishboneFetchMaster(depth=wishboneLatency + 1)
+        dut.submodules.imem = WishboneRAM(depth=128, latency=wishboneLatency, randomStall=wishboneStall, seed=seed)
+        dut.d.comb += [
+            # fetch master connections
+            dut.submodules.fetch.addr.eq(dut.submodules.core.PCout),
+            dut.submodules.fetch.bus.connect(dut.submodules.imem.bus),
+            # core connections
+            dut.submodules.core.instruction.eq(dut.submodules.fetch.data),
+            dut.submodules.core.instructionReady.eq(dut.submodules.fetch.ready)
+        ]
+    elif axiLatency is not None:
+        dut.submodules.fetch = AxiLiteFetchMaster(depth=axiLatency + 2)
+        dut.submodules.imem = AxiRAM(depth=128, latency=axiLatency, lite=True)
+        dut.d.comb += [
+            # fetch master connections
+            dut.submodules.fetch.addr.eq(dut.submodules.core.PCout),
+            dut.submodules.fetch.bus.connect(dut.submodules.imem.bus),
+            # core connections
+            dut.submodules.core.instruction.eq(dut.submodules.fetch.data),
+            dut.submodules.core.instructionReady.eq(dut.submodules.fetch.ready)
+        ]
+    elif imemMaxWait is not None:
+        # NOTE: With dual-issue, the (word-addressed) RAM holds 64-bit pairs - it is given the pair's index as a word
+        dualIssue = coreConfig.get("dualIssue", False)
+        dut.submodules.imem = WaitStateRAM(width=64 if dualIssue else 32, depth=64 if dualIssue else 128,
+            maxWait=imemMaxWait, seed=seed)
+        dut.d.comb += [
+            # imem connections (fetch always requests)
+            dut.submodules.imem.req.eq(1),
+            dut.submodules.imem.addr.eq(dut.submodules.core.PCout[1:] if dualIssue else dut.submodules.core.PCout),
+            dut.submodules.imem.writeEnable.eq(0),
+            # core connections
+            dut.submodules.core.instruction.eq(dut.submodules.imem.readData),
+            dut.submodules.core.instructionReady.eq(dut.submodules.imem.ready)
+        ]
+    elif coreConfig.get("dualIssue", False):
+        # NOTE: A dual-issue core fetches 64-bit (8-byte aligned) pairs - programs are given as packWords()
+        dut.submodules.imem = RAM(width=64, depth=64)
+        dut.d.comb += [
+            # imem connections
+            dut.submodules.imem.writeEnable.eq(0),
+            dut.submodules.imem.writeData.eq(0),
+            dut.submodules.imem.readAddr.eq(dut.submodules.core.PCout[3:]),
+            dut.submodules.imem.writeAddr.eq(0),
+            # core connections
+            dut.submodules.core.instruction.eq(dut.submodules.imem.readData)
+        ]
+    elif icacheConfig is None:
+        dut.submodules.imem = RAM(width=32, depth=128, wordAligned=True)
+        dut.d.comb += [
             # imem connections
-            self.dut.submodules.imem.writeEnable.eq(0),
-            self.dut.submodules.imem.writeData.eq(0),
-            self.dut.submodules.imem.readAddr.eq(self.dut.submodules.core.PCout),
-            self.dut.submodules.imem.writeAddr.eq(0),
+            dut.submodules.imem.writeEnable.eq(0),
+            dut.submodules.imem.writeData.eq(0),
+            dut.submodules.imem.readAddr.eq(dut.submodules.core.PCout),
+            dut.submodules.imem.writeAddr.eq(0),
+            # core connections
+            dut.submodules.core.instruction.eq(dut.submodules.imem.readData)
+        ]
+    else:
+        dut.submodules.icache = InstructionCache(**icacheConfig)
+        dut.submodules.imem = SlowRAM(width=32, depth=128, latency=imemLatency)
+        dut.d.comb += [
+            # icache connections
+            dut.submodules.icache.addr.eq(dut.submodules.core.PCout),
+            dut.submodules.imem.req.eq(dut.submodules.icache.refillReq),
+            dut.submodules.imem.addr.eq(dut.submodules.icache.refillAddr),
+            dut.submodules.icache.refillData.eq(dut.submodules.imem.readData),
+            dut.submodules.icache.refillValid.eq(dut.submodules.imem.valid),
+            # core connections
+            dut.submodules.core.instruction.eq(dut.submodules.icache.data),
+            dut.submodules.core.instructionReady.eq(dut.submodules.icache.ready)
+        ]
+
+    if wishboneLatency is not None:
+        dut.submodules.data = WishboneDataMaster(depth=wishboneLatency + 1)
+        dut.submodules.dmem = WishboneRAM(depth=128, latency=wishboneLatency, randomStall=wishboneStall,
+            seed=seed ^ 0xffff)
+        dut.d.comb += [
+            # data master connections
+            dut.submodules.data.addr.eq(dut.submodules.core.DataAddr),
+            dut.submodules.data.readEnable.eq(dut.submodules.core.DataRE),
+            dut.submodules.data.writeEnable.eq(dut.submodules.core.DataWE),
+            dut.submodules.data.writeData.eq(dut.submodules.core.DataOut),
+            dut.submodules.data.byteEn.eq(dut.submodules.core.DataByteEn),
+            dut.submodules.data.bus.connect(dut.submodules.dmem.bus),
+            # core connections
+            dut.submodules.core.DataIn.eq(dut.submodules.data.readData),
+            dut.submodules.core.DataReady.eq(dut.submodules.data.ready)
+        ]
+    elif axiLatency is not None:
+        dut.submodules.data = AxiLiteDataMaster(depth=axiLatency + 2)
+        # NOTE: Slower writes, so loads issued while a store is posted would be performed before it on the bus
+        dut.submodules.dmem = AxiRAM(depth=128, latency=axiLatency, writeLatency=axiLatency + 2, lite=True)
+        dut.d.comb += [
+            # data master connections
+            dut.submodules.data.addr.eq(dut.submodules.core.DataAddr),
+            dut.submodules.data.readEnable.eq(dut.submodules.core.DataRE),
+            dut.submodules.data.writeEnable.eq(dut.submodules.core.DataWE),
+            dut.submodules.data.writeData.eq(dut.submodules.core.DataOut),
+            dut.submodules.data.byteEn.eq(dut.submodules.core.DataByteEn),
+            dut.submodules.data.bus.connect(dut.submodules.dmem.bus),
+            # core connections
+            dut.submodules.core.DataIn.eq(dut.submodules.data.readData),
+            dut.submodules.core.DataReady.eq(dut.submodules.data.ready)
+        ]
+    elif dmemMaxWait is not None:
+        # NOTE: Seeded differently from the imem, so both ports' wait states are independent
+        dut.submodules.dmem = WaitStateRAM(width=32, depth=128, maxWait=dmemMaxWait, seed=seed ^ 0xffff)
+        dut.d.comb += [
+            # dmem connections
+            dut.submodules.dmem.req.eq(dut.submodules.core.DataRE | dut.submodules.core.DataWE),
+            dut.submodules.dmem.addr.eq(dut.submodules.core.DataAddr),
+            dut.submodules.dmem.writeEnable.eq(dut.submodules.core.DataWE),
+            dut.submodules.dmem.writeData.eq(dut.submodules.core.DataOut),
+            dut.submodules.dmem.byteEnable.eq(dut.submodules.core.DataByteEn),
+            # core connections
+            dut.submodules.core.DataIn.eq(dut.submodules.dmem.readData),
+            dut.submodules.core.DataReady.eq(dut.submodules.dmem.ready)
+        ]
+    elif dcacheConfig is None:
+        dut.submodules.dmem = RAM(width=32, depth=128, wordAligned=True)
+        dut.d.comb += [
             # dmem connections
-            self.dut.submodules.dmem.writeEnable.eq(self.dut.submodules.core.DataWE),
-            self.dut.submodules.dmem.writeData.eq(self.dut.submodules.core.DataOut),
-            self.dut.submodules.dmem.readAddr.eq(self.dut.submodules.core.DataAddr),
-            self.dut.submodules.dmem.writeAddr.eq(self.dut.submodules.core.DataAddr),
+            dut.submodules.dmem.writeEnable.eq(dut.submodules.core.DataWE),
+            dut.submodules.dmem.writeData.eq(dut.submodules.core.DataOut),
+            dut.submodules.dmem.byteEnable.eq(dut.submodules.core.DataByteEn),
+            dut.submodules.dmem.readAddr.eq(dut.submodules.core.DataAddr),
+            dut.submodules.dmem.writeAddr.eq(dut.submodules.core.DataAddr),
             # core connections
-            self.dut.submodules.core.instruction.eq(self.dut.submodules.imem.readData),
-            self.dut.submodules.core.DataIn.eq(self.dut.submodules.dmem.readData)
+            dut.submodules.core.DataIn.eq(dut.submodules.dmem.readData)
         ]
+    else:
+        dut.submodules.dcache = DataCache(**dcacheConfig)
+        dut.submodules.dmem = SlowRAM(width=32, depth=128, latency=dmemLatency)
+        dut.d.comb += [
+            # dcache connections
+            dut.submodules.dcache.addr.eq(dut.submodules.core.DataAddr),
+            dut.submodules.dcache.readEnable.eq(dut.submodules.core.DataRE),
+            dut.submodules.dcache.writeEnable.eq(dut.submodules.core.DataWE),
+            dut.submodules.dcache.writeData.eq(dut.submodules.core.DataOut),
+            dut.submodules.dcache.byteEn.eq(dut.submodules.core.DataByteEn),
+            dut.submodules.dmem.req.eq(dut.submodules.dcache.memReq),
+            dut.submodules.dmem.addr.eq(dut.submodules.dcache.memAddr),
+            dut.submodules.dmem.writeEnable.eq(dut.submodules.dcache.memWriteEnable),
+            dut.submodules.dmem.writeData.eq(dut.submodules.dcache.memWriteData),
+            dut.submodules.dmem.byteEnable.eq(dut.submodules.dcache.memByteEn),
+            dut.submodules.dcache.memReadData.eq(dut.submodules.dmem.readData),
+            dut.submodules.dcache.memValid.eq(dut.submodules.dmem.valid),
+            # core connections
+            dut.submodules.core.DataIn.eq(dut.submodules.dcache.readData),
+            dut.submodules.core.DataReady.eq(dut.submodules.dcache.ready)
+        ]
+    return dut
+
+# Nested loop (taken/not-taken branch mix) - x3 counts total inner loop iterations
+loopProgram = '''
+    addi   x1, x0, 3
+    addi   x3, x0, 0
+    addi   x2, x0, 4
+    addi   x3, x3, 1
+    addi   x2, x2, -1
+    bne    x2, -8, x0
+    addi   x1, x1, -1
+    bne    x1, -20, x0
+    addi   x4, x3, 100
+    beq    x0, 0, x0
+'''
+loopExpectedRegs = { 1: 0, 2: 0, 3: 12, 4: 112 }
+
+# Leaf calls followed by a recursive call chain (return address spilled to a stack at x2)
+callProgram = '''
+    addi   x10, x0, 0
+    addi   x11, x0, 5
+    addi   x2, x0, 64
+    addi   x12, x0, 4
+    jal    x1, 24
+    addi   x11, x11, -1
+    bne    x11, -8, x0
+    jal    x1, 20
+    addi   x13, x10, 0
+    beq    x0, 0, x0
+    addi   x10, x10, 3
+    jalr   x0, x1, 0
+    beq    x12, 32, x0
+    addi   x2, x2, -4
+    addi   x12, x12, -1
+    sw     x1, 0, x2
+    jal    x1, -16
+    lw     x1, x2, 0
+    addi   x2, x2, 4
+    addi   x10, x10, 1
+    jalr   x0, x1, 0
+'''
+callExpectedRegs = { 1: 32, 2: 64, 10: 19, 11: 0, 12: 0, 13: 19 }
+
+# JAL/JALR - indirect call through a just-computed pointer, forward/backward jumps and links
+jumpProgram = '''
+    addi   x5, x0, 28
+    jalr   x1, x5, 0
+    addi   x6, x6, 1
+    jal    x0, 12
+    addi   x7, x0, 99
+    addi   x7, x0, 98
+    beq    x0, 0, x0
+    addi   x6, x0, 10
+    jal    x3, 4
+    jalr   x0, x1, 0
+'''
+jumpExpectedRegs = { 1: 8, 3: 36, 5: 28, 6: 11, 7: 0 }
+
+# A callee returning past its call's successor (the RAS-predicted return is wrong) through an odd link and offset
+returnSkipProgram = '''
+    addi   x5, x0, 0
+    addi   x6, x0, 3
+    jal    x1, 20
+    addi   x5, x5, 100
+    addi   x6, x6, -1
+    bne    x6, -12, x0
+    beq    x0, 0, x0
+    addi   x5, x5, 1
+    addi   x1, x1, 1
+    jalr   x0, x1, 3
+'''
+returnSkipExpectedRegs = { 1: 13, 5: 3, 6: 0 }
+
+# Load-use/load-branch at distances 1-3 and a load feeding a store (loaded data is forwarded post-LSU)
+loadProgram = '''
+    addi   x1, x0, 40
+    addi   x2, x0, 7
+    sw     x2, 0, x1
+    lw     x3, x1, 0
+    addi   x4, x3, 1
+    add    x5, x3, x4
+    lw     x6, x1, 0
+    beq    x6, 8, x2
+    addi   x7, x0, 99
+    lw     x8, x1, 0
+    addi   x0, x0, 0
+    bne    x8, 8, x0
+    addi   x7, x0, 98
+    lw     x9, x1, 0
+    addi   x0, x0, 0
+    addi   x0, x0, 0
+    beq    x9, 8, x2
+    addi   x7, x0, 97
+    lw     x10, x1, 0
+    sw     x10, 4, x1
+    lw     x11, x1, 4
+    add    x12, x11, x11
+    beq    x0, 0, x0
+'''
+loadExpectedRegs = { 3: 7, 4: 8, 5: 15, 6: 7, 7: 0, 8: 7, 9: 7, 10: 7, 11: 7, 12: 14 }
+
+# Loads right after stores to the same word (and to a word stored two stores earlier)
+storeLoadProgram = '''
+    addi   x1, x0, 123
+    addi   x2, x0, 16
+    sw     x1, 0, x2
+    lw     x3, x2, 0
+    addi   x4, x0, 45
+    sw     x4, 4, x2
+    sw     x3, 8, x2
+    lw     x5, x2, 4
+    lw     x6, x2, 8
+    sb     x4, 0, x2
+    lw     x7, x2, 0
+    beq    x0, 0, x0
+'''
+storeLoadExpectedRegs = { 3: 123, 5: 45, 6: 123, 7: 45 }
+
+# Branch operands produced 3, 2 and 1 instructions earlier (MEM/WB, EX/MEM and EX at the time of decode)
+branchFwdProgram = '''
+    addi   x3, x0, 5
+    addi   x4, x0, 5
+    addi   x0, x0, 0
+    addi   x0, x0, 0
+    addi   x5, x0, 9
+    addi   x6, x0, 9
+    addi   x0, x0, 0
+    bne    x5, 8, x6
+    addi   x7, x0, 1
+    addi   x8, x0, 5
+    addi   x0, x0, 0
+    beq    x8, 8, x4
+    addi   x7, x0, 99
+    addi   x9, x0, 5
+    beq    x9, 8, x3
+    addi   x7, x0, 98
+    beq    x0, 0, x0
+'''
+branchFwdExpectedRegs = { 7: 1, 8: 5, 9: 5 }
+
+# Byte/halfword stores into a word (only their byte lanes are written) and sign/zero extended sub-word loads
+subwordProgram = '''
+    addi   x1, x0, 80
+    addi   x2, x0, -1
+    sw     x2, 0, x1
+    addi   x3, x0, 18
+    sb     x3, 1, x1
+    addi   x4, x0, 837
+    sh     x4, 2, x1
+    lw     x5, x1, 0
+    lb     x6, x1, 0
+    lbu    x7, x1, 1
+    lh     x8, x1, 2
+    lhu    x9, x1, 0
+    sb     x2, 3, x1
+    lh     x10, x1, 2
+    lb     x11, x1, 3
+    lbu    x12, x1, 2
+    sh     x0, 0, x1
+    lw     x13, x1, 0
+    beq    x0, 0, x0
+'''
+subwordExpectedRegs = { 5: 0x034512ff, 6: 0xffffffff, 7: 0x12, 8: 0x345, 9: 0x12ff, 10: 0xffffff45, 11: 0xffffffff,
+    12: 0x45, 13: 0xff450000 }
+
+# RV32M - every operation, results used right away (forwarded, by a branch, by the next multiply/divide),
+# a load feeding a multiply, division by zero and signed overflow
+mulDivProgram = '''
+    addi   x1, x0, -7
+    addi   x2, x0, 3
+    mul    x3, x1, x2
+    add    x4, x3, x3
+    mulh   x5, x1, x2
+    mulhu  x6, x1, x2
+    mulhsu x7, x1, x2
+    div    x8, x1, x2
+    rem    x9, x1, x2
+    divu   x10, x1, x2
+    remu   x11, x1, x2
+    div    x12, x1, x0
+    rem    x13, x1, x0
+    addi   x14, x0, 80
+    sw     x2, 0, x14
+    lw     x15, x14, 0
+    mul    x16, x15, x15
+    addi   x17, x0, 9
+    beq    x16, 8, x17
+    addi   x18, x0, 99
+    divu   x19, x16, x15
+    sw     x19, 4, x14
+    lw     x20, x14, 4
+    addi   x21, x0, 1
+    slli   x21, x21, 31
+    addi   x22, x0, -1
+    div    x23, x21, x22
+    rem    x24, x21, x22
+    mul    x25, x23, x22
+    beq    x0, 0, x0
+'''
+mulDivExpectedRegs = { 3: 0xffffffeb, 4: 0xffffffd6, 5: 0xffffffff, 6: 2, 7: 0xffffffff, 8: 0xfffffffe,
+    9: 0xffffffff, 10: 0x55555553, 11: 0, 12: 0xffffffff, 13: 0xfffffff9, 16: 9, 18: 0, 19: 3, 20: 3,
+    23: 0x80000000, 24: 0, 25: 0x80000000 }
+
+# Zba/Zbb - results forwarded into the next instruction, loaded operands, a load address from sh2add, a branch
+# on a cpop result
+bitmanipProgram = '''
+    addi   x1, x0, -100
+    addi   x2, x0, 37
+    sh2add x3, x2, x1
+    andn   x4, x1, x2
+    clz    x5, x2
+    ctz    x6, x1
+    cpop   x7, x1
+    min    x8, x1, x2
+    maxu   x9, x1, x2
+    lui    x10, 305418240
+    addi   x10, x10, 1656
+    rev8   x11, x10
+    rori   x12, x10, 8
+    rol    x13, x10, x2
+    sext.b x14, x1
+    zext.h x15, x1
+    orc.b  x16, x3
+    xnor   x17, x3, x3
+    sh3add x18, x17, x3
+    sw     x11, 0, x18
+    addi   x19, x0, 10
+    sh2add x20, x19, x0
+    lw     x21, x20, 0
+    ror    x22, x21, x2
+    cpop   x23, x21
+    addi   x24, x0, 16
+    beq    x23, 8, x24
+    addi   x25, x0, 99
+    sext.h x26, x21
+    beq    x0, 0, x0
+'''
+bitmanipExpectedRegs = { 3: 48, 4: 0xffffff98, 5: 26, 6: 2, 7: 28, 8: 0xffffff9c, 9: 0xffffff9c, 10: 0x12345678,
+    11: 0x78563412, 12: 0x78123456, 13: 0x468acf02, 14: 0xffffff9c, 15: 0xff9c, 16: 0xff, 17: 0xffffffff, 18: 40,
+    20: 40, 21: 0x78563412, 22: 0x93c2b1a0, 23: 13, 25: 99, 26: 0x3412 }
+
+# RV32F - FMA results used right away (by the FMA unit, an FP to integer move, a store), back-to-back divides,
+# loads/stores of FP registers, conversions (rounding modes), compares feeding a branch
+fpProgram = '''
+    lui       x1, 1069547520
+    fmv.w.x   f1, x1
+    lui       x2, 1073741824
+    fmv.w.x   f2, x2
+    fadd.s    f3, f1, f2
+    fmul.s    f4, f3, f2
+    fmadd.s   f5, f4, f2, f1
+    fmv.x.w   x3, f5
+    fdiv.s    f6, f5, f2
+    fsqrt.s   f7, f2
+    fadd.s    f8, f1, f1
+    fcvt.w.s  x4, f6
+    fcvt.w.s  x5, f6, rtz
+    flt.s     x6, f1, f8
+    fmv.x.w   x7, f7
+    addi      x8, x0, 80
+    fsw       f5, 0, x8
+    flw       f9, x8, 0
+    fsub.s    f10, f9, f5
+    fclass.s  x9, f10
+    fcvt.s.w  f11, x4
+    fsgnjn.s  f12, f11, f11
+    fmin.s    f13, f12, f1
+    fmv.x.w   x10, f13
+    lw        x11, x8, 0
+    fdiv.s    f14, f1, f2
+    fdiv.s    f15, f2, f1
+    fmv.x.w   x12, f15
+    fnmsub.s  f16, f2, f2, f1
+    fmv.x.w   x13, f16
+    fcvt.wu.s x14, f16
+    feq.s     x15, f1, f1
+    addi      x16, x0, 1
+    beq       x15, 8, x16
+    addi      x17, x0, 99
+    fsw       f15, 4, x8
+    lw        x18, x8, 4
+    beq       x0, 0, x0
+'''
+fpExpectedRegs = { 3: 0x41780000, 4: 8, 5: 7, 6: 1, 7: 0x3fb504f3, 9: 0x10, 10: 0xc1000000, 11: 0x41780000,
+    12: 0x3faaaaab, 13: 0xc0200000, 14: 0, 15: 1, 17: 0, 18: 0x3faaaaab }
+fpExpectedFpRegs = { 3: 0x40600000, 4: 0x40e00000, 5: 0x41780000, 6: 0x40f80000, 7: 0x3fb504f3, 8: 0x40400000,
+    9: 0x41780000, 10: 0, 11: 0x41000000, 12: 0xc1000000, 13: 0xc1000000, 14: 0x3f400000, 15: 0x3faaaaab,
+    16: 0xc0200000 }
+
+# RV32C - a compressed call/return (links are pc + 2), 32-bit instructions at 2 mod 4 addresses reached both
+# sequentially and as jump/branch targets (straddling two words) and a compressed branch
+# Dual-issue pairing (address: pair) - 0/4 paired, 8/12 RAW (8 alone, 12 pairs with 16 from the buffered upper
+# word), 20/24 paired, 28/32 WAW (the store at 40 sees the younger x7), 36 uses the second pipe's MEM/WB result,
+# 40 (store) alone, 44/48 load + ALU paired, 52/56 load-use in the second slot (52 alone), loop at 64 (paired body,
+# bne waits for x13 in the second pipe), a jump to a misaligned (upper word) target and a branch on a second pipe
+# result
+pairProgram = '''
+    addi   x1, x0, 5
+    addi   x2, x0, 7
+    add    x3, x1, x2
+    add    x4, x3, x1
+    addi   x5, x0, 1
+    addi   x5, x5, 2
+    auipc  x6, 0
+    addi   x7, x0, 1
+    addi   x7, x0, 2
+    add    x8, x6, x3
+    sw     x7, 0, x0
+    lw     x9, x0, 0
+    addi   x10, x0, 1
+    addi   x11, x0, 2
+    add    x12, x9, x10
+    addi   x13, x0, 4
+    addi   x14, x14, 3
+    addi   x13, x13, -1
+    bne    x13, -8, x0
+    jal    x0, 16
+    addi   x15, x0, 99
+    addi   x15, x0, 99
+    addi   x15, x0, 99
+    lui    x16, 4096
+    addi   x19, x0, 7
+    slli   x17, x16, 1
+    bne    x17, 8, x0
+    addi   x20, x0, 98
+    add    x20, x20, x16
+    beq    x0, 0, x0
+'''
+pairExpectedRegs = { 1: 5, 2: 7, 3: 12, 4: 17, 5: 3, 6: 24, 7: 2, 8: 36, 9: 2, 10: 1, 11: 2, 12: 3, 13: 0, 14: 12,
+    15: 0, 16: 4096, 17: 8192, 19: 7, 20: 4096 }
+
+# A multiply/divide is not paired - the second slot's operands would only be forwarded in its first EX cycle (12 and
+# 20 go with the next instruction instead)
+pairMulDivProgram = '''
+    addi   x1, x0, 6
+    addi   x3, x0, 7
+    mul    x4, x1, x3
+    addi   x5, x3, 1
+    div    x6, x4, x1
+    addi   x7, x4, 2
+    beq    x0, 0, x0
+'''
+pairMulDivExpectedRegs = { 1: 6, 3: 7, 4: 42, 5: 8, 6: 7, 7: 44 }
+
+# Threads (hart ID in x10) - back-to-back dependencies, a store/load-use and a branch, none of which stall
+hartProgram = '''
+    slli   x11, x10, 2
+    addi   x12, x10, 1
+    add    x13, x12, x12
+    sw     x13, 64, x11
+    lw     x14, x11, 64
+    add    x15, x14, x10
+    beq    x10, 8, x0
+    addi   x16, x0, 7
+    addi   x17, x15, 1
+    beq    x0, 0, x0
+'''
+hartExpectedRegs = lambda thread: { 10: thread, 11: 4 * thread, 12: thread + 1, 13: 2 * thread + 2,
+    14: 2 * thread + 2, 15: 3 * thread + 2, 16: 0 if thread == 0 else 7, 17: 3 * thread + 3 }
+
+compressedJumpProgram = '''
+    c.li   x5, 14
+    c.jalr x5
+    addi   x6, x6, 1
+    jal    x0, 16
+    c.li   x7, 9
+    addi   x8, x0, 5
+    c.addi x8, 1
+    c.jr   x1
+    c.li   x7, 7
+    c.bnez x8, 6
+    c.li   x7, 8
+    c.nop
+    jal    x3, 6
+    c.li   x7, 11
+    lui    x9, 4096
+    c.addi x9, 1
+    beq    x0, 0, x0
+'''
+compressedJumpExpectedRegs = { 1: 4, 3: 34, 5: 14, 6: 1, 7: 0, 8: 6, 9: 4097 }
+# NOTE: Link values (code addresses) differ once compressed
+callCompressedExpectedRegs = { reg: value for reg, value in callExpectedRegs.items() if reg != 1 }
+
+# Define unit tests
+class TestCore(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc()
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=40, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=60, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=60, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=40, expectedRegs=branchFwdExpectedRegs)
 
     # Test each instruction
+
+# Zba/Zbb on RV32I, and next to RV32M/RV32F (with branch prediction)
+class TestCoreBitmanip(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(enableZb=True)
+
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=80, expectedRegs=bitmanipExpectedRegs)
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+
+class TestCoreBitmanipFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IMF.value, enableZb=True, bhtEntries=16, btbEntries=4)
+
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=80, expectedRegs=bitmanipExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=300, expectedRegs=mulDivExpectedRegs)
+
+# RV32M with the default (2 cycle), a single-cycle and a deeper multiplier
+class TestCoreMulDiv(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IM.value)
+
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=300, expectedRegs=mulDivExpectedRegs)
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=60, expectedRegs=loadExpectedRegs)
+
+class TestCoreMulDivCombinational(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IM.value, mulLatency=0)
+
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=300, expectedRegs=mulDivExpectedRegs)
+
+class TestCoreMulDivDeep(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IMF.value, mulLatency=4, bhtEntries=16, btbEntries=4)
+
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=300, expectedRegs=mulDivExpectedRegs)
     program = '''
         addi   x1, x0, 4
         slti   x2, x1, -6
@@ -73,6 +663,478 @@ class TestCore(unittest.TestCase):
     programBinary = asm2Bin(program)
     test_core = test_core(programBinary)
 
+class TestCoreBranchPredictor(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(bhtEntries=16)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+
+class TestCoreBranchTargetBuffer(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(bhtEntries=16, btbEntries=4, btbTagBits=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=40, expectedRegs=jumpExpectedRegs)
+
+class TestCoreBranchTargetBufferOnly(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(btbEntries=4)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+
+class TestCoreReturnAddressStack(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(rasDepth=2)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=40, expectedRegs=jumpExpectedRegs)
+    test_core_return_skip = test_core(asm2Bin(returnSkipProgram), cycles=60, expectedRegs=returnSkipExpectedRegs)
+
+# Small I-cache (many misses) - the pipeline is frozen on every refill
+class TestCoreInstructionCache(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(icacheConfig={ "size": 32, "lineSize": 8, "ways": 2 }, imemLatency=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=500, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=200, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=300, expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreInstructionCacheDirectMapped(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(icacheConfig={ "size": 64, "lineSize": 16, "ways": 1 }, imemLatency=3,
+            bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=500, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+
+# Tiny D-cache (loads/stores mostly miss) - the pipeline is frozen on every refill/eviction
+class TestCoreDataCache(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(dcacheConfig={ "size": 16, "lineSize": 8, "ways": 1 }, dmemLatency=3)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=300, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=200, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=300, expectedRegs=subwordExpectedRegs)
+
+class TestCoreDataCacheWriteThrough(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(dcacheConfig={ "size": 32, "lineSize": 8, "ways": 2, "writeBack": False,
+            "writeBufferDepth": 2 }, dmemLatency=3)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=300, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=200, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=300, expectedRegs=subwordExpectedRegs)
+
+# Both caches - I-cache and D-cache misses overlap
+class TestCoreCaches(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(icacheConfig={ "size": 32, "lineSize": 8, "ways": 2 },
+            dcacheConfig={ "size": 16, "lineSize": 8, "ways": 1 }, imemLatency=2, dmemLatency=1, bhtEntries=16,
+            btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=600, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=400, expectedRegs=loadExpectedRegs)
+
+# Randomized wait states on either/both memory ports (different LFSR seeds per class)
+class TestCoreInstructionWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(imemMaxWait=3, seed=0x1d2c)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=400, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=500, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=200, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=200, expectedRegs=loadExpectedRegs)
+
+class TestCoreDataWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(dmemMaxWait=4, seed=0x7a31)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=300, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=200, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=300, expectedRegs=subwordExpectedRegs)
+
+class TestCoreWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(imemMaxWait=2, dmemMaxWait=3, seed=0x5eed, bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=400, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=600, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=200, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=400, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=200, expectedRegs=branchFwdExpectedRegs)
+
+# RV32F with the default (3 cycle) and a single-cycle FMA unit (with RV32M), and while both ports insert wait states
+class TestCoreFloat(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IF.value)
+
+    test_core_float = test_core(asm2Bin(fpProgram), cycles=300, expectedRegs=fpExpectedRegs,
+        expectedFpRegs=fpExpectedFpRegs)
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=60, expectedRegs=loadExpectedRegs)
+
+class TestCoreFloatShallow(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IMF.value, fmaLatency=1, bhtEntries=16, btbEntries=4)
+
+    test_core_float = test_core(asm2Bin(fpProgram), cycles=300, expectedRegs=fpExpectedRegs,
+        expectedFpRegs=fpExpectedFpRegs)
+
+class TestCoreFloatWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(imemMaxWait=2, dmemMaxWait=3, seed=0x0f10, ISA=CoreISAconfigs.RV32IF.value)
+
+    test_core_float = test_core(asm2Bin(fpProgram), cycles=800, expectedRegs=fpExpectedRegs,
+        expectedFpRegs=fpExpectedFpRegs)
+
+# RV32M while both ports insert wait states (multiply/divide results arriving while frozen)
+class TestCoreMulDivWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(imemMaxWait=2, dmemMaxWait=3, seed=0x6d75, ISA=CoreISAconfigs.RV32IM.value)
+
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=800, expectedRegs=mulDivExpectedRegs)
+
+class TestCoreWaitStatesAlt(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(imemMaxWait=1, dmemMaxWait=1, seed=0x0bad)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=400, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=200, expectedRegs=loadExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=200, expectedRegs=branchFwdExpectedRegs)
+
+# RV32C - the example programs compressed (see compressProgram), with prediction, wait states and Wishbone fetch
+class TestCoreCompressed(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(enableC=True)
+
+    test_core_compressed_jump = test_core(asm2BinC(compressedJumpProgram), cycles=60,
+        expectedRegs=compressedJumpExpectedRegs)
+    test_core_loop = test_core(compressProgram(asm2Bin(loopProgram)), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(compressProgram(asm2Bin(callProgram)), cycles=120,
+        expectedRegs=callCompressedExpectedRegs)
+    test_core_load = test_core(compressProgram(asm2Bin(loadProgram)), cycles=60, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(compressProgram(asm2Bin(subwordProgram)), cycles=60,
+        expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(compressProgram(asm2Bin(branchFwdProgram)), cycles=40,
+        expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreCompressedPredictors(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(enableC=True, bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_compressed_jump = test_core(asm2BinC(compressedJumpProgram), cycles=60,
+        expectedRegs=compressedJumpExpectedRegs)
+    test_core_loop = test_core(compressProgram(asm2Bin(loopProgram)), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(compressProgram(asm2Bin(callProgram)), cycles=120,
+        expectedRegs=callCompressedExpectedRegs)
+    test_core_branch_fwd = test_core(compressProgram(asm2Bin(branchFwdProgram)), cycles=40,
+        expectedRegs=branchFwdExpectedRegs)
+    test_core_call_aligned = test_core(compressProgram(asm2Bin(callProgram), alignTargets=True), cycles=120,
+        expectedRegs=callCompressedExpectedRegs)
+
+class TestCoreCompressedFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(ISA=CoreISAconfigs.RV32IMF.value, enableC=True, enableZb=True, bhtEntries=16,
+            btbEntries=4)
+
+    test_core_mul_div = test_core(compressProgram(asm2Bin(mulDivProgram)), cycles=300,
+        expectedRegs=mulDivExpectedRegs)
+    test_core_bitmanip = test_core(compressProgram(asm2Bin(bitmanipProgram)), cycles=80,
+        expectedRegs=bitmanipExpectedRegs)
+    test_core_float = test_core(compressProgram(asm2Bin(fpProgram)), cycles=300, expectedRegs=fpExpectedRegs,
+        expectedFpRegs=fpExpectedFpRegs)
+
+class TestCoreCompressedWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(enableC=True, imemMaxWait=2, dmemMaxWait=3, seed=0x2c3d, bhtEntries=16, btbEntries=4,
+            rasDepth=2)
+
+    test_core_compressed_jump = test_core(asm2BinC(compressedJumpProgram), cycles=300,
+        expectedRegs=compressedJumpExpectedRegs)
+    test_core_loop = test_core(compressProgram(asm2Bin(loopProgram)), cycles=400, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(compressProgram(asm2Bin(callProgram)), cycles=600,
+        expectedRegs=callCompressedExpectedRegs)
+    test_core_load = test_core(compressProgram(asm2Bin(loadProgram)), cycles=300, expectedRegs=loadExpectedRegs)
+
+class TestCoreCompressedWishbone(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(enableC=True, wishboneLatency=2, rasDepth=2)
+
+    test_core_compressed_jump = test_core(asm2BinC(compressedJumpProgram), cycles=200,
+        expectedRegs=compressedJumpExpectedRegs)
+    test_core_loop = test_core(compressProgram(asm2Bin(loopProgram)), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(compressProgram(asm2Bin(callProgram)), cycles=400,
+        expectedRegs=callCompressedExpectedRegs)
+    test_core_subword = test_core(compressProgram(asm2Bin(subwordProgram)), cycles=300,
+        expectedRegs=subwordExpectedRegs)
+
+# Both ports as Wishbone B4 pipelined masters (prefetching fetch, posted stores)
+# Dual-issue - on RV32I, next to RV32IMF/Zba/Zbb with all predictors, and with wait states/a data cache
+class TestCoreDualIssue(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(dualIssue=True)
+
+    test_core_pair = test_core(packWords(asm2Bin(pairProgram)), cycles=100, expectedRegs=pairExpectedRegs)
+    test_core_loop = test_core(packWords(asm2Bin(loopProgram)), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(packWords(asm2Bin(callProgram)), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(packWords(asm2Bin(jumpProgram)), cycles=40, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(packWords(asm2Bin(loadProgram)), cycles=60, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(packWords(asm2Bin(subwordProgram)), cycles=60, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(packWords(asm2Bin(branchFwdProgram)), cycles=40,
+        expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreDualIssueFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(dualIssue=True, ISA=CoreISAconfigs.RV32IMF.value, enableZb=True, bhtEntries=16,
+            btbEntries=4, rasDepth=2)
+
+    test_core_pair = test_core(packWords(asm2Bin(pairProgram)), cycles=100, expectedRegs=pairExpectedRegs)
+    test_core_call = test_core(packWords(asm2Bin(callProgram)), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_mul_div = test_core(packWords(asm2Bin(mulDivProgram)), cycles=300, expectedRegs=mulDivExpectedRegs)
+    test_core_pair_mul_div = test_core(packWords(asm2Bin(pairMulDivProgram)), cycles=80,
+        expectedRegs=pairMulDivExpectedRegs)
+    test_core_bitmanip = test_core(packWords(asm2Bin(bitmanipProgram)), cycles=80,
+        expectedRegs=bitmanipExpectedRegs)
+    test_core_float = test_core(packWords(asm2Bin(fpProgram)), cycles=300, expectedRegs=fpExpectedRegs,
+        expectedFpRegs=fpExpectedFpRegs)
+
+class TestCoreDualIssueWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(dualIssue=True, imemMaxWait=2, dcacheConfig={ "size": 16, "lineSize": 8, "ways": 1 },
+            dmemLatency=3, bhtEntries=16, btbEntries=4)
+
+    test_core_pair = test_core(packWords(asm2Bin(pairProgram)), cycles=400, expectedRegs=pairExpectedRegs)
+    test_core_call = test_core(packWords(asm2Bin(callProgram)), cycles=600, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(packWords(asm2Bin(loadProgram)), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(packWords(asm2Bin(subwordProgram)), cycles=400, expectedRegs=subwordExpectedRegs)
+
+# Barrel threading - every thread runs the program (3 threads: a thread's previous instruction writes back as it
+# decodes, more: written back earlier)
+class TestCoreThreads(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(threads=3)
+
+    test_core_hart = test_core(asm2Bin(hartProgram), cycles=60, expectedRegs=hartExpectedRegs)
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=360, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=120, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=180, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=180, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=120, expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreThreadsFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(threads=5, ISA=CoreISAconfigs.RV32IM.value, enableZb=True)
+
+    test_core_hart = test_core(asm2Bin(hartProgram), cycles=80, expectedRegs=hartExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=1500, expectedRegs=mulDivExpectedRegs)
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=400, expectedRegs=bitmanipExpectedRegs)
+
+class TestCoreThreadsWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(threads=4, imemMaxWait=2, dmemMaxWait=3, seed=0x5eed)
+
+    test_core_hart = test_core(asm2Bin(hartProgram), cycles=300, expectedRegs=hartExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=800, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=600, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=800, expectedRegs=subwordExpectedRegs)
+
+# Pipeline depth - 3 stages (no hazards - a load's data goes through to the next data request) and 7 stages (two
+# fetch and two memory stages, longer load-use/branch penalties), incl. while the memories insert wait states
+class TestCoreShallow(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=3)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=100, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=40, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=60, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=60, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=40, expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreShallowFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=3, ISA=CoreISAconfigs.RV32IM.value, enableZb=True, bhtEntries=16,
+            btbEntries=4, rasDepth=2)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=120, expectedRegs=callExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=300, expectedRegs=mulDivExpectedRegs)
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=80, expectedRegs=bitmanipExpectedRegs)
+
+class TestCoreShallowWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=3, imemMaxWait=2, dcacheConfig={ "size": 16, "lineSize": 8, "ways": 1 },
+            dmemLatency=3, ISA=CoreISAconfigs.RV32IM.value)
+
+    test_core_call = test_core(asm2Bin(callProgram), cycles=600, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=400, expectedRegs=subwordExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=900, expectedRegs=mulDivExpectedRegs)
+
+class TestCoreDeep(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=7)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=150, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=180, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=60, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=90, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=90, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=60, expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreDeepFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=7, ISA=CoreISAconfigs.RV32IM.value, enableZb=True, bhtEntries=16,
+            btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=150, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=180, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=60, expectedRegs=jumpExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=400, expectedRegs=mulDivExpectedRegs)
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=120, expectedRegs=bitmanipExpectedRegs)
+
+class TestCoreDeepWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=7, imemMaxWait=2, dmemMaxWait=3, seed=0x5eed, bhtEntries=16,
+            btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=500, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=700, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=400, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=500, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=300, expectedRegs=branchFwdExpectedRegs)
+
+# Regfile in synchronous-read RAMs (read at the IF2/ID boundary) - loads/ALU results written back while the
+# reading instruction is fetched or held in decode, incl. while the memories insert wait states
+class TestCoreBramRegfile(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=7, bramRegfile=True, ISA=CoreISAconfigs.RV32IM.value, enableZb=True,
+            bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=150, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=180, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=60, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=90, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=90, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=60, expectedRegs=branchFwdExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=400, expectedRegs=mulDivExpectedRegs)
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=120, expectedRegs=bitmanipExpectedRegs)
+
+class TestCoreBramRegfileWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(pipelineDepth=7, bramRegfile=True, imemMaxWait=2, dmemMaxWait=3, seed=0x5eed,
+            ISA=CoreISAconfigs.RV32IM.value)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=500, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=700, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=400, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=500, expectedRegs=subwordExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=1200, expectedRegs=mulDivExpectedRegs)
+
+# Branches resolved in EX - static prediction, with all predictors (and RV32IMF/Zba/Zbb, RV32C), and while the
+# memories insert wait states
+class TestCoreBranchInEx(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(branchInEx=True)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=120, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=150, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=50, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=60, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=60, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=50, expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreBranchInExFull(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(branchInEx=True, ISA=CoreISAconfigs.RV32IMF.value, enableZb=True, bhtEntries=16,
+            btbEntries=4, btbTagBits=2, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=120, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=150, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=50, expectedRegs=jumpExpectedRegs)
+    test_core_return_skip = test_core(asm2Bin(returnSkipProgram), cycles=60, expectedRegs=returnSkipExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=300, expectedRegs=mulDivExpectedRegs)
+    test_core_bitmanip = test_core(asm2Bin(bitmanipProgram), cycles=80, expectedRegs=bitmanipExpectedRegs)
+    test_core_float = test_core(asm2Bin(fpProgram), cycles=300, expectedRegs=fpExpectedRegs,
+        expectedFpRegs=fpExpectedFpRegs)
+
+class TestCoreBranchInExCompressed(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(branchInEx=True, enableC=True, bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_compressed_jump = test_core(asm2BinC(compressedJumpProgram), cycles=60,
+        expectedRegs=compressedJumpExpectedRegs)
+    test_core_loop = test_core(compressProgram(asm2Bin(loopProgram)), cycles=120, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(compressProgram(asm2Bin(callProgram)), cycles=150,
+        expectedRegs=callCompressedExpectedRegs)
+    test_core_branch_fwd = test_core(compressProgram(asm2Bin(branchFwdProgram)), cycles=50,
+        expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreBranchInExWaitStates(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(branchInEx=True, imemMaxWait=2, dmemMaxWait=3, seed=0x6e78,
+            ISA=CoreISAconfigs.RV32IM.value, bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=400, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=600, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=300, expectedRegs=branchFwdExpectedRegs)
+    test_core_mul_div = test_core(asm2Bin(mulDivProgram), cycles=900, expectedRegs=mulDivExpectedRegs)
+
+class TestCoreWishbone(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(wishboneLatency=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=400, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=200, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=200, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=300, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=200, expectedRegs=branchFwdExpectedRegs)
+
+class TestCoreWishboneStall(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(wishboneLatency=1, wishboneStall=True, seed=0x3c5a, bhtEntries=16, btbEntries=4,
+            rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=400, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=500, expectedRegs=callExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=300, expectedRegs=branchFwdExpectedRegs)
+
+# Both ports as AXI4-Lite masters
+class TestCoreAxiLite(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(axiLatency=2, bhtEntries=16, btbEntries=4, rasDepth=2)
+
+    test_core_loop = test_core(asm2Bin(loopProgram), cycles=300, expectedRegs=loopExpectedRegs)
+    test_core_call = test_core(asm2Bin(callProgram), cycles=500, expectedRegs=callExpectedRegs)
+    test_core_jump = test_core(asm2Bin(jumpProgram), cycles=200, expectedRegs=jumpExpectedRegs)
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_subword = test_core(asm2Bin(subwordProgram), cycles=300, expectedRegs=subwordExpectedRegs)
+    test_core_branch_fwd = test_core(asm2Bin(branchFwdProgram), cycles=300, expectedRegs=branchFwdExpectedRegs)
+    test_core_store_load = test_core(asm2Bin(storeLoadProgram), cycles=300, expectedRegs=storeLoadExpectedRegs)
+
+class TestCoreAxiLiteFast(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(axiLatency=1)
+
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=300, expectedRegs=loadExpectedRegs)
+    test_core_store_load = test_core(asm2Bin(storeLoadProgram), cycles=300, expectedRegs=storeLoadExpectedRegs)
+
+class TestCoreAxiLiteSlow(unittest.TestCase):
+    def setUp(self):
+        self.dut = createSoc(axiLatency=4)
+
+    test_core_load = test_core(asm2Bin(loadProgram), cycles=400, expectedRegs=loadExpectedRegs)
+    test_core_store_load = test_core(asm2Bin(storeLoadProgram), cycles=400, expectedRegs=storeLoadExpectedRegs)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
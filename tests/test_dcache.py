@@ -0,0 +1,143 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.types import *
+from mipyfive.dcache import *
+from examples.common.slowram import *
+
+memDepth = 64
+
+def createCacheSoc(size, lineSize, ways, replacement, writeBack, writeBufferDepth, latency):
+    dut = Module()
+    dut.submodules.dcache   = dcache = DataCache(size, lineSize, ways, replacement, writeBack, writeBufferDepth)
+    dut.submodules.mem      = mem = SlowRAM(width=32, depth=memDepth, latency=latency,
+        init=[random.randint(0, 4294967295) for _ in range(memDepth)])
+    dut.d.comb += [
+        mem.req.eq(dcache.memReq),
+        mem.addr.eq(dcache.memAddr),
+        mem.writeEnable.eq(dcache.memWriteEnable),
+        mem.writeData.eq(dcache.memWriteData),
+        mem.byteEnable.eq(dcache.memByteEn),
+        dcache.memReadData.eq(mem.readData),
+        dcache.memValid.eq(mem.valid)
+    ]
+    return dut
+
+# (write, addr, data, byteEn) accesses with some locality (runs from random starting points)
+# NOTE: A third of the writes are sub-word (byte/halfword lanes)
+def accessStream(length):
+    accesses = []
+    while len(accesses) < length:
+        start = random.randrange(0, memDepth)
+        for i in range(random.randint(1, 8)):
+            write = random.random() < 0.4
+            byteEn = random.choice([0b0001, 0b0010, 0b0100, 0b1000, 0b0011, 0b1100]) \
+                if write and random.random() < 0.33 else 0b1111
+            accesses.append((write, ((start + i) % memDepth) * 4, random.randint(0, 4294967295) if write else 0,
+                byteEn))
+    return accesses[:length]
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_dcache(accesses):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        dcache = self.dut.submodules.dcache
+        mem = self.dut.submodules.mem
+        def process():
+            # Each access is accepted when "ready" - read data is returned with the next "ready"
+            # NOTE: Every word is read back at the end (i.e. after evictions)
+            model = list(mem.memory._init)
+            expected = None
+            for write, addr, data, byteEn in accesses + [(False, 4*i, 0, 0b1111) for i in range(memDepth)] + \
+                [(False, 0, 0, 0b1111)]:
+                yield dcache.addr.eq(addr)
+                yield dcache.readEnable.eq(not write)
+                yield dcache.writeEnable.eq(write)
+                yield dcache.writeData.eq(data)
+                yield dcache.byteEn.eq(byteEn)
+                yield Settle()
+                while not (yield dcache.ready):
+                    yield Tick()
+                    yield Settle()
+                if expected is not None:
+                    self.assertEqual((yield dcache.readData), expected)
+                expected = None if write else model[addr // 4]
+                if write:
+                    mask = sum(0xff << (8*lane) for lane in range(4) if byteEn & (1 << lane))
+                    model[addr // 4] = (model[addr // 4] & ~mask) | (data & mask)
+                yield Tick()
+            yield dcache.readEnable.eq(0)
+
+            # Write-through - memory is up to date once the write buffer has drained
+            if not dcache.writeBack:
+                for _ in range(dcache.bufferDepth * 8):
+                    yield Tick()
+                for i in range(memDepth):
+                    self.assertEqual((yield mem.memory[i]), model[i])
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# Define unit tests
+class TestDCacheWriteBack(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=64, lineSize=16, ways=2, replacement=CacheReplacement.LRU, writeBack=True,
+            writeBufferDepth=4, latency=2)
+
+    test_dcache_random = test_dcache(accessStream(300))
+
+class TestDCacheWriteBackDirectMapped(unittest.TestCase):
+    def setUp(self):
+        # Write buffer smaller than a line - evictions wait for it to drain
+        self.dut = createCacheSoc(size=32, lineSize=8, ways=1, replacement=CacheReplacement.LRU, writeBack=True,
+            writeBufferDepth=1, latency=3)
+
+    test_dcache_random = test_dcache(accessStream(300))
+
+class TestDCacheWriteBackFIFO(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=64, lineSize=8, ways=4, replacement=CacheReplacement.FIFO, writeBack=True,
+            writeBufferDepth=2, latency=1)
+
+    test_dcache_random = test_dcache(accessStream(300))
+
+class TestDCacheWriteThrough(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=64, lineSize=16, ways=2, replacement=CacheReplacement.LRU, writeBack=False,
+            writeBufferDepth=4, latency=2)
+
+    test_dcache_random = test_dcache(accessStream(300))
+
+class TestDCacheWriteThroughRandom(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=32, lineSize=4, ways=2, replacement=CacheReplacement.RANDOM, writeBack=False,
+            writeBufferDepth=2, latency=3)
+
+    test_dcache_random = test_dcache(accessStream(300))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
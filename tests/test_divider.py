@@ -0,0 +1,99 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.divider import *
+
+def toSigned(value):
+    return value - (1 << 32) if value & (1 << 31) else value
+
+def divModel(in1, in2, aluOp):
+    '''Reference model - RV32M divide/remainder result for a pair of 32-bit register values'''
+    if aluOp in (AluOp.DIV, AluOp.REM):
+        a, b = toSigned(in1), toSigned(in2)
+    else:
+        a, b = in1, in2
+    if b == 0:
+        quotient, remainder = -1, a
+    else:
+        # Rounds towards zero (Python's // rounds towards -infinity)
+        quotient = abs(a) // abs(b) * (-1 if (a < 0) != (b < 0) else 1)
+        remainder = a - quotient * b
+    return (remainder if aluOp in (AluOp.REM, AluOp.REMU) else quotient) & 0xffffffff
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_divider(ops, maxCycles=None):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            for in1, in2, aluOp in ops:
+                yield self.dut.start.eq(1)
+                yield self.dut.in1.eq(in1)
+                yield self.dut.in2.eq(in2)
+                yield self.dut.aluOp.eq(aluOp.value)
+                yield Tick()
+                yield self.dut.start.eq(0)
+                cycles = 1
+                yield Settle()
+                while not (yield self.dut.done):
+                    self.assertEqual((yield self.dut.busy), 1)
+                    yield Tick()
+                    yield Settle()
+                    cycles += 1
+                self.assertEqual((yield self.dut.out), divModel(in1, in2, aluOp))
+                if maxCycles is not None:
+                    self.assertLessEqual(cycles, maxCycles)
+                yield Tick()
+                yield Settle()
+                self.assertEqual((yield self.dut.busy), 0)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+divOps = [AluOp.DIV, AluOp.DIVU, AluOp.REM, AluOp.REMU]
+edgeOperands = [0, 1, 2, 7, 0x7fffffff, 0x80000000, 0xfffffff9, 0xffffffff]
+
+# Define unit tests
+class TestDivider(unittest.TestCase):
+    def setUp(self):
+        self.dut = Divider(width=32)
+
+    # Incl. division by zero and signed overflow (-2^31 / -1)
+    test_divider_edge   = test_divider([(in1, in2, aluOp) for in1 in edgeOperands for in2 in edgeOperands
+        for aluOp in divOps], maxCycles=34)
+    test_divider_random = test_divider([(random.randint(0, 0xffffffff), random.randint(0, 0xffffffff),
+        random.choice(divOps)) for i in range(32)], maxCycles=34)
+    test_divider_small  = test_divider([(random.randint(0, 0xffffffff) >> random.randint(0, 31),
+        random.randint(1, 0xffffffff) >> random.randint(0, 31), random.choice(divOps)) for i in range(32)])
+
+    # Early termination - a quotient of n significant bits takes n + 2 cycles (from "start" to "done")
+    test_divider_early  = test_divider([(100, 7, AluOp.DIVU), (100, 7, AluOp.REMU), (0xfffffff9, 0xfffffff9,
+        AluOp.DIV)], maxCycles=6)
+    test_divider_larger = test_divider([(5, 7, AluOp.DIVU), (5, 7, AluOp.REM), (0, 3, AluOp.DIV),
+        (3, 0, AluOp.REMU)], maxCycles=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
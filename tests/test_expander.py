@@ -0,0 +1,125 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from tests.utils import *
+from mipyfive.utils import *
+from mipyfive.expander import *
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_expander(pairs):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            for compressed, expected in pairs:
+                yield self.dut.instruction.eq(compressed)
+                yield Delay(1e-6)
+                self.assertEqual(hex((yield self.dut.out)), hex(expected), hex(compressed))
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def randomPairs(count):
+    ''' Random RV32C instructions and the (independently assembled) 32-bit instructions they expand to '''
+    x = lambda reg: f"x{reg}"
+    f = lambda reg: f"f{reg}"
+    pairs = []
+    for _ in range(count):
+        rd, rs2 = random.randint(1, 31), random.randint(1, 31)
+        rdP, rs2P = random.randint(8, 15), random.randint(8, 15)
+        imm6 = random.choice([random.randint(-32, 31), -32, 31, -1])
+        uimm7 = random.randint(0, 31) * 4
+        uimm8 = random.randint(0, 63) * 4
+        shamt = random.randint(1, 31)
+        jOffset = random.choice([random.randint(-1024, 1023) * 2, -2048, 2046])
+        bOffset = random.choice([random.randint(-128, 127) * 2, -256, 254])
+        lui = random.choice([random.randint(1, 31), random.randint(-32, -1)])
+        sp16 = random.choice([random.randint(1, 31), random.randint(-32, -1)]) * 16
+        spn = random.randint(1, 255) * 4
+        choices = [
+            (("c.addi4spn", [x(rdP), str(spn)]), f"addi {x(rdP)}, x2, {spn}"),
+            (("c.lw", [x(rdP), x(rs2P), str(uimm7)]), f"lw {x(rdP)}, {x(rs2P)}, {uimm7}"),
+            (("c.flw", [f(rdP), x(rs2P), str(uimm7)]), f"flw {f(rdP)}, {x(rs2P)}, {uimm7}"),
+            (("c.sw", [x(rdP), str(uimm7), x(rs2P)]), f"sw {x(rdP)}, {uimm7}, {x(rs2P)}"),
+            (("c.fsw", [f(rdP), str(uimm7), x(rs2P)]), f"fsw {f(rdP)}, {uimm7}, {x(rs2P)}"),
+            (("c.nop", []), "addi x0, x0, 0"),
+            (("c.addi", [x(rd), str(imm6)]), f"addi {x(rd)}, {x(rd)}, {imm6}"),
+            (("c.jal", [str(jOffset)]), f"jal x1, {jOffset}"),
+            (("c.li", [x(rd), str(imm6)]), f"addi {x(rd)}, x0, {imm6}"),
+            (("c.addi16sp", [str(sp16)]), f"addi x2, x2, {sp16}"),
+            (("c.lui", [x(random.choice([1, 3, rd if rd != 2 else 4])), str(lui << 12)]), None),
+            (("c.srli", [x(rdP), str(shamt)]), f"srli {x(rdP)}, {x(rdP)}, {shamt}"),
+            (("c.srai", [x(rdP), str(shamt)]), f"srli {x(rdP)}, {x(rdP)}, {shamt}"),
+            (("c.andi", [x(rdP), str(imm6)]), f"andi {x(rdP)}, {x(rdP)}, {imm6}"),
+            (("c.sub", [x(rdP), x(rs2P)]), f"sub {x(rdP)}, {x(rdP)}, {x(rs2P)}"),
+            (("c.xor", [x(rdP), x(rs2P)]), f"xor {x(rdP)}, {x(rdP)}, {x(rs2P)}"),
+            (("c.or", [x(rdP), x(rs2P)]), f"or {x(rdP)}, {x(rdP)}, {x(rs2P)}"),
+            (("c.and", [x(rdP), x(rs2P)]), f"and {x(rdP)}, {x(rdP)}, {x(rs2P)}"),
+            (("c.j", [str(jOffset)]), f"jal x0, {jOffset}"),
+            (("c.beqz", [x(rdP), str(bOffset)]), f"beq x0, {bOffset}, {x(rdP)}"),
+            (("c.bnez", [x(rdP), str(bOffset)]), f"bne x0, {bOffset}, {x(rdP)}"),
+            (("c.slli", [x(rd), str(shamt)]), f"slli {x(rd)}, {x(rd)}, {shamt}"),
+            (("c.lwsp", [x(rd), str(uimm8)]), f"lw {x(rd)}, x2, {uimm8}"),
+            (("c.flwsp", [f(rd), str(uimm8)]), f"flw {f(rd)}, x2, {uimm8}"),
+            (("c.swsp", [x(rs2), str(uimm8)]), f"sw {x(rs2)}, {uimm8}, x2"),
+            (("c.fswsp", [f(rs2), str(uimm8)]), f"fsw {f(rs2)}, {uimm8}, x2"),
+            (("c.jr", [x(rd)]), f"jalr x0, {x(rd)}, 0"),
+            (("c.jalr", [x(rd)]), f"jalr x1, {x(rd)}, 0"),
+            (("c.mv", [x(rd), x(rs2)]), f"add {x(rd)}, x0, {x(rs2)}"),
+            (("c.add", [x(rd), x(rs2)]), f"add {x(rd)}, {x(rd)}, {x(rs2)}")
+        ]
+        (mnemonic, operands), expected = random.choice(choices)
+        # NOTE: The assembler's lui only takes positive values and its srai lacks funct7 - both are built here
+        if mnemonic == "c.lui":
+            expected = ((lui << 12) & 0xffffffff) | int(operands[0][1:]) << 7 | 0b0110111
+        elif mnemonic == "c.srai":
+            expected = asm2Bin(expected)[0] | 0b0100000 << 25
+        else:
+            expected = asm2Bin(expected)[0]
+        pairs.append((asm2binC(mnemonic, operands), expected))
+    return pairs
+
+# Reserved/illegal (and non-RV32) encodings expand to 0 - and C.EBREAK to EBREAK
+illegalPairs = [
+    (0x0000, 0),                                # All zeros (C.ADDI4SPN with a zero immediate)
+    (asm2binC("c.lwsp", ["x0", "4"]), 0),       # C.LWSP with rd = x0
+    (asm2binC("c.jr", ["x0"]), 0),              # C.JR with rs1 = x0
+    (asm2binC("c.lui", ["x5", "0"]), 0),        # C.LUI with a zero immediate
+    (asm2binC("c.addi16sp", ["0"]), 0),         # C.ADDI16SP with a zero immediate
+    (0x2000, 0),                                # C.FLD (RV32DC)
+    (0x9c01, 0),                                # C.SUBW (RV64C)
+    (asm2binC("c.ebreak", []), 0x00100073)      # C.EBREAK --> EBREAK
+]
+
+# Define unit tests
+class TestExpander(unittest.TestCase):
+    def setUp(self):
+        self.dut = Expander()
+
+    test_expander_random = test_expander(randomPairs(400))
+    test_expander_illegal = test_expander(illegalPairs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
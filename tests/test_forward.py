@@ -12,7 +12,7 @@ from mipyfive.types import *
 from mipyfive.forward import *
 
 def expectedHazardResolution(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_rd, MEM_WB_rd,
-    EX_MEM_reg_write, MEM_WB_reg_write):
+    EX_MEM_reg_write, MEM_WB_reg_write, MEM_WB_mem_read):
 
     fwdAluA = AluForwardCtrl.NO_FWD
     fwdAluB = AluForwardCtrl.NO_FWD
@@ -37,7 +37,7 @@ def expectedHazardResolution(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_
     elif((MEM_WB_reg_write) & (MEM_WB_rd != 0) &
         ~((EX_MEM_reg_write) & (EX_MEM_rd != 0) & (EX_MEM_rd == ID_EX_rs1)) &
             (MEM_WB_rd == ID_EX_rs1)):
-                fwdAluA = AluForwardCtrl.MEM_WB
+                fwdAluA = AluForwardCtrl.MEM_WB_LOAD if MEM_WB_mem_read else AluForwardCtrl.MEM_WB
     else:
         fwdAluA = AluForwardCtrl.NO_FWD
 
@@ -47,7 +47,7 @@ def expectedHazardResolution(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_
     elif((MEM_WB_reg_write) & (MEM_WB_rd != 0) &
         ~((EX_MEM_reg_write) & (EX_MEM_rd != 0) & (EX_MEM_rd == ID_EX_rs2)) &
             (MEM_WB_rd == ID_EX_rs2)):
-                fwdAluB = AluForwardCtrl.MEM_WB
+                fwdAluB = AluForwardCtrl.MEM_WB_LOAD if MEM_WB_mem_read else AluForwardCtrl.MEM_WB
     else:
             fwdAluB = AluForwardCtrl.NO_FWD
 
@@ -56,7 +56,7 @@ def expectedHazardResolution(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_
 createVcd = False
 outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
 def test_forward(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_rd, MEM_WB_rd,
-    EX_MEM_reg_write, MEM_WB_reg_write):
+    EX_MEM_reg_write, MEM_WB_reg_write, MEM_WB_mem_read=0):
 
     def test(self):
         global createVcd
@@ -71,10 +71,12 @@ def test_forward(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_rd, MEM_WB_r
             yield self.dut.MEM_WB_rd.eq(MEM_WB_rd)
             yield self.dut.EX_MEM_reg_write.eq(EX_MEM_reg_write)
             yield self.dut.MEM_WB_reg_write.eq(MEM_WB_reg_write)
+            yield self.dut.MEM_WB_mem_read.eq(MEM_WB_mem_read)
             yield Delay(1e-6)
 
             expectedAluACtrl, expectedAluBCtrl, expectedRegfileAout, expectedRegfileBout = expectedHazardResolution(
-                IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_rd, MEM_WB_rd, EX_MEM_reg_write, MEM_WB_reg_write
+                IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_rd, MEM_WB_rd, EX_MEM_reg_write, MEM_WB_reg_write,
+                MEM_WB_mem_read
             )
             self.assertEqual((yield self.dut.fwdAluA), expectedAluACtrl)
             self.assertEqual((yield self.dut.fwdAluB), expectedAluBCtrl)
@@ -90,6 +92,57 @@ def test_forward(IF_ID_rs1, ID_EX_rs1, IF_ID_rs2, ID_EX_rs2, EX_MEM_rd, MEM_WB_r
             sim.run()
     return test
 
+def test_forward_dual(inputs, expected):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # NOTE: Inputs not given are 0 (x0, no write), outputs not given are expected to be NO_FWD
+            for name, value in inputs.items():
+                yield getattr(self.dut, name).eq(value)
+            yield Delay(1e-6)
+            outputs = {"fwdAluA": AluForwardCtrl.NO_FWD, "fwdAluB": AluForwardCtrl.NO_FWD,
+                "fwdAluA1": AluForwardCtrl.NO_FWD, "fwdAluB1": AluForwardCtrl.NO_FWD,
+                "fwdRegfileAout": RegfileOutForwardCtrl.NO_FWD, "fwdRegfileBout": RegfileOutForwardCtrl.NO_FWD}
+            outputs.update(expected)
+            for name, value in outputs.items():
+                self.assertEqual((yield getattr(self.dut, name)), value.value, name)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_forward_deep(inputs, expected):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # NOTE: Inputs not given are 0 (x0, no write), outputs not given are expected to be NO_FWD
+            for name, value in inputs.items():
+                yield getattr(self.dut, name).eq(value)
+            yield Delay(1e-6)
+            outputs = {"fwdAluA": AluForwardCtrl.NO_FWD, "fwdAluB": AluForwardCtrl.NO_FWD,
+                "fwdRegfileAout": RegfileOutForwardCtrl.NO_FWD, "fwdRegfileBout": RegfileOutForwardCtrl.NO_FWD}
+            outputs.update(expected)
+            for name, value in outputs.items():
+                self.assertEqual((yield getattr(self.dut, name)), value.value, name)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
 # Define unit tests
 class TestForward(unittest.TestCase):
     def setUp(self):
@@ -116,6 +169,15 @@ class TestForward(unittest.TestCase):
         IF_ID_rs1=0, ID_EX_rs1=0, IF_ID_rs2=16, ID_EX_rs2=0, EX_MEM_rd=16, MEM_WB_rd=4,
             EX_MEM_reg_write=1, MEM_WB_reg_write=0
     )
+    # (MEM/WB results are written through the Regfile - no forwarding)
+    test_fwd_ctrl_MEM_WB_no_fwd_rs1 = test_forward(
+        IF_ID_rs1=12, ID_EX_rs1=0, IF_ID_rs2=3, ID_EX_rs2=0, EX_MEM_rd=3, MEM_WB_rd=12,
+            EX_MEM_reg_write=1, MEM_WB_reg_write=1
+    )
+    test_fwd_ctrl_MEM_WB_no_fwd_rs2 = test_forward(
+        IF_ID_rs1=3, ID_EX_rs1=0, IF_ID_rs2=12, ID_EX_rs2=0, EX_MEM_rd=3, MEM_WB_rd=12,
+            EX_MEM_reg_write=0, MEM_WB_reg_write=1
+    )
 
     # Test EX/MEM Data Hazards
     test_fwd_EX_MEM_hazard_rs1 = test_forward(
@@ -145,6 +207,24 @@ class TestForward(unittest.TestCase):
             EX_MEM_reg_write=1, MEM_WB_reg_write=1
     )
 
+    # Test MEM/WB load data (post-LSU) Hazards
+    test_fwd_MEM_WB_load_hazard_rs1 = test_forward(
+        IF_ID_rs1=0, ID_EX_rs1=10, IF_ID_rs2=0, ID_EX_rs2=2, EX_MEM_rd=3, MEM_WB_rd=10,
+            EX_MEM_reg_write=1, MEM_WB_reg_write=1, MEM_WB_mem_read=1
+    )
+    test_fwd_MEM_WB_load_hazard_rs2 = test_forward(
+        IF_ID_rs1=0, ID_EX_rs1=1, IF_ID_rs2=0, ID_EX_rs2=6, EX_MEM_rd=3, MEM_WB_rd=6,
+            EX_MEM_reg_write=1, MEM_WB_reg_write=1, MEM_WB_mem_read=1
+    )
+    test_fwd_MEM_WB_load_ctrl_no_fwd = test_forward(
+        IF_ID_rs1=9, ID_EX_rs1=0, IF_ID_rs2=9, ID_EX_rs2=0, EX_MEM_rd=3, MEM_WB_rd=9,
+            EX_MEM_reg_write=1, MEM_WB_reg_write=1, MEM_WB_mem_read=1
+    )
+    test_fwd_EX_MEM_over_load_hazard = test_forward(
+        IF_ID_rs1=5, ID_EX_rs1=5, IF_ID_rs2=0, ID_EX_rs2=0, EX_MEM_rd=5, MEM_WB_rd=5,
+            EX_MEM_reg_write=1, MEM_WB_reg_write=1, MEM_WB_mem_read=1
+    )
+
     # Check non-data-hazard cases
     test_fwd_no_hazard = test_forward(IF_ID_rs1=1, ID_EX_rs1=2, IF_ID_rs2=3, ID_EX_rs2=4, EX_MEM_rd=6,
         MEM_WB_rd=10, EX_MEM_reg_write=1, MEM_WB_reg_write=1)
@@ -153,6 +233,72 @@ class TestForward(unittest.TestCase):
             EX_MEM_reg_write=0, MEM_WB_reg_write=0
     )
 
+# Dual-issue - the second pipe's results go to both pipes and decode, a stage's results come before older ones
+class TestForwardDual(unittest.TestCase):
+    def setUp(self):
+        self.dut = ForwardingUnit(regCount=32, dualIssue=True)
+
+    test_fwd_EX_MEM1 = test_forward_dual(
+        {"ID_EX_rs1": 3, "ID_EX1_rs2": 3, "IF_ID_rs2": 3, "EX_MEM1_rd": 3, "EX_MEM1_reg_write": 1},
+        {"fwdAluA": AluForwardCtrl.EX_MEM1, "fwdAluB1": AluForwardCtrl.EX_MEM1,
+            "fwdRegfileBout": RegfileOutForwardCtrl.EX_MEM1}
+    )
+    test_fwd_MEM_WB1 = test_forward_dual(
+        {"ID_EX_rs2": 9, "ID_EX1_rs1": 9, "IF_ID_rs1": 9, "MEM_WB1_rd": 9, "MEM_WB1_reg_write": 1},
+        {"fwdAluB": AluForwardCtrl.MEM_WB1, "fwdAluA1": AluForwardCtrl.MEM_WB1}
+    )
+    test_fwd_MEM_WB_load_to_second = test_forward_dual(
+        {"ID_EX1_rs1": 4, "ID_EX1_rs2": 5, "MEM_WB_rd": 4, "MEM_WB_reg_write": 1, "MEM_WB_mem_read": 1,
+            "EX_MEM_rd": 5, "EX_MEM_reg_write": 1},
+        {"fwdAluA1": AluForwardCtrl.MEM_WB_LOAD, "fwdAluB1": AluForwardCtrl.EX_MEM}
+    )
+    test_fwd_EX_MEM1_over_MEM_WB = test_forward_dual(
+        {"ID_EX_rs1": 7, "ID_EX1_rs2": 7, "EX_MEM1_rd": 7, "EX_MEM1_reg_write": 1, "MEM_WB_rd": 7,
+            "MEM_WB_reg_write": 1, "MEM_WB_mem_read": 1, "MEM_WB1_rd": 7, "MEM_WB1_reg_write": 1},
+        {"fwdAluA": AluForwardCtrl.EX_MEM1, "fwdAluB1": AluForwardCtrl.EX_MEM1}
+    )
+    test_fwd_EX_MEM_over_MEM_WB1 = test_forward_dual(
+        {"ID_EX_rs1": 8, "ID_EX1_rs1": 8, "IF_ID_rs1": 8, "EX_MEM_rd": 8, "EX_MEM_reg_write": 1, "MEM_WB1_rd": 8,
+            "MEM_WB1_reg_write": 1},
+        {"fwdAluA": AluForwardCtrl.EX_MEM, "fwdAluA1": AluForwardCtrl.EX_MEM,
+            "fwdRegfileAout": RegfileOutForwardCtrl.EX_MEM}
+    )
+    test_fwd_x0_no_fwd = test_forward_dual(
+        {"EX_MEM1_rd": 0, "EX_MEM1_reg_write": 1, "MEM_WB1_rd": 0, "MEM_WB1_reg_write": 1}, {}
+    )
+    test_fwd_no_write_no_fwd = test_forward_dual(
+        {"ID_EX_rs1": 6, "ID_EX1_rs2": 6, "IF_ID_rs1": 6, "EX_MEM1_rd": 6, "MEM_WB1_rd": 6}, {}
+    )
+
+# 7 stages - decode also gets MEM/WB ALU results, EX gets MEM2/WB results (a load in MEM/WB is never forwarded)
+class TestForwardDeep(unittest.TestCase):
+    def setUp(self):
+        self.dut = ForwardingUnit(regCount=32, pipelineDepth=7)
+
+    test_fwd_MEM_WB = test_forward_deep(
+        {"ID_EX_rs1": 3, "IF_ID_rs2": 3, "MEM_WB_rd": 3, "MEM_WB_reg_write": 1},
+        {"fwdAluA": AluForwardCtrl.MEM_WB, "fwdRegfileBout": RegfileOutForwardCtrl.MEM_WB}
+    )
+    test_fwd_MEM_WB_load_no_fwd = test_forward_deep(
+        {"ID_EX_rs1": 3, "IF_ID_rs2": 3, "MEM_WB_rd": 3, "MEM_WB_reg_write": 1, "MEM_WB_mem_read": 1}, {}
+    )
+    test_fwd_MEM2_WB = test_forward_deep(
+        {"ID_EX_rs2": 9, "IF_ID_rs1": 9, "MEM2_WB_rd": 9, "MEM2_WB_reg_write": 1},
+        {"fwdAluB": AluForwardCtrl.MEM2_WB}
+    )
+    test_fwd_MEM_WB_over_MEM2_WB = test_forward_deep(
+        {"ID_EX_rs1": 7, "ID_EX_rs2": 7, "MEM_WB_rd": 7, "MEM_WB_reg_write": 1, "MEM2_WB_rd": 7,
+            "MEM2_WB_reg_write": 1},
+        {"fwdAluA": AluForwardCtrl.MEM_WB, "fwdAluB": AluForwardCtrl.MEM_WB}
+    )
+    test_fwd_EX_MEM_over_MEM_WB = test_forward_deep(
+        {"ID_EX_rs1": 8, "IF_ID_rs1": 8, "EX_MEM_rd": 8, "EX_MEM_reg_write": 1, "MEM_WB_rd": 8, "MEM_WB_reg_write": 1},
+        {"fwdAluA": AluForwardCtrl.EX_MEM, "fwdRegfileAout": RegfileOutForwardCtrl.EX_MEM}
+    )
+    test_fwd_x0_no_fwd = test_forward_deep(
+        {"MEM_WB_rd": 0, "MEM_WB_reg_write": 1, "MEM2_WB_rd": 0, "MEM2_WB_reg_write": 1}, {}
+    )
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
@@ -0,0 +1,118 @@
+import os
+import sys
+import math
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.fpdivsqrt import *
+from utils import *
+
+def sqrtFraction(value):
+    '''Square root of a (positive) Fraction - exact to well beyond binary32 precision, with a sticky bit'''
+    scale = 2 * (80 - (value.numerator.bit_length() - value.denominator.bit_length()) // 2)
+    scaled = value * Fraction(2) ** scale
+    root = math.isqrt(scaled.numerator // scaled.denominator)
+    exact = root * root * scaled.denominator == scaled.numerator
+    return Fraction(2 * root + (0 if exact else 1), 2) / Fraction(2) ** (scale // 2)
+
+def divSqrtModel(in1, in2, fpuOp, rm):
+    '''Reference model - RV32F FDIV/FSQRT result, as a binary32 bit pattern'''
+    sign = (in1 >> 31) ^ (in2 >> 31)
+    if fpuOp is FpuOp.FSQRT:
+        if f32IsNan(in1) or (in1 >> 31 and in1 & 0x7fffffff != 0):
+            return F32_QNAN
+        if in1 & 0x7fffffff == 0 or f32IsInf(in1):
+            return in1
+        return roundF32(sqrtFraction(f32ToFraction(in1)), rm)
+    zero1, zero2 = in1 & 0x7fffffff == 0, in2 & 0x7fffffff == 0
+    if f32IsNan(in1) or f32IsNan(in2) or zero1 and zero2 or f32IsInf(in1) and f32IsInf(in2):
+        return F32_QNAN
+    if f32IsInf(in1) or zero2:
+        return sign << 31 | F32_INF
+    if zero1 or f32IsInf(in2):
+        return sign << 31
+    return roundF32(f32ToFraction(in1) / f32ToFraction(in2), rm)
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_fpdivsqrt(ops):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            for index, (in1, in2, fpuOp, rm) in enumerate(ops):
+                expected = divSqrtModel(in1, in2, fpuOp, rm)
+                isSpecial = f32IsNan(in1) or f32IsInf(in1) or in1 & 0x7fffffff == 0 or (fpuOp is FpuOp.FSQRT and
+                    in1 >> 31) or fpuOp is FpuOp.FDIV and (f32IsInf(in2) or f32IsNan(in2) or in2 & 0x7fffffff == 0)
+                yield self.dut.start.eq(1)
+                yield self.dut.in1.eq(in1)
+                yield self.dut.in2.eq(in2)
+                yield self.dut.fpuOp.eq(fpuOp.value)
+                yield self.dut.rm.eq(rm)
+                yield self.dut.tag.eq(index % 32)
+                yield Tick()
+                yield self.dut.start.eq(0)
+                # 27 iterations (1 cycle for special values), then the result is held until acknowledged
+                cycles = 1
+                yield Settle()
+                while not (yield self.dut.valid):
+                    self.assertEqual((yield self.dut.busy), 1)
+                    yield Tick()
+                    yield Settle()
+                    cycles += 1
+                self.assertEqual(cycles, 1 if isSpecial else 28)
+                for i in range(random.randint(0, 2)):
+                    yield Tick()
+                    yield Settle()
+                self.assertEqual((yield self.dut.valid), 1)
+                self.assertEqual((yield self.dut.busy), 0)
+                self.assertEqual(hex((yield self.dut.out)), hex(expected), f"{(hex(in1), hex(in2), fpuOp, rm)}")
+                self.assertEqual((yield self.dut.tagOut), index % 32)
+                yield self.dut.ack.eq(1)
+                yield Tick()
+                yield self.dut.ack.eq(0)
+                yield Settle()
+                self.assertEqual((yield self.dut.valid), 0)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+edgeOperands = [0, 0x80000000, 0x3f800000, 0xbf800000, 0x40000000, 0x00000001, 0x00800000, 0x7f7fffff,
+    0x7f800000, 0xff800000, 0x7fc00000]
+edgeOps = [(in1, in2, FpuOp.FDIV, 0) for in1 in edgeOperands for in2 in edgeOperands] + \
+    [(in1, 0, FpuOp.FSQRT, 0) for in1 in edgeOperands]
+randomDivOps = [(randomF32(), randomF32(), FpuOp.FDIV, random.randint(0, 4)) for i in range(96)]
+randomSqrtOps = [(randomF32() & random.choice([0x7fffffff, 0xffffffff]), 0, FpuOp.FSQRT, random.randint(0, 4))
+    for i in range(96)]
+
+# Define unit tests
+class TestFpDivSqrt(unittest.TestCase):
+    def setUp(self):
+        self.dut = FpDivSqrt()
+
+    test_fpdivsqrt_edge         = test_fpdivsqrt(edgeOps)
+    test_fpdivsqrt_div_random   = test_fpdivsqrt(randomDivOps)
+    test_fpdivsqrt_sqrt_random  = test_fpdivsqrt(randomSqrtOps)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
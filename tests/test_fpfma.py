@@ -0,0 +1,129 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.fpfma import *
+from utils import *
+
+def fmaModel(in1, in2, in3, fpuOp, rm):
+    '''Reference model - RV32F fused multiply-add (and FADD/FSUB/FMUL) result, as a binary32 bit pattern'''
+    if fpuOp in [FpuOp.FADD, FpuOp.FSUB]:
+        in1, in2, in3 = in1, 0x3f800000, in2
+    elif fpuOp is FpuOp.FMUL:
+        in3 = None
+    negProduct  = fpuOp in [FpuOp.FNMSUB, FpuOp.FNMADD]
+    negAddend   = fpuOp in [FpuOp.FSUB, FpuOp.FMSUB, FpuOp.FNMADD]
+    signP       = (in1 >> 31) ^ (in2 >> 31) ^ negProduct
+    signC       = in3 is not None and (in3 >> 31) ^ negAddend
+    operands    = [in1, in2] + ([in3] if in3 is not None else [])
+    if any(f32IsNan(x) for x in operands):
+        return F32_QNAN
+    infP = f32IsInf(in1) or f32IsInf(in2)
+    zeroP = in1 & 0x7fffffff == 0 or in2 & 0x7fffffff == 0
+    infC = in3 is not None and f32IsInf(in3)
+    if infP and zeroP or infP and infC and signP != signC:
+        return F32_QNAN
+    if infP:
+        return signP << 31 | F32_INF
+    if infC:
+        return signC << 31 | F32_INF
+    product = f32ToFraction(in1) * f32ToFraction(in2) * (-1 if negProduct else 1)
+    if in3 is None:
+        return roundF32(product, rm, signP)
+    addend = f32ToFraction(in3) * (-1 if negAddend else 1)
+    total = product + addend
+    if total == 0:
+        # Exact zeros - the operands' sign if both agree, otherwise -0 only when rounding down
+        zeroSign = signP if (zeroP and in3 & 0x7fffffff == 0 and signP == signC) else (rm == 2)
+        if zeroP and in3 & 0x7fffffff != 0:
+            return in3 ^ (negAddend << 31)
+        return roundF32(total, rm, zeroSign)
+    return roundF32(total, rm)
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_fpfma(ops):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # A new operation every cycle - results (and tags) must come out in order, "latency" cycles later
+            expected = []
+            for cycle in range(len(ops) + self.dut.latency + 1):
+                if cycle < len(ops):
+                    in1, in2, in3, fpuOp, rm = ops[cycle]
+                    yield self.dut.start.eq(1)
+                    yield self.dut.in1.eq(in1)
+                    yield self.dut.in2.eq(in2)
+                    yield self.dut.in3.eq(in3)
+                    yield self.dut.fpuOp.eq(fpuOp.value)
+                    yield self.dut.rm.eq(rm)
+                    yield self.dut.tag.eq(cycle % 32)
+                    expected.append(fmaModel(in1, in2, in3, fpuOp, rm))
+                else:
+                    yield self.dut.start.eq(0)
+                yield Settle()
+                if cycle >= self.dut.latency and cycle - self.dut.latency < len(ops):
+                    index = cycle - self.dut.latency
+                    self.assertEqual((yield self.dut.valid), 1)
+                    self.assertEqual(hex((yield self.dut.out)), hex(expected[index]), f"{ops[index]}")
+                    self.assertEqual((yield self.dut.tagOut), index % 32)
+                else:
+                    self.assertEqual((yield self.dut.valid), 0)
+                yield Tick()
+        sim.add_clock(1e-6)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+fmaOps = [FpuOp.FADD, FpuOp.FSUB, FpuOp.FMUL, FpuOp.FMADD, FpuOp.FMSUB, FpuOp.FNMSUB, FpuOp.FNMADD]
+edgeOperands = [0, 0x80000000, 0x3f800000, 0xbf800000, 0x00000001, 0x00800000, 0x7f7fffff, 0x7f800000,
+    0xff800000, 0x7fc00000]
+edgeOps = [(in1, in2, in3, fpuOp, 0) for in1 in edgeOperands for in2 in edgeOperands for in3 in [0, 0x80000000,
+    0x3f800000, 0x7f800000] for fpuOp in [FpuOp.FADD, FpuOp.FMUL, FpuOp.FMADD, FpuOp.FNMSUB]]
+# Cancellation - products that (nearly) cancel the addend
+cancelOps = []
+for i in range(64):
+    in1, in2 = randomF32(special=False), randomF32(special=False)
+    product = roundF32(f32ToFraction(in1) * f32ToFraction(in2), random.randint(0, 4))
+    cancelOps.append((in1, in2, product ^ random.choice([0, 1, 2]), FpuOp.FMSUB, random.randint(0, 4)))
+randomOps = [(randomF32(), randomF32(), randomF32(), random.choice(fmaOps), random.randint(0, 4))
+    for i in range(256)]
+
+# Define unit tests
+class TestFpFma(unittest.TestCase):
+    def setUp(self):
+        self.dut = FpFma(latency=3)
+
+    test_fpfma_edge         = test_fpfma(edgeOps)
+    test_fpfma_cancel       = test_fpfma(cancelOps)
+    test_fpfma_random       = test_fpfma(randomOps)
+
+class TestFpFmaShallow(unittest.TestCase):
+    def setUp(self):
+        self.dut = FpFma(latency=1)
+
+    test_fpfma_random       = test_fpfma(randomOps)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
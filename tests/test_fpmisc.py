@@ -0,0 +1,143 @@
+import os
+import sys
+import math
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.fpmisc import *
+from utils import *
+
+def orderKey(bits):
+    '''Total order key of a non-NaN binary32 value (-0 below +0)'''
+    return -(bits & 0x7fffffff) - 1 if bits >> 31 else bits
+
+def roundToInt(value, rm):
+    '''Round a Fraction to an integer with a RISC-V rounding mode'''
+    low = math.floor(value)
+    rem = value - low
+    return low + {
+        0: rem > Fraction(1, 2) or (rem == Fraction(1, 2) and low % 2 == 1),
+        1: rem > 0 and value < 0,
+        2: False,
+        3: rem > 0,
+        4: rem > Fraction(1, 2) or (rem == Fraction(1, 2) and value > 0)
+    }[rm]
+
+def miscModel(in1, in2, intIn, fpuOp, rm):
+    '''Reference model - RV32F single-cycle operation result'''
+    nan1, nan2 = f32IsNan(in1), f32IsNan(in2)
+    if fpuOp is FpuOp.FSGNJ:
+        return in1 & 0x7fffffff | in2 & 0x80000000
+    if fpuOp is FpuOp.FSGNJN:
+        return in1 & 0x7fffffff | ~in2 & 0x80000000
+    if fpuOp is FpuOp.FSGNJX:
+        return in1 ^ in2 & 0x80000000
+    if fpuOp in [FpuOp.FMIN, FpuOp.FMAX]:
+        if nan1 and nan2:
+            return F32_QNAN
+        if nan1 or nan2:
+            return in1 if nan2 else in2
+        pick = min if fpuOp is FpuOp.FMIN else max
+        return pick(in1, in2, key=orderKey)
+    if fpuOp in [FpuOp.FEQ, FpuOp.FLT, FpuOp.FLE]:
+        if nan1 or nan2:
+            return 0
+        value1 = Fraction(2) ** 200 * (-1 if in1 >> 31 else 1) if f32IsInf(in1) else f32ToFraction(in1)
+        value2 = Fraction(2) ** 200 * (-1 if in2 >> 31 else 1) if f32IsInf(in2) else f32ToFraction(in2)
+        return int({FpuOp.FEQ: value1 == value2, FpuOp.FLT: value1 < value2, FpuOp.FLE: value1 <= value2}[fpuOp])
+    if fpuOp is FpuOp.FCLASS:
+        sign, exp, frac = in1 >> 31, (in1 >> 23) & 0xff, in1 & 0x7fffffff
+        if nan1:
+            return 1 << (9 if in1 & 0x400000 else 8)
+        if f32IsInf(in1):
+            return 1 << (0 if sign else 7)
+        if frac == 0:
+            return 1 << (3 if sign else 4)
+        if exp == 0:
+            return 1 << (2 if sign else 5)
+        return 1 << (1 if sign else 6)
+    if fpuOp in [FpuOp.FCVT_W_S, FpuOp.FCVT_WU_S]:
+        low, high = (-2**31, 2**31 - 1) if fpuOp is FpuOp.FCVT_W_S else (0, 2**32 - 1)
+        if nan1:
+            return high & 0xffffffff
+        if f32IsInf(in1):
+            return (low if in1 >> 31 else high) & 0xffffffff
+        value = roundToInt(f32ToFraction(in1), rm)
+        return min(max(value, low), high) & 0xffffffff
+    if fpuOp is FpuOp.FCVT_S_W:
+        return roundF32(Fraction(intIn - (1 << 32) if intIn >> 31 else intIn), rm)
+    if fpuOp is FpuOp.FCVT_S_WU:
+        return roundF32(Fraction(intIn), rm)
+    if fpuOp is FpuOp.FMV_X_W:
+        return in1
+    return intIn
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_fpmisc(ops):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            for in1, in2, intIn, fpuOp, rm in ops:
+                yield self.dut.in1.eq(in1)
+                yield self.dut.in2.eq(in2)
+                yield self.dut.intIn.eq(intIn)
+                yield self.dut.fpuOp.eq(fpuOp.value)
+                yield self.dut.rm.eq(rm)
+                yield Delay(1e-6)
+                self.assertEqual(hex((yield self.dut.out)), hex(miscModel(in1, in2, intIn, fpuOp, rm)),
+                    f"{(hex(in1), hex(in2), hex(intIn), fpuOp, rm)}")
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+miscOps = [FpuOp.FSGNJ, FpuOp.FSGNJN, FpuOp.FSGNJX, FpuOp.FMIN, FpuOp.FMAX, FpuOp.FEQ, FpuOp.FLT, FpuOp.FLE,
+    FpuOp.FCLASS, FpuOp.FCVT_W_S, FpuOp.FCVT_WU_S, FpuOp.FCVT_S_W, FpuOp.FCVT_S_WU, FpuOp.FMV_X_W, FpuOp.FMV_W_X]
+edgeOperands = [0, 0x80000000, 0x3f800000, 0xbf800000, 0x00000001, 0x807fffff, 0x7f7fffff, 0x7f800000,
+    0xff800000, 0x7fc00000, 0x7f800001]
+edgeIntegers = [0, 1, 0x7fffffff, 0x80000000, 0xffffffff, 0x01000001]
+edgeOps = [(in1, in2, intIn, fpuOp, 0) for in1 in edgeOperands for in2 in edgeOperands[:6] for intIn in
+    edgeIntegers[:2] for fpuOp in miscOps] + [(0, 0, intIn, fpuOp, rm) for intIn in edgeIntegers for fpuOp in
+    [FpuOp.FCVT_S_W, FpuOp.FCVT_S_WU] for rm in range(5)]
+# Conversions around the integer range limits and halfway points
+cvtOperands = [0x4effffff, 0x4f000000, 0x4f7fffff, 0x4f800000, 0xcf000000, 0xcf000001, 0x3f000000, 0xbf000000,
+    0x3fc00000, 0xbfc00000, 0x40200000, 0xc0200000, 0x3e800000, 0xbf400000]
+cvtOps = [(in1, 0, 0, fpuOp, rm) for in1 in cvtOperands for fpuOp in [FpuOp.FCVT_W_S, FpuOp.FCVT_WU_S]
+    for rm in range(5)]
+randomOps = [(randomF32(), randomF32(), random.getrandbits(32), random.choice(miscOps), random.randint(0, 4))
+    for i in range(512)]
+# Operands in the integer range
+randomOps += [(random.getrandbits(1) << 31 | random.randint(100, 160) << 23 | random.getrandbits(23), 0, 0,
+    random.choice([FpuOp.FCVT_W_S, FpuOp.FCVT_WU_S]), random.randint(0, 4)) for i in range(128)]
+
+# Define unit tests
+class TestFpMisc(unittest.TestCase):
+    def setUp(self):
+        self.dut = FpMisc()
+
+    test_fpmisc_edge    = test_fpmisc(edgeOps)
+    test_fpmisc_convert = test_fpmisc(cvtOps)
+    test_fpmisc_random  = test_fpmisc(randomOps)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
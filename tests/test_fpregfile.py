@@ -0,0 +1,72 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.fpregfile import *
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_fpregfile_ports(cycles):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            regs = [0] * self.dut.regArray.depth
+            for cycle in range(cycles):
+                # Random reads, and writes on either port (or both - to different registers)
+                readAddrs = [random.randint(0, 31) for i in range(3)]
+                pipeAddr, unitAddr = random.sample(range(32), 2)
+                pipeWrite, unitWrite = random.randint(0, 1), random.randint(0, 1)
+                pipeData, unitData = random.getrandbits(32), random.getrandbits(32)
+                for port, addr in zip([self.dut.rs1Addr, self.dut.rs2Addr, self.dut.rs3Addr], readAddrs):
+                    yield port.eq(addr)
+                yield self.dut.writeEnable.eq(pipeWrite)
+                yield self.dut.writeAddr.eq(pipeAddr)
+                yield self.dut.writeData.eq(pipeData)
+                yield self.dut.unitWriteEnable.eq(unitWrite)
+                yield self.dut.unitWriteAddr.eq(unitAddr)
+                yield self.dut.unitWriteData.eq(unitData)
+                if pipeWrite:
+                    regs[pipeAddr] = pipeData
+                if unitWrite:
+                    regs[unitAddr] = unitData
+                yield Settle()
+
+                # Write-through - the values written this cycle are read (f0 is not hard-wired to zero)
+                for port, addr in zip([self.dut.rs1Data, self.dut.rs2Data, self.dut.rs3Data], readAddrs):
+                    self.assertEqual((yield port), regs[addr])
+                yield Tick()
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# Define unit tests
+class TestFpRegfile(unittest.TestCase):
+    def setUp(self):
+        self.dut = FpRegFile(regCount=32)
+
+    test_fpregfile_ports = test_fpregfile_ports(cycles=256)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
@@ -11,21 +11,27 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from mipyfive.types import *
 from mipyfive.hazard import *
 
-def expectedHazardResolution(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd):
-    IF_stall     = 1
-    IF_ID_stall  = 1
+def expectedHazardResolution(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd, ID_EX_regWrite, Branch,
+    EX_MEM_memToReg, EX_MEM_rd):
+    IF_stall     = 0
+    IF_ID_stall  = 0
     ID_EX_flush  = 0
 
-    if ID_EX_memRead and ((ID_EX_rd == IF_ID_rs1) or (ID_EX_rd == IF_ID_rs2)):
-        IF_stall     = 0
-        IF_ID_stall  = 0
+    ID_EX_match  = (ID_EX_rd != 0) and ((ID_EX_rd == IF_ID_rs1) or (ID_EX_rd == IF_ID_rs2))
+    EX_MEM_match = (EX_MEM_rd != 0) and ((EX_MEM_rd == IF_ID_rs1) or (EX_MEM_rd == IF_ID_rs2))
+    branchStall  = Branch and ((ID_EX_regWrite and ID_EX_match) or (EX_MEM_memToReg and EX_MEM_match))
+    loadStall    = ID_EX_memRead and ID_EX_regWrite and ID_EX_match
+    if branchStall or loadStall:
+        IF_stall     = 1
+        IF_ID_stall  = 1
         ID_EX_flush  = 1
-    
+
     return IF_stall, IF_ID_stall, ID_EX_flush
 
 createVcd = False
 outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
-def test_hazard(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd):
+def test_hazard(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd, ID_EX_regWrite=1, Branch=0,
+    EX_MEM_memToReg=0, EX_MEM_rd=0):
     def test(self):
         global createVcd
         global outputDir
@@ -35,10 +41,14 @@ def test_hazard(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd):
             yield self.dut.ID_EX_rd.eq(ID_EX_rd)
             yield self.dut.IF_ID_rs1.eq(IF_ID_rs1)
             yield self.dut.IF_ID_rs2.eq(IF_ID_rs2)
+            yield self.dut.ID_EX_regWrite.eq(ID_EX_regWrite)
+            yield self.dut.Branch.eq(Branch)
+            yield self.dut.EX_MEM_memToReg.eq(EX_MEM_memToReg)
+            yield self.dut.EX_MEM_rd.eq(EX_MEM_rd)
             yield Delay(1e-6)
 
             IF_stall, IF_ID_stall, ID_EX_flush = expectedHazardResolution(
-                IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd
+                IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd, ID_EX_regWrite, Branch, EX_MEM_memToReg, EX_MEM_rd
             )
             self.assertEqual((yield self.dut.IF_stall), IF_stall)
             self.assertEqual((yield self.dut.IF_ID_stall), IF_ID_stall)
@@ -53,6 +63,103 @@ def test_hazard(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd):
             sim.run()
     return test
 
+def test_scoreboard(steps):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # Each step: decode inputs (FP sources/destination), FP register writes, and the expected stall
+            # NOTE: Decode issues (fpIssue) whenever it does not stall
+            for step in steps:
+                ports = {"IF_ID_frs1": 0, "IF_ID_frs2": 0, "IF_ID_frs3": 0, "IF_ID_frd": 0, "IF_ID_usesFrs1": 0,
+                    "IF_ID_usesFrs2": 0, "IF_ID_usesFrs3": 0, "IF_ID_fpRegWrite": 0, "fpWriteEnable": 0,
+                    "fpWriteAddr": 0, "fpUnitWriteEnable": 0, "fpUnitWriteAddr": 0}
+                ports.update(step)
+                stall = ports.pop("stall")
+                for name, value in ports.items():
+                    yield getattr(self.dut, name).eq(value)
+                yield Settle()
+                self.assertEqual((yield self.dut.IF_stall), stall, f"{step}")
+                self.assertEqual((yield self.dut.ID_EX_flush), stall, f"{step}")
+                yield self.dut.fpIssue.eq(int(not stall))
+                yield Tick()
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_hazard_dual(inputs, stall, pairStall):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # NOTE: Inputs not given are 0 (x0, no write/load/branch)
+            for name, value in inputs.items():
+                yield getattr(self.dut, name).eq(value)
+            yield Delay(1e-6)
+            self.assertEqual((yield self.dut.IF_stall), stall)
+            self.assertEqual((yield self.dut.ID_EX_flush), stall)
+            self.assertEqual((yield self.dut.pairStall), pairStall)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_hazard_deep(inputs, stall):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # NOTE: Inputs not given are 0 (x0, no write/load/branch)
+            for name, value in inputs.items():
+                yield getattr(self.dut, name).eq(value)
+            yield Delay(1e-6)
+            self.assertEqual((yield self.dut.IF_stall), stall)
+            self.assertEqual((yield self.dut.IF_ID_stall), stall)
+            self.assertEqual((yield self.dut.ID_EX_flush), stall)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# An FMA into f3 (written by the FP unit port), then a use of f3
+rawSteps = [
+    {"IF_ID_fpRegWrite": 1, "IF_ID_frd": 3, "IF_ID_usesFrs1": 1, "IF_ID_frs1": 1, "stall": 0},
+    {"IF_ID_usesFrs2": 1, "IF_ID_frs2": 3, "stall": 1},
+    {"IF_ID_usesFrs2": 1, "IF_ID_frs2": 3, "stall": 1},
+    {"IF_ID_usesFrs2": 1, "IF_ID_frs2": 3, "fpUnitWriteEnable": 1, "fpUnitWriteAddr": 3, "stall": 0},
+    {"IF_ID_usesFrs1": 1, "IF_ID_frs1": 3, "IF_ID_usesFrs3": 1, "IF_ID_frs3": 3, "stall": 0}
+]
+# A load into f5 (written by writeback), then another write to f5 - an unused rs3 field never stalls
+wawSteps = [
+    {"IF_ID_fpRegWrite": 1, "IF_ID_frd": 5, "stall": 0},
+    {"IF_ID_usesFrs3": 0, "IF_ID_frs3": 5, "stall": 0},
+    {"IF_ID_fpRegWrite": 1, "IF_ID_frd": 5, "stall": 1},
+    {"IF_ID_fpRegWrite": 1, "IF_ID_frd": 5, "fpWriteEnable": 1, "fpWriteAddr": 5, "stall": 0},
+    # The second write is pending now (issued in the same cycle as the first one's write)
+    {"IF_ID_usesFrs1": 1, "IF_ID_frs1": 5, "stall": 1},
+    {"IF_ID_usesFrs1": 1, "IF_ID_frs1": 5, "fpWriteEnable": 1, "fpWriteAddr": 5, "stall": 0}
+]
+
 # Define unit tests
 class TestHazard(unittest.TestCase):
     def setUp(self):
@@ -62,10 +169,73 @@ class TestHazard(unittest.TestCase):
     IF_ID_rs2       = random.randint(0, 31)
     ID_EX_rd        = random.randint(0, 31)
     ID_EX_memRead   = random.randint(0, 1)
-    test_hazard_random = test_hazard(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd)
+    Branch          = random.randint(0, 1)
+    EX_MEM_rd       = random.randint(0, 31)
+    test_hazard_random = test_hazard(IF_ID_rs1, IF_ID_rs2, ID_EX_memRead, ID_EX_rd, Branch=Branch,
+        EX_MEM_memToReg=random.randint(0, 1), EX_MEM_rd=EX_MEM_rd)
     
     test_non_hazard = test_hazard(IF_ID_rs1=4, IF_ID_rs2=3, ID_EX_memRead=1, ID_EX_rd=12)
-    test_hazard = test_hazard(IF_ID_rs1=4, IF_ID_rs2=5, ID_EX_memRead=1, ID_EX_rd=5)
+    test_load_x0_non_hazard = test_hazard(IF_ID_rs1=0, IF_ID_rs2=3, ID_EX_memRead=1, ID_EX_rd=0, ID_EX_regWrite=0)
+    test_branch_x0_non_hazard = test_hazard(IF_ID_rs1=0, IF_ID_rs2=0, ID_EX_memRead=0, ID_EX_rd=0, Branch=1,
+        EX_MEM_memToReg=1, EX_MEM_rd=0)
+
+    # Load-use (only the cycle where the load is still in EX - later uses are forwarded)
+    test_load_hazard = test_hazard(IF_ID_rs1=4, IF_ID_rs2=5, ID_EX_memRead=1, ID_EX_rd=5)
+    test_load_ex_mem_non_hazard = test_hazard(IF_ID_rs1=4, IF_ID_rs2=5, ID_EX_memRead=0, ID_EX_rd=1,
+        EX_MEM_memToReg=1, EX_MEM_rd=5)
+
+    # Branches resolved in decode
+    test_branch_alu_hazard = test_hazard(IF_ID_rs1=7, IF_ID_rs2=3, ID_EX_memRead=0, ID_EX_rd=7, Branch=1)
+    test_branch_load_hazard = test_hazard(IF_ID_rs1=1, IF_ID_rs2=9, ID_EX_memRead=0, ID_EX_rd=2, Branch=1,
+        EX_MEM_memToReg=1, EX_MEM_rd=9)
+    test_branch_non_hazard = test_hazard(IF_ID_rs1=1, IF_ID_rs2=9, ID_EX_memRead=0, ID_EX_rd=2, Branch=1,
+        EX_MEM_memToReg=0, EX_MEM_rd=9)
+
+class TestHazardScoreboard(unittest.TestCase):
+    def setUp(self):
+        self.dut = HazardUnit(regCount=32, enableF=True)
+
+    test_scoreboard_raw = test_scoreboard(rawSteps)
+    test_scoreboard_waw = test_scoreboard(wawSteps)
+
+# Dual-issue - a branch waits for the second pipe's ALU result, a second slot load-use only keeps it from pairing
+class TestHazardDual(unittest.TestCase):
+    def setUp(self):
+        self.dut = HazardUnit(regCount=32, dualIssue=True)
+
+    test_branch_second_pipe_hazard = test_hazard_dual(
+        {"Branch": 1, "IF_ID_rs2": 6, "ID_EX1_regWrite": 1, "ID_EX1_rd": 6}, stall=1, pairStall=0)
+    test_second_pipe_non_hazard = test_hazard_dual(
+        {"IF_ID_rs1": 6, "IF_ID1_rs1": 6, "ID_EX1_regWrite": 1, "ID_EX1_rd": 6}, stall=0, pairStall=0)
+    test_branch_second_pipe_x0_non_hazard = test_hazard_dual(
+        {"Branch": 1, "ID_EX1_regWrite": 1, "ID_EX1_rd": 0}, stall=0, pairStall=0)
+    test_pair_load_hazard = test_hazard_dual(
+        {"IF_ID_rs1": 2, "IF_ID1_rs2": 5, "ID_EX_memRead": 1, "ID_EX_regWrite": 1, "ID_EX_rd": 5},
+        stall=0, pairStall=1)
+    test_pair_alu_non_hazard = test_hazard_dual(
+        {"IF_ID1_rs1": 5, "ID_EX_regWrite": 1, "ID_EX_rd": 5}, stall=0, pairStall=0)
+    test_load_both_hazard = test_hazard_dual(
+        {"IF_ID_rs1": 5, "IF_ID1_rs1": 5, "ID_EX_memRead": 1, "ID_EX_regWrite": 1, "ID_EX_rd": 5},
+        stall=1, pairStall=1)
+
+# 7 stages - load data is only forwarded from MEM2/WB, so a use waits for a load in EX/MEM too (and a branch for
+# one in MEM/WB)
+class TestHazardDeep(unittest.TestCase):
+    def setUp(self):
+        self.dut = HazardUnit(regCount=32, pipelineDepth=7)
+
+    test_load_hazard = test_hazard_deep(
+        {"IF_ID_rs1": 4, "IF_ID_rs2": 5, "ID_EX_memRead": 1, "ID_EX_regWrite": 1, "ID_EX_rd": 5}, stall=1)
+    test_load_ex_mem_hazard = test_hazard_deep(
+        {"IF_ID_rs1": 4, "IF_ID_rs2": 5, "EX_MEM_memToReg": 1, "EX_MEM_rd": 4}, stall=1)
+    test_load_mem_wb_non_hazard = test_hazard_deep(
+        {"IF_ID_rs1": 4, "IF_ID_rs2": 5, "MEM_WB_memToReg": 1, "MEM_WB_rd": 5}, stall=0)
+    test_branch_load_mem_wb_hazard = test_hazard_deep(
+        {"Branch": 1, "IF_ID_rs1": 4, "IF_ID_rs2": 5, "MEM_WB_memToReg": 1, "MEM_WB_rd": 5}, stall=1)
+    test_branch_alu_mem_wb_non_hazard = test_hazard_deep(
+        {"Branch": 1, "IF_ID_rs1": 4, "IF_ID_rs2": 5, "MEM_WB_memToReg": 0, "MEM_WB_rd": 5}, stall=0)
+    test_load_x0_non_hazard = test_hazard_deep(
+        {"Branch": 1, "EX_MEM_memToReg": 1, "EX_MEM_rd": 0, "MEM_WB_memToReg": 1, "MEM_WB_rd": 0}, stall=0)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -0,0 +1,155 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.types import *
+from mipyfive.icache import *
+from examples.common.slowram import *
+
+memDepth = 256
+
+def createCacheSoc(size, lineSize, ways, replacement, latency):
+    dut = Module()
+    dut.submodules.icache   = icache = InstructionCache(size, lineSize, ways, replacement)
+    dut.submodules.mem      = mem = SlowRAM(width=32, depth=memDepth, latency=latency,
+        init=[random.randint(0, 4294967295) for _ in range(memDepth)])
+    dut.d.comb += [
+        mem.req.eq(icache.refillReq),
+        mem.addr.eq(icache.refillAddr),
+        icache.refillData.eq(mem.readData),
+        icache.refillValid.eq(mem.valid)
+    ]
+    return dut
+
+# Fetch streams with some locality (sequential runs from random starting points)
+def fetchStream(length):
+    addrs = []
+    while len(addrs) < length:
+        start = random.randrange(0, memDepth) * 4
+        addrs += [(start + 4*i) % (memDepth*4) for i in range(random.randint(1, 12))]
+    return addrs[:length]
+
+# Present "addr" until the cache accepts it - returns the data of the previous fetch
+# NOTE: A fetch is counted (hit or miss) by the time the next one is accepted
+def fetch(icache, addr):
+    yield icache.addr.eq(addr)
+    yield Settle()
+    while not (yield icache.ready):
+        yield Tick()
+        yield Settle()
+    data = yield icache.data
+    yield Tick()
+    yield Settle()
+    return data
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_icache(addrs):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        icache = self.dut.submodules.icache
+        mem = self.dut.submodules.mem
+        def process():
+            # Counting starts once the warm-up fetch of address 0 has been counted
+            # NOTE: Whether the cache latches the reset-time address before the process starts depends
+            #       on the simulator, hence the warm-up
+            yield from fetch(icache, 0)
+            pending = 0
+            for i, addr in enumerate(addrs + [0]):
+                data = yield from fetch(icache, addr)
+                self.assertEqual(data, mem.memory._init[pending // 4])
+                pending = addr
+                if i == 0:
+                    base = (yield icache.hits) + (yield icache.misses)
+
+            # Every fetch is either a hit or a miss
+            self.assertEqual((yield icache.hits) + (yield icache.misses) - base, len(addrs))
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_icache_loop(loopWords, iterations, expectedMisses):
+    def test(self):
+        sim = Simulator(self.dut)
+        icache = self.dut.submodules.icache
+        def process():
+            # Line 0 is cached (and counted) by the warm-up fetch before the loop starts
+            yield from fetch(icache, 0)
+            for i, addr in enumerate([4*i for i in range(loopWords)] * iterations + [0]):
+                yield from fetch(icache, addr)
+                if i == 0:
+                    baseHits, baseMisses = (yield icache.hits), (yield icache.misses)
+            self.assertEqual((yield icache.misses) - baseMisses, expectedMisses)
+            self.assertEqual((yield icache.hits) - baseHits, loopWords*iterations - expectedMisses)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        sim.run()
+    return test
+
+# Define unit tests
+class TestICacheDirectMapped(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=64, lineSize=16, ways=1, replacement=CacheReplacement.LRU, latency=3)
+
+    test_icache_random = test_icache(fetchStream(200))
+    # 16-word loop fits exactly (4 lines) - only compulsory misses (line 0 is already warm)
+    test_icache_fit = test_icache_loop(loopWords=16, iterations=4, expectedMisses=3)
+
+class TestICacheSingleWordLines(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=32, lineSize=4, ways=2, replacement=CacheReplacement.FIFO, latency=1)
+
+    test_icache_random = test_icache(fetchStream(200))
+
+class TestICacheLRU(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=128, lineSize=16, ways=2, replacement=CacheReplacement.LRU, latency=2)
+
+    test_icache_random = test_icache(fetchStream(200))
+    # 40-word loop (10 lines) over 4 sets of 2 - sets 0 and 1 hold 3 lines each and thrash under LRU
+    # (every access misses, bar warm line 0), sets 2 and 3 only take compulsory misses
+    test_icache_thrash = test_icache_loop(loopWords=40, iterations=3, expectedMisses=21)
+
+class TestICacheFIFO(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=128, lineSize=8, ways=4, replacement=CacheReplacement.FIFO, latency=2)
+
+    test_icache_random = test_icache(fetchStream(200))
+
+class TestICacheRandom(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=64, lineSize=16, ways=2, replacement=CacheReplacement.RANDOM, latency=2)
+
+    test_icache_random = test_icache(fetchStream(200))
+
+class TestICacheFullyAssociative(unittest.TestCase):
+    def setUp(self):
+        self.dut = createCacheSoc(size=64, lineSize=16, ways=4, replacement=CacheReplacement.LRU, latency=2)
+
+    test_icache_random = test_icache(fetchStream(200))
+    test_icache_fit = test_icache_loop(loopWords=16, iterations=4, expectedMisses=3)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
@@ -12,7 +12,7 @@ from mipyfive.lsu import *
 
 createVcd = False
 outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
-def test_load(lDin, lCtrl, lDoutExpected):
+def test_load(lDin, lCtrl, lDoutExpected, lAddr=0):
     def test(self):
         global createVcd
         global outputDir
@@ -20,6 +20,7 @@ def test_load(lDin, lCtrl, lDoutExpected):
         def process():
             yield self.dut.lDataIn.eq(lDin)
             yield self.dut.lCtrlIn.eq(lCtrl)
+            yield self.dut.lAddrIn.eq(lAddr)
             yield self.dut.sDataIn.eq(0)
             yield self.dut.sCtrlIn.eq(0)
             yield Delay(1e-6)
@@ -35,7 +36,7 @@ def test_load(lDin, lCtrl, lDoutExpected):
             sim.run()
     return test
 
-def test_store(sDin, sCtrl, sDoutExpected):
+def test_store(sDin, sCtrl, sDoutExpected, sAddr=0, sByteEnExpected=None):
     def test(self):
         global createVcd
         global outputDir
@@ -45,9 +46,12 @@ def test_store(sDin, sCtrl, sDoutExpected):
             yield self.dut.lCtrlIn.eq(0)
             yield self.dut.sDataIn.eq(sDin)
             yield self.dut.sCtrlIn.eq(sCtrl)
+            yield self.dut.sAddrIn.eq(sAddr)
             yield Delay(1e-6)
 
             self.assertEqual((yield self.dut.sDataOut), sDoutExpected)
+            if sByteEnExpected is not None:
+                self.assertEqual((yield self.dut.sByteEnOut), sByteEnExpected)
         sim.add_process(process)
         if createVcd:
             if not os.path.exists(outputDir):
@@ -73,6 +77,17 @@ class TestLSU(unittest.TestCase):
     test_sh = test_store(0x1234abcd, LSUStoreCtrl.LSU_SH.value, 0x0000abcd)
     test_sw = test_store(0x1234abcd, LSUStoreCtrl.LSU_SW.value, 0x1234abcd)
 
+    # Sub-word accesses at an address offset - loaded from/stored to their byte lane
+    test_lb_offset  = test_load(0x1234abcd, LSULoadCtrl.LSU_LB.value,  0xffffffab, lAddr=1)
+    test_lbu_offset = test_load(0x1234abcd, LSULoadCtrl.LSU_LBU.value, 0x00000012, lAddr=3)
+    test_lh_offset  = test_load(0x8234abcd, LSULoadCtrl.LSU_LH.value,  0xffff8234, lAddr=2)
+    test_lhu_offset = test_load(0x8234abcd, LSULoadCtrl.LSU_LHU.value, 0x00008234, lAddr=2)
+
+    test_sb_offset = test_store(0x1234abcd, LSUStoreCtrl.LSU_SB.value, 0x00cd0000, sAddr=2, sByteEnExpected=0b0100)
+    test_sb_lane3  = test_store(0x1234abcd, LSUStoreCtrl.LSU_SB.value, 0xcd000000, sAddr=3, sByteEnExpected=0b1000)
+    test_sh_offset = test_store(0x1234abcd, LSUStoreCtrl.LSU_SH.value, 0xabcd0000, sAddr=2, sByteEnExpected=0b1100)
+    test_sw_byteen = test_store(0x1234abcd, LSUStoreCtrl.LSU_SW.value, 0x1234abcd, sByteEnExpected=0b1111)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
@@ -0,0 +1,101 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.multiplier import *
+
+def toSigned(value):
+    return value - (1 << 32) if value & (1 << 31) else value
+
+def mulModel(in1, in2, aluOp):
+    '''Reference model - RV32M multiply result for a pair of 32-bit register values'''
+    if aluOp is AluOp.MUL:
+        return (in1 * in2) & 0xffffffff
+    if aluOp is AluOp.MULH:
+        return ((toSigned(in1) * toSigned(in2)) >> 32) & 0xffffffff
+    if aluOp is AluOp.MULHSU:
+        return ((toSigned(in1) * in2) >> 32) & 0xffffffff
+    return ((in1 * in2) >> 32) & 0xffffffff
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_multiplier(ops):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # A new operation every cycle - results must come out in order, "latency" cycles later
+            expected = []
+            for cycle in range(len(ops) + self.dut.latency + 1):
+                if cycle < len(ops):
+                    in1, in2, aluOp = ops[cycle]
+                    yield self.dut.start.eq(1)
+                    yield self.dut.in1.eq(in1)
+                    yield self.dut.in2.eq(in2)
+                    yield self.dut.aluOp.eq(aluOp.value)
+                    expected.append(mulModel(in1, in2, aluOp))
+                else:
+                    yield self.dut.start.eq(0)
+                yield Settle()
+                if cycle >= self.dut.latency and cycle - self.dut.latency < len(ops):
+                    self.assertEqual((yield self.dut.valid), 1)
+                    self.assertEqual((yield self.dut.out), expected[cycle - self.dut.latency])
+                else:
+                    self.assertEqual((yield self.dut.valid), 0)
+                yield Tick() if self.dut.latency > 0 else Delay(1e-6)
+        # NOTE: A latency of 0 has no registers (and so no clock domain)
+        if self.dut.latency > 0:
+            sim.add_clock(1e-6)
+        sim.add_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+mulOps = [AluOp.MUL, AluOp.MULH, AluOp.MULHSU, AluOp.MULHU]
+edgeOperands = [0, 1, 0x7fffffff, 0x80000000, 0xffffffff]
+edgeOps = [(in1, in2, aluOp) for in1 in edgeOperands for in2 in edgeOperands for aluOp in mulOps]
+randomOps = [(random.randint(0, 0xffffffff), random.randint(0, 0xffffffff), random.choice(mulOps))
+    for i in range(32)]
+
+# Define unit tests
+class TestMultiplier(unittest.TestCase):
+    def setUp(self):
+        self.dut = Multiplier(width=32, latency=2)
+
+    test_multiplier_edge    = test_multiplier(edgeOps)
+    test_multiplier_random  = test_multiplier(randomOps)
+
+class TestMultiplierCombinational(unittest.TestCase):
+    def setUp(self):
+        self.dut = Multiplier(width=32, latency=0)
+
+    test_multiplier_edge    = test_multiplier(edgeOps)
+    test_multiplier_random  = test_multiplier(randomOps)
+
+class TestMultiplierDeep(unittest.TestCase):
+    def setUp(self):
+        self.dut = Multiplier(width=32, latency=4)
+
+    test_multiplier_random  = test_multiplier(randomOps)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
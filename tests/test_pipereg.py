@@ -22,7 +22,6 @@ def test_pipereg(values):
             for val in values:
                 yield self.dut.din.eq(val)
                 yield self.dut.en.eq(0)
-                yield self.dut.reg[0].eq(0)
                 yield Tick()
 
                 yield self.dut.en.eq(1)
@@ -30,11 +29,11 @@ def test_pipereg(values):
                     yield Tick()
                 self.assertEqual((yield self.dut.dout), val)
 
-                # NOTE: Toggling/testing the reset signal in simulation is currently non-working in nMigen...
-                #yield self.dut.rst.eq(1)
-                #for j in range(2):
-                #    yield Tick()
-                #self.assertEqual((yield self.dut.dout), 0)
+                yield self.dut.rst.eq(1)
+                for j in range(2):
+                    yield Tick()
+                self.assertEqual((yield self.dut.dout), 0)
+                yield self.dut.rst.eq(0)
         
         sim.add_clock(1e-6)
         sim.add_sync_process(process)
@@ -47,6 +46,49 @@ def test_pipereg(values):
             sim.run()
     return test
 
+# rst only clears the control field ("ctrl") - the data field ("data") holds, or loads din along with en
+def test_pipereg_fields(values):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+
+        # Begin test
+        def process():
+            for ctrl, data in values:
+                yield self.dut.din.eq(Cat(C(ctrl, 4), C(data, 28)))
+                yield self.dut.en.eq(1)
+                yield Tick()
+                yield Settle()
+                self.assertEqual((yield self.dut.doutSlice("ctrl")), ctrl)
+                self.assertEqual((yield self.dut.doutSlice("data")), data)
+
+                yield self.dut.din.eq(Cat(C(ctrl ^ 0xf, 4), C(data ^ 0xfffffff, 28)))
+                yield self.dut.en.eq(0)
+                yield self.dut.rst.eq(1)
+                yield Tick()
+                yield Settle()
+                self.assertEqual((yield self.dut.doutSlice("ctrl")), 0)
+                self.assertEqual((yield self.dut.doutSlice("data")), data)
+
+                yield self.dut.en.eq(1)
+                yield Tick()
+                yield Settle()
+                self.assertEqual((yield self.dut.doutSlice("ctrl")), 0)
+                self.assertEqual((yield self.dut.doutSlice("data")), data ^ 0xfffffff)
+                yield self.dut.rst.eq(0)
+
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
 # Define unit tests
 class TestPipereg(unittest.TestCase):
     def setUp(self):
@@ -55,6 +97,17 @@ class TestPipereg(unittest.TestCase):
 
     test_pipereg = test_pipereg([0xdeadbeef, 0x5a5a5a5a, 0x0f0f0f0f])
 
+class TestPiperegFields(unittest.TestCase):
+    def setUp(self):
+        print()
+        self.dut = PipeReg(dataFields=["data"], ctrl=4, data=28)
+
+    test_pipereg_fields = test_pipereg_fields([(0xa, 0xdeadbee), (0x5, 0x5a5a5a5), (0xf, 0x0f0f0f0)])
+
+    def test_pipereg_unknown_field(self):
+        with self.assertRaises(ValueError):
+            PipeReg(dataFields=["dat"], ctrl=4, data=28)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
@@ -0,0 +1,79 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.types import *
+from mipyfive.predictor import *
+
+def expectedCounter(counter, taken):
+    if taken:
+        return min(counter + 1, BhtState.STRONG_TAKEN.value)
+    return max(counter - 1, BhtState.STRONG_NOT_TAKEN.value)
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_predictor(pc, outcomes):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            counter = BhtState.WEAK_NOT_TAKEN.value
+            yield self.dut.fetchPc.eq(pc)
+            yield self.dut.updatePc.eq(pc)
+            yield Tick()
+            self.assertEqual((yield self.dut.counter), counter)
+
+            # Train the entry with the given branch outcomes
+            for taken in outcomes:
+                yield self.dut.updateEnable.eq(1)
+                yield self.dut.updateCounter.eq((yield self.dut.counter))
+                yield self.dut.updateTaken.eq(taken)
+                yield Tick()
+                yield self.dut.updateEnable.eq(0)
+                yield Tick()
+                counter = expectedCounter(counter, taken)
+                self.assertEqual((yield self.dut.counter), counter)
+                self.assertEqual((yield self.dut.taken), counter >> 1)
+
+            # Neighbouring entry should be left untouched
+            yield self.dut.fetchPc.eq(pc + 4)
+            yield Tick()
+            self.assertEqual((yield self.dut.counter), BhtState.WEAK_NOT_TAKEN.value)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# Define unit tests
+class TestPredictor(unittest.TestCase):
+    def setUp(self):
+        self.dut = BranchPredictor(entries=16)
+
+    test_predictor_saturate_taken       = test_predictor(pc=0x40, outcomes=[1, 1, 1, 1])
+    test_predictor_saturate_not_taken   = test_predictor(pc=0x08, outcomes=[0, 0, 0])
+    test_predictor_hysteresis           = test_predictor(pc=0x1c, outcomes=[1, 1, 0, 1, 0, 0, 0])
+    test_predictor_random               = test_predictor(pc=random.randint(0, 14) * 4,
+        outcomes=[random.randint(0, 1) for i in range(8)])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
@@ -74,6 +74,45 @@ def test_ram_write(writeData):
             sim.run()
     return test
 
+def test_ram_byte_enable():
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            testList = []
+            for i in range(self.dut.memory.depth):
+                randVal = random.randint(1, 4294967295)
+                yield self.dut.memory[i].eq(randVal)
+                testList.append(randVal)
+            yield Tick()
+
+            # Test that only the enabled byte lanes are written
+            for i in range(self.dut.memory.depth):
+                writeData = random.randint(0, 4294967295)
+                byteEnable = random.randint(0, 15)
+                yield self.dut.writeData.eq(writeData)
+                yield self.dut.byteEnable.eq(byteEnable)
+                yield self.dut.writeAddr.eq(i)
+                yield self.dut.writeEnable.eq(1)
+                yield Tick()
+                yield self.dut.writeEnable.eq(0)
+                yield self.dut.readAddr.eq(i)
+                for j in range(2):
+                    yield Tick()
+                mask = sum(0xff << (8*lane) for lane in range(4) if byteEnable & (1 << lane))
+                self.assertEqual((yield self.dut.readData), (testList[i] & ~mask) | (writeData & mask))
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
 # Define unit tests
 class TestRam(unittest.TestCase):
     def setUp(self):
@@ -81,6 +120,7 @@ class TestRam(unittest.TestCase):
 
     test_ram_write  = test_ram_write(writeData=0xdeadbeef)
     test_ram_read   = test_ram_read()
+    test_ram_byte_enable = test_ram_byte_enable()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -0,0 +1,72 @@
+import os
+import sys
+import random
+import argparse
+import unittest
+from nmigen import *
+from nmigen.back.pysim import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mipyfive.ras import *
+
+createVcd = False
+outputDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out", "vcd"))
+def test_ras(ops):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            # Reference model - circular stack of self.dut.stack.depth entries
+            depth = self.dut.stack.depth
+            model = [0] * depth
+            sp = 0
+            for op, addr in ops:
+                yield self.dut.push.eq(op in ("push", "swap"))
+                yield self.dut.pop.eq(op in ("pop", "swap"))
+                yield self.dut.pushAddr.eq(addr)
+                yield Tick()
+                if op == "push":
+                    sp = (sp + 1) % depth
+                    model[sp] = addr
+                elif op == "pop":
+                    sp = (sp - 1) % depth
+                elif op == "swap":
+                    model[sp] = addr
+                yield self.dut.push.eq(0)
+                yield self.dut.pop.eq(0)
+                yield Tick()
+                self.assertEqual((yield self.dut.top), model[sp])
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+# Define unit tests
+class TestRas(unittest.TestCase):
+    def setUp(self):
+        self.dut = ReturnAddressStack(depth=4)
+
+    test_ras_push_pop = test_ras([("push", 0x10), ("push", 0x20), ("pop", 0), ("push", 0x30),
+        ("pop", 0), ("pop", 0)])
+    test_ras_swap     = test_ras([("push", 0x10), ("push", 0x20), ("swap", 0x44), ("pop", 0)])
+    test_ras_overflow = test_ras([("push", 0x10 * (i + 1)) for i in range(6)] + [("pop", 0)] * 6)
+    test_ras_random   = test_ras([(random.choice(["push", "pop", "swap"]), random.randint(0, 1023) * 4)
+        for i in range(16)])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vcd", action="store_true", help="Emit VCD files.")
+    args, argv = parser.parse_known_args()
+    sys.argv[1:] = argv
+    if args.vcd is True:
+        print(f"[INFO]: Emitting VCD files to --> {outputDir}\n")
+        createVcd = True
+
+    unittest.main(verbosity=2)
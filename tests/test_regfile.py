@@ -27,6 +27,8 @@ def test_regfile_read():
             yield Tick()
 
             # Test that reading from 
+            # NOTE: x0 always reads as zero
+            testList[0] = 0
             for i in range(self.dut.regArray.depth):
                 yield self.dut.rs1Addr.eq(i)
                 yield self.dut.rs2Addr.eq(i)
@@ -64,8 +66,202 @@ def test_regfile_write(writeData):
                 yield self.dut.rs1Addr.eq(i)
                 yield self.dut.rs2Addr.eq(i)
                 yield Tick()
-                self.assertEqual((yield self.dut.rs1Data), writeData)
-                self.assertEqual((yield self.dut.rs2Data), writeData)
+                self.assertEqual((yield self.dut.rs1Data), writeData if i != 0 else 0)
+                self.assertEqual((yield self.dut.rs2Data), writeData if i != 0 else 0)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_regfile_bypass(writeData):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            oldList = []
+            for i in range(self.dut.regArray.depth):
+                randVal = random.randint(1, 4294967295)
+                yield self.dut.regArray[i].eq(randVal)
+                oldList.append(randVal if i != 0 else 0)
+            yield Tick()
+
+            # Test that a same-cycle write is seen on each port (and only on the port reading it)
+            for i in range(self.dut.regArray.depth):
+                other = (i + 1) % self.dut.regArray.depth
+                for writePort, otherPort in [(self.dut.rs1Addr, self.dut.rs2Addr),
+                    (self.dut.rs2Addr, self.dut.rs1Addr)]:
+                        yield self.dut.writeAddr.eq(i)
+                        yield self.dut.writeData.eq(writeData)
+                        yield self.dut.writeEnable.eq(1)
+                        yield writePort.eq(i)
+                        yield otherPort.eq(other)
+                        yield Settle()
+                        expected = writeData if i != 0 else 0
+                        if writePort is self.dut.rs1Addr:
+                            self.assertEqual((yield self.dut.rs1Data), expected)
+                            self.assertEqual((yield self.dut.rs2Data), oldList[other])
+                        else:
+                            self.assertEqual((yield self.dut.rs2Data), expected)
+                            self.assertEqual((yield self.dut.rs1Data), oldList[other])
+                        yield Tick()
+                oldList[i] = writeData if i != 0 else 0
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_regfile_dual(writeData, writeData2):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            oldList = []
+            for i in range(self.dut.regArray.depth):
+                randVal = random.randint(1, 4294967295)
+                yield self.dut.regArray[i].eq(randVal)
+                oldList.append(randVal if i != 0 else 0)
+            yield Tick()
+
+            # Both write ports at once (the second one wins on the same register) - seen on all four read ports
+            # in the same cycle, and stored
+            ports = [(self.dut.rs1Addr, self.dut.rs1Data), (self.dut.rs2Addr, self.dut.rs2Data),
+                (self.dut.rs3Addr, self.dut.rs3Data), (self.dut.rs4Addr, self.dut.rs4Data)]
+            for i in range(self.dut.regArray.depth):
+                other = i if i % 4 == 0 else random.randint(0, self.dut.regArray.depth - 1)
+                yield self.dut.writeAddr.eq(i)
+                yield self.dut.writeData.eq(writeData)
+                yield self.dut.writeEnable.eq(1)
+                yield self.dut.writeAddr2.eq(other)
+                yield self.dut.writeData2.eq(writeData2)
+                yield self.dut.writeEnable2.eq(1)
+                addrs = [i, other, (i + 1) % self.dut.regArray.depth, i]
+                for (rsAddr, _), addr in zip(ports, addrs):
+                    yield rsAddr.eq(addr)
+                yield Settle()
+                newList = list(oldList)
+                newList[i] = writeData
+                newList[other] = writeData2
+                newList[0] = 0
+                for (_, rsData), addr in zip(ports, addrs):
+                    self.assertEqual((yield rsData), newList[addr])
+                yield Tick()
+                oldList = newList
+            yield self.dut.writeEnable.eq(0)
+            yield self.dut.writeEnable2.eq(0)
+            for i in range(self.dut.regArray.depth):
+                yield ports[i % 4][0].eq(i)
+                yield Settle()
+                self.assertEqual((yield ports[i % 4][1]), oldList[i])
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_regfile_threads(writeData):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            regCount = self.dut.regCount
+            # Each bank's x10 starts out as its thread index
+            for thread in range(self.dut.threads):
+                yield self.dut.readThread.eq(thread)
+                yield self.dut.rs1Addr.eq(10)
+                yield Settle()
+                self.assertEqual((yield self.dut.rs1Data), thread)
+
+            # A write only goes to (and is only written through on reads of) the write thread's bank
+            for i in range(regCount * self.dut.threads):
+                writeThread, reg = divmod(i, regCount)
+                readThread = random.choice([writeThread, (writeThread + 1) % self.dut.threads])
+                old = (yield self.dut.regArray[readThread * regCount + reg])
+                yield self.dut.writeThread.eq(writeThread)
+                yield self.dut.writeAddr.eq(reg)
+                yield self.dut.writeData.eq(writeData + i)
+                yield self.dut.writeEnable.eq(1)
+                yield self.dut.readThread.eq(readThread)
+                yield self.dut.rs1Addr.eq(reg)
+                yield self.dut.rs2Addr.eq(reg)
+                yield Settle()
+                expected = 0 if reg == 0 else writeData + i if readThread == writeThread else old
+                self.assertEqual((yield self.dut.rs1Data), expected)
+                self.assertEqual((yield self.dut.rs2Data), expected)
+                yield Tick()
+            yield self.dut.writeEnable.eq(0)
+            for i in range(regCount * self.dut.threads):
+                thread, reg = divmod(i, regCount)
+                yield self.dut.readThread.eq(thread)
+                yield self.dut.rs1Addr.eq(reg)
+                yield Settle()
+                self.assertEqual((yield self.dut.rs1Data), 0 if reg == 0 else writeData + i)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        if createVcd:
+            if not os.path.exists(outputDir):
+                os.makedirs(outputDir)
+            with sim.write_vcd(vcd_file=os.path.join(outputDir, f"{self._testMethodName}.vcd")):
+                sim.run()
+        else:
+            sim.run()
+    return test
+
+def test_regfile_sync(seed):
+    def test(self):
+        global createVcd
+        global outputDir
+        sim = Simulator(self.dut)
+        def process():
+            random.seed(seed)
+            regs = [0] * self.dut.regCount
+            for i in range(1, self.dut.regCount):
+                regs[i] = random.randint(1, 4294967295)
+                yield self.dut.regArray[i].eq(regs[i])
+                yield self.dut.regArray2[i].eq(regs[i])
+            yield Tick()
+
+            # Each cycle reads the registers addressed (rs1AddrNext/rs2AddrNext) in the previous one, while a write
+            # (often to one of them - in this cycle or the previous one) is seen on the port reading it
+            addrs = (0, 0)
+            for _ in range(300):
+                nextAddrs = (random.randrange(self.dut.regCount), random.randrange(self.dut.regCount))
+                writeAddr = random.choice([*addrs, *nextAddrs, random.randrange(self.dut.regCount)])
+                writeEnable = random.getrandbits(1)
+                writeData = random.getrandbits(32)
+                yield self.dut.rs1Addr.eq(addrs[0])
+                yield self.dut.rs2Addr.eq(addrs[1])
+                yield self.dut.rs1AddrNext.eq(nextAddrs[0])
+                yield self.dut.rs2AddrNext.eq(nextAddrs[1])
+                yield self.dut.writeAddr.eq(writeAddr)
+                yield self.dut.writeData.eq(writeData)
+                yield self.dut.writeEnable.eq(writeEnable)
+                yield Settle()
+                written = writeData if writeEnable and writeAddr != 0 else regs[writeAddr]
+                for addr, rsData in zip(addrs, [self.dut.rs1Data, self.dut.rs2Data]):
+                    self.assertEqual((yield rsData), written if addr == writeAddr else regs[addr])
+                yield Tick()
+                regs[writeAddr] = written
+                addrs = nextAddrs
         sim.add_clock(1e-6)
         sim.add_sync_process(process)
         if createVcd:
@@ -84,6 +280,27 @@ class TestRegfile(unittest.TestCase):
 
     test_regfile_write  = test_regfile_write(writeData=0xdeadbeef)
     test_regfile_read   = test_regfile_read()
+    test_regfile_bypass = test_regfile_bypass(writeData=0xcafef00d)
+
+class TestRegfileDual(unittest.TestCase):
+    def setUp(self):
+        self.dut = RegFile(width=32, regCount=32, dualIssue=True)
+
+    test_regfile_write  = test_regfile_write(writeData=0xdeadbeef)
+    test_regfile_read   = test_regfile_read()
+    test_regfile_dual   = test_regfile_dual(writeData=0x12345678, writeData2=0x9abcdef0)
+
+class TestRegfileThreads(unittest.TestCase):
+    def setUp(self):
+        self.dut = RegFile(width=32, regCount=32, threads=3)
+
+    test_regfile_threads = test_regfile_threads(writeData=0x0badf00d)
+
+class TestRegfileSync(unittest.TestCase):
+    def setUp(self):
+        self.dut = RegFile(width=32, regCount=32, syncRead=True)
+
+    test_regfile_sync   = test_regfile_sync(seed=0xb4a3)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -1,15 +1,28 @@
 import os
+import random
 import textwrap
+from fractions import Fraction
 from riscv_assembler.utils import *
 
+# RV32I mnemonics missing from riscv_assembler --> (a supported one with the same encoding but for funct3, funct3)
+rMissing = { "slt": ("sltu", 0b010) }
+iMissing = { "lh": ("lb", 0b001) }
+
+def withFunct3(word, funct3):
+    return word & ~(0b111 << 12) | (funct3 << 12)
+
 def asm2binR(instr, rd, rs1, rs2):
     ''' Simple wrapper around riscv_assembler.utils R-type assembler to convert bitstring --> raw int'''
+    if instr in rMissing:
+        return withFunct3(asm2binR(rMissing[instr][0], rd, rs1, rs2), rMissing[instr][1])
     tk = Toolkit()
     bitstring = tk.R_type(instr, rs1, rs2, rd)
     return int(bitstring, 2)
 
 def asm2binI(instr, rd, rs1, imm):
     ''' Simple wrapper around riscv_assembler.utils I-type assembler to convert bitstring --> raw int'''
+    if instr in iMissing:
+        return withFunct3(asm2binI(iMissing[instr][0], rd, rs1, imm), iMissing[instr][1])
     tk = Toolkit()
     bitstring = tk.I_type(instr, rs1, imm, rd)
     return int(bitstring, 2)
@@ -38,32 +51,425 @@ def asm2binJ(instr, rd, imm):
     bitstring = tk.UJ_type(instr, imm, rd)
     return int(bitstring, 2)
 
+# RV32F mnemonics (not supported by riscv_assembler) --> (opcode, funct7, funct3 - None for the rounding mode,
+# rs2 - None for a register operand)
+fpInstructions = {
+    "fadd.s":   (0b1010011, 0b0000000, None, None),
+    "fsub.s":   (0b1010011, 0b0000100, None, None),
+    "fmul.s":   (0b1010011, 0b0001000, None, None),
+    "fdiv.s":   (0b1010011, 0b0001100, None, None),
+    "fsqrt.s":  (0b1010011, 0b0101100, None, 0),
+    "fsgnj.s":  (0b1010011, 0b0010000, 0b000, None),
+    "fsgnjn.s": (0b1010011, 0b0010000, 0b001, None),
+    "fsgnjx.s": (0b1010011, 0b0010000, 0b010, None),
+    "fmin.s":   (0b1010011, 0b0010100, 0b000, None),
+    "fmax.s":   (0b1010011, 0b0010100, 0b001, None),
+    "fcvt.w.s": (0b1010011, 0b1100000, None, 0),
+    "fcvt.wu.s":(0b1010011, 0b1100000, None, 1),
+    "fmv.x.w":  (0b1010011, 0b1110000, 0b000, 0),
+    "fclass.s": (0b1010011, 0b1110000, 0b001, 0),
+    "feq.s":    (0b1010011, 0b1010000, 0b010, None),
+    "flt.s":    (0b1010011, 0b1010000, 0b001, None),
+    "fle.s":    (0b1010011, 0b1010000, 0b000, None),
+    "fcvt.s.w": (0b1010011, 0b1101000, None, 0),
+    "fcvt.s.wu":(0b1010011, 0b1101000, None, 1),
+    "fmv.w.x":  (0b1010011, 0b1111000, 0b000, 0),
+    "fmadd.s":  (0b1000011, None, None, None),
+    "fmsub.s":  (0b1000111, None, None, None),
+    "fnmsub.s": (0b1001011, None, None, None),
+    "fnmadd.s": (0b1001111, None, None, None)
+}
+roundingModes = { "rne": 0, "rtz": 1, "rdn": 2, "rup": 3, "rmm": 4, "dyn": 7 }
+
+def asm2binF(instr, operands):
+    ''' RV32F assembler - "flw frd, rs1, imm", "fsw frs2, imm, rs1", otherwise "rd, rs1[, rs2[, rs3]][, rm]"
+    (rd/rs1 are x or f registers as the instruction requires, the rounding mode defaults to dyn)'''
+    reg = lambda name: int(name[1:])
+    if instr == "flw":
+        imm = int(operands[2]) & 0xfff
+        return imm << 20 | reg(operands[1]) << 15 | 0b010 << 12 | reg(operands[0]) << 7 | 0b0000111
+    if instr == "fsw":
+        imm = int(operands[1]) & 0xfff
+        return ((imm >> 5) << 25 | reg(operands[0]) << 20 | reg(operands[2]) << 15 | 0b010 << 12 |
+            (imm & 0x1f) << 7 | 0b0100111)
+    opcode, funct7, funct3, rs2 = fpInstructions[instr]
+    rm = roundingModes["dyn"]
+    if operands[-1] in roundingModes:
+        rm = roundingModes[operands[-1]]
+        operands = operands[:-1]
+    word = opcode | reg(operands[0]) << 7 | (rm if funct3 is None else funct3) << 12 | reg(operands[1]) << 15
+    word |= (reg(operands[2]) if rs2 is None else rs2) << 20
+    if funct7 is None:
+        # R4-type - rs3 and fmt (00 - single precision)
+        return word | reg(operands[3]) << 27
+    return word | funct7 << 25
+
+# Zba/Zbb - R-type (funct7, funct3), unary (funct12, funct3) and RORI (funct7, funct3) encodings
+zbRInstructions = {
+    "sh1add": (0b0010000, 0b010), "sh2add": (0b0010000, 0b100), "sh3add": (0b0010000, 0b110),
+    "andn":   (0b0100000, 0b111), "orn":    (0b0100000, 0b110), "xnor":   (0b0100000, 0b100),
+    "min":    (0b0000101, 0b100), "minu":   (0b0000101, 0b101), "max":    (0b0000101, 0b110),
+    "maxu":   (0b0000101, 0b111), "rol":    (0b0110000, 0b001), "ror":    (0b0110000, 0b101)
+}
+zbUnaryInstructions = {
+    "clz":    (0x600, 0b001), "ctz":    (0x601, 0b001), "cpop":   (0x602, 0b001), "sext.b": (0x604, 0b001),
+    "sext.h": (0x605, 0b001), "orc.b":  (0x287, 0b101), "rev8":   (0x698, 0b101)
+}
+
+def asm2binZb(instr, operands):
+    ''' Zba/Zbb assembler - "rd, rs1, rs2", "rori rd, rs1, shamt", "zext.h rd, rs1" or (unary) "rd, rs1" '''
+    reg = lambda name: int(name[1:])
+    if instr == "rori":
+        return (0b0110000 << 25 | (int(operands[2]) & 0x1f) << 20 | reg(operands[1]) << 15 | 0b101 << 12 |
+            reg(operands[0]) << 7 | 0b0010011)
+    if instr == "zext.h":
+        return 0b0000100 << 25 | reg(operands[1]) << 15 | 0b100 << 12 | reg(operands[0]) << 7 | 0b0110011
+    if instr in zbUnaryInstructions:
+        funct12, funct3 = zbUnaryInstructions[instr]
+        return funct12 << 20 | reg(operands[1]) << 15 | funct3 << 12 | reg(operands[0]) << 7 | 0b0010011
+    funct7, funct3 = zbRInstructions[instr]
+    return (funct7 << 25 | reg(operands[2]) << 20 | reg(operands[1]) << 15 | funct3 << 12 | reg(operands[0]) << 7 |
+        0b0110011)
+
+# RV32C - (funct3, op) per mnemonic and the immediate's bit order (highest instruction bit first) per layout
+cInstructions = {
+    "c.addi4spn": (0b000, 0b00), "c.lw":   (0b010, 0b00), "c.flw":  (0b011, 0b00), "c.sw":   (0b110, 0b00),
+    "c.fsw":  (0b111, 0b00), "c.nop":  (0b000, 0b01), "c.addi": (0b000, 0b01), "c.jal":  (0b001, 0b01),
+    "c.li":   (0b010, 0b01), "c.addi16sp": (0b011, 0b01), "c.lui": (0b011, 0b01), "c.srli": (0b100, 0b01),
+    "c.srai": (0b100, 0b01), "c.andi": (0b100, 0b01), "c.sub":  (0b100, 0b01), "c.xor":  (0b100, 0b01),
+    "c.or":   (0b100, 0b01), "c.and":  (0b100, 0b01), "c.j":    (0b101, 0b01), "c.beqz": (0b110, 0b01),
+    "c.bnez": (0b111, 0b01), "c.slli": (0b000, 0b10), "c.lwsp": (0b010, 0b10), "c.flwsp": (0b011, 0b10),
+    "c.jr":   (0b100, 0b10), "c.mv":   (0b100, 0b10), "c.ebreak": (0b100, 0b10), "c.jalr": (0b100, 0b10),
+    "c.add":  (0b100, 0b10), "c.swsp": (0b110, 0b10), "c.fswsp": (0b111, 0b10)
+}
+cImmOrder = {
+    "ciw":  [5, 4, 9, 8, 7, 6, 2, 3],
+    "cl":   [5, 4, 3, 2, 6],
+    "ci":   [5, 4, 3, 2, 1, 0],
+    "sp16": [9, 4, 6, 8, 7, 5],
+    "lui":  [17, 16, 15, 14, 13, 12],
+    "cj":   [11, 4, 9, 8, 10, 6, 7, 3, 2, 1, 5],
+    "cb":   [8, 4, 3, 7, 6, 2, 1, 5],
+    "lwsp": [5, 4, 3, 2, 7, 6],
+    "swsp": [5, 4, 3, 2, 7, 6]
+}
+
+def cImm(imm, layout):
+    ''' Scatter an immediate into the bits of an RV32C instruction (with the given immediate layout) '''
+    order = cImmOrder[layout]
+    value = 0
+    for bit in order:
+        value = value << 1 | ((imm >> bit) & 1)
+    if layout in ["ci", "sp16", "lui", "lwsp"]:
+        # Bit 12, then bits 6:2
+        return (value >> 5) << 12 | (value & 0x1f) << 2
+    if layout in ["cl", "cb"]:
+        # Bits 12:10, then bits 6:5 (cl) or 6:2 (cb)
+        low = len(order) - 3
+        return (value >> low) << 10 | (value & ((1 << low) - 1)) << (7 - low)
+    # Contiguous - bits 12:5 (ciw), 12:2 (cj) or 12:7 (swsp)
+    return value << (13 - len(order))
+
+def asm2binC(instr, operands):
+    ''' RV32C assembler - operand orders follow the 32-bit instructions' ("c.lw rd', rs1', imm", "c.sw rs2', imm, rs1'",
+    "c.beqz rs1', imm", "c.lui rd, imm" takes the full value, ...) with an implicit rd/rs1 (c.addi rd, imm) or x2
+    (c.addi4spn rd', imm, c.addi16sp imm, c.lwsp rd, imm, c.swsp rs2, imm), CR-type is "rd, rs2" or "rs1" '''
+    reg = lambda name: int(name[1:])
+    regP = lambda name: int(name[1:]) - 8
+    funct3, op = cInstructions[instr]
+    word = funct3 << 13 | op
+    if instr == "c.addi4spn":
+        return word | cImm(int(operands[1]), "ciw") | regP(operands[0]) << 2
+    if instr in ["c.lw", "c.flw"]:
+        return word | cImm(int(operands[2]), "cl") | regP(operands[1]) << 7 | regP(operands[0]) << 2
+    if instr in ["c.sw", "c.fsw"]:
+        return word | cImm(int(operands[1]), "cl") | regP(operands[2]) << 7 | regP(operands[0]) << 2
+    if instr == "c.nop":
+        return word
+    if instr in ["c.addi", "c.li", "c.slli"]:
+        return word | reg(operands[0]) << 7 | cImm(int(operands[1]), "ci")
+    if instr in ["c.jal", "c.j"]:
+        return word | cImm(int(operands[0]), "cj")
+    if instr == "c.addi16sp":
+        return word | 2 << 7 | cImm(int(operands[0]), "sp16")
+    if instr == "c.lui":
+        return word | reg(operands[0]) << 7 | cImm(int(operands[1]), "lui")
+    if instr in ["c.srli", "c.srai", "c.andi"]:
+        funct2 = ["c.srli", "c.srai", "c.andi"].index(instr)
+        return word | funct2 << 10 | regP(operands[0]) << 7 | cImm(int(operands[1]), "ci")
+    if instr in ["c.sub", "c.xor", "c.or", "c.and"]:
+        funct2 = ["c.sub", "c.xor", "c.or", "c.and"].index(instr)
+        return word | 0b011 << 10 | regP(operands[0]) << 7 | funct2 << 5 | regP(operands[1]) << 2
+    if instr in ["c.beqz", "c.bnez"]:
+        return word | regP(operands[0]) << 7 | cImm(int(operands[1]), "cb")
+    if instr in ["c.lwsp", "c.flwsp"]:
+        return word | reg(operands[0]) << 7 | cImm(int(operands[1]), "lwsp")
+    if instr in ["c.swsp", "c.fswsp"]:
+        return word | cImm(int(operands[1]), "swsp") | reg(operands[0]) << 2
+    # CR-type - bit 12 is set for c.ebreak/c.jalr/c.add
+    rd = reg(operands[0]) if instr != "c.ebreak" else 0
+    rs2 = reg(operands[1]) if instr in ["c.mv", "c.add"] else 0
+    return word | (instr in ["c.ebreak", "c.jalr", "c.add"]) << 12 | rd << 7 | rs2 << 2
+
+def packHalfwords(halfwords):
+    ''' Pack 16-bit parcels into (little-endian) 32-bit words - an odd count is padded with a c.nop '''
+    if len(halfwords) % 2:
+        halfwords = halfwords + [asm2binC("c.nop", [])]
+    return [halfwords[i] | halfwords[i + 1] << 16 for i in range(0, len(halfwords), 2)]
+
+def packWords(words):
+    ''' Pack 32-bit words into (little-endian) 64-bit words (a dual-issue core's instruction memory) - an odd count
+    is padded with a nop '''
+    if len(words) % 2:
+        words = words + [asm2Bin("addi x0, x0, 0")[0]]
+    return [words[i] | words[i + 1] << 32 for i in range(0, len(words), 2)]
+
+def signExtend(value, bits):
+    return value - (1 << bits) if value >> (bits - 1) & 1 else value
+
+def pcRelOffset(word):
+    ''' Offset of a JAL/branch instruction (None for any other) '''
+    if word & 0x7f == 0b1101111:
+        return signExtend((word >> 31) << 20 | ((word >> 12) & 0xff) << 12 | ((word >> 20) & 1) << 11 |
+            ((word >> 21) & 0x3ff) << 1, 21)
+    if word & 0x7f == 0b1100011:
+        return signExtend((word >> 31) << 12 | ((word >> 7) & 1) << 11 | ((word >> 25) & 0x3f) << 5 |
+            ((word >> 8) & 0xf) << 1, 13)
+    return None
+
+def compressInstruction(word, offset=None):
+    ''' The RV32C instruction equivalent to a 32-bit one (None if there is none) - a JAL/branch's offset is
+    replaced by "offset" when given '''
+    isP = lambda reg: 8 <= reg <= 15
+    x = lambda reg: f"x{reg}"
+    opcode, rd, funct3 = word & 0x7f, (word >> 7) & 0x1f, (word >> 12) & 0x7
+    rs1, rs2, funct7 = (word >> 15) & 0x1f, (word >> 20) & 0x1f, word >> 25
+    immI = signExtend(word >> 20, 12)
+    immS = signExtend(funct7 << 5 | rd, 12)
+    offset = pcRelOffset(word) if offset is None else offset
+    if opcode == 0b0010011 and funct3 == 0b000:
+        if rd == 0 and rs1 == 0 and immI == 0:
+            return asm2binC("c.nop", [])
+        if rd == rs1 == 2 and immI != 0 and immI % 16 == 0 and -512 <= immI <= 496:
+            return asm2binC("c.addi16sp", [str(immI)])
+        if rs1 == 2 and isP(rd) and immI % 4 == 0 and 0 < immI <= 1020:
+            return asm2binC("c.addi4spn", [x(rd), str(immI)])
+        if rd != 0 and rs1 == 0 and -32 <= immI <= 31:
+            return asm2binC("c.li", [x(rd), str(immI)])
+        if rd != 0 and rd == rs1 and immI != 0 and -32 <= immI <= 31:
+            return asm2binC("c.addi", [x(rd), str(immI)])
+        if rd != 0 and rs1 != 0 and immI == 0:
+            return asm2binC("c.mv", [x(rd), x(rs1)])
+    elif opcode == 0b0010011 and funct3 == 0b001 and funct7 == 0 and rd == rs1 != 0 and rs2 != 0:
+        return asm2binC("c.slli", [x(rd), str(rs2)])
+    elif opcode == 0b0010011 and funct3 == 0b101 and funct7 in [0, 0b0100000] and rd == rs1 and isP(rd) and rs2 != 0:
+        return asm2binC("c.srli" if funct7 == 0 else "c.srai", [x(rd), str(rs2)])
+    elif opcode == 0b0010011 and funct3 == 0b111 and rd == rs1 and isP(rd) and -32 <= immI <= 31:
+        return asm2binC("c.andi", [x(rd), str(immI)])
+    elif opcode == 0b0110111 and rd not in [0, 2] and signExtend(word >> 12, 20) != 0 and \
+        -32 <= signExtend(word >> 12, 20) <= 31:
+        return asm2binC("c.lui", [x(rd), str(signExtend(word >> 12, 20) << 12)])
+    elif opcode == 0b0110011 and funct7 == 0 and funct3 == 0b000 and rd != 0:
+        if rs1 == 0 and rs2 != 0:
+            return asm2binC("c.mv", [x(rd), x(rs2)])
+        if rd == rs1 and rs2 != 0:
+            return asm2binC("c.add", [x(rd), x(rs2)])
+        if rd == rs2 and rs1 != 0:
+            return asm2binC("c.add", [x(rd), x(rs1)])
+    elif opcode == 0b0110011 and (funct7, funct3) in [(0b0100000, 0b000), (0, 0b100), (0, 0b110), (0, 0b111)] and \
+        isP(rd) and isP(rs1) and isP(rs2):
+        mnemonic = { 0b000: "c.sub", 0b100: "c.xor", 0b110: "c.or", 0b111: "c.and" }[funct3]
+        if rd == rs1:
+            return asm2binC(mnemonic, [x(rd), x(rs2)])
+        if rd == rs2 and mnemonic != "c.sub":
+            return asm2binC(mnemonic, [x(rd), x(rs1)])
+    elif opcode == 0b0000011 and funct3 == 0b010:
+        if isP(rd) and isP(rs1) and immI % 4 == 0 and 0 <= immI <= 124:
+            return asm2binC("c.lw", [x(rd), x(rs1), str(immI)])
+        if rs1 == 2 and rd != 0 and immI % 4 == 0 and 0 <= immI <= 252:
+            return asm2binC("c.lwsp", [x(rd), str(immI)])
+    elif opcode == 0b0100011 and funct3 == 0b010:
+        if isP(rs2) and isP(rs1) and immS % 4 == 0 and 0 <= immS <= 124:
+            return asm2binC("c.sw", [x(rs2), str(immS), x(rs1)])
+        if rs1 == 2 and immS % 4 == 0 and 0 <= immS <= 252:
+            return asm2binC("c.swsp", [x(rs2), str(immS)])
+    elif opcode == 0b1101111 and rd in [0, 1] and -2048 <= offset <= 2046:
+        return asm2binC("c.j" if rd == 0 else "c.jal", [str(offset)])
+    elif opcode == 0b1100111 and funct3 == 0 and immI == 0 and rs1 != 0 and rd in [0, 1]:
+        return asm2binC("c.jr" if rd == 0 else "c.jalr", [x(rs1)])
+    elif opcode == 0b1100011 and funct3 in [0b000, 0b001] and 0 in [rs1, rs2] and isP(rs1 | rs2) and \
+        -256 <= offset <= 254:
+        return asm2binC("c.beqz" if funct3 == 0b000 else "c.bnez", [x(rs1 | rs2), str(offset)])
+    elif word == 0x00100073:
+        return asm2binC("c.ebreak", [])
+    return None
+
+def compressProgram(binaryList, alignTargets=False):
+    ''' Convert an RV32I(MF) program (at address 0) to RV32IC - every instruction with a compressed equivalent is
+    replaced by it and JAL/branch offsets are updated (one no longer fitting its compressed form stays 32-bit)\n
+    With "alignTargets", a 32-bit instruction that is a JAL/branch target (or follows a call) is kept word aligned
+    by leaving the closest compressible instruction before it uncompressed\n
+    NOTE: Code addresses computed otherwise (i.e. JALR targets other than links) are not relocated
+    '''
+    targets = { i: i + pcRelOffset(word) // 4 for i, word in enumerate(binaryList) if pcRelOffset(word) is not None }
+    landings = set(targets.values()) | { i + 1 for i, word in enumerate(binaryList)
+        if word & 0x7f in [0b1101111, 0b1100111] and (word >> 7) & 0x1f != 0 }
+
+    # Every candidate starts out compressed - one whose new offset does not fit (or that misaligns a target) is
+    # made 32-bit again, which only ever moves code apart (so this settles)
+    sizes = [2 if compressInstruction(word) is not None else 4 for word in binaryList]
+    while True:
+        addrs = [sum(sizes[:i]) for i in range(len(binaryList) + 1)]
+        offsets = { i: addrs[target] - addrs[i] for i, target in targets.items() }
+        grown = [i for i in targets if sizes[i] == 2 and compressInstruction(binaryList[i], offsets[i]) is None]
+        if alignTargets and not grown:
+            for i in sorted(landings):
+                before = [j for j in range(i) if sizes[j] == 2]
+                if i < len(binaryList) and sizes[i] == 4 and addrs[i] % 4 == 2 and before:
+                    grown = [before[-1]]
+                    break
+        if not grown:
+            break
+        for i in grown:
+            sizes[i] = 4
+
+    halfwords = []
+    for i, word in enumerate(binaryList):
+        if sizes[i] == 2:
+            halfwords.append(compressInstruction(word, offsets.get(i)))
+            continue
+        if i in targets and word & 0x7f == 0b1101111:
+            imm = offsets[i]
+            word = (word & 0xfff | ((imm >> 20) & 1) << 31 | ((imm >> 1) & 0x3ff) << 21 | ((imm >> 11) & 1) << 20 |
+                ((imm >> 12) & 0xff) << 12)
+        elif i in targets:
+            imm = offsets[i]
+            word = (word & 0x01fff07f | ((imm >> 12) & 1) << 31 | ((imm >> 5) & 0x3f) << 25 | ((imm >> 1) & 0xf) << 8 |
+                ((imm >> 11) & 1) << 7)
+        halfwords += [word & 0xffff, word >> 16]
+    return packHalfwords(halfwords)
+
 def asm2Bin(instructions):
-    '''Convert RV32I asm program str to binary list\n
+    '''Convert RV32I(MF)/Zba/Zbb asm program str to binary list (see compressProgram/asm2BinC for RV32C)\n
     (Operand order follows same arg orders as asm2bin<RISBUJ> util functions)
     '''
     instructionsList = textwrap.dedent(instructions).split(os.linesep)
     instructionsList = [value for value in instructionsList if value != '']
 
+    # NOTE: riscv_assembler names these differently
+    aliases = { "mulhsu": "mulsu", "mulhu": "mulu", "srli": "slri" }
+
     tk = Toolkit()
     binaryList = []
     for instr in instructionsList:
         mnemonic = instr[:instr.find(' ')]
+        mnemonic = aliases.get(mnemonic, mnemonic)
         operands = instr[instr.find(' '):].replace(' ', '').split(',')
-        if mnemonic in tk.R_instr:
+        if mnemonic in fpInstructions or mnemonic in ["flw", "fsw"]:
+            binaryList.append(asm2binF(mnemonic, operands))
+        elif mnemonic in zbRInstructions or mnemonic in zbUnaryInstructions or mnemonic in ["rori", "zext.h"]:
+            binaryList.append(asm2binZb(mnemonic, operands))
+        elif mnemonic in tk.R_instr or mnemonic in rMissing:
             binaryList.append(asm2binR(mnemonic, operands[0], operands[1], operands[2]))
-        elif mnemonic in tk.I_instr:
+        elif mnemonic in tk.I_instr or mnemonic in iMissing:
             binaryList.append(asm2binI(mnemonic, operands[0], operands[1], operands[2]))
         elif mnemonic in tk.S_instr:
             binaryList.append(asm2binS(mnemonic, operands[0], operands[1], operands[2]))
         elif mnemonic in tk.SB_instr:
             binaryList.append(asm2binB(mnemonic, operands[0], operands[1], operands[2]))
         elif mnemonic in tk.U_instr:
-            binaryList.append(asm2binU(mnemonic, operands[0], operands[1], operands[2]))
+            binaryList.append(asm2binU(mnemonic, operands[0], operands[1]))
         elif mnemonic in tk.UJ_instr:
-            binaryList.append(asm2binJ(mnemonic, operands[0], operands[1], operands[2]))
+            binaryList.append(asm2binJ(mnemonic, operands[0], operands[1]))
         else:
             print(f"[mipyfive - Error]: assembleRv32iProgram - Unrecognized mnemonic ({mnemonic})")
             return None
 
     return binaryList
+
+def asm2BinC(instructions):
+    '''Convert RV32IC asm program str (RV32I(MF)/Zba/Zbb and c.* mnemonics, see asm2Bin/asm2binC) to binary list
+    (instructions are packed at halfword granularity)
+    '''
+    instructionsList = textwrap.dedent(instructions).split(os.linesep)
+    instructionsList = [value for value in instructionsList if value.strip() != '']
+
+    halfwords = []
+    for instr in instructionsList:
+        instr = instr.strip()
+        mnemonic = instr.split(' ')[0]
+        if mnemonic in cInstructions:
+            operands = instr[len(mnemonic):].replace(' ', '').split(',')
+            halfwords.append(asm2binC(mnemonic, [value for value in operands if value != '']))
+        else:
+            word = asm2Bin(instr)
+            if word is None:
+                return None
+            halfwords += [word[0] & 0xffff, word[0] >> 16]
+
+    return packHalfwords(halfwords)
+
+# Single-precision reference helpers (exact, via fractions) for the RV32F unit tests
+F32_QNAN = 0x7fc00000
+F32_INF  = 0x7f800000
+
+def f32IsNan(bits):
+    return (bits >> 23) & 0xff == 0xff and bits & 0x7fffff != 0
+
+def f32IsInf(bits):
+    return bits & 0x7fffffff == F32_INF
+
+def f32ToFraction(bits):
+    ''' Value of a finite binary32 bit pattern as an exact Fraction (a -0 gives 0) '''
+    exp, frac = (bits >> 23) & 0xff, bits & 0x7fffff
+    sig = Fraction(frac if exp == 0 else frac | (1 << 23))
+    value = sig * Fraction(2) ** (max(exp, 1) - 127 - 23)
+    return -value if bits >> 31 else value
+
+def roundF32(value, rm=0, negative=False):
+    ''' Round an exact (Fraction) value to a binary32 bit pattern - "rm" is a RISC-V rounding mode (RNE, RTZ, RDN,
+    RUP, RMM), "negative" gives the sign of a zero value '''
+    sign = value < 0 or (value == 0 and negative)
+    mag = abs(Fraction(value))
+    if mag == 0:
+        return sign << 31
+    exp = max(mag.numerator.bit_length() - mag.denominator.bit_length(), -126)
+    while mag >= Fraction(2) ** (exp + 1):
+        exp += 1
+    while exp > -126 and mag < Fraction(2) ** exp:
+        exp -= 1
+    quantum = Fraction(2) ** (exp - 23)
+    sig, rem = divmod(mag, quantum)
+    rem = rem / quantum
+    roundUp = {
+        0: rem > Fraction(1, 2) or (rem == Fraction(1, 2) and sig % 2 == 1),
+        1: False,
+        2: rem > 0 and sign,
+        3: rem > 0 and not sign,
+        4: rem >= Fraction(1, 2)
+    }[rm]
+    mag = (sig + roundUp) * quantum
+    if mag >= Fraction(2) ** 128:
+        toInf = rm in [0, 4] or (rm == 3 and not sign) or (rm == 2 and sign)
+        return (sign << 31) | (F32_INF if toInf else 0x7f7fffff)
+    if mag < Fraction(2) ** -126:
+        return (sign << 31) | int(mag / Fraction(2) ** -149)
+    exp = mag.numerator.bit_length() - mag.denominator.bit_length()
+    while mag >= Fraction(2) ** (exp + 1):
+        exp += 1
+    while mag < Fraction(2) ** exp:
+        exp -= 1
+    frac = int(mag / Fraction(2) ** (exp - 23)) - (1 << 23)
+    return (sign << 31) | ((exp + 127) << 23) | frac
+
+def randomF32(special=True):
+    ''' A random binary32 bit pattern - biased towards special and edge values '''
+    edges = [0, 0x80000000, 0x3f800000, 0xbf800000, 1, 0x807fffff, 0x00800000, 0x7f7fffff, 0xff7fffff,
+        F32_INF, 0xff800000, F32_QNAN, 0x7f800001]
+    pick = random.random()
+    if special and pick < 0.15:
+        return random.choice(edges)
+    if pick < 0.3:
+        # Small exponents - subnormal and tiny results
+        return random.getrandbits(1) << 31 | random.randint(0, 24) << 23 | random.getrandbits(23)
+    return random.getrandbits(1) << 31 | random.randint(64, 190) << 23 | random.getrandbits(23)